@@ -0,0 +1,250 @@
+import logging
+
+import psycopg2
+
+logger = logging.getLogger("they-own-what")
+
+# One row per property with code enforcement / eviction counters. The ingest
+# scripts keep it current through property_activity_dirty, so readers can join
+# a single indexed row instead of aggregating both tables on every request.
+DDL_PROPERTY_ACTIVITY_STATS = """
+    CREATE TABLE IF NOT EXISTS property_activity_stats (
+        property_id INTEGER PRIMARY KEY,
+        violations_total INTEGER NOT NULL DEFAULT 0,
+        violations_open INTEGER NOT NULL DEFAULT 0,
+        violations_active INTEGER NOT NULL DEFAULT 0,
+        violations_closed INTEGER NOT NULL DEFAULT 0,
+        violations_last_90d INTEGER NOT NULL DEFAULT 0,
+        violations_last_365d INTEGER NOT NULL DEFAULT 0,
+        last_violation_date DATE,
+        evictions_total INTEGER NOT NULL DEFAULT 0,
+        evictions_active INTEGER NOT NULL DEFAULT 0,
+        evictions_closed INTEGER NOT NULL DEFAULT 0,
+        evictions_last_90d INTEGER NOT NULL DEFAULT 0,
+        evictions_last_365d INTEGER NOT NULL DEFAULT 0,
+        evictions_prev_365d INTEGER NOT NULL DEFAULT 0,
+        last_eviction_date DATE,
+        computed_on DATE NOT NULL DEFAULT CURRENT_DATE
+    )
+"""
+
+DDL_PROPERTY_ACTIVITY_DIRTY = """
+    CREATE TABLE IF NOT EXISTS property_activity_dirty (
+        property_id INTEGER PRIMARY KEY,
+        changed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+DDL_PROPERTY_ACTIVITY_TRIGGERS = """
+    CREATE OR REPLACE FUNCTION property_activity_mark_dirty(pid INTEGER) RETURNS VOID AS $$
+    BEGIN
+        IF pid IS NULL THEN
+            RETURN;
+        END IF;
+        INSERT INTO property_activity_dirty (property_id)
+        VALUES (pid)
+        ON CONFLICT (property_id) DO UPDATE SET changed_at = CURRENT_TIMESTAMP;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    CREATE OR REPLACE FUNCTION property_activity_dirty_enforcement() RETURNS TRIGGER AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            PERFORM property_activity_mark_dirty(OLD.property_id);
+        ELSIF TG_OP = 'INSERT' THEN
+            PERFORM property_activity_mark_dirty(NEW.property_id);
+        ELSIF NEW.property_id IS DISTINCT FROM OLD.property_id
+           OR NEW.record_status IS DISTINCT FROM OLD.record_status
+           OR NEW.date_opened IS DISTINCT FROM OLD.date_opened
+           OR NEW.date_closed IS DISTINCT FROM OLD.date_closed THEN
+            PERFORM property_activity_mark_dirty(OLD.property_id);
+            PERFORM property_activity_mark_dirty(NEW.property_id);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    CREATE OR REPLACE FUNCTION property_activity_dirty_eviction() RETURNS TRIGGER AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            PERFORM property_activity_mark_dirty(OLD.property_id);
+        ELSIF TG_OP = 'INSERT' THEN
+            PERFORM property_activity_mark_dirty(NEW.property_id);
+        ELSIF NEW.property_id IS DISTINCT FROM OLD.property_id
+           OR NEW.status IS DISTINCT FROM OLD.status
+           OR NEW.filing_date IS DISTINCT FROM OLD.filing_date THEN
+            PERFORM property_activity_mark_dirty(OLD.property_id);
+            PERFORM property_activity_mark_dirty(NEW.property_id);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    DROP TRIGGER IF EXISTS trg_property_activity_enforcement ON code_enforcement;
+    CREATE TRIGGER trg_property_activity_enforcement
+    AFTER INSERT OR DELETE OR UPDATE OF property_id, record_status, date_opened, date_closed ON code_enforcement
+    FOR EACH ROW EXECUTE FUNCTION property_activity_dirty_enforcement();
+
+    DROP TRIGGER IF EXISTS trg_property_activity_eviction ON evictions;
+    CREATE TRIGGER trg_property_activity_eviction
+    AFTER INSERT OR DELETE OR UPDATE OF property_id, status, filing_date ON evictions
+    FOR EACH ROW EXECUTE FUNCTION property_activity_dirty_eviction();
+"""
+
+# Status classes match the definitions the endpoints used when they aggregated
+# the raw tables: "open" is the property page's unclosed count, "active" the
+# batch/insights count that also drops blank and entered-in-error records, and
+# "closed" the landlord monitor's resolved count.
+_STATS_QUERY = """
+    WITH ce AS (
+        SELECT
+            ce.property_id,
+            COUNT(*) AS violations_total,
+            COUNT(*) FILTER (
+                WHERE ce.record_status IS NULL
+                   OR lower(ce.record_status) NOT LIKE 'closed%'
+            ) AS violations_open,
+            COUNT(*) FILTER (
+                WHERE ce.record_status IS NOT NULL
+                  AND ce.record_status != 'NaN'
+                  AND ce.record_status NOT ILIKE 'Closed%'
+                  AND ce.record_status NOT ILIKE 'Entered in error%'
+            ) AS violations_active,
+            COUNT(*) FILTER (
+                WHERE ce.date_closed IS NOT NULL
+                   OR lower(COALESCE(ce.record_status, '')) IN ('closed', 'resolved', 'complied', 'complete', 'completed')
+            ) AS violations_closed,
+            COUNT(*) FILTER (WHERE ce.date_opened >= CURRENT_DATE - INTERVAL '90 days') AS violations_last_90d,
+            COUNT(*) FILTER (WHERE ce.date_opened >= CURRENT_DATE - INTERVAL '365 days') AS violations_last_365d,
+            MAX(ce.date_opened) AS last_violation_date
+        FROM code_enforcement ce
+        {enforcement_scope}
+        WHERE ce.property_id IS NOT NULL
+        GROUP BY ce.property_id
+    ),
+    ev AS (
+        SELECT
+            e.property_id,
+            COUNT(*) AS evictions_total,
+            COUNT(*) FILTER (
+                WHERE lower(COALESCE(e.status, '')) NOT LIKE '%withdraw%'
+                  AND lower(COALESCE(e.status, '')) NOT LIKE '%closed%'
+                  AND lower(COALESCE(e.status, '')) NOT LIKE '%disposed%'
+            ) AS evictions_active,
+            COUNT(*) FILTER (
+                WHERE lower(COALESCE(e.status, '')) ~ '(closed|disposed|dismissed|withdrawn|settled|judgment)'
+            ) AS evictions_closed,
+            COUNT(*) FILTER (WHERE e.filing_date >= CURRENT_DATE - INTERVAL '90 days') AS evictions_last_90d,
+            COUNT(*) FILTER (WHERE e.filing_date >= CURRENT_DATE - INTERVAL '365 days') AS evictions_last_365d,
+            COUNT(*) FILTER (
+                WHERE e.filing_date >= CURRENT_DATE - INTERVAL '730 days'
+                  AND e.filing_date < CURRENT_DATE - INTERVAL '365 days'
+            ) AS evictions_prev_365d,
+            MAX(e.filing_date) AS last_eviction_date
+        FROM evictions e
+        {eviction_scope}
+        WHERE e.property_id IS NOT NULL
+        GROUP BY e.property_id
+    )
+    INSERT INTO property_activity_stats (
+        property_id, violations_total, violations_open, violations_active, violations_closed,
+        violations_last_90d, violations_last_365d, last_violation_date,
+        evictions_total, evictions_active, evictions_closed,
+        evictions_last_90d, evictions_last_365d, evictions_prev_365d, last_eviction_date,
+        computed_on
+    )
+    SELECT
+        COALESCE(ce.property_id, ev.property_id),
+        COALESCE(ce.violations_total, 0), COALESCE(ce.violations_open, 0),
+        COALESCE(ce.violations_active, 0), COALESCE(ce.violations_closed, 0),
+        COALESCE(ce.violations_last_90d, 0), COALESCE(ce.violations_last_365d, 0),
+        ce.last_violation_date,
+        COALESCE(ev.evictions_total, 0), COALESCE(ev.evictions_active, 0),
+        COALESCE(ev.evictions_closed, 0), COALESCE(ev.evictions_last_90d, 0),
+        COALESCE(ev.evictions_last_365d, 0), COALESCE(ev.evictions_prev_365d, 0),
+        ev.last_eviction_date,
+        CURRENT_DATE
+    FROM ce
+    FULL OUTER JOIN ev ON ev.property_id = ce.property_id
+"""
+
+
+def _stats_query(scope_table=None):
+    if not scope_table:
+        return _STATS_QUERY.format(enforcement_scope="", eviction_scope="")
+    return _STATS_QUERY.format(
+        enforcement_scope=f"JOIN {scope_table} scope ON scope.property_id = ce.property_id",
+        eviction_scope=f"JOIN {scope_table} scope ON scope.property_id = e.property_id",
+    )
+
+
+def ensure_property_activity_stats(conn):
+    """Creates the stats table and change triggers; builds it on first install.
+
+    Returns False when the source tables are missing or the DDL fails, so
+    callers can keep going without the counters.
+    """
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT to_regclass('code_enforcement') IS NOT NULL AND to_regclass('evictions') IS NOT NULL")
+            if not cursor.fetchone()[0]:
+                return False
+            cursor.execute("SELECT to_regclass('property_activity_stats') IS NULL")
+            created = cursor.fetchone()[0]
+            cursor.execute(DDL_PROPERTY_ACTIVITY_STATS)
+            cursor.execute(DDL_PROPERTY_ACTIVITY_DIRTY)
+            cursor.execute(DDL_PROPERTY_ACTIVITY_TRIGGERS)
+        if created:
+            # Same transaction as the DDL, so a failed build is retried next time
+            refresh_property_activity_stats(conn, full=True)
+        else:
+            conn.commit()
+    except psycopg2.Error as e:
+        conn.rollback()
+        logger.warning(f"Property activity stats setup failed: {e}")
+        return False
+    return True
+
+
+def refresh_property_activity_stats(conn, full=False):
+    """Recomputes stats for properties whose records changed since the last
+    refresh, plus rows whose 90/365-day windows have rolled over since they
+    were computed. Returns the number of properties refreshed."""
+    with conn.cursor() as cursor:
+        if full:
+            cursor.execute("TRUNCATE property_activity_stats, property_activity_dirty")
+            cursor.execute(_stats_query())
+            refreshed = cursor.rowcount
+        else:
+            cursor.execute("""
+                CREATE TEMP TABLE tmp_activity_refresh ON COMMIT DROP AS
+                SELECT property_id FROM property_activity_dirty
+                UNION
+                SELECT property_id FROM property_activity_stats
+                WHERE computed_on < CURRENT_DATE
+                  AND (violations_last_365d > 0 OR evictions_last_365d > 0 OR evictions_prev_365d > 0)
+            """)
+            refreshed = cursor.rowcount
+            if refreshed:
+                cursor.execute("ALTER TABLE tmp_activity_refresh ADD PRIMARY KEY (property_id)")
+                cursor.execute("ANALYZE tmp_activity_refresh")
+                # Markers go first so changes committed while we aggregate are
+                # picked up by the next refresh rather than lost
+                cursor.execute("DELETE FROM property_activity_dirty d USING tmp_activity_refresh r WHERE d.property_id = r.property_id")
+                cursor.execute("DELETE FROM property_activity_stats s USING tmp_activity_refresh r WHERE s.property_id = r.property_id")
+                cursor.execute(_stats_query("tmp_activity_refresh"))
+    conn.commit()
+    logger.info(f"Property activity stats refreshed for {refreshed} properties{' (full rebuild)' if full else ''}")
+    return refreshed
+
+
+def update_property_activity_stats(conn):
+    """Ingest hook: installs the table if needed, then applies pending changes."""
+    if not ensure_property_activity_stats(conn):
+        return 0
+    try:
+        return refresh_property_activity_stats(conn)
+    except psycopg2.Error as e:
+        conn.rollback()
+        logger.error(f"Property activity stats refresh failed: {e}")
+        return 0
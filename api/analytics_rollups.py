@@ -0,0 +1,441 @@
+import os
+import math
+import time
+import hashlib
+import logging
+from collections import defaultdict
+from functools import reduce
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+logger = logging.getLogger("they-own-what")
+
+# Registers per sketch = 2 ** precision. Changing it invalidates stored sketches.
+HLL_PRECISION = 10
+HLL_REGISTERS = 1 << HLL_PRECISION
+MINUTE_ROLLUP_RETENTION_DAYS = int(os.environ.get("ANALYTICS_MINUTE_ROLLUP_RETENTION_DAYS", "3"))
+ROLLUP_PRUNE_INTERVAL_SECONDS = 600
+# Keys longer than this are truncated so they stay within btree index limits
+MAX_KEY_LENGTH = 500
+
+ROLLUP_TABLES = {"minute": "analytics_rollup_minute", "day": "analytics_rollup_day"}
+# Advisory lock serializing rollup flushes, so the read-merge-write of sketches cannot lose registers
+ROLLUP_LOCK_ID = 0x616E6C72
+
+COUNTER_COLUMNS = (
+    "requests", "bot_requests", "mobile_requests",
+    "search_requests", "property_views", "network_views",
+)
+
+DDL_ANALYTICS_ROLLUP_TABLE = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        bucket TIMESTAMP NOT NULL,
+        dimension TEXT NOT NULL,
+        k1 TEXT NOT NULL DEFAULT '',
+        k2 TEXT NOT NULL DEFAULT '',
+        k3 TEXT NOT NULL DEFAULT '',
+        requests BIGINT NOT NULL DEFAULT 0,
+        bot_requests BIGINT NOT NULL DEFAULT 0,
+        mobile_requests BIGINT NOT NULL DEFAULT 0,
+        search_requests BIGINT NOT NULL DEFAULT 0,
+        property_views BIGINT NOT NULL DEFAULT 0,
+        network_views BIGINT NOT NULL DEFAULT 0,
+        sessions_hll BYTEA,
+        human_sessions_hll BYTEA,
+        last_seen TIMESTAMP,
+        PRIMARY KEY (bucket, dimension, k1, k2, k3)
+    )
+"""
+
+DDL_ANALYTICS_ROLLUP_STATE = """
+    CREATE TABLE IF NOT EXISTS analytics_rollup_state (
+        id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+        covered_since TIMESTAMP NOT NULL
+    )
+"""
+
+# The SQL sketch union used by earlier window reads rebuilt every register
+# array byte by byte; sketches are now merged in Python and these are dropped.
+DDL_DROP_SQL_HLL_UNION = """
+    DROP AGGREGATE IF EXISTS analytics_hll_union(BYTEA);
+    DROP FUNCTION IF EXISTS analytics_hll_merge(BYTEA, BYTEA);
+"""
+
+
+# --- HyperLogLog sketches ---
+def hll_new() -> bytearray:
+    return bytearray(HLL_REGISTERS)
+
+
+def hll_add(registers: bytearray, value: str):
+    x = int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+    idx = x >> (64 - HLL_PRECISION)
+    rest = x & ((1 << (64 - HLL_PRECISION)) - 1)
+    rank = (64 - HLL_PRECISION) - rest.bit_length() + 1
+    if rank > registers[idx]:
+        registers[idx] = rank
+
+
+def hll_merge(a: Optional[bytes], b: Optional[bytes]) -> Optional[bytes]:
+    """Register-wise max; None acts as the empty sketch."""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return bytes(map(max, a, b))
+
+
+def hll_union(sketches: Optional[Iterable[bytes]]) -> Optional[bytes]:
+    """Folds any number of sketches with hll_merge; None or empty gives None."""
+    return reduce(hll_merge, (_as_bytes(s) for s in sketches or ()), None)
+
+
+def hll_estimate(registers: Optional[bytes]) -> int:
+    if not registers:
+        return 0
+    m = len(registers)
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m * m / sum(2.0 ** -r for r in registers)
+    zeros = registers.count(0)
+    if estimate <= 2.5 * m and zeros:
+        # Small-range correction (linear counting)
+        estimate = m * math.log(m / zeros)
+    return int(round(estimate))
+
+
+# --- Classification (mirrors the raw SQL used by /api/analytics/realtime) ---
+def device_type(user_agent: str, is_mobile: bool, is_bot: bool) -> str:
+    if is_bot:
+        return "Bot / CLI"
+    if is_mobile:
+        return "Mobile"
+    if "iPad" in user_agent or "Tablet" in user_agent:
+        return "Tablet"
+    return "Desktop"
+
+
+def browser_name(user_agent: str, is_bot: bool) -> str:
+    if "Chrome" in user_agent and "Edg" not in user_agent and "OPR" not in user_agent:
+        return "Chrome"
+    if "Safari" in user_agent and "Chrome" not in user_agent:
+        return "Safari"
+    if "Firefox" in user_agent:
+        return "Firefox"
+    if "Edg" in user_agent:
+        return "Edge"
+    if "curl" in user_agent:
+        return "curl CLI"
+    if is_bot:
+        return "Bot Crawler"
+    return "Other"
+
+
+def _key(*parts) -> Tuple[str, str, str]:
+    values = [(p or "")[:MAX_KEY_LENGTH] for p in parts]
+    return tuple(values + [""] * (3 - len(values)))
+
+
+def _as_naive_utc(ts: Optional[datetime]) -> datetime:
+    if ts is None:
+        return datetime.now(timezone.utc).replace(tzinfo=None)
+    if ts.tzinfo is not None:
+        return ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
+
+
+class RollupAccumulator:
+    """Aggregates local_analytics rows into minute and day rollup deltas."""
+
+    def __init__(self):
+        self.cells: Dict[Tuple, Dict[str, Any]] = {}
+
+    def _cell(self, grain, bucket, dimension, key):
+        cell_key = (grain, bucket, dimension) + key
+        cell = self.cells.get(cell_key)
+        if cell is None:
+            cell = {c: 0 for c in COUNTER_COLUMNS}
+            cell.update(sessions=None, human_sessions=None, last_seen=None)
+            self.cells[cell_key] = cell
+        return cell
+
+    def add(self, row: tuple, ts: Optional[datetime]):
+        (session_hash, city, event_type, path, search_query, _entity_target,
+         user_agent, is_mobile, is_bot, _ip, visitor_city, visitor_region, visitor_country) = row
+        path = path or ""
+        if "analytics" in path:
+            return
+        user_agent = user_agent or ""
+        ts = _as_naive_utc(ts)
+        buckets = (
+            ("minute", ts.replace(second=0, microsecond=0)),
+            ("day", ts.replace(hour=0, minute=0, second=0, microsecond=0)),
+        )
+
+        # Paths embed property/network ids, so a session sketch per page would
+        # grow rollup storage with every distinct URL; pages only count hits
+        dims = [
+            ("all", _key(), True),
+            ("dataset", _key(city), True),
+            ("device", _key(device_type(user_agent, is_mobile, is_bot)), True),
+            ("browser", _key(browser_name(user_agent, is_bot)), True),
+            ("page", _key(path), False),
+        ]
+        if not is_bot:
+            dims.append(("geo", _key(visitor_city or "(Unknown)", visitor_region, visitor_country), True))
+        else:
+            dims.append(("bot_ua", _key(user_agent), False))
+        is_search = event_type == "search" or "search" in path or "autocomplete" in path
+        query = (search_query or "").strip(" ")
+        if query:
+            dims.append(("search", _key(query, city), False))
+
+        for grain, bucket in buckets:
+            for dimension, key, track_sessions in dims:
+                cell = self._cell(grain, bucket, dimension, key)
+                cell["requests"] += 1
+                if dimension in ("all", "dataset") and is_search:
+                    cell["search_requests"] += 1
+                if dimension == "all":
+                    cell["bot_requests"] += int(bool(is_bot))
+                    cell["mobile_requests"] += int(bool(is_mobile))
+                    cell["property_views"] += int(event_type == "property_view")
+                    cell["network_views"] += int(event_type == "network_view")
+                    if not is_bot:
+                        if cell["human_sessions"] is None:
+                            cell["human_sessions"] = hll_new()
+                        hll_add(cell["human_sessions"], session_hash or "")
+                if dimension == "bot_ua":
+                    cell["last_seen"] = max(cell["last_seen"] or ts, ts)
+                if track_sessions:
+                    if cell["sessions"] is None:
+                        cell["sessions"] = hll_new()
+                    hll_add(cell["sessions"], session_hash or "")
+
+    def flush(self, cursor):
+        """Upserts the accumulated deltas.
+
+        Sketches are merged with the stored ones here, under an advisory lock,
+        so the upsert just replaces them instead of merging bytes in SQL.
+        """
+        if not self.cells:
+            return
+        cursor.execute("SELECT pg_advisory_xact_lock(%s)", (ROLLUP_LOCK_ID,))
+        by_grain = defaultdict(list)
+        for grain, table in ROLLUP_TABLES.items():
+            stored = self._stored_sketches(cursor, grain, table)
+            for cell_key in sorted(k for k in self.cells if k[0] == grain):
+                _, bucket, dimension, k1, k2, k3 = cell_key
+                cell = self.cells[cell_key]
+                old_sessions, old_human = stored.get(cell_key[1:], (None, None))
+                sessions = hll_merge(old_sessions, _as_bytes(cell["sessions"]))
+                human_sessions = hll_merge(old_human, _as_bytes(cell["human_sessions"]))
+                by_grain[grain].append((
+                    bucket, dimension, k1, k2, k3,
+                    *[cell[c] for c in COUNTER_COLUMNS],
+                    psycopg2.Binary(sessions) if sessions is not None else None,
+                    psycopg2.Binary(human_sessions) if human_sessions is not None else None,
+                    cell["last_seen"],
+                ))
+        for grain, rows in by_grain.items():
+            table = ROLLUP_TABLES[grain]
+            updates = ", ".join(f"{c} = t.{c} + EXCLUDED.{c}" for c in COUNTER_COLUMNS)
+            execute_values(cursor, f"""
+                INSERT INTO {table} AS t (
+                    bucket, dimension, k1, k2, k3, {", ".join(COUNTER_COLUMNS)},
+                    sessions_hll, human_sessions_hll, last_seen
+                ) VALUES %s
+                ON CONFLICT (bucket, dimension, k1, k2, k3) DO UPDATE SET
+                    {updates},
+                    sessions_hll = COALESCE(EXCLUDED.sessions_hll, t.sessions_hll),
+                    human_sessions_hll = COALESCE(EXCLUDED.human_sessions_hll, t.human_sessions_hll),
+                    last_seen = GREATEST(t.last_seen, EXCLUDED.last_seen)
+            """, rows, page_size=1000)
+        self.cells = {}
+
+    def _stored_sketches(self, cursor, grain, table) -> Dict[Tuple, Tuple[Optional[bytes], Optional[bytes]]]:
+        keys = [
+            k[1:] for k, cell in self.cells.items()
+            if k[0] == grain and (cell["sessions"] is not None or cell["human_sessions"] is not None)
+        ]
+        if not keys:
+            return {}
+        rows = execute_values(cursor, f"""
+            SELECT t.bucket, t.dimension, t.k1, t.k2, t.k3, t.sessions_hll, t.human_sessions_hll
+            FROM {table} t
+            JOIN (VALUES %s) AS v(bucket, dimension, k1, k2, k3)
+              ON t.bucket = v.bucket::timestamp AND t.dimension = v.dimension
+             AND t.k1 = v.k1 AND t.k2 = v.k2 AND t.k3 = v.k3
+        """, keys, page_size=1000, fetch=True)
+        stored = {}
+        for row in rows:
+            values = list(row.values()) if isinstance(row, dict) else list(row)
+            stored[tuple(values[:5])] = (_as_bytes(values[5]), _as_bytes(values[6]))
+        return stored
+
+
+def _as_bytes(value) -> Optional[bytes]:
+    return bytes(value) if value is not None else None
+
+
+# --- Maintenance ---
+def ensure_analytics_rollups(conn):
+    """Creates rollup tables; coverage starts now unless backfilled."""
+    try:
+        with conn.cursor() as cursor:
+            for table in ROLLUP_TABLES.values():
+                cursor.execute(DDL_ANALYTICS_ROLLUP_TABLE.format(table=table))
+            cursor.execute(DDL_ANALYTICS_ROLLUP_STATE)
+            cursor.execute(DDL_DROP_SQL_HLL_UNION)
+            cursor.execute("""
+                INSERT INTO analytics_rollup_state (id, covered_since)
+                VALUES (TRUE, NOW()::timestamp)
+                ON CONFLICT (id) DO NOTHING
+            """)
+        conn.commit()
+    except psycopg2.Error as e:
+        # Raw analytics keep flowing; the endpoint falls back to raw queries
+        conn.rollback()
+        logger.warning(f"Analytics rollup setup failed: {e}")
+
+
+_last_prune = 0.0
+
+
+def apply_analytics_rollups(cursor, rows: List[tuple], returned: Optional[List[tuple]]):
+    """AnalyticsWriter hook: folds a freshly inserted batch into the rollups."""
+    global _last_prune
+    acc = RollupAccumulator()
+    timestamps = [r[0] for r in returned] if returned else [None] * len(rows)
+    for row, ts in zip(rows, timestamps):
+        acc.add(row, ts)
+
+    # A rollup failure must not lose the raw rows inserted in this transaction
+    cursor.execute("SAVEPOINT analytics_rollups")
+    try:
+        acc.flush(cursor)
+        if time.monotonic() - _last_prune > ROLLUP_PRUNE_INTERVAL_SECONDS:
+            _last_prune = time.monotonic()
+            cursor.execute(
+                f"DELETE FROM {ROLLUP_TABLES['minute']} WHERE bucket < NOW()::timestamp - make_interval(days => %s)",
+                (MINUTE_ROLLUP_RETENTION_DAYS,),
+            )
+        cursor.execute("RELEASE SAVEPOINT analytics_rollups")
+    except psycopg2.Error as e:
+        cursor.execute("ROLLBACK TO SAVEPOINT analytics_rollups")
+        logger.warning(f"Analytics rollup update failed: {e}")
+
+
+def backfill_analytics_rollups(conn, batch_size: int = 50000) -> int:
+    """Rolls up raw local_analytics rows older than the current coverage start."""
+    ensure_analytics_rollups(conn)
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT covered_since FROM analytics_rollup_state FOR UPDATE")
+        covered_since = cursor.fetchone()[0]
+        cursor.execute("SELECT MIN(timestamp) FROM local_analytics WHERE timestamp < %s", (covered_since,))
+        oldest = cursor.fetchone()[0]
+    if oldest is None:
+        conn.commit()
+        return 0
+
+    minute_cutoff = datetime.utcnow() - timedelta(days=MINUTE_ROLLUP_RETENTION_DAYS)
+    total = 0
+    acc = RollupAccumulator()
+    with conn.cursor(name="analytics_rollup_backfill") as read_cur:
+        read_cur.itersize = batch_size
+        read_cur.execute("""
+            SELECT timestamp, session_hash, city, event_type, path, search_query, entity_target,
+                   user_agent, is_mobile, is_bot, visitor_ip, visitor_city, visitor_region, visitor_country
+            FROM local_analytics
+            WHERE timestamp < %s
+        """, (covered_since,))
+        for record in read_cur:
+            acc.add(record[1:], record[0])
+            total += 1
+            if len(acc.cells) >= batch_size:
+                _drop_expired_minutes(acc, minute_cutoff)
+                with conn.cursor() as write_cur:
+                    acc.flush(write_cur)
+    _drop_expired_minutes(acc, minute_cutoff)
+    with conn.cursor() as write_cur:
+        acc.flush(write_cur)
+        write_cur.execute("UPDATE analytics_rollup_state SET covered_since = %s", (oldest,))
+    conn.commit()
+    return total
+
+
+def _drop_expired_minutes(acc: RollupAccumulator, cutoff: datetime):
+    acc.cells = {k: v for k, v in acc.cells.items() if k[0] != "minute" or k[1] >= cutoff}
+
+
+# --- Reads ---
+def rollups_cover(cursor, minutes: int) -> bool:
+    """True when rollups exist and include the start of the requested window."""
+    cursor.execute("""
+        SELECT 1 FROM information_schema.tables
+        WHERE table_schema = 'public' AND table_name = 'analytics_rollup_state'
+    """)
+    if cursor.fetchone() is None:
+        return False
+    cursor.execute("""
+        SELECT covered_since <= NOW()::timestamp - make_interval(mins => %s) AS covered
+        FROM analytics_rollup_state
+    """, (minutes,))
+    row = cursor.fetchone()
+    if row is None:
+        return False
+    return bool(row["covered"] if isinstance(row, dict) else row[0])
+
+
+def _window_segments(now: datetime, minutes: int):
+    """Splits (now - minutes, now] into minute-rollup and day-rollup ranges."""
+    start = (now - timedelta(minutes=minutes)).replace(second=0, microsecond=0)
+    day_of = lambda ts: ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    today = day_of(now)
+    if start < now - timedelta(days=MINUTE_ROLLUP_RETENTION_DAYS - 1):
+        # Minute rows have expired here; long windows are day-aligned at the start
+        first_full_day = day_of(start)
+    else:
+        first_full_day = start if start == day_of(start) else day_of(start) + timedelta(days=1)
+    if first_full_day >= today:
+        return [(start, None)], None
+    minute_ranges = [(today, None)]
+    if start < first_full_day:
+        minute_ranges.insert(0, (start, first_full_day))
+    return minute_ranges, (first_full_day, today)
+
+
+def fetch_window_rollups(cursor, minutes: int) -> List[Dict[str, Any]]:
+    """Merged rollup cells per (dimension, key) for the last `minutes` minutes."""
+    cursor.execute("SELECT NOW()::timestamp AS now")
+    row = cursor.fetchone()
+    now = row["now"] if isinstance(row, dict) else row[0]
+    minute_ranges, day_range = _window_segments(now, minutes)
+
+    parts, params = [], []
+    for lo, hi in minute_ranges:
+        parts.append(f"SELECT * FROM {ROLLUP_TABLES['minute']} WHERE bucket >= %s" + (" AND bucket < %s" if hi else ""))
+        params += [lo] + ([hi] if hi else [])
+    if day_range:
+        parts.append(f"SELECT * FROM {ROLLUP_TABLES['day']} WHERE bucket >= %s AND bucket < %s")
+        params += list(day_range)
+
+    cursor.execute(f"""
+        SELECT dimension, k1, k2, k3,
+               {", ".join(f"SUM({c})::bigint AS {c}" for c in COUNTER_COLUMNS)},
+               array_agg(sessions_hll) FILTER (WHERE sessions_hll IS NOT NULL) AS sessions_hll,
+               array_agg(human_sessions_hll) FILTER (WHERE human_sessions_hll IS NOT NULL) AS human_sessions_hll,
+               MAX(last_seen) AS last_seen
+        FROM ({" UNION ALL ".join(parts)}) r
+        GROUP BY dimension, k1, k2, k3
+    """, params)
+    cells = []
+    for r in cursor.fetchall():
+        cell = dict(r)
+        # Raw sketches come back per bucket and are folded here, not in SQL
+        cell["unique_sessions"] = hll_estimate(hll_union(cell.pop("sessions_hll")))
+        cell["unique_human_sessions"] = hll_estimate(hll_union(cell.pop("human_sessions_hll")))
+        cells.append(cell)
+    return cells
@@ -8,11 +8,19 @@ import logging
 import signal
 import sys
 import re
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 
 # Add the parent directory to sys.path so we can import 'api.geocoding_utils'
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from api.geocoding_utils import geocode_census, geocode_nominatim, is_geocode_match_credible, is_valid_coordinate
+from api.geocoding_utils import (
+    census_batch_geocode,
+    format_geocoding_address,
+    geocode_with_fallbacks,
+    geocoding_address_parts,
+    is_usable_geocode,
+    is_valid_coordinate,
+)
+from api.geocode_cache import GeocodeCache, geocode_cache_key
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
@@ -22,6 +30,10 @@ DATABASE_URL = os.environ.get("DATABASE_URL")
 BATCH_SIZE = 500
 MAX_WORKERS = 10 # Faster for Census
 GEOCODE_FAILED_MARKER = "GEOCODE_FAILED"
+# Send each batch's uncached addresses to the Census batch endpoint before per-address lookups
+USE_CENSUS_BATCH = os.environ.get("CENSUS_BATCH", "1").lower() in ("1", "true", "yes")
+
+GEOCODE_CACHE = GeocodeCache()
 
 stop_signal = False
 
@@ -40,87 +52,67 @@ def get_db_connection():
         logger.error(f"DB Connection failed: {e}")
         return None
 
-def clean_address_for_geocoding(location, city, zip_code):
-    """
-    Applies logic to handle problematic address patterns:
-    1. Strips leading '0 ' (e.g. '0 MELBA ST' -> 'MELBA ST')
-    2. Handles ranges (e.g. '1-15 EDGEWATER' -> '1 EDGEWATER')
-    3. Normalizes zip codes (removes '.0')
+def resolve_geocodes(cur, pending, include_failures=True):
     """
-    if not location:
-        return None
+    Geocodes {cache key: (street, city, state, zip)} for one batch.
 
-    loc = str(location).strip().upper()
-    
-    # Leading-zero municipal placeholders do not identify a real street number.
-    if re.match(r'^0+\s+', loc):
-        return None
-    
-    # 2. Handle range addresses like '1-15 EDGEWATER' or '1-15 A EDGEWATER'
-    # We take the first number in the range
-    # Regex: Start of string, digits, hyphen, digits, (any non-space chars), space, rest of string
-    range_match = re.match(r'^(\d+)-\d+[^\s]*\s+(.*)', loc)
-    if range_match:
-        loc = f"{range_match.group(1)} {range_match.group(2)}"
-
-    # 3. Clean zip code
-    clean_zip = ""
-    if zip_code:
+    Keys already in geocode_cache are answered from it. The rest go to the
+    Census batch endpoint in one upload; addresses it cannot place credibly
+    fall back to the per-address chain (Nominatim, then Nominatim without the
+    ZIP, plus single-line Census for rows a failed batch upload never
+    answered). Every new verdict is written back to the cache.
+
+    Returns {key: (lat, lon, matched_address)} with None for addresses that
+    could not be geocoded credibly. Keys left unanswered because of a stop
+    signal are absent.
+    """
+    queries = {key: format_geocoding_address(parts) for key, parts in pending.items()}
+    resolved = {}
+    for key, entry in GEOCODE_CACHE.get_many(cur, pending, include_failures=include_failures).items():
+        resolved[key] = (entry["latitude"], entry["longitude"], entry["matched_address"]) if entry["credible"] else None
+    misses = [key for key in pending if key not in resolved]
+    if misses:
+        logger.info(f"  -> {len(resolved)} cached, {len(misses)} to geocode")
+
+    verdicts = []
+    fallback = []
+    batch = census_batch_geocode([(str(i), *pending[key]) for i, key in enumerate(misses)]) if (USE_CENSUS_BATCH and misses) else {}
+    for i, key in enumerate(misses):
+        answer = batch.get(str(i), False)
+        if answer:
+            lat, lon, norm = answer
+            if is_usable_geocode(lat, lon, norm, queries[key]):
+                resolved[key] = (lat, lon, norm)
+                verdicts.append((key, queries[key], lat, lon, norm, "census_batch", True))
+                continue
+            logger.info(f"Rejected Census batch match; matched={norm!r}; input={queries[key]!r}")
+        # False: the upload failed, so single-line Census has not been tried yet
+        fallback.append((key, answer is False))
+
+    def geocode_one(item):
+        if stop_signal:
+            return None
+        key, try_census = item
         try:
-            clean_zip = str(int(float(str(zip_code).strip())))
-            if len(clean_zip) < 5:
-                clean_zip = clean_zip.zfill(5)
-        except:
-            clean_zip = str(zip_code).strip()
-            
-    DEFAULT_STATE = os.environ.get("DEFAULT_STATE", "CT")
-    full_address = f"{loc}, {city or ''}, {DEFAULT_STATE} {clean_zip}".strip()
-    return full_address
-
-def process_property(prop):
-    if stop_signal: return None
-    
-    prop_id, location, city, zip_code = prop
-    
-    full_address = clean_address_for_geocoding(location, city, zip_code)
-    if not full_address:
-        return (prop_id, None, None, None)
-
-    def usable(candidate_lat, candidate_lon, candidate_norm, input_address):
-        return (
-            is_valid_coordinate(candidate_lat, candidate_lon, "CT")
-            and is_geocode_match_credible(input_address, candidate_norm)
-        )
-    
-    # Try Census First
-    lat, lon, norm = geocode_census(full_address)
-    if lat and lon and not usable(lat, lon, norm, full_address):
-        logger.info(f"Rejected Census match for property {prop_id}; trying Nominatim. matched={norm!r}; input={full_address!r}")
-        lat, lon, norm = None, None, None
-    
-    # Fallback to Nominatim
-    if not lat:
-        lat, lon, norm = geocode_nominatim(full_address)
-        if lat and lon and not usable(lat, lon, norm, full_address):
-            logger.info(f"Rejected Nominatim match for property {prop_id}; trying without ZIP. matched={norm!r}; input={full_address!r}")
-            lat, lon, norm = None, None, None
-    
-    # Second Fallback: Try without zip if it failed
-    if not lat:
-        addr_no_zip = re.sub(r'\s\d{5}$', '', full_address)
-        if addr_no_zip != full_address:
-            lat, lon, norm = geocode_nominatim(addr_no_zip)
-            if lat and lon and not usable(lat, lon, norm, addr_no_zip):
-                logger.info(f"Rejected no-ZIP Nominatim match for property {prop_id}. matched={norm!r}; input={addr_no_zip!r}")
-                lat, lon, norm = None, None, None
-        
-    if usable(lat, lon, norm, full_address):
-        return (prop_id, lat, lon, norm)
-
-    if lat or lon:
-        logger.warning(f"Rejected geocode for property {prop_id}: {lat}, {lon}; matched={norm!r}; input={full_address!r}")
-
-    return (prop_id, None, None, None)
+            return key, geocode_with_fallbacks(queries[key], try_census=try_census)
+        except Exception as e:
+            # One bad address must not abort the rest of the batch
+            logger.error(f"Fallback geocode failed for {queries[key]!r}: {e}")
+            return None
+
+    if fallback:
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            for i, res in enumerate(executor.map(geocode_one, fallback)):
+                if i % 50 == 0 and i > 0:
+                    logger.info(f"  -> {i}/{len(fallback)} fallback lookups done in batch")
+                if not res:
+                    continue
+                key, (lat, lon, norm, source, credible) = res
+                resolved[key] = (lat, lon, norm) if credible else None
+                verdicts.append((key, queries[key], lat, lon, norm, source, credible))
+
+    GEOCODE_CACHE.put_many(cur, verdicts)
+    return resolved
 
 def run_geocoder(reprocess_failures=False, max_batches=None):
     logger.info(f"Starting Geocoder V2 (Reprocess={reprocess_failures})...")
@@ -180,22 +172,24 @@ def run_geocoder(reprocess_failures=False, max_batches=None):
                 
                 logger.info(f"Processing batch of {len(rows)} properties...")
                 
-                results = []
-                with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-                    futures = [executor.submit(process_property, row) for row in rows]
-                    for i, future in enumerate(as_completed(futures)):
-                        try:
-                            res = future.result()
-                            if res:
-                                results.append(res)
-                            if i % 50 == 0 and i > 0:
-                                logger.info(f"  -> {i}/{len(rows)} processed in batch")
-                        except Exception as e:
-                            logger.error(f"Worker Error: {e}")
+                # Condo units share a street address and so one cache key / lookup
+                prop_keys = []
+                pending = {}
+                for pid, location, city, zip_code in rows:
+                    parts = geocoding_address_parts(location, city, zip_code)
+                    key = geocode_cache_key(*parts) if parts else None
+                    if key:
+                        pending.setdefault(key, parts)
+                    prop_keys.append((pid, key))
+
+                resolved = resolve_geocodes(cur, pending, include_failures=not reprocess_failures)
 
                 # Batch Update
                 success_count = 0
-                for pid, lat, lon, norm_addr in results:
+                for pid, key in prop_keys:
+                    if key is not None and key not in resolved:
+                        continue  # interrupted before this address was tried
+                    lat, lon, norm_addr = resolved.get(key) or (None, None, None)
                     if is_valid_coordinate(lat, lon, "CT"):
                         cur.execute("""
                             UPDATE properties 
@@ -1,48 +1,176 @@
 import os
 import time
+import threading
 import psycopg2
 from psycopg2 import pool
 from fastapi import HTTPException
-from typing import Optional
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
 import logging
 
+from api.query_profiler import connection_factory
+
 logger = logging.getLogger("they-own-what")
 
+DB_POOL_MIN = int(os.environ.get("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.environ.get("DB_POOL_MAX", "40"))
+# How long a checkout waits for a free connection before the request gets a 503
+DB_POOL_CHECKOUT_TIMEOUT = float(os.environ.get("DB_POOL_CHECKOUT_TIMEOUT", "30"))
+# Checkouts that waited longer than this are logged
+DB_POOL_SLOW_CHECKOUT_MS = float(os.environ.get("DB_POOL_SLOW_CHECKOUT_MS", "250"))
+
+
+class CheckoutGate:
+    """Bounds concurrent checkouts to the pool size and records how long they wait.
+
+    psycopg2's pools raise PoolError as soon as maxconn connections are out;
+    the gate makes callers queue for a connection instead, up to `timeout`.
+    """
+
+    def __init__(self, limit: int, timeout: float = DB_POOL_CHECKOUT_TIMEOUT,
+                 slow_ms: float = DB_POOL_SLOW_CHECKOUT_MS):
+        self.limit = limit
+        self.timeout = timeout
+        self.slow_ms = slow_ms
+        self._slots = threading.BoundedSemaphore(limit)
+        self._lock = threading.Lock()
+        self.in_use = 0
+        self.reset()
+
+    def reset(self):
+        """Clears the counters; connections currently out stay counted."""
+        with self._lock:
+            self.checkouts = 0
+            self.waited = 0
+            self.timeouts = 0
+            self.total_wait_ms = 0.0
+            self.max_wait_ms = 0.0
+            self.peak_in_use = self.in_use
+
+    def acquire(self) -> float:
+        """Blocks until a slot is free; returns the wait in ms."""
+        start = time.perf_counter()
+        # Fast path keeps uncontended checkouts out of the waited count
+        contended = not self._slots.acquire(blocking=False)
+        acquired = self._slots.acquire(timeout=self.timeout) if contended else True
+        wait_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            if not acquired:
+                self.timeouts += 1
+                raise pool.PoolError(f"no connection available after {self.timeout:.0f}s ({self.limit} in use)")
+            self.checkouts += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            if contended:
+                self.waited += 1
+        if wait_ms >= self.slow_ms:
+            logger.warning(f"DB pool checkout waited {wait_ms:.0f} ms ({self.in_use}/{self.limit} in use)")
+        return wait_ms
+
+    def release(self):
+        with self._lock:
+            self.in_use -= 1
+        self._slots.release()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_connections": self.limit,
+                "in_use": self.in_use,
+                "peak_in_use": self.peak_in_use,
+                "checkouts": self.checkouts,
+                "waited": self.waited,
+                "timeouts": self.timeouts,
+                "total_wait_ms": round(self.total_wait_ms, 2),
+                "avg_wait_ms": round(self.total_wait_ms / self.checkouts, 2) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait_ms, 2),
+            }
+
+
+class MeteredConnectionPool(pool.ThreadedConnectionPool):
+    """ThreadedConnectionPool whose checkouts queue behind a CheckoutGate."""
+
+    def __init__(self, minconn, maxconn, *args, **kwargs):
+        self.gate = CheckoutGate(maxconn)
+        super().__init__(minconn, maxconn, *args, **kwargs)
+
+    def getconn(self, key=None):
+        self.gate.acquire()
+        try:
+            return super().getconn(key)
+        except Exception:
+            self.gate.release()
+            raise
+
+    def putconn(self, conn=None, key=None, close=False):
+        # A rejected putconn (e.g. a connection this pool never handed out)
+        # did not return a checkout, so it must not free a gate slot
+        super().putconn(conn, key, close)
+        self.gate.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return self.gate.snapshot()
+
+
 # Global DB Pool
-db_pool: Optional[pool.SimpleConnectionPool] = None
+db_pool: Optional[MeteredConnectionPool] = None
+_init_lock = threading.Lock()
 
 def init_db_pool():
     global db_pool
-    if db_pool is None:
-        DATABASE_URL = os.environ.get("DATABASE_URL")
-        retries = 60
-        while retries > 0:
-            try:
-                db_pool = psycopg2.pool.SimpleConnectionPool(
-                    1, 40,
-                    dsn=DATABASE_URL
-                )
-                logger.info("Database connection pool created successfully.")
-                break
-            except psycopg2.OperationalError as e:
-                retries -= 1
-                logger.warning(f"DB not ready; retrying... ({retries} left). Error: {e}")
-                time.sleep(2)
-        
+    with _init_lock:
         if db_pool is None:
-            # Fatal error if we can't connect
-            raise Exception("Could not connect to DB after retries.")
+            DATABASE_URL = os.environ.get("DATABASE_URL")
+            retries = 60
+            while retries > 0:
+                try:
+                    db_pool = MeteredConnectionPool(
+                        DB_POOL_MIN, DB_POOL_MAX,
+                        dsn=DATABASE_URL,
+                        connection_factory=connection_factory(),
+                    )
+                    logger.info("Database connection pool created successfully.")
+                    break
+                except psycopg2.OperationalError as e:
+                    retries -= 1
+                    logger.warning(f"DB not ready; retrying... ({retries} left). Error: {e}")
+                    time.sleep(2)
 
-def get_db_connection():
+            if db_pool is None:
+                # Fatal error if we can't connect
+                raise Exception("Could not connect to DB after retries.")
+
+@contextmanager
+def db_checkout():
+    """Scoped checkout for handlers that also make slow outbound calls.
+
+    Keep the block around the DB work only, so the connection goes back to
+    the pool before the handler waits on a geocoder, SerpAPI or Gemini.
+    Uncommitted work is rolled back when the connection is returned.
+    """
     if db_pool is None:
         init_db_pool()
-        
+
     if db_pool is None:
         raise HTTPException(status_code=503, detail="Database connection unavailable")
-        
-    conn = db_pool.getconn()
+
+    try:
+        conn = db_pool.getconn()
+    except pool.PoolError as e:
+        logger.error(f"DB pool checkout failed: {e}")
+        raise HTTPException(status_code=503, detail="Database busy, please retry")
     try:
         yield conn
     finally:
-        if conn:
-            db_pool.putconn(conn)
+        db_pool.putconn(conn)
+
+def get_db_connection():
+    with db_checkout() as conn:
+        yield conn
+
+def pool_stats() -> Dict[str, Any]:
+    if db_pool is None:
+        return {}
+    return db_pool.stats()
@@ -0,0 +1,237 @@
+import logging
+
+import psycopg2
+
+logger = logging.getLogger("they-own-what")
+
+# Daily eviction fact cube. The landlord monitor and burst detector sum these
+# rows instead of normalizing and regex-matching every eviction per request.
+# Rows are rebuilt per source by the ingest jobs, so there is no upsert key.
+DDL_EVICTION_DAILY_FACTS = """
+    CREATE TABLE IF NOT EXISTS eviction_daily_facts (
+        source TEXT NOT NULL,
+        event_date DATE NOT NULL,
+        municipality TEXT NOT NULL,
+        plaintiff_norm TEXT NOT NULL DEFAULT '',
+        plaintiff_label TEXT NOT NULL DEFAULT '',
+        attorney_norm TEXT NOT NULL DEFAULT '',
+        attorney_label TEXT NOT NULL DEFAULT '',
+        status_class TEXT NOT NULL,
+        filings INTEGER NOT NULL,
+        dispositions INTEGER NOT NULL DEFAULT 0,
+        disposition_days BIGINT NOT NULL DEFAULT 0
+    );
+    CREATE INDEX IF NOT EXISTS idx_eviction_daily_facts_date ON eviction_daily_facts (event_date);
+    CREATE INDEX IF NOT EXISTS idx_eviction_daily_facts_source ON eviction_daily_facts (source);
+"""
+
+# Same cube at network grain. 'plaintiff' rows link a filing to the networks
+# whose entities share the plaintiff's name; 'property' rows link it through
+# network_properties. A filing can land in several networks, which is why this
+# is a separate table rather than a network_id column on the daily facts.
+DDL_EVICTION_NETWORK_DAILY_FACTS = """
+    CREATE TABLE IF NOT EXISTS eviction_network_daily_facts (
+        link_type TEXT NOT NULL CHECK (link_type IN ('plaintiff', 'property')),
+        network_id INTEGER NOT NULL,
+        event_date DATE,
+        municipality TEXT NOT NULL DEFAULT '',
+        property_city TEXT NOT NULL DEFAULT '',
+        attorney_label TEXT NOT NULL DEFAULT '',
+        status_class TEXT NOT NULL,
+        filings INTEGER NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_eviction_network_daily_facts_network
+        ON eviction_network_daily_facts (link_type, network_id, event_date);
+    CREATE INDEX IF NOT EXISTS idx_eviction_network_daily_facts_date
+        ON eviction_network_daily_facts (link_type, event_date);
+"""
+
+# 'open'/'closed' is the monitor's disposition regex. The suffixes carry what
+# the burst detector counts and filters on: ':after_default' (default
+# judgments), ':default_judgment' (other default/judgment wording) and
+# ':withdrawal'.
+DDL_EVICTION_STATUS_CLASS = """
+    CREATE OR REPLACE FUNCTION eviction_status_class(status TEXT) RETURNS TEXT AS $$
+        SELECT CASE WHEN s ~ '(closed|disposed|dismissed|withdrawn|settled|judgment)' THEN 'closed' ELSE 'open' END
+            || CASE WHEN s LIKE '%after default%' THEN ':after_default'
+                    WHEN s LIKE '%default%judgment%' THEN ':default_judgment'
+                    ELSE '' END
+            || CASE WHEN s LIKE '%withdraw%' THEN ':withdrawal' ELSE '' END
+        FROM (SELECT lower(COALESCE(status, '')) AS s) normalized
+    $$ LANGUAGE sql IMMUTABLE
+"""
+
+SOURCES = ("CT", "MD")
+
+
+def _attorney_columns(cursor):
+    cursor.execute("""
+        SELECT column_name FROM information_schema.columns
+        WHERE table_name = 'evictions'
+          AND column_name IN ('plaintiff_attorney_firm', 'plaintiff_attorney_name', 'plaintiff_attorney_norm')
+    """)
+    return {row[0] for row in cursor.fetchall()}
+
+
+def _attorney_expressions(columns, alias=""):
+    """(attorney_norm, attorney_label) SQL for the evictions columns present.
+
+    attorney_norm is the monitor's attorney key; attorney_label is the
+    firm-first name the burst detector and monitor surges report.
+    """
+    col = f"{alias}." if alias else ""
+    if "plaintiff_attorney_norm" in columns:
+        norm = f"COALESCE(TRIM({col}plaintiff_attorney_norm), '')"
+    elif "plaintiff_attorney_firm" in columns:
+        norm = f"COALESCE(NULLIF(TRIM({col}plaintiff_attorney_firm), ''), NULLIF(TRIM({col}plaintiff_attorney_name), ''), '')"
+    else:
+        norm = "''"
+    present = [c for c in ("plaintiff_attorney_firm", "plaintiff_attorney_name", "plaintiff_attorney_norm") if c in columns]
+    label = "COALESCE(" + "".join(f"NULLIF(TRIM({col}{c}), ''), " for c in present) + "'')"
+    return norm, label
+
+
+def _table_exists(cursor, table):
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL", (table,))
+    return cursor.fetchone()[0]
+
+
+def _insert_ct_facts(cursor):
+    attorney_norm, attorney_label = _attorney_expressions(_attorney_columns(cursor))
+    cursor.execute(f"""
+        INSERT INTO eviction_daily_facts (
+            source, event_date, municipality, plaintiff_norm, plaintiff_label,
+            attorney_norm, attorney_label, status_class, filings, dispositions, disposition_days
+        )
+        SELECT
+            'CT', filing_date,
+            UPPER(COALESCE(NULLIF(TRIM(municipality), ''), 'UNKNOWN')),
+            COALESCE(TRIM(plaintiff_norm), ''),
+            COALESCE(NULLIF(TRIM(plaintiff_name), ''), NULLIF(TRIM(plaintiff_norm), ''), ''),
+            {attorney_norm},
+            {attorney_label},
+            eviction_status_class(status),
+            COUNT(*),
+            COUNT(*) FILTER (WHERE disposition_date IS NOT NULL),
+            COALESCE(SUM(disposition_date - filing_date) FILTER (WHERE disposition_date IS NOT NULL), 0)
+        FROM evictions
+        WHERE filing_date IS NOT NULL
+        GROUP BY 2, 3, 4, 5, 6, 7, 8
+    """)
+    return cursor.rowcount
+
+
+def _insert_md_facts(cursor):
+    if not _table_exists(cursor, "city_eviction_events"):
+        return 0
+    cursor.execute("""
+        INSERT INTO eviction_daily_facts (source, event_date, municipality, status_class, filings)
+        SELECT 'MD', event_date, 'BALTIMORE', eviction_status_class(event_type), COUNT(*)
+        FROM city_eviction_events
+        WHERE event_date IS NOT NULL
+          AND city = 'baltimore'
+        GROUP BY 2, 4
+    """)
+    return cursor.rowcount
+
+
+def _insert_network_facts(cursor):
+    _, attorney_label = _attorney_expressions(_attorney_columns(cursor), alias="e")
+    cursor.execute("""
+        INSERT INTO eviction_network_daily_facts (link_type, network_id, event_date, municipality, status_class, filings)
+        SELECT 'plaintiff', en.network_id, e.filing_date,
+               COALESCE(UPPER(TRIM(e.municipality)), ''),
+               eviction_status_class(e.status), COUNT(*)
+        FROM evictions e
+        JOIN entity_networks en
+          ON UPPER(TRIM(e.plaintiff_norm)) = UPPER(TRIM(en.entity_name))
+         AND en.entity_type IN ('business', 'principal', 'owner')
+        WHERE e.filing_date IS NOT NULL
+          AND e.plaintiff_norm IS NOT NULL AND TRIM(e.plaintiff_norm) != ''
+        GROUP BY 2, 3, 4, 5
+    """)
+    inserted = cursor.rowcount
+    if _table_exists(cursor, "network_properties"):
+        cursor.execute(f"""
+            INSERT INTO eviction_network_daily_facts (link_type, network_id, event_date, property_city, attorney_label, status_class, filings)
+            SELECT 'property', np.network_id, e.filing_date, COALESCE(np.property_city, ''),
+                   {attorney_label},
+                   eviction_status_class(e.status), COUNT(*)
+            FROM (
+                SELECT DISTINCT network_id, property_id, property_city
+                FROM network_properties
+            ) np
+            JOIN evictions e ON e.property_id = np.property_id
+            GROUP BY 2, 3, 4, 5, 6
+        """)
+        inserted += cursor.rowcount
+    return inserted
+
+
+def ensure_eviction_facts(conn):
+    """Creates the fact tables; builds them on first install.
+
+    Returns False when the evictions table is missing or the DDL fails.
+    """
+    try:
+        with conn.cursor() as cursor:
+            if not _table_exists(cursor, "evictions"):
+                return False
+            cursor.execute("SELECT to_regclass('eviction_daily_facts') IS NULL")
+            created = cursor.fetchone()[0]
+            cursor.execute(DDL_EVICTION_STATUS_CLASS)
+            cursor.execute(DDL_EVICTION_DAILY_FACTS)
+            cursor.execute(DDL_EVICTION_NETWORK_DAILY_FACTS)
+        if created:
+            # Same transaction as the DDL, so a failed build is retried next time
+            for source in SOURCES:
+                rebuild_eviction_facts(conn, source, commit=False)
+            rebuild_eviction_network_facts(conn, commit=False)
+        conn.commit()
+    except psycopg2.Error as e:
+        conn.rollback()
+        logger.warning(f"Eviction fact cube setup failed: {e}")
+        return False
+    return True
+
+
+def rebuild_eviction_facts(conn, source, commit=True):
+    """Replaces one source's daily facts ('CT' evictions or 'MD' Baltimore events)."""
+    if source not in SOURCES:
+        raise ValueError(f"Unknown eviction fact source: {source}")
+    with conn.cursor() as cursor:
+        # Readers keep seeing the previous rows until this transaction commits
+        cursor.execute("DELETE FROM eviction_daily_facts WHERE source = %s", (source,))
+        inserted = _insert_ct_facts(cursor) if source == "CT" else _insert_md_facts(cursor)
+    if commit:
+        conn.commit()
+    logger.info(f"Eviction fact cube: {inserted:,} daily rows for {source}")
+    return inserted
+
+
+def rebuild_eviction_network_facts(conn, commit=True):
+    """Replaces the network-grain facts; run after evictions or networks change."""
+    with conn.cursor() as cursor:
+        if not _table_exists(cursor, "entity_networks"):
+            return 0
+        cursor.execute("DELETE FROM eviction_network_daily_facts")
+        inserted = _insert_network_facts(cursor)
+    if commit:
+        conn.commit()
+    logger.info(f"Eviction fact cube: {inserted:,} network rows")
+    return inserted
+
+
+def update_eviction_facts(conn, source):
+    """Ingest hook: installs the cube if needed, then rebuilds `source`."""
+    if not ensure_eviction_facts(conn):
+        return 0
+    try:
+        inserted = rebuild_eviction_facts(conn, source)
+        if source == "CT":
+            inserted += rebuild_eviction_network_facts(conn)
+        return inserted
+    except psycopg2.Error as e:
+        conn.rollback()
+        logger.error(f"Eviction fact cube rebuild failed: {e}")
+        return 0
@@ -0,0 +1,137 @@
+import os
+import re
+import logging
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from psycopg2.extras import execute_values
+
+logger = logging.getLogger("they-own-what")
+
+# Failed or non-credible lookups are retried once they are this old
+GEOCODE_CACHE_RETRY_DAYS = int(os.environ.get("GEOCODE_CACHE_RETRY_DAYS", "30"))
+
+DDL_GEOCODE_CACHE = """
+    CREATE TABLE IF NOT EXISTS geocode_cache (
+        address_key TEXT PRIMARY KEY,
+        query TEXT NOT NULL,
+        latitude DOUBLE PRECISION,
+        longitude DOUBLE PRECISION,
+        matched_address TEXT,
+        source TEXT,
+        credible BOOLEAN NOT NULL DEFAULT FALSE,
+        geocoded_at TIMESTAMPTZ NOT NULL DEFAULT now()
+    )
+"""
+
+CACHE_COLUMNS = ("address_key", "query", "latitude", "longitude", "matched_address", "source", "credible")
+
+# Unit designators do not move the geocode: "12 MAIN ST UNIT 3" and "12 MAIN ST #4" share one entry
+_UNIT_RE = re.compile(r'\s*(?:#|\b(?:UNIT|APT|APARTMENT|STE|SUITE|BLDG|FL|FLOOR)\b)\s*[A-Z0-9-]*\s*$')
+_NON_WORD_RE = re.compile(r'[^A-Z0-9]+')
+
+
+def geocode_cache_key(street: str, city: str, state: str, zip_code: str) -> str:
+    """Cache key for geocoding_address_parts() output: unit-less street, city, state, 5-digit zip."""
+    street = str(street or "").upper()
+    previous = None
+    while previous != street:
+        previous = street
+        street = _UNIT_RE.sub("", street)
+    fields = (street, city, state, str(zip_code or "")[:5])
+    return "|".join(_NON_WORD_RE.sub(" ", str(f or "").upper()).strip() for f in fields)
+
+
+class GeocodeCache:
+    """Geocoder results by normalized address, shared by the background
+    geocoder and /api/geocoding/batch. Every lookup is stored with its source
+    and credibility verdict; credible hits are reused indefinitely, failures
+    only until GEOCODE_CACHE_RETRY_DAYS."""
+
+    def __init__(self, retry_days: int = GEOCODE_CACHE_RETRY_DAYS):
+        self.retry_days = retry_days
+        self._table_ready = False
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "last_error": None}
+
+    def _ensure_table(self, cursor):
+        # Created inside the caller's transaction: the background geocoder
+        # holds FOR UPDATE row locks that a commit here would release
+        if self._table_ready:
+            return
+        cursor.execute(DDL_GEOCODE_CACHE)
+        self._table_ready = True
+
+    def get_many(self, cursor, keys: Iterable[str], include_failures: bool = True) -> Dict[str, Dict[str, Any]]:
+        """
+        {key: entry} for cached keys. Failed entries older than retry_days
+        (or all failed entries when include_failures is False) count as misses.
+        Runs in the caller's transaction.
+        """
+        keys = list(set(keys))
+        if not keys:
+            return {}
+        cursor.execute("SAVEPOINT geocode_cache_get")
+        try:
+            self._ensure_table(cursor)
+            cursor.execute("""
+                SELECT address_key, latitude, longitude, matched_address, source, credible
+                FROM geocode_cache
+                WHERE address_key = ANY(%s)
+                  AND (credible OR (%s AND geocoded_at > now() - make_interval(days => %s)))
+            """, (keys, include_failures, self.retry_days))
+            rows = cursor.fetchall()
+            cursor.execute("RELEASE SAVEPOINT geocode_cache_get")
+        except Exception as e:
+            cursor.execute("ROLLBACK TO SAVEPOINT geocode_cache_get")
+            self._table_ready = False
+            self._record_error(e)
+            return {}
+        found = {}
+        for row in rows:
+            entry = dict(row) if isinstance(row, dict) else dict(zip(
+                ("address_key", "latitude", "longitude", "matched_address", "source", "credible"), row))
+            found[entry.pop("address_key")] = entry
+        self._bump("hits", len(found))
+        self._bump("misses", len(keys) - len(found))
+        return found
+
+    def put_many(self, cursor, entries: Iterable[Tuple[str, str, Optional[float], Optional[float], Optional[str], Optional[str], bool]]):
+        """
+        entries: (key, query, lat, lon, matched_address, source, credible).
+        Runs in the caller's transaction; the caller commits.
+        """
+        rows = list({entry[0]: entry for entry in entries}.values())
+        if not rows:
+            return
+        cursor.execute("SAVEPOINT geocode_cache_put")
+        try:
+            self._ensure_table(cursor)
+            execute_values(cursor, f"""
+                INSERT INTO geocode_cache ({", ".join(CACHE_COLUMNS)}) VALUES %s
+                ON CONFLICT (address_key) DO UPDATE SET
+                    query = EXCLUDED.query, latitude = EXCLUDED.latitude, longitude = EXCLUDED.longitude,
+                    matched_address = EXCLUDED.matched_address, source = EXCLUDED.source,
+                    credible = EXCLUDED.credible, geocoded_at = now()
+                WHERE NOT geocode_cache.credible OR EXCLUDED.credible
+            """, rows)
+            cursor.execute("RELEASE SAVEPOINT geocode_cache_put")
+        except Exception as e:
+            cursor.execute("ROLLBACK TO SAVEPOINT geocode_cache_put")
+            self._table_ready = False
+            self._record_error(e)
+            return
+        self._bump("stores", len(rows))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats)
+
+    def _bump(self, key: str, amount: int = 1):
+        with self._lock:
+            self._stats[key] += amount
+
+    def _record_error(self, e: Exception):
+        logger.warning(f"Geocode cache unavailable: {e}")
+        with self._lock:
+            self._stats["last_error"] = str(e)[:200]
@@ -1,8 +1,12 @@
 
+import os
+import io
+import csv
 import requests
 import time
 import logging
 import re
+import threading
 from difflib import SequenceMatcher
 
 logger = logging.getLogger("geocoder-utils")
@@ -10,7 +14,13 @@ logger = logging.getLogger("geocoder-utils")
 NOMINATIM_LOCAL_URL = "http://ctdata_nominatim:8080/search"
 NOMINATIM_PUBLIC_URL = "https://nominatim.openstreetmap.org/search"
 CENSUS_URL = "https://geocoding.geo.census.gov/geocoder/locations/onelineaddress"
+CENSUS_BATCH_URL = os.environ.get("CENSUS_BATCH_URL", "https://geocoding.geo.census.gov/geocoder/locations/addressbatch")
+# The batch endpoint accepts at most 10,000 addresses per file
+CENSUS_BATCH_SIZE = int(os.environ.get("CENSUS_BATCH_SIZE", "5000"))
+CENSUS_BATCH_TIMEOUT = int(os.environ.get("CENSUS_BATCH_TIMEOUT", "600"))
 USER_AGENT = "TheyOwnWhatApp/1.0"
+# Nominatim policy: 1 request/s. Shared by every thread in the process
+NOMINATIM_PUBLIC_INTERVAL = float(os.environ.get("NOMINATIM_PUBLIC_INTERVAL", "1.1"))
 
 CT_LAT_MIN, CT_LAT_MAX = 40.8, 42.3
 CT_LON_MIN, CT_LON_MAX = -73.9, -71.6
@@ -305,6 +315,71 @@ def geocode_census(address):
         logger.warning(f"Census User Geocode Error: {e}")
         return None, None, None
 
+def census_batch_geocode(addresses, url=None, benchmark="Public_AR_Current", batch_size=CENSUS_BATCH_SIZE, timeout=CENSUS_BATCH_TIMEOUT):
+    """
+    Bulk Census geocoding through the addressbatch endpoint.
+
+    addresses: iterable of (id, street, city, state, zip). Each chunk of
+    batch_size rows is uploaded as one multipart CSV file. Returns
+    {id: (lat, lon, matched_address)} for rows the Census matched and
+    {id: None} for ties and no-matches. A chunk that fails is logged and
+    skipped, so its ids are absent and the caller can fall back to
+    per-address lookups for them.
+    """
+    url = url or CENSUS_BATCH_URL
+    rows = [tuple("" if v is None else str(v) for v in row) for row in addresses]
+    results = {}
+    for start in range(0, len(rows), batch_size):
+        chunk = rows[start:start + batch_size]
+        buf = io.StringIO()
+        csv.writer(buf).writerows(chunk)
+        try:
+            resp = requests.post(
+                url,
+                data={"benchmark": benchmark},
+                files={"addressFile": ("addresses.csv", buf.getvalue().encode("utf-8"), "text/csv")},
+                headers={"User-Agent": USER_AGENT},
+                timeout=timeout,
+            )
+            resp.raise_for_status()
+        except Exception as e:
+            logger.warning(f"Census batch geocode failed for {len(chunk)} addresses: {e}")
+            continue
+        results.update(parse_census_batch_response(resp.text))
+    return results
+
+
+def parse_census_batch_response(text):
+    """Parses addressbatch output: id, input, Match/No_Match/Tie, Exact/Non_Exact, matched address, "lon,lat", ..."""
+    results = {}
+    for row in csv.reader(io.StringIO(text)):
+        if len(row) < 3:
+            continue
+        results[row[0].strip()] = None
+        if len(row) < 6 or row[2].strip() != "Match":
+            continue
+        try:
+            lon, lat = (float(v) for v in row[5].split(","))
+        except ValueError:
+            continue
+        results[row[0].strip()] = (lat, lon, row[4].strip() or None)
+    return results
+
+_nominatim_lock = threading.Lock()
+_nominatim_next_at = 0.0
+
+
+def _wait_for_public_nominatim():
+    """Reserves the next public Nominatim slot and sleeps until it comes up."""
+    global _nominatim_next_at
+    with _nominatim_lock:
+        now = time.monotonic()
+        wait = _nominatim_next_at - now
+        _nominatim_next_at = max(now, _nominatim_next_at) + NOMINATIM_PUBLIC_INTERVAL
+    if wait > 0:
+        time.sleep(wait)
+
+
 def geocode_nominatim(address):
     """Secondary: Nominatim (Slow, Rate Limited)"""
     # 1. Try Local First
@@ -320,7 +395,7 @@ def geocode_nominatim(address):
     except Exception:
         # 2. Fallback to Public with Strict Rate Limiting
         try:
-            time.sleep(1.1) # Nominatim policy: 1 request/s
+            _wait_for_public_nominatim()
             resp = requests.get(NOMINATIM_PUBLIC_URL, params=params, headers=headers, timeout=10)
             resp.raise_for_status()
             data = resp.json()
@@ -330,3 +405,81 @@ def geocode_nominatim(address):
             logger.error(f"Nominatim Geocoding error for {address}: {e}")
             
     return None, None, None
+
+
+def geocoding_address_parts(location, city, zip_code):
+    """
+    (street, city, state, zip) for a property row, or None when the location
+    cannot be geocoded:
+    1. Leading '0 ' placeholders (e.g. '0 MELBA ST') are rejected
+    2. Ranges use their first number ('1-15 EDGEWATER' -> '1 EDGEWATER')
+    3. Zip codes lose a trailing '.0' and are zero-padded
+    """
+    if not location:
+        return None
+
+    loc = str(location).strip().upper()
+
+    # Leading-zero municipal placeholders do not identify a real street number.
+    if re.match(r'^0+\s+', loc):
+        return None
+
+    range_match = re.match(r'^(\d+)-\d+[^\s]*\s+(.*)', loc)
+    if range_match:
+        loc = f"{range_match.group(1)} {range_match.group(2)}"
+
+    clean_zip = ""
+    if zip_code:
+        try:
+            clean_zip = str(int(float(str(zip_code).strip())))
+            if len(clean_zip) < 5:
+                clean_zip = clean_zip.zfill(5)
+        except (TypeError, ValueError):
+            clean_zip = str(zip_code).strip()
+
+    return loc, city or "", os.environ.get("DEFAULT_STATE", "CT"), clean_zip
+
+
+def format_geocoding_address(parts):
+    """One-line address for the single-address geocoders from geocoding_address_parts() output."""
+    loc, city, state, clean_zip = parts
+    return f"{loc}, {city}, {state} {clean_zip}".strip()
+
+
+def clean_address_for_geocoding(location, city, zip_code):
+    parts = geocoding_address_parts(location, city, zip_code)
+    return format_geocoding_address(parts) if parts else None
+
+
+def is_usable_geocode(lat, lon, matched_address, input_address, state="CT"):
+    return is_valid_coordinate(lat, lon, state) and is_geocode_match_credible(input_address, matched_address)
+
+
+def geocode_with_fallbacks(full_address, try_census=True, try_nominatim=True):
+    """
+    Census, then Nominatim, then Nominatim without the ZIP, keeping the first
+    credible result. try_nominatim=False stops after Census.
+
+    Returns (lat, lon, matched_address, source, credible). When nothing is
+    credible the last rejected candidate (if any) is returned with
+    credible=False so callers can record the verdict.
+    """
+    rejected = (None, None, None, None, False)
+    attempts = []
+    if try_census:
+        attempts.append(("census", geocode_census, full_address))
+    if try_nominatim:
+        attempts.append(("nominatim", geocode_nominatim, full_address))
+        addr_no_zip = re.sub(r'\s\d{5}$', '', full_address)
+        if addr_no_zip != full_address:
+            attempts.append(("nominatim_no_zip", geocode_nominatim, addr_no_zip))
+
+    for source, geocode, address in attempts:
+        lat, lon, norm = geocode(address)
+        if not (lat and lon):
+            continue
+        if is_usable_geocode(lat, lon, norm, address):
+            return lat, lon, norm, source, True
+        logger.info(f"Rejected {source} match; matched={norm!r}; input={address!r}")
+        rejected = (lat, lon, norm, source, False)
+    return rejected
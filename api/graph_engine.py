@@ -0,0 +1,356 @@
+# graph_engine.py
+"""
+Array-backed graph primitives for network_builder.
+
+The entity graph used to be a dict of Python int tuples plus a dict-based
+owner map during discovery, which costs gigabytes on the statewide dataset.
+Here edges are buffered in compact int32 arrays, frozen into a CSR layout
+(offsets + neighbors) and walked with array-based owner/DSU state.
+"""
+import os
+import time
+import logging
+import resource
+from array import array
+from contextlib import contextmanager
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+NODE_TYPE_CODES = {'business': 0, 'principal': 1, 'address': 2}
+
+
+# --- Edge accumulation ---
+class EdgeBuffer:
+    """Append-only undirected edge list stored as two int32 arrays."""
+
+    def __init__(self):
+        self.src = array('i')
+        self.dst = array('i')
+
+    def add(self, u, v):
+        self.src.append(u)
+        self.dst.append(v)
+
+    def __len__(self):
+        return len(self.src)
+
+
+class TypedEdgeBuffer:
+    """Edge list whose endpoints are (node type, key) pairs, interned in bulk.
+
+    Keys are appended per node type as they are seen and each endpoint is
+    stored as (type code, slot). intern() then numbers every type with one
+    np.unique pass plus a per-type offset, so no (type, id) tuple dict is
+    built while loading edges.
+    """
+
+    def __init__(self):
+        self.keys = [[] for _ in NODE_TYPE_CODES]
+        self.src_type = array('b')
+        self.src_slot = array('i')
+        self.dst_type = array('b')
+        self.dst_slot = array('i')
+
+    def _slot(self, node_type, key):
+        keys = self.keys[NODE_TYPE_CODES[node_type]]
+        keys.append(key)
+        return len(keys) - 1
+
+    def add(self, u_type, u_key, v_type, v_key):
+        self.src_type.append(NODE_TYPE_CODES[u_type])
+        self.src_slot.append(self._slot(u_type, u_key))
+        self.dst_type.append(NODE_TYPE_CODES[v_type])
+        self.dst_slot.append(self._slot(v_type, v_key))
+
+    def __len__(self):
+        return len(self.src_type)
+
+    def intern(self):
+        """Returns (src ids, dst ids, NodeIndex) with ids laid out type by type."""
+        unique_keys = []
+        slot_ids = []
+        offset = 0
+        for keys in self.keys:
+            uniq, inverse = np.unique(_key_array(keys), return_inverse=True)
+            unique_keys.append(uniq)
+            slot_ids.append(inverse.astype(np.int32) + offset)
+            offset += len(uniq)
+        return (
+            _endpoint_ids(self.src_type, self.src_slot, slot_ids),
+            _endpoint_ids(self.dst_type, self.dst_slot, slot_ids),
+            NodeIndex(unique_keys),
+        )
+
+
+def _key_array(keys):
+    # Integer keys sort natively; anything else stays as Python objects so long
+    # strings are not widened into a fixed-size unicode array.
+    if keys and isinstance(keys[0], (int, np.integer)) and not isinstance(keys[0], bool):
+        return np.asarray(keys, dtype=np.int64)
+    return np.array(keys, dtype=object)
+
+
+def _endpoint_ids(types, slots, slot_ids):
+    types = np.frombuffer(types, dtype=np.int8) if len(types) else np.empty(0, dtype=np.int8)
+    slots = np.frombuffer(slots, dtype=np.int32) if len(slots) else np.empty(0, dtype=np.int32)
+    ids = np.empty(len(types), dtype=np.int32)
+    for code, lookup in enumerate(slot_ids):
+        mask = types == code
+        ids[mask] = lookup[slots[mask]]
+    return ids
+
+
+class NodeIndex:
+    """Maps integer node ids to (type, key) nodes and back.
+
+    Ids are contiguous per node type (in NODE_TYPE_CODES order) and each type's
+    keys are sorted, so a lookup is a searchsorted into one array.
+    """
+
+    def __init__(self, keys_by_type):
+        self.type_names = sorted(NODE_TYPE_CODES, key=NODE_TYPE_CODES.get)
+        self.keys = keys_by_type
+        self.offsets = np.zeros(len(keys_by_type) + 1, dtype=np.int64)
+        np.cumsum([len(keys) for keys in keys_by_type], out=self.offsets[1:])
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def id_of(self, node, default=None):
+        code = NODE_TYPE_CODES.get(node[0])
+        if code is None:
+            return default
+        keys = self.keys[code]
+        try:
+            pos = int(np.searchsorted(keys, node[1]))
+            found = pos < len(keys) and keys[pos] == node[1]
+        except TypeError:
+            return default
+        return int(self.offsets[code]) + pos if found else default
+
+    def __contains__(self, node):
+        return self.id_of(node) is not None
+
+    def node(self, node_id):
+        code = int(np.searchsorted(self.offsets, node_id, side='right')) - 1
+        key = self.keys[code][node_id - self.offsets[code]]
+        return (self.type_names[code], key.item() if isinstance(key, np.generic) else key)
+
+    def nodes(self, node_ids):
+        """(type, key) tuples for an array of ids, preserving order."""
+        node_ids = np.asarray(node_ids, dtype=np.int64)
+        codes = np.searchsorted(self.offsets, node_ids, side='right') - 1
+        result = [None] * len(node_ids)
+        for code, keys in enumerate(self.keys):
+            picked = np.flatnonzero(codes == code)
+            if not len(picked):
+                continue
+            name = self.type_names[code]
+            for pos, key in zip(picked.tolist(), keys[node_ids[picked] - self.offsets[code]].tolist()):
+                result[pos] = (name, key)
+        return result
+
+    def type_codes(self):
+        """Compact int8 type code per node id (see NODE_TYPE_CODES)."""
+        return np.repeat(
+            np.arange(len(self.keys), dtype=np.int8),
+            np.diff(self.offsets),
+        )
+
+
+# --- CSR graph ---
+class CSRGraph:
+    """Immutable undirected graph in compressed sparse row form.
+
+    Mirrors the read API of the old dict-of-tuples graph: ``graph.get(node, [])``
+    returns the neighbors of an integer node id and ``len(graph)`` counts nodes
+    that have at least one edge.
+    """
+
+    def __init__(self, offsets, neighbors, node_types):
+        self.offsets = offsets
+        self.neighbors = neighbors
+        self.node_types = node_types
+        # memoryviews give fast int iteration without materializing Python lists
+        self._offsets_view = memoryview(offsets)
+        self._neighbors_view = memoryview(neighbors)
+        self._connected = int(np.count_nonzero(np.diff(offsets)))
+
+    @classmethod
+    def from_edges(cls, edges, num_nodes, node_types=None):
+        """Builds a symmetric, de-duplicated CSR graph from an EdgeBuffer."""
+        src = np.frombuffer(edges.src, dtype=np.int32) if len(edges) else np.empty(0, dtype=np.int32)
+        dst = np.frombuffer(edges.dst, dtype=np.int32) if len(edges) else np.empty(0, dtype=np.int32)
+        return cls.from_arrays(src, dst, num_nodes, node_types)
+
+    @classmethod
+    def from_arrays(cls, src, dst, num_nodes, node_types=None):
+        """Builds a symmetric, de-duplicated CSR graph from int32 endpoint arrays."""
+        keep = src != dst
+        src, dst = src[keep], dst[keep]
+        both_src = np.concatenate([src, dst]).astype(np.int64)
+        both_dst = np.concatenate([dst, src]).astype(np.int64)
+
+        # Sort by (src, dst) and drop duplicate edges in one pass
+        keys = np.unique(both_src * num_nodes + both_dst)
+        rows = (keys // num_nodes).astype(np.int32) if num_nodes else keys.astype(np.int32)
+        cols = (keys % num_nodes).astype(np.int32) if num_nodes else keys.astype(np.int32)
+
+        offsets = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=num_nodes), out=offsets[1:])
+        if node_types is None:
+            node_types = np.zeros(num_nodes, dtype=np.int8)
+        return cls(offsets, cols, node_types)
+
+    @property
+    def num_nodes(self):
+        return len(self.offsets) - 1
+
+    @property
+    def num_edges(self):
+        return len(self.neighbors) // 2
+
+    def get(self, node, default=()):
+        if node < 0 or node >= self.num_nodes:
+            return default
+        return self._neighbors_view[self._offsets_view[node]:self._offsets_view[node + 1]]
+
+    def degree(self, node):
+        return self._offsets_view[node + 1] - self._offsets_view[node]
+
+    def __contains__(self, node):
+        return 0 <= node < self.num_nodes and self.degree(node) > 0
+
+    def __len__(self):
+        return self._connected
+
+    def nbytes(self):
+        return self.offsets.nbytes + self.neighbors.nbytes + self.node_types.nbytes
+
+
+# --- DSU ---
+def merge_labels(num_items, pairs_a, pairs_b):
+    """Vectorized union-find: returns a root label per item for the given union pairs.
+
+    Uses min-label propagation with pointer jumping, so every item in a
+    connected group ends up labelled with the smallest index in that group.
+    """
+    labels = np.arange(num_items, dtype=np.int64)
+    if num_items == 0 or len(pairs_a) == 0:
+        return labels
+    a = np.asarray(pairs_a, dtype=np.int64)
+    b = np.asarray(pairs_b, dtype=np.int64)
+    while True:
+        prev = labels.copy()
+        np.minimum.at(labels, a, labels[b])
+        np.minimum.at(labels, b, labels[a])
+        # Pointer jumping collapses chains before the next propagation round
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+        if np.array_equal(labels, prev):
+            return labels
+
+
+def depth_limited_components(graph, seed_ints, max_depth, progress_every=10000):
+    """Seed-ordered depth-limited BFS with deferred seed merging.
+
+    Same semantics as the original dict/deque implementation: each seed claims
+    the unowned nodes within ``max_depth`` hops in seed order, and seeds whose
+    regions touch are merged. Unions never influenced the traversal, so they
+    are collected as pairs and resolved at the end by merge_labels().
+
+    Returns (owned_nodes, owner_seed_idx, seed_labels) as NumPy arrays.
+    """
+    num_nodes = graph.num_nodes
+    node_owner = array('i', [-1]) * num_nodes
+    owned = array('i')
+    union_a = array('i')
+    union_b = array('i')
+    offsets = graph._offsets_view
+    neighbors = graph._neighbors_view
+    total_seeds = len(seed_ints)
+
+    for idx, seed_id in enumerate(seed_ints):
+        if progress_every and idx % progress_every == 0:
+            logger.info(f"  - Processing seed {idx:,}/{total_seeds:,}...")
+        if node_owner[seed_id] != -1:
+            continue
+
+        node_owner[seed_id] = idx
+        owned.append(seed_id)
+        frontier = [seed_id]
+        depth = 0
+        while frontier and depth < max_depth:
+            next_frontier = []
+            for node in frontier:
+                for neighbor in neighbors[offsets[node]:offsets[node + 1]]:
+                    owner_idx = node_owner[neighbor]
+                    if owner_idx == -1:
+                        node_owner[neighbor] = idx
+                        owned.append(neighbor)
+                        next_frontier.append(neighbor)
+                    elif owner_idx != idx:
+                        union_a.append(idx)
+                        union_b.append(owner_idx)
+            frontier = next_frontier
+            depth += 1
+
+    owned_nodes = np.frombuffer(owned, dtype=np.int32) if len(owned) else np.empty(0, dtype=np.int32)
+    owners = np.frombuffer(node_owner, dtype=np.int32)[owned_nodes] if len(owned) else np.empty(0, dtype=np.int32)
+    labels = merge_labels(total_seeds, union_a, union_b)
+    return owned_nodes, owners, labels
+
+
+# --- Profiling ---
+def current_rss_mb():
+    """Resident set size of this process in MB (Linux /proc, else peak RSS)."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb():
+    # ru_maxrss is KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class PhaseReport:
+    """Collects wall time and memory per rebuild phase and logs a summary."""
+
+    def __init__(self, title="Network rebuild"):
+        self.title = title
+        self.rows = []
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        rss_before = current_rss_mb()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            rss_after = current_rss_mb()
+            self.rows.append({
+                "phase": name,
+                "seconds": round(elapsed, 2),
+                "rss_mb": round(rss_after, 1),
+                "rss_delta_mb": round(rss_after - rss_before, 1),
+                "peak_rss_mb": round(peak_rss_mb(), 1),
+            })
+            logger.info(f"⏱️  {name}: {elapsed:.1f}s, RSS {rss_after:,.0f} MB ({rss_after - rss_before:+,.0f} MB)")
+
+    def log_summary(self):
+        logger.info(f"📈 {self.title} report:")
+        for row in self.rows:
+            logger.info(
+                f"  {row['phase']:<28} {row['seconds']:>8.1f}s  "
+                f"RSS {row['rss_mb']:>9,.0f} MB  Δ {row['rss_delta_mb']:>+8,.0f} MB  peak {row['peak_rss_mb']:>9,.0f} MB"
+            )
@@ -3,14 +3,25 @@ import os
 import re
 import time
 import psycopg2
-from psycopg2.extras import RealDictCursor, execute_values
-from collections import deque, defaultdict
+from psycopg2.extras import RealDictCursor
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+import io
 import logging
+import multiprocessing
 import sys
+import numpy as np
 
 # Add the current directory to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+from graph_engine import (
+    TypedEdgeBuffer,
+    CSRGraph,
+    PhaseReport,
+    NODE_TYPE_CODES,
+    depth_limited_components,
+)
 from shared_utils import (
     normalize_business_name,
     normalize_person_name,
@@ -40,6 +51,11 @@ AMBIGUOUS_PRINCIPAL_MIN_EMAIL_DOMAINS = int(os.environ.get("AMBIGUOUS_PRINCIPAL_
 AMBIGUOUS_PRINCIPAL_MIN_MAIL_ADDRESSES = int(os.environ.get("AMBIGUOUS_PRINCIPAL_MIN_MAIL_ADDRESSES", "8"))
 AMBIGUOUS_PRINCIPAL_TOP_EMAIL_SHARE = float(os.environ.get("AMBIGUOUS_PRINCIPAL_TOP_EMAIL_SHARE", "0.35"))
 AMBIGUOUS_PRINCIPAL_MAIL_ADDRESS_SHARE = float(os.environ.get("AMBIGUOUS_PRINCIPAL_MAIL_ADDRESS_SHARE", "0.60"))
+# Rows buffered per table before a COPY is streamed to Postgres
+COPY_FLUSH_ROWS = int(os.environ.get("NETWORK_COPY_FLUSH_ROWS", "50000"))
+# Property linking: worker processes and id span handed to each worker task
+LINK_WORKERS = int(os.environ.get("NETWORK_LINK_WORKERS", str(os.cpu_count() or 1)))
+LINK_RANGE_SIZE = int(os.environ.get("NETWORK_LINK_RANGE_SIZE", "50000"))
 
 # Placeholder/Generic names to skip during linking to prevent bad merges
 SKIP_NAMES = {
@@ -86,10 +102,58 @@ def get_db_connection():
         logger.error(f"❌ Database connection failed: {e}")
         raise
 
+# --- Bulk Loading ---
+def _copy_text(value):
+    """Formats one value for COPY ... FROM STDIN (text format)."""
+    if value is None:
+        return '\\N'
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace('\t', '\\t')
+        .replace('\n', '\\n')
+        .replace('\r', '\\r')
+    )
+
+class CopyBuffer:
+    """Streams rows into a table with COPY, flushing every `flush_rows` rows."""
+
+    def __init__(self, conn, table, columns, flush_rows=COPY_FLUSH_ROWS):
+        self.conn = conn
+        self.table = table
+        self.columns = columns
+        self.flush_rows = flush_rows
+        self.buffer = io.StringIO()
+        self.pending = 0
+        self.rows = 0
+
+    def add(self, row):
+        self.buffer.write('\t'.join(_copy_text(v) for v in row))
+        self.buffer.write('\n')
+        self.pending += 1
+        if self.pending >= self.flush_rows:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        self.buffer.seek(0)
+        with self.conn.cursor() as cur:
+            cur.copy_expert(f"COPY {self.table} ({', '.join(self.columns)}) FROM STDIN", self.buffer)
+        self.rows += self.pending
+        self.pending = 0
+        self.buffer = io.StringIO()
+
 # --- Logic 1: Property Linking ---
-def link_properties_to_entities(conn):
-    """Maps properties to business_id or principal_id using robust name matching."""
-    logger.info("🔗 PHASE 1: Linking properties to entities...")
+# Lookup maps for the property linker. They are module globals so forked
+# workers share the parent's copy instead of rebuilding or unpickling them.
+_LINK_B_MAP = {}
+_LINK_B_CANON_MAP = {}
+_LINK_P_MAP = {}
+
+def _load_link_maps(conn):
+    """Builds the business/principal name maps used by _match_property_owner."""
+    global _LINK_B_MAP, _LINK_B_CANON_MAP, _LINK_P_MAP
     with conn.cursor(cursor_factory=RealDictCursor) as cur:
         # 1. Load Business Map
         b_map = {}
@@ -127,118 +191,178 @@ def link_properties_to_entities(conn):
 
         logger.info(f"  - Principal map loaded ({len(p_map):,} unique names).")
 
+    _LINK_B_MAP, _LINK_B_CANON_MAP, _LINK_P_MAP = b_map, b_canon_map, p_map
+
+def _match_property_owner(owner, co_owner):
+    """Returns (business_id, principal_id) for one property's owner fields."""
+    b_map, b_canon_map, p_map = _LINK_B_MAP, _LINK_B_CANON_MAP, _LINK_P_MAP
+    oname = owner or ''
+    cname = co_owner or ''
+
+    # Institutional Filter: If owner is institutional, do not link to business/principal
+    # This effectively removes them from the network graph
+    if INSTITUTIONAL_PATTERN.search(oname) or INSTITUTIONAL_PATTERN.search(cname):
+        return None, None
+
+    onorm = normalize_business_name(oname)
+    cnorm = normalize_business_name(cname)
+
+    # Care-Of Filter: If name starts with C/O, ignore it (it's likely a manager or mailing address)
+    # We only skip the specific field that matches.
+    skip_owner = bool(CARE_OF_PATTERN.match(oname))
+    skip_co_owner = bool(CARE_OF_PATTERN.match(cname))
+
+    # Pass 1: Primary Business matches
+    bid = None
+    if not skip_owner and onorm not in SKIP_NAMES:
+        bid = b_map.get(onorm)
+    if not bid and not skip_co_owner and cnorm not in SKIP_NAMES:
+        bid = b_map.get(cnorm)
+
+    # Pass 2: Canonical Business matches (Suffix-stripped)
+    if not bid:
+        if not skip_owner and onorm not in SKIP_NAMES:
+            bc_owner = canonicalize_business_name(oname)
+            bid = b_canon_map.get(bc_owner)
+        if not bid and not skip_co_owner and cnorm not in SKIP_NAMES:
+            bc_co = canonicalize_business_name(cname)
+            bid = b_canon_map.get(bc_co)
+
+    # Pass 3: Principal matches (with LAST FIRST ↔ FIRST LAST reversal)
+    pid = None
+    if not bid: # Only check principal if no business found
+        # Iterate over checking owner then co-owner, skipping if C/O matches
+        for raw_name, skip in [(oname, skip_owner), (cname, skip_co_owner)]:
+            if skip: continue
+            if pid: break # Found one already
+
+            name_clean = normalize_person_name(raw_name)
+            if not name_clean:
+                continue
+            # Direct match
+            pid = p_map.get(name_clean)
+            # Canonical match
+            if not pid:
+                pid = p_map.get(canonicalize_person_name(name_clean))
+            # LAST FIRST → FIRST LAST reversal
+            if not pid:
+                parts = name_clean.split()
+                if len(parts) >= 2:
+                    # Try "LAST FIRST" → "FIRST LAST"
+                    reversed_name = f"{parts[-1]} {' '.join(parts[:-1])}"
+                    pid = p_map.get(reversed_name)
+                    if not pid:
+                        pid = p_map.get(canonicalize_person_name(reversed_name))
+                    # Try "FIRST LAST" → "LAST FIRST"
+                    if not pid:
+                        reversed_name2 = f"{' '.join(parts[1:])} {parts[0]}"
+                        pid = p_map.get(reversed_name2)
+                        if not pid:
+                            pid = p_map.get(canonicalize_person_name(reversed_name2))
+
+    return bid, pid
+
+def _match_property_rows(rows):
+    """Matches (id, owner, co_owner) rows; returns (processed, [(id, bid, pid), ...])."""
+    matches = []
+    processed = 0
+    for prop_id, owner, co_owner in rows:
+        processed += 1
+        bid, pid = _match_property_owner(owner, co_owner)
+        if bid or pid:
+            matches.append((prop_id, bid, pid))
+    return processed, matches
+
+def _link_property_range(bounds):
+    """Pool worker: streams one property-id range over its own connection."""
+    lo, hi = bounds
+    conn = get_db_connection()
+    try:
+        with conn.cursor(name=f"prop_linker_{lo}") as sc:
+            sc.itersize = 5000
+            sc.execute("SELECT id, owner, co_owner FROM properties WHERE id >= %s AND id < %s", (lo, hi))
+            return _match_property_rows(sc)
+    finally:
+        conn.close()
+
+def _property_links_buffer(conn):
+    """Temp table that collects matched links until _apply_property_links()."""
+    with conn.cursor() as cur:
+        cur.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS tmp_property_links (
+                id INTEGER PRIMARY KEY, business_id TEXT, principal_id TEXT
+            ) ON COMMIT DROP
+        """)
+    return CopyBuffer(conn, "tmp_property_links", ("id", "business_id", "principal_id"))
+
+def _apply_property_links(conn, links):
+    """Merges the COPY'd links into properties with a single UPDATE ... FROM."""
+    links.flush()
+    with conn.cursor() as cur:
+        cur.execute("ANALYZE tmp_property_links")
+        cur.execute("""
+            UPDATE properties AS p
+            SET business_id = t.business_id, principal_id = t.principal_id
+            FROM tmp_property_links t
+            WHERE p.id = t.id
+        """)
+    conn.commit()
+
+def _property_id_ranges(conn):
+    with conn.cursor() as cur:
+        cur.execute("SELECT MIN(id), MAX(id) FROM properties")
+        lo, hi = cur.fetchone()
+    if lo is None:
+        return []
+    return [(start, min(start + LINK_RANGE_SIZE, hi + 1)) for start in range(lo, hi + 1, LINK_RANGE_SIZE)]
+
+def link_properties_to_entities(conn, property_ids=None):
+    """Maps properties to business_id or principal_id using robust name matching.
+
+    When property_ids is given only those properties are (re)linked; the
+    incremental refresh uses this for parcels touched since the last build.
+    A full pass is split into id ranges matched by a forked process pool.
+    """
+    logger.info("🔗 PHASE 1: Linking properties to entities...")
+    _load_link_maps(conn)
+
+    links = _property_links_buffer(conn)
+    count = 0
+    workers = LINK_WORKERS if property_ids is None else 1
+    if workers > 1 and 'fork' not in multiprocessing.get_all_start_methods():
+        logger.info("  - fork start method unavailable; linking on a single core.")
+        workers = 1
+
+    if workers > 1:
+        ranges = _property_id_ranges(conn)
+        logger.info(f"  - Matching {len(ranges):,} id range(s) across {workers} worker(s)...")
+        # fork: workers inherit the lookup maps copy-on-write
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork")) as pool:
+            for done, (processed, range_matches) in enumerate(pool.map(_link_property_range, ranges), 1):
+                count += processed
+                for row in range_matches:
+                    links.add(row)
+                if done % 10 == 0 or done == len(ranges):
+                    logger.info(f"    Processed {count:,} properties ({done:,}/{len(ranges):,} ranges)...")
+    else:
         # Use a separate connection for the server-side cursor to avoid closure on commit
         read_conn = get_db_connection()
         try:
             cursor_name = f"prop_linker_{int(time.time())}"
-            with read_conn.cursor(name=cursor_name, cursor_factory=RealDictCursor) as sc:
-                sc.execute("SELECT id, owner, co_owner FROM properties")
-                updates = []
-                linked_count = 0
-                count = 0
-
-                # Fetch in chunks from the server-side cursor
-                while True:
-                    rows = sc.fetchmany(5000)
-                    if not rows: break
-
-                    for row in rows:
-                        count += 1
-                        if count % 100000 == 0:
-                            logger.info(f"    Processed {count:,} properties...")
-
-                        oname = row['owner'] or ''
-                        cname = row['co_owner'] or ''
-
-                        onorm = normalize_business_name(oname)
-                        cnorm = normalize_business_name(cname)
-
-                        # Institutional Filter: If owner is institutional, do not link to business/principal
-                        # This effectively removes them from the network graph
-                        if INSTITUTIONAL_PATTERN.search(oname) or INSTITUTIONAL_PATTERN.search(cname):
-                            continue
-
-                        # Care-Of Filter: If name starts with C/O, ignore it (it's likely a manager or mailing address)
-                        # We only skip the specific field that matches.
-
-                        skip_owner = bool(CARE_OF_PATTERN.match(oname))
-                        skip_co_owner = bool(CARE_OF_PATTERN.match(cname))
-
-                        # Pass 1: Primary Business matches
-                        bid = None
-                        if not skip_owner and onorm not in SKIP_NAMES:
-                            bid = b_map.get(onorm)
-                        if not bid and not skip_co_owner and cnorm not in SKIP_NAMES:
-                            bid = b_map.get(cnorm)
-
-                        # Pass 2: Canonical Business matches (Suffix-stripped)
-                        if not bid:
-                            if not skip_owner and onorm not in SKIP_NAMES:
-                                bc_owner = canonicalize_business_name(oname)
-                                bid = b_canon_map.get(bc_owner)
-                            if not bid and not skip_co_owner and cnorm not in SKIP_NAMES:
-                                bc_co = canonicalize_business_name(cname)
-                                bid = b_canon_map.get(bc_co)
-
-                        # Pass 3: Principal matches (with LAST FIRST ↔ FIRST LAST reversal)
-                        pid = None
-                        if not bid: # Only check principal if no business found
-                            # Iterate over checking owner then co-owner, skipping if C/O matches
-                            for raw_name, skip in [(oname, skip_owner), (cname, skip_co_owner)]:
-                                if skip: continue
-                                if pid: break # Found one already
-
-                                name_clean = normalize_person_name(raw_name)
-                                if not name_clean:
-                                    continue
-                                # Direct match
-                                pid = p_map.get(name_clean)
-                                # Canonical match
-                                if not pid:
-                                    pid = p_map.get(canonicalize_person_name(name_clean))
-                                # LAST FIRST → FIRST LAST reversal
-                                if not pid:
-                                    parts = name_clean.split()
-                                    if len(parts) >= 2:
-                                        # Try "LAST FIRST" → "FIRST LAST"
-                                        reversed_name = f"{parts[-1]} {' '.join(parts[:-1])}"
-                                        pid = p_map.get(reversed_name)
-                                        if not pid:
-                                            pid = p_map.get(canonicalize_person_name(reversed_name))
-                                        # Try "FIRST LAST" → "LAST FIRST"
-                                        if not pid:
-                                            reversed_name2 = f"{' '.join(parts[1:])} {parts[0]}"
-                                            pid = p_map.get(reversed_name2)
-                                            if not pid:
-                                                pid = p_map.get(canonicalize_person_name(reversed_name2))
-
-                        if bid or pid:
-                            updates.append((bid, pid, row['id']))
-                            linked_count += 1
-
-                        if len(updates) >= 5000:
-                            with conn.cursor() as up_cur: # Use the main connection for updates
-                                execute_values(up_cur, """
-                                    UPDATE properties AS p
-                                    SET business_id = v.bid, principal_id = v.pid
-                                    FROM (VALUES %s) AS v(bid, pid, id)
-                                    WHERE p.id = v.id
-                                """, updates)
-                            conn.commit()
-                            updates = []
-
-                if updates:
-                    with conn.cursor() as up_cur:
-                        execute_values(up_cur, """
-                            UPDATE properties AS p
-                            SET business_id = v.bid, principal_id = v.pid
-                            FROM (VALUES %s) AS v(bid, pid, id)
-                            WHERE p.id = v.id
-                        """, updates)
-                    conn.commit()
+            with read_conn.cursor(name=cursor_name) as sc:
+                sc.itersize = 5000
+                if property_ids is None:
+                    sc.execute("SELECT id, owner, co_owner FROM properties")
+                else:
+                    sc.execute("SELECT id, owner, co_owner FROM properties WHERE id = ANY(%s::int[])", (list(property_ids),))
+                count, matches = _match_property_rows(sc)
+                for row in matches:
+                    links.add(row)
         finally:
             read_conn.close()
 
+    linked_count = links.rows + links.pending
+    _apply_property_links(conn, links)
     logger.info(f"  - Linked {linked_count:,} out of {count:,} properties.")
 
 # --- Logic 2: Graph Building ---
@@ -246,21 +370,9 @@ def build_graph(conn, skip_emails=False):
     """Builds the entity graph using shared attributes."""
     logger.info("🕸️ PHASE 2: Building graph (Integers)...")
 
-    # Start IDs:
-    # 0 = reserved
-    # Positive ints only
-    node_to_int = {}
-    int_to_node = [] # Index is the int ID
-
-    def get_id(node_tuple):
-        if node_tuple not in node_to_int:
-            node_to_int[node_tuple] = len(int_to_node)
-            int_to_node.append(node_tuple)
-        return node_to_int[node_tuple]
-
-    # Use defaultdict(list) for adjacency list as it is lighter than set (handle dupes later or ignore)
-    # Using arrays would be even better but lists are standard python.
-    graph = defaultdict(set) # Using set to avoid edges duplication during build
+    # Edges are buffered with (type, key) endpoints; node ids are interned per
+    # type and duplicates dropped when the buffer is frozen at the end of the phase.
+    edges = TypedEdgeBuffer()
 
     with conn.cursor(cursor_factory=RealDictCursor) as cur:
         cur.execute("SELECT normalized_name FROM principal_ignore_list")
@@ -451,14 +563,7 @@ def build_graph(conn, skip_emails=False):
                     if INSTITUTIONAL_PATTERN.search(row['b_name'] or ""):
                         continue
 
-                u_node = ('business', bid)
-                v_node = ('principal', pid)
-
-                u = get_id(u_node)
-                v = get_id(v_node)
-
-                graph[u].add(v)
-                graph[v].add(u)
+                edges.add('business', bid, 'principal', pid)
                 try:
                     pid_int = int(pid)
                     property_active_principal_ids.add(pid_int)
@@ -518,8 +623,8 @@ def build_graph(conn, skip_emails=False):
                     pid = int(row['principal_id'])
                 except (TypeError, ValueError):
                     continue
-                principal_node = ('principal', pid)
-                if pid not in property_active_principal_ids or principal_node not in node_to_int:
+                # Only principals already linked to an owning business are in the graph
+                if pid not in property_active_principal_ids:
                     continue
                 if pid in ambiguous_principal_ids:
                     continue
@@ -541,6 +646,9 @@ def build_graph(conn, skip_emails=False):
 
         bridge_business_count = 0
         bridge_edge_count = 0
+        # Principal-principal edges only come from bridges, so this set of
+        # principal id pairs is enough to count distinct bridge edges.
+        bridge_pairs = set()
         max_bridge_group = 0
         for surname_groups in bridge_groups.values():
             added_for_business = False
@@ -549,14 +657,13 @@ def build_graph(conn, skip_emails=False):
                 if len(pids) < 2:
                     continue
                 max_bridge_group = max(max_bridge_group, len(pids))
-                int_ids = [node_to_int[('principal', pid)] for pid in pids]
-                for i in range(len(int_ids)):
-                    for j in range(i + 1, len(int_ids)):
-                        u, v = int_ids[i], int_ids[j]
-                        if v not in graph[u]:
+                for i in range(len(pids)):
+                    for j in range(i + 1, len(pids)):
+                        u, v = pids[i], pids[j]
+                        if (u, v) not in bridge_pairs:
+                            bridge_pairs.add((u, v))
                             bridge_edge_count += 1
-                        graph[u].add(v)
-                        graph[v].add(u)
+                            edges.add('principal', u, 'principal', v)
                 added_for_business = True
             if added_for_business:
                 bridge_business_count += 1
@@ -571,7 +678,7 @@ def build_graph(conn, skip_emails=False):
         # B. Shared Emails (Filtered)
         if skip_emails:
             logger.info("  - SKIPPING Shared Emails (Diagnostic Mode).")
-            return graph, node_to_int, int_to_node
+            return _freeze_graph(edges)
 
         logger.info("  - Loading Shared Emails...")
         # Force a fresh cursor for rules to ensure no state leakage
@@ -636,12 +743,9 @@ def build_graph(conn, skip_emails=False):
                         max_group_size,
                     )
                     continue
-                # Convert all to ints first
-                int_ids = [get_id(('business', bid)) for bid in biz_ids]
-                for i in range(len(int_ids)):
-                    for j in range(i+1, len(int_ids)):
-                        u, v = int_ids[i], int_ids[j]
-                        graph[u].add(v); graph[v].add(u)
+                for i in range(len(biz_ids)):
+                    for j in range(i+1, len(biz_ids)):
+                        edges.add('business', biz_ids[i], 'business', biz_ids[j])
         if skipped_email_keys:
             logger.info("  - Skipped %s high-frequency email key(s) as likely service/agent bridges.", skipped_email_keys)
 
@@ -678,11 +782,8 @@ def build_graph(conn, skip_emails=False):
         for addr, biz_ids in addr_map.items():
             if len(biz_ids) < 2:
                 continue
-            addr_node = get_id(('address', addr))
             for bid in biz_ids:
-                biz_node = get_id(('business', bid))
-                graph[biz_node].add(addr_node)
-                graph[addr_node].add(biz_node)
+                edges.add('business', bid, 'address', addr)
                 addr_membership_edge_count += 1
             addr_pair_equivalent_count += len(biz_ids) * (len(biz_ids) - 1) // 2
 
@@ -693,18 +794,26 @@ def build_graph(conn, skip_emails=False):
             f"{addr_pair_equivalent_count:,}",
         )
 
-    # Convert sets to tuples for memory efficiency (sets have high overhead)
-    # We use a dict instead of defaultdict for the final object to prevent accidental growth
-    final_graph = {k: tuple(v) for k, v in graph.items()}
-    del graph # Free the sets immediately
+    return _freeze_graph(edges)
+
 
-    logger.info(f"✅ PHASE 2 COMPLETE: Graph built with {len(final_graph):,} nodes and {len(int_to_node):,} entities.")
-    return final_graph, node_to_int, int_to_node
+def _freeze_graph(edges):
+    """Interns the buffered nodes and converts the edges into the immutable CSR graph used by discovery."""
+    buffered = len(edges)
+    src, dst, nodes = edges.intern()
+    del edges  # Free the raw endpoint keys immediately
+    final_graph = CSRGraph.from_arrays(src, dst, len(nodes), nodes.type_codes())
+
+    logger.info(
+        f"✅ PHASE 2 COMPLETE: Graph built with {len(final_graph):,} nodes, {final_graph.num_edges:,} edges "
+        f"({buffered:,} buffered) and {len(nodes):,} entities; CSR arrays use {final_graph.nbytes() / (1024 * 1024):,.1f} MB."
+    )
+    return final_graph, nodes
 
 # --- Logic 3: Depth-Limited Discovery ---
 def discover_networks_depth_limited(graph_data, seed_nodes_raw):
     """Discovers networks using Iterative BFS on INTEGER graph."""
-    graph, node_to_int, int_to_node = graph_data
+    graph, nodes = graph_data
 
     logger.info("🔍 PHASE 3: Discovering networks (Iterative BFS + DSU Merging on Integers)...")
 
@@ -712,80 +821,28 @@ def discover_networks_depth_limited(graph_data, seed_nodes_raw):
     # (Seeds might be filtered out by hub rules, etc)
     seed_ints = []
     for s in seed_nodes_raw:
-        if s in node_to_int:
-            seed_ints.append(node_to_int[s])
+        node_id = nodes.id_of(s)
+        if node_id is not None:
+            seed_ints.append(node_id)
 
     logger.info(f"  - Valid seeds count: {len(seed_ints):,} / {len(seed_nodes_raw):,}")
 
-    # Initialize DSU for merging seed components
-    # Map: Seed_Index -> Parent_Seed_Index
-    parent = list(range(len(seed_ints)))
-
-    def find(i):
-        if parent[i] == i:
-            return i
-        root = i
-        while parent[root] != root:
-            root = parent[root]
-        curr = i
-        while curr != root:
-            next_val = parent[curr]
-            parent[curr] = root
-            curr = next_val
-        return root
-
-    def union(i, j):
-        root_i = find(i)
-        root_j = find(j)
-        if root_i != root_j:
-            parent[root_i] = root_j
-
-    # Map: Node_Int -> Seed_Index (owner)
-    node_owner = {}
-
-    processed_count = 0
-    total_seeds = len(seed_ints)
-
-    for idx, seed_id in enumerate(seed_ints):
-        if idx % 10000 == 0:
-            logger.info(f"  - Processing seed {idx:,}/{total_seeds:,}...")
-
-        if seed_id in node_owner:
-            continue
-
-        # Start new component
-        node_owner[seed_id] = idx
-        queue = deque([(seed_id, 0)])
-
-        while queue:
-            node, depth = queue.popleft()
-            processed_count += 1
-
-            if depth >= MAX_DEPTH: continue
-
-            for neighbor in graph.get(node, []):
-                if neighbor not in node_owner:
-                    node_owner[neighbor] = idx
-                    queue.append((neighbor, depth + 1))
-                else:
-                    # Collision
-                    owner_idx = node_owner[neighbor]
-                    if find(idx) != find(owner_idx):
-                        union(idx, owner_idx)
+    # BFS over the CSR arrays; seed merges are resolved afterwards by the
+    # vectorized DSU in graph_engine.merge_labels().
+    owned_nodes, owners, labels = depth_limited_components(graph, seed_ints, MAX_DEPTH)
 
     # Construct discovered_networks list
     logger.info("  - Compiling network components...")
-    components_int = defaultdict(list)
-
-    for node_id, owner_idx in node_owner.items():
-        root = find(owner_idx)
-        components_int[root].append(node_id)
-
-    # Convert ints back to node tuples
     discovered_networks = []
-    for comp_ints in components_int.values():
-        network = [int_to_node[i] for i in comp_ints]
-        discovered_networks.append(network)
+    if len(owned_nodes):
+        roots = labels[owners]
+        # Keep discovery order: components by first-claimed node, members in claim order
+        order = np.argsort(roots, kind='stable')
+        sorted_roots = roots[order]
+        _, starts = np.unique(sorted_roots, return_index=True)
+        groups = np.split(owned_nodes[order], starts[1:])
+        for pos in np.argsort(order[starts], kind='stable'):
+            discovered_networks.append(nodes.nodes(groups[pos]))
 
     logger.info(f"✅ PHASE 3 COMPLETE: Found {len(discovered_networks):,} distinct networks.")
     return discovered_networks
@@ -843,17 +900,26 @@ def store_networks_shadow(conn, networks, graph_data=None):
             if suffix in name_upper: return False
         return True
 
+    # Exclude known agents from the ignore list when naming networks
+    with conn.cursor() as cur:
+        cur.execute("SELECT normalized_name FROM principal_ignore_list")
+        ignore_names_set = {r[0] for r in cur}
+
     owning_principals = set(prin_props.keys())
     owning_businesses = set(biz_props.keys())
 
-    entity_links = []
+    # Network ids are assigned here (the table was truncated with RESTART IDENTITY),
+    # so every shadow table can be streamed with COPY instead of INSERT ... RETURNING.
+    network_rows = CopyBuffer(conn, "networks_shadow", ("id", "primary_name", "business_count", "principal_count", "total_properties", "total_assessed_value"))
+    entity_links = CopyBuffer(conn, "entity_networks_shadow", ("network_id", "entity_type", "entity_id", "entity_name", "normalized_name"))
+    edges_to_store = CopyBuffer(conn, "ownership_links_shadow", ("network_id", "from_entity", "to_entity", "link_type"))
+    copy_start = time.perf_counter()
 
     # Prepare for edge storage
-    edges_to_store = []
     graph_map = None
-    node_to_int = None
+    nodes = None
     if graph_data:
-        graph_map, node_to_int, _ = graph_data
+        graph_map, nodes = graph_data
         logger.info("  - Graph data provided. Will store edges.")
 
     for nid, group in enumerate(networks, 1):
@@ -866,11 +932,6 @@ def store_networks_shadow(conn, networks, graph_data=None):
         businesses = [n[1] for n in group if n[0] == 'business']
 
         # 2. NAMING LOGIC: Property-Weighted Human Priority
-        # Exclude known agents from the ignore list
-        with conn.cursor() as cur:
-            cur.execute("SELECT normalized_name FROM principal_ignore_list")
-            ignore_names_set = {r[0] for r in cur}
-
         p_weights = defaultdict(int)
         for pid in principals:
             p_weights[pid] += prin_props.get(pid, 0)
@@ -937,10 +998,8 @@ def store_networks_shadow(conn, networks, graph_data=None):
         net_total_props = 0
         net_total_value = 0
 
-        with conn.cursor() as cur:
-            cur.execute("INSERT INTO networks_shadow (primary_name, business_count, principal_count, total_properties, total_assessed_value) VALUES (%s, %s, %s, %s, %s) RETURNING id",
-                        (primary_name, visible_b_count, visible_p_count, net_total_props, net_total_value))
-            net_id = cur.fetchone()[0]
+        net_id = nid
+        network_rows.add((net_id, primary_name, visible_b_count, visible_p_count, net_total_props, net_total_value))
 
         # Identify principals who are connected to owning businesses (indirect ownership)
         principals_via_businesses = set()
@@ -965,7 +1024,7 @@ def store_networks_shadow(conn, networks, graph_data=None):
             name = biz_names.get(node_id) if node_type == 'business' else prin_names.get(node_id)
             if not name: continue
             norm = normalize_business_name(name) if node_type == 'business' else normalize_person_name(name)
-            entity_links.append((net_id, node_type, node_id, name, norm))
+            entity_links.add((net_id, node_type, node_id, name, norm))
 
         # STORE EDGES (Optimization: Only if graph data provided)
         if graph_map:
@@ -978,8 +1037,8 @@ def store_networks_shadow(conn, networks, graph_data=None):
             node_map = {} # Int -> Name
 
             for node in group:
-                if node in node_to_int:
-                    idx = node_to_int[node]
+                idx = nodes.id_of(node)
+                if idx is not None:
                     group_ints.append(idx)
 
                     # Resolve name
@@ -1012,59 +1071,47 @@ def store_networks_shadow(conn, networks, graph_data=None):
                         # We need types from the node tuples, but we only have names in node_map.
                         # Recover types from group list is slow.
                         # Let's assume P-B if names are different types... wait names don't have types.
-                        # We can use the graph_data int_to_node to look up types.
+                        # We can use the CSR node type codes to look up types.
 
-                        u_node = graph_data[2][u_idx]
-                        v_node = graph_data[2][v_idx]
+                        u_type = graph_map.node_types[u_idx]
+                        v_type = graph_map.node_types[v_idx]
 
                         l_type = 'link'
-                        if u_node[0] != v_node[0]: l_type = 'principal_link'
-                        elif u_node[0] == 'business': l_type = 'shared_contact'
+                        if u_type != v_type: l_type = 'principal_link'
+                        elif u_type == NODE_TYPE_CODES['business']: l_type = 'shared_contact'
 
-                        edges_to_store.append((net_id, u_name, v_name, l_type))
+                        edges_to_store.add((net_id, u_name, v_name, l_type))
 
-        if len(entity_links) >= 10000:
-            with conn.cursor() as cur:
-                execute_values(cur, "INSERT INTO entity_networks_shadow (network_id, entity_type, entity_id, entity_name, normalized_name) VALUES %s", entity_links)
-            conn.commit(); entity_links = []
-
-        if len(edges_to_store) >= 10000:
-            with conn.cursor() as cur:
-                execute_values(cur, "INSERT INTO ownership_links_shadow (network_id, from_entity, to_entity, link_type) VALUES %s", edges_to_store)
-            conn.commit(); edges_to_store = []
+    for buf in (network_rows, entity_links, edges_to_store):
+        buf.flush()
+    with conn.cursor() as cur:
+        # Keep the serial in step with the ids assigned above
+        cur.execute("SELECT setval(pg_get_serial_sequence('networks_shadow', 'id'), GREATEST(%s, 1), %s)",
+                    (network_rows.rows, network_rows.rows > 0))
+    conn.commit()
 
-    if entity_links:
-        with conn.cursor() as cur:
-            execute_values(cur, "INSERT INTO entity_networks_shadow (network_id, entity_type, entity_id, entity_name, normalized_name) VALUES %s", entity_links)
-        conn.commit()
+    copy_elapsed = time.perf_counter() - copy_start
+    total_rows = network_rows.rows + entity_links.rows + edges_to_store.rows
+    logger.info(
+        f"  - Streamed {network_rows.rows:,} networks, {entity_links.rows:,} entity links and "
+        f"{edges_to_store.rows:,} edges in {copy_elapsed:.1f}s ({total_rows / max(copy_elapsed, 1e-6):,.0f} rows/sec)."
+    )
 
-    if edges_to_store:
-        with conn.cursor() as cur:
-            execute_values(cur, "INSERT INTO ownership_links_shadow (network_id, from_entity, to_entity, link_type) VALUES %s", edges_to_store)
-        conn.commit()
+    build_property_membership_shadow(conn)
 
     logger.info("📊 Calculating and updating network total properties and values using SQL...")
     with conn.cursor() as cur:
         cur.execute("""
             WITH network_unique_properties AS (
-                SELECT DISTINCT ON (en.network_id, p.location, p.property_city, p.unit)
-                       en.network_id,
+                SELECT DISTINCT ON (m.network_id, p.location, p.property_city, p.unit)
+                       m.network_id,
                        p.location,
                        p.property_city,
                        p.unit,
                        p.assessed_value
-                FROM entity_networks_shadow en
-                JOIN properties p ON (
-                    (en.entity_type = 'business' AND p.business_id = en.entity_id)
-                    OR (en.entity_type = 'business' AND UPPER(p.owner) = UPPER(en.entity_name))
-                    OR (en.entity_type = 'business' AND p.owner_norm = en.normalized_name)
-                    OR (en.entity_type = 'principal' AND p.principal_id = en.entity_id)
-                    OR (en.entity_type = 'principal' AND p.owner_norm = en.entity_id)
-                    OR (en.entity_type = 'principal' AND p.co_owner_norm = en.entity_id)
-                    OR (en.entity_type = 'principal' AND p.owner_norm = en.normalized_name)
-                    OR (en.entity_type = 'principal' AND p.co_owner_norm = en.normalized_name)
-                )
-                ORDER BY en.network_id, p.location, p.property_city, p.unit, p.id DESC
+                FROM network_property_membership_shadow m
+                JOIN properties p ON p.id = m.property_id
+                ORDER BY m.network_id, p.location, p.property_city, p.unit, p.id DESC
             ),
             network_stats AS (
                 SELECT network_id,
@@ -1084,8 +1131,64 @@ def store_networks_shadow(conn, networks, graph_data=None):
 
     logger.info("✅ PHASE 4 COMPLETE.")
 
+# Each branch is a plain equi-join so Postgres can use an index or hash join,
+# instead of the single OR'd join predicate the API used to evaluate per request.
+# Lower priority wins when a property matches a network through several rules.
+PROPERTY_MEMBERSHIP_RULES = [
+    (1, 'business_id', 'business', "p.business_id = en.entity_id"),
+    (2, 'business_owner_name', 'business', "UPPER(p.owner) = UPPER(en.entity_name)"),
+    (3, 'business_owner_norm', 'business', "p.owner_norm = en.normalized_name"),
+    (4, 'principal_id', 'principal', "p.principal_id = en.entity_id"),
+    (5, 'principal_owner_norm', 'principal', "p.owner_norm = en.entity_id"),
+    (6, 'principal_co_owner_norm', 'principal', "p.co_owner_norm = en.entity_id"),
+    (7, 'principal_owner_norm', 'principal', "p.owner_norm = en.normalized_name"),
+    (8, 'principal_co_owner_norm', 'principal', "p.co_owner_norm = en.normalized_name"),
+]
+
+def build_property_membership_shadow(conn):
+    """Materializes network -> property membership from entity_networks_shadow.
+
+    The table is rebuilt from scratch on every refresh and swapped in with the
+    other shadow tables, so readers only ever see a complete snapshot.
+    """
+    logger.info("🧭 Materializing network_property_membership_shadow...")
+    start = time.time()
+    branches = "\n                UNION ALL\n".join(
+        f"""
+                SELECT en.network_id, p.id AS property_id, {priority} AS priority, '{reason}' AS match_reason
+                FROM entity_networks_shadow en
+                JOIN properties p ON {predicate}
+                WHERE en.entity_type = '{entity_type}'"""
+        for priority, reason, entity_type, predicate in PROPERTY_MEMBERSHIP_RULES
+    )
+    with conn.cursor() as cur:
+        cur.execute("DROP TABLE IF EXISTS network_property_membership_shadow;")
+        cur.execute("""
+            CREATE TABLE network_property_membership_shadow (
+                network_id INTEGER NOT NULL,
+                property_id INTEGER NOT NULL,
+                match_reason TEXT NOT NULL
+            );
+        """)
+        cur.execute(f"""
+            INSERT INTO network_property_membership_shadow (network_id, property_id, match_reason)
+            SELECT DISTINCT ON (network_id, property_id) network_id, property_id, match_reason
+            FROM ({branches}
+            ) candidates
+            ORDER BY network_id, property_id, priority
+        """)
+        row_count = cur.rowcount
+        # Indexes are built after the bulk load; unnamed so the swapped-in live
+        # table keeps its own index names without colliding with the next shadow.
+        cur.execute("ALTER TABLE network_property_membership_shadow ADD PRIMARY KEY (network_id, property_id);")
+        cur.execute("CREATE INDEX ON network_property_membership_shadow (property_id);")
+        cur.execute("ANALYZE network_property_membership_shadow;")
+    conn.commit()
+    logger.info(f"  - Stored {row_count:,} network/property memberships in {time.time() - start:.1f}s.")
+
 def run_full_rebuild():
     conn = get_db_connection()
+    report = PhaseReport()
     try:
         # 0. Clear stale links (to remove old name-based IDs)
         logger.info("🧹 PHASE 0: Clearing stale property links...")
@@ -1097,8 +1200,10 @@ def run_full_rebuild():
             """)
         conn.commit()
 
-        link_properties_to_entities(conn)
-        graph, node_to_int, int_to_node = build_graph(conn)
+        with report.phase("link properties"):
+            link_properties_to_entities(conn)
+        with report.phase("build graph"):
+            graph, nodes = build_graph(conn)
 
         # Seed nodes: Entities that own properties
         logger.info("Gathering seed nodes...")
@@ -1114,10 +1219,13 @@ def run_full_rebuild():
                 except (ValueError, TypeError):
                     continue
 
-        graph_data = (graph, node_to_int, int_to_node)
-        networks = discover_networks_depth_limited(graph_data, list(seeds))
-        store_networks_shadow(conn, networks, graph_data=graph_data)
+        graph_data = (graph, nodes)
+        with report.phase("discover networks"):
+            networks = discover_networks_depth_limited(graph_data, list(seeds))
+        with report.phase("store shadow tables"):
+            store_networks_shadow(conn, networks, graph_data=graph_data)
     finally:
+        report.log_summary()
         conn.close()
 
 if __name__ == "__main__":
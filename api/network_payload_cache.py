@@ -0,0 +1,152 @@
+import os
+import zlib
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger("they-own-what")
+
+NETWORK_PAYLOAD_CACHE_ENABLED = os.environ.get("NETWORK_PAYLOAD_CACHE", "1").lower() in ("1", "true", "yes")
+# How many of the top cached_insights networks to pre-render after startup
+NETWORK_PAYLOAD_PREWARM = int(os.environ.get("NETWORK_PAYLOAD_PREWARM", "25"))
+# Server-side cap on how many networks one prewarm request may render
+NETWORK_PAYLOAD_PREWARM_MAX = int(os.environ.get("NETWORK_PAYLOAD_PREWARM_MAX", "100"))
+NETWORK_PAYLOAD_COMPRESSION = int(os.environ.get("NETWORK_PAYLOAD_COMPRESSION", "6"))
+
+DATA_VERSION_KEY = "network_data_version"
+# Version used until the first swap/updater bump writes one
+INITIAL_DATA_VERSION = "initial"
+
+DDL_NETWORK_PAYLOAD_CACHE = """
+    CREATE TABLE IF NOT EXISTS network_payload_cache (
+        network_key TEXT NOT NULL,
+        data_version TEXT NOT NULL,
+        payload_date DATE NOT NULL,
+        payload BYTEA NOT NULL,
+        frame_count INTEGER NOT NULL,
+        raw_bytes INTEGER NOT NULL,
+        created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+        PRIMARY KEY (network_key, data_version, payload_date)
+    )
+"""
+
+CURRENT_VERSION_SQL = f"COALESCE((SELECT value->>'version' FROM kv_cache WHERE key = '{DATA_VERSION_KEY}'), '{INITIAL_DATA_VERSION}')"
+
+
+def _scalar(cursor):
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    return next(iter(row.values())) if isinstance(row, dict) else row[0]
+
+
+def network_key(network_ids: Iterable[Any]) -> str:
+    return ",".join(str(n) for n in sorted({int(n) for n in network_ids}))
+
+
+def bump_network_data_version(cursor, reason: str):
+    """Invalidates every cached network payload; call inside the transaction that changes the data."""
+    cursor.execute(f"""
+        INSERT INTO kv_cache (key, value, created_at)
+        VALUES ('{DATA_VERSION_KEY}', jsonb_build_object('version', md5(clock_timestamp()::text), 'reason', %s), now())
+        ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value, created_at = EXCLUDED.created_at
+    """, (reason,))
+    cursor.execute("SELECT to_regclass('public.network_payload_cache') IS NOT NULL")
+    if _scalar(cursor):
+        # Entries for older versions can never be read again
+        cursor.execute(f"DELETE FROM network_payload_cache WHERE data_version <> {CURRENT_VERSION_SQL}")
+
+
+class NetworkPayloadCache:
+    """Compressed NDJSON frames of /api/network/stream_load, keyed by
+    (network ids, data version, day). The day is part of the key because the
+    eviction/code-enforcement summaries count relative to CURRENT_DATE."""
+
+    def __init__(self):
+        self._table_ready = False
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "bytes_served": 0, "last_error": None}
+
+    def _ensure_table(self, cursor):
+        if self._table_ready:
+            return
+        cursor.execute(DDL_NETWORK_PAYLOAD_CACHE)
+        cursor.connection.commit()
+        self._table_ready = True
+
+    def get(self, cursor, network_ids: List[int]) -> Optional[List[str]]:
+        """Returns the cached frames (with trailing newlines) or None on a miss."""
+        try:
+            self._ensure_table(cursor)
+            cursor.execute(f"""
+                SELECT payload FROM network_payload_cache
+                WHERE network_key = %s AND payload_date = CURRENT_DATE
+                  AND data_version = {CURRENT_VERSION_SQL}
+            """, (network_key(network_ids),))
+            payload = _scalar(cursor)
+        except Exception as e:
+            cursor.connection.rollback()
+            self._record_error(e)
+            return None
+        if payload is None:
+            self._bump("misses")
+            return None
+        body = zlib.decompress(bytes(payload)).decode("utf-8")
+        self._bump("hits")
+        self._bump("bytes_served", len(body))
+        return body.splitlines(keepends=True)
+
+    def data_version(self, cursor) -> Optional[str]:
+        """The current data version; read it before rendering and pass it to put()."""
+        try:
+            cursor.execute(f"SELECT {CURRENT_VERSION_SQL}")
+            return _scalar(cursor)
+        except Exception as e:
+            cursor.connection.rollback()
+            self._record_error(e)
+            return None
+
+    def put(self, cursor, network_ids: List[int], frames: List[str], data_version: Optional[str]):
+        """Stores frames rendered under `data_version`; dropped if the version moved on meanwhile."""
+        if data_version is None:
+            return
+        body = "".join(frames).encode("utf-8")
+        try:
+            self._ensure_table(cursor)
+            cursor.execute(f"""
+                INSERT INTO network_payload_cache (network_key, data_version, payload_date, payload, frame_count, raw_bytes)
+                SELECT %s, %s, CURRENT_DATE, %s, %s, %s
+                WHERE %s = {CURRENT_VERSION_SQL}
+                ON CONFLICT (network_key, data_version, payload_date) DO NOTHING
+            """, (network_key(network_ids), data_version, zlib.compress(body, NETWORK_PAYLOAD_COMPRESSION),
+                  len(frames), len(body), data_version))
+            cursor.execute("DELETE FROM network_payload_cache WHERE payload_date < CURRENT_DATE")
+            cursor.connection.commit()
+        except Exception as e:
+            cursor.connection.rollback()
+            self._record_error(e)
+            return
+        self._bump("stores")
+
+    def stats(self, cursor=None) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        if cursor is not None and self._table_ready:
+            cursor.execute(f"""
+                SELECT COUNT(*) AS entries, COALESCE(SUM(length(payload)), 0) AS stored_bytes,
+                       COALESCE(SUM(raw_bytes), 0) AS raw_bytes, {CURRENT_VERSION_SQL} AS data_version
+                FROM network_payload_cache
+                WHERE payload_date = CURRENT_DATE AND data_version = {CURRENT_VERSION_SQL}
+            """)
+            row = cursor.fetchone()
+            stats.update(dict(row) if isinstance(row, dict) else dict(zip(("entries", "stored_bytes", "raw_bytes", "data_version"), row)))
+        return stats
+
+    def _bump(self, key: str, amount: int = 1):
+        with self._lock:
+            self._stats[key] += amount
+
+    def _record_error(self, e: Exception):
+        logger.warning(f"Network payload cache unavailable: {e}")
+        with self._lock:
+            self._stats["last_error"] = str(e)[:200]
@@ -0,0 +1,120 @@
+import os
+import time
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import requests
+
+# Shared bound on concurrent calls to Census/Nominatim, SerpAPI and Gemini.
+# Request threads wait on these futures without holding a DB connection.
+OUTBOUND_MAX_WORKERS = int(os.environ.get("OUTBOUND_MAX_WORKERS", "32"))
+# Default socket timeout for outbound HTTP calls that did not set one
+OUTBOUND_HTTP_TIMEOUT = float(os.environ.get("OUTBOUND_HTTP_TIMEOUT", "10"))
+# Most calls one request may have queued or running at once, so a large
+# batch cannot fill the pool ahead of other requests' SerpAPI/Gemini calls
+OUTBOUND_REQUEST_WINDOW = int(os.environ.get("OUTBOUND_REQUEST_WINDOW", "8"))
+
+
+class OutboundExecutor:
+    """Bounded thread pool for slow third-party calls, with queue/run metrics.
+
+    Calls made from inside an outbound worker run inline: a worker that
+    waited on another queued task could deadlock a saturated pool.
+    """
+
+    def __init__(self, max_workers: int = OUTBOUND_MAX_WORKERS):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="outbound")
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.pending = 0
+        self.running = 0
+        self.failed = 0
+        self.total_queue_ms = 0.0
+        self.max_queue_ms = 0.0
+
+    def _in_worker(self) -> bool:
+        return getattr(self._local, "active", False)
+
+    def _run(self, queued_at: float, fn: Callable, args, kwargs):
+        queue_ms = (time.perf_counter() - queued_at) * 1000
+        with self._lock:
+            self.pending -= 1
+            self.running += 1
+            self.total_queue_ms += queue_ms
+            self.max_queue_ms = max(self.max_queue_ms, queue_ms)
+        self._local.active = True
+        try:
+            return fn(*args, **kwargs)
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        finally:
+            self._local.active = False
+            with self._lock:
+                self.running -= 1
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        if self._in_worker():
+            future: Future = Future()
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        with self._lock:
+            self.submitted += 1
+            self.pending += 1
+        return self._executor.submit(self._run, time.perf_counter(), fn, args, kwargs)
+
+    def call(self, fn: Callable, *args, **kwargs) -> Any:
+        """Runs fn on the pool and waits for it."""
+        return self.submit(fn, *args, **kwargs).result()
+
+    def map(self, fn: Callable, items: Iterable) -> List[Any]:
+        """Like Executor.map, but results come back as a list in input order."""
+        return [future.result() for future in [self.submit(fn, item) for item in items]]
+
+    def as_completed(self, fn: Callable, items: Iterable,
+                     window: int = OUTBOUND_REQUEST_WINDOW) -> Iterator[Tuple[Any, Future]]:
+        """Yields (item, future) as fn(item) calls finish, keeping at most `window` in flight."""
+        pending = iter(items)
+        in_flight: Dict[Future, Any] = {}
+        for item in pending:
+            in_flight[self.submit(fn, item)] = item
+            if len(in_flight) >= window:
+                break
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                for item in pending:
+                    in_flight[self.submit(fn, item)] = item
+                    break
+                yield in_flight.pop(future), future
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            started = self.submitted - self.pending
+            return {
+                "max_workers": self.max_workers,
+                "submitted": self.submitted,
+                "pending": self.pending,
+                "running": self.running,
+                "failed": self.failed,
+                "avg_queue_ms": round(self.total_queue_ms / started, 2) if started else 0.0,
+                "max_queue_ms": round(self.max_queue_ms, 2),
+            }
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+
+OUTBOUND = OutboundExecutor()
+
+
+def outbound_get(url: str, timeout: Optional[float] = None, **kwargs):
+    """requests.get on the outbound pool, with OUTBOUND_HTTP_TIMEOUT as the default timeout."""
+    return OUTBOUND.call(requests.get, url, timeout=timeout or OUTBOUND_HTTP_TIMEOUT, **kwargs)
@@ -0,0 +1,326 @@
+import os
+import re
+import time
+import logging
+import threading
+import contextvars
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+import psycopg2.extensions
+from psycopg2 import sql as pg_sql
+from starlette.routing import Match
+
+logger = logging.getLogger("they-own-what")
+
+QUERY_PROFILER_ENABLED = os.environ.get("QUERY_PROFILER", "0").lower() in ("1", "true", "yes")
+# Statements slower than this are logged and, with QUERY_PROFILER_EXPLAIN, explained
+QUERY_PROFILER_SLOW_MS = float(os.environ.get("QUERY_PROFILER_SLOW_MS", "500"))
+# EXPLAIN ANALYZE re-runs the statement, so it is a separate opt-in and rate limited per fingerprint
+QUERY_PROFILER_EXPLAIN = os.environ.get("QUERY_PROFILER_EXPLAIN", "0").lower() in ("1", "true", "yes")
+QUERY_PROFILER_EXPLAIN_INTERVAL = int(os.environ.get("QUERY_PROFILER_EXPLAIN_INTERVAL", "300"))
+# Recent durations kept per fingerprint / route for percentiles
+QUERY_PROFILER_SAMPLES = int(os.environ.get("QUERY_PROFILER_SAMPLES", "1000"))
+# Requests that match no route (404s, probes) share one bucket so stats stay bounded
+UNMATCHED_ROUTE = "(unmatched)"
+
+_COMMENT_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_PARAM_RE = re.compile(r"%\(\w+\)s|%s")
+_NUMBER_RE = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_VALUES_RE = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+_SPACE_RE = re.compile(r"\s+")
+_READ_RE = re.compile(r"(SELECT|WITH)\b", re.I)
+_WRITE_RE = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE|CREATE|DROP|ALTER|TRUNCATE|COPY|CALL|NEXTVAL|SETVAL|LOCK|FOR\s+(?:NO\s+KEY\s+)?(?:UPDATE|SHARE))\b", re.I)
+
+
+def sql_fingerprint(query: str) -> str:
+    """Statement shape with literals, parameters and value lists collapsed:
+    "SELECT * FROM p WHERE id IN (%s, %s) AND city = 'X'" -> "SELECT * FROM p WHERE id IN (...) AND city = ?"."""
+    text = _COMMENT_RE.sub(" ", query)
+    text = _STRING_RE.sub("?", text)
+    text = _PARAM_RE.sub("?", text)
+    text = _NUMBER_RE.sub("?", text)
+    text = _LIST_RE.sub("(...)", text)
+    text = _VALUES_RE.sub("(...)", text)
+    return _SPACE_RE.sub(" ", text).strip().rstrip(";")
+
+
+def is_read_only(query: str) -> bool:
+    """True for plain SELECT/WITH statements that EXPLAIN ANALYZE can safely run a second time."""
+    text = _STRING_RE.sub("''", _COMMENT_RE.sub(" ", query)).strip()
+    return bool(_READ_RE.match(text)) and not _WRITE_RE.search(text)
+
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _summary(samples) -> Dict[str, float]:
+    ordered = sorted(samples)
+    if not ordered:
+        return {}
+    return {
+        "p50_ms": round(_percentile(ordered, 50), 2),
+        "p95_ms": round(_percentile(ordered, 95), 2),
+        "p99_ms": round(_percentile(ordered, 99), 2),
+    }
+
+
+class RequestProfile:
+    """Statements run on behalf of one HTTP request."""
+
+    __slots__ = ("route", "started", "statements", "db_ms")
+
+    def __init__(self, route: str):
+        self.route = route
+        self.started = time.perf_counter()
+        self.statements = 0
+        self.db_ms = 0.0
+
+    def server_timing(self) -> str:
+        total_ms = (time.perf_counter() - self.started) * 1000
+        return f'db;dur={self.db_ms:.1f};desc="{self.statements} queries", app;dur={total_ms:.1f}'
+
+
+_CURRENT = contextvars.ContextVar("query_profile", default=None)
+
+
+def route_template(routes, scope) -> str:
+    """Path template of the first route that fully matches `scope`, else UNMATCHED_ROUTE."""
+    for route in routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", UNMATCHED_ROUTE)
+    return UNMATCHED_ROUTE
+
+
+class QueryProfiler:
+    """
+    Aggregates statement timings from ProfilingConnection cursors by SQL
+    fingerprint and by route. The current request is tracked in a ContextVar,
+    which FastAPI copies into the threadpool that runs sync endpoints and
+    dependencies, so pooled connections need no extra plumbing. Statements run
+    outside a request (prewarm threads, startup) count under "(background)".
+    """
+
+    def __init__(self, enabled=QUERY_PROFILER_ENABLED, slow_ms=QUERY_PROFILER_SLOW_MS,
+                 explain=QUERY_PROFILER_EXPLAIN, explain_interval=QUERY_PROFILER_EXPLAIN_INTERVAL,
+                 samples=QUERY_PROFILER_SAMPLES):
+        self.enabled = enabled
+        self.slow_ms = slow_ms
+        self.explain = explain
+        self.explain_interval = explain_interval
+        self.samples = samples
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._since = time.time()
+            self._statements: Dict[str, Dict[str, Any]] = {}
+            self._routes: Dict[str, Dict[str, Any]] = {}
+
+    # --- Requests ------------------------------------------------------
+
+    def start_request(self, route: str) -> Optional[RequestProfile]:
+        """Makes a new RequestProfile current for this request's context; None when disabled."""
+        if not self.enabled:
+            return None
+        profile = RequestProfile(route)
+        _CURRENT.set(profile)
+        return profile
+
+    def finish_request(self, profile: Optional[RequestProfile], route: Optional[str] = None):
+        """Records the request under `route`, defaulting to the one it was started with."""
+        if profile is None:
+            return
+        total_ms = (time.perf_counter() - profile.started) * 1000
+        route = route or profile.route
+        with self._lock:
+            entry = self._routes.get(route)
+            if entry is None:
+                entry = self._routes[route] = {
+                    "requests": 0, "statements": 0, "total": deque(maxlen=self.samples), "db": deque(maxlen=self.samples),
+                }
+            entry["requests"] += 1
+            entry["statements"] += profile.statements
+            entry["total"].append(total_ms)
+            entry["db"].append(profile.db_ms)
+
+    # --- Statements ----------------------------------------------------
+
+    def record(self, query: str, duration_ms: float, rows: int, explain=None):
+        """Called by ProfilingCursorMixin after every statement. explain() returns a plan or None."""
+        profile = _CURRENT.get()
+        route = profile.route if profile is not None else "(background)"
+        if profile is not None:
+            profile.statements += 1
+            profile.db_ms += duration_ms
+
+        fingerprint = sql_fingerprint(query)
+        want_plan = False
+        with self._lock:
+            entry = self._statements.get(fingerprint)
+            if entry is None:
+                entry = self._statements[fingerprint] = {
+                    "calls": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0, "slow": 0,
+                    "samples": deque(maxlen=self.samples), "routes": {}, "explain": None, "explained_at": 0.0,
+                }
+            entry["calls"] += 1
+            entry["total_ms"] += duration_ms
+            entry["max_ms"] = max(entry["max_ms"], duration_ms)
+            entry["rows"] += max(rows, 0)
+            entry["samples"].append(duration_ms)
+            entry["routes"][route] = entry["routes"].get(route, 0) + 1
+            if duration_ms >= self.slow_ms:
+                entry["slow"] += 1
+                now = time.time()
+                if self.explain and explain is not None and now - entry["explained_at"] >= self.explain_interval:
+                    entry["explained_at"] = now
+                    want_plan = True
+
+        if duration_ms >= self.slow_ms:
+            logger.warning(f"🐢 Slow query ({duration_ms:,.0f} ms, {rows} rows) in {route}: {fingerprint[:300]}")
+        if want_plan:
+            plan = explain()
+            if plan is not None:
+                with self._lock:
+                    entry["explain"] = {
+                        "captured_at": time.time(), "route": route,
+                        "duration_ms": round(duration_ms, 1), "plan": plan,
+                    }
+
+    # --- Reporting -----------------------------------------------------
+
+    def snapshot(self, limit: int = 25, sort: str = "total_ms") -> Dict[str, Any]:
+        with self._lock:
+            statements = [
+                {
+                    "fingerprint": fingerprint,
+                    "calls": e["calls"],
+                    "total_ms": round(e["total_ms"], 1),
+                    "mean_ms": round(e["total_ms"] / e["calls"], 2),
+                    "max_ms": round(e["max_ms"], 1),
+                    "rows": e["rows"],
+                    "slow": e["slow"],
+                    **_summary(e["samples"]),
+                    "routes": dict(sorted(e["routes"].items(), key=lambda kv: -kv[1])[:5]),
+                    "explain": e["explain"],
+                }
+                for fingerprint, e in self._statements.items()
+            ]
+            routes = [
+                {
+                    "route": route,
+                    "requests": e["requests"],
+                    "statements_per_request": round(e["statements"] / e["requests"], 1),
+                    "total": _summary(e["total"]),
+                    "db": _summary(e["db"]),
+                }
+                for route, e in self._routes.items()
+            ]
+            since = self._since
+        if sort not in ("total_ms", "mean_ms", "max_ms", "calls", "slow", "p95_ms"):
+            sort = "total_ms"
+        statements.sort(key=lambda s: s.get(sort, 0), reverse=True)
+        routes.sort(key=lambda r: r["db"].get("p95_ms", 0), reverse=True)
+        return {
+            "enabled": self.enabled,
+            "explain": self.explain,
+            "slow_ms": self.slow_ms,
+            "since": since,
+            "routes": routes,
+            "statements": statements[:limit],
+        }
+
+
+QUERY_PROFILER = QueryProfiler()
+
+
+class ProfilingCursorMixin:
+    """Times execute/executemany on any psycopg2 cursor class it is mixed into."""
+
+    def execute(self, query, vars=None):
+        start = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            self._profile(query, vars, start)
+
+    def executemany(self, query, vars_list):
+        start = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            self._profile(query, None, start, explainable=False)
+
+    def _profile(self, query, vars, start, explainable=True):
+        duration_ms = (time.perf_counter() - start) * 1000
+        try:
+            text = query.as_string(self) if isinstance(query, pg_sql.Composable) else query
+            if isinstance(text, bytes):
+                text = text.decode("utf-8", "replace")
+            explain = None
+            # Named (server-side) cursors only declare here; their plan is not worth a second run
+            if explainable and self.name is None and is_read_only(text):
+                explain = lambda: self.connection.explain(text, vars)
+            QUERY_PROFILER.record(text, duration_ms, self.rowcount, explain)
+        except Exception as e:
+            logger.debug(f"Query profiler failed to record a statement: {e}")
+
+
+_CURSOR_CLASSES: Dict[type, type] = {}
+_CURSOR_CLASSES_LOCK = threading.Lock()
+
+
+def _profiling_cursor_class(base):
+    with _CURSOR_CLASSES_LOCK:
+        cls = _CURSOR_CLASSES.get(base)
+        if cls is None:
+            cls = _CURSOR_CLASSES[base] = type(f"Profiling{base.__name__}", (ProfilingCursorMixin, base), {})
+        return cls
+
+
+class ProfilingConnection(psycopg2.extensions.connection):
+    """
+    connection_factory for the API pool. Every cursor it hands out, whatever
+    cursor_factory the caller asks for (RealDictCursor, named cursors), is a
+    subclass of that factory with ProfilingCursorMixin in front.
+    """
+
+    def cursor(self, *args, **kwargs):
+        base = kwargs.get("cursor_factory") or self.cursor_factory or psycopg2.extensions.cursor
+        kwargs["cursor_factory"] = _profiling_cursor_class(base)
+        return super().cursor(*args, **kwargs)
+
+    def explain(self, query, vars=None):
+        """EXPLAIN (ANALYZE, BUFFERS) plan for a read-only statement, inside a savepoint so a failure leaves the caller's transaction usable."""
+        use_savepoint = not self.autocommit and self.info.transaction_status == psycopg2.extensions.TRANSACTION_STATUS_INTRANS
+        if self.info.transaction_status == psycopg2.extensions.TRANSACTION_STATUS_INERROR:
+            return None
+        cur = super().cursor()
+        try:
+            if use_savepoint:
+                cur.execute("SAVEPOINT query_profiler_explain")
+            cur.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + query, vars)
+            plan = cur.fetchone()[0]
+            if use_savepoint:
+                cur.execute("RELEASE SAVEPOINT query_profiler_explain")
+            return plan
+        except Exception as e:
+            if use_savepoint:
+                try:
+                    cur.execute("ROLLBACK TO SAVEPOINT query_profiler_explain")
+                except Exception:
+                    pass
+            logger.warning(f"Query profiler EXPLAIN failed: {e}")
+            return None
+        finally:
+            cur.close()
+
+
+def connection_factory():
+    """connection_factory for psycopg2.connect / pools: ProfilingConnection when the profiler is on."""
+    return ProfilingConnection if QUERY_PROFILER.enabled else None
@@ -3,11 +3,16 @@ import os
 import sys
 import psycopg2
 import logging
-from psycopg2.extras import RealDictCursor
+from collections import defaultdict
+from psycopg2.extras import RealDictCursor, execute_values
 
 # Add current directory to path so we can import network_builder
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from network_builder import get_db_connection, link_properties_to_entities, build_graph, discover_networks_depth_limited, store_networks_shadow
+from graph_engine import PhaseReport
+from search_index import refresh_search_documents
+from network_payload_cache import bump_network_data_version
+from eviction_facts import ensure_eviction_facts, rebuild_eviction_network_facts
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -16,6 +21,9 @@ logger = logging.getLogger(__name__)
 DATABASE_URL = os.environ.get("DATABASE_URL")
 GUREVITCH_MIN_PROPERTIES = int(os.environ.get("GUREVITCH_MIN_PROPERTIES", "900"))
 GUREVITCH_MAX_PROPERTIES = int(os.environ.get("GUREVITCH_MAX_PROPERTIES", "2500"))
+# Above this many dirty records the incremental mode falls back to a full rebuild
+INCREMENTAL_MAX_DIRTY = int(os.environ.get("INCREMENTAL_MAX_DIRTY", "50000"))
+INCREMENTAL_MAX_PASSES = int(os.environ.get("INCREMENTAL_MAX_PASSES", "20"))
 
 def setup_shadow_tables(conn):
     """Creates shadow tables for safe writing."""
@@ -51,6 +59,129 @@ def setup_shadow_tables(conn):
         cursor.execute("TRUNCATE networks_shadow, entity_networks_shadow, ownership_links_shadow RESTART IDENTITY;")
     conn.commit()
 
+def setup_dirty_tracking(conn):
+    """Installs triggers that record properties, businesses and principal links
+    changed since the last network build in network_dirty_records."""
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS network_dirty_records (
+                record_type TEXT NOT NULL CHECK (record_type IN ('property', 'business', 'principal')),
+                record_id TEXT NOT NULL,
+                changed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (record_type, record_id)
+            );
+        """)
+        cursor.execute("""
+            CREATE OR REPLACE FUNCTION network_mark_dirty(kind TEXT, rid TEXT) RETURNS VOID AS $$
+            BEGIN
+                IF rid IS NULL THEN
+                    RETURN;
+                END IF;
+                -- Wall-clock stamp: a re-marked record must never keep the
+                -- changed_at a refresh already loaded (see clear_dirty_records)
+                INSERT INTO network_dirty_records (record_type, record_id, changed_at)
+                VALUES (kind, rid, clock_timestamp())
+                ON CONFLICT (record_type, record_id) DO UPDATE SET changed_at = clock_timestamp();
+            END;
+            $$ LANGUAGE plpgsql;
+        """)
+        cursor.execute("""
+            CREATE OR REPLACE FUNCTION network_dirty_property() RETURNS TRIGGER AS $$
+            BEGIN
+                IF TG_OP = 'DELETE' THEN
+                    PERFORM network_mark_dirty('property', OLD.id::text);
+                ELSIF TG_OP = 'INSERT'
+                   OR NEW.owner IS DISTINCT FROM OLD.owner
+                   OR NEW.co_owner IS DISTINCT FROM OLD.co_owner THEN
+                    PERFORM network_mark_dirty('property', NEW.id::text);
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+        """)
+        cursor.execute("""
+            CREATE OR REPLACE FUNCTION network_dirty_business() RETURNS TRIGGER AS $$
+            BEGIN
+                IF TG_OP = 'DELETE' THEN
+                    PERFORM network_mark_dirty('business', OLD.id::text);
+                ELSIF TG_OP = 'INSERT'
+                   OR NEW.name IS DISTINCT FROM OLD.name
+                   OR NEW.mail_address IS DISTINCT FROM OLD.mail_address
+                   OR NEW.business_address IS DISTINCT FROM OLD.business_address
+                   OR NEW.business_email_address IS DISTINCT FROM OLD.business_email_address THEN
+                    PERFORM network_mark_dirty('business', NEW.id::text);
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+        """)
+        cursor.execute("""
+            CREATE OR REPLACE FUNCTION network_dirty_principal_link() RETURNS TRIGGER AS $$
+            BEGIN
+                IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                    PERFORM network_mark_dirty('business', OLD.business_id::text);
+                    PERFORM network_mark_dirty('principal', OLD.principal_id::text);
+                END IF;
+                IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                    PERFORM network_mark_dirty('business', NEW.business_id::text);
+                    PERFORM network_mark_dirty('principal', NEW.principal_id::text);
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+        """)
+        cursor.execute("DROP TRIGGER IF EXISTS trg_network_dirty_property ON properties;")
+        cursor.execute("""
+            CREATE TRIGGER trg_network_dirty_property
+            AFTER INSERT OR DELETE OR UPDATE OF owner, co_owner ON properties
+            FOR EACH ROW EXECUTE FUNCTION network_dirty_property();
+        """)
+        cursor.execute("DROP TRIGGER IF EXISTS trg_network_dirty_business ON businesses;")
+        cursor.execute("""
+            CREATE TRIGGER trg_network_dirty_business
+            AFTER INSERT OR DELETE OR UPDATE OF name, mail_address, business_address, business_email_address ON businesses
+            FOR EACH ROW EXECUTE FUNCTION network_dirty_business();
+        """)
+        cursor.execute("DROP TRIGGER IF EXISTS trg_network_dirty_principal_link ON principal_business_links;")
+        cursor.execute("""
+            CREATE TRIGGER trg_network_dirty_principal_link
+            AFTER INSERT OR UPDATE OR DELETE ON principal_business_links
+            FOR EACH ROW EXECUTE FUNCTION network_dirty_principal_link();
+        """)
+    conn.commit()
+
+def load_dirty_records(conn):
+    """Returns (markers, {'property': set, 'business': set, 'principal': set}).
+
+    markers are the (record_type, record_id, changed_at) rows read, for
+    clear_dirty_records once the build that consumed them is live.
+    """
+    dirty = {'property': set(), 'business': set(), 'principal': set()}
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT record_type, record_id, changed_at FROM network_dirty_records")
+        markers = cursor.fetchall()
+    conn.commit()
+    for record_type, record_id, _ in markers:
+        dirty[record_type].add(record_id)
+    return markers, dirty
+
+def clear_dirty_records(conn, markers):
+    """Drops exactly the markers a finished build loaded.
+
+    A cutoff timestamp is not enough: changed_at is stamped inside the
+    writer's transaction, so a marker committed after the load can carry an
+    earlier time. Markers added or re-stamped since the load survive.
+    """
+    with conn.cursor() as cursor:
+        execute_values(cursor, """
+            DELETE FROM network_dirty_records d
+            USING (VALUES %s) AS m(record_type, record_id, changed_at)
+            WHERE d.record_type = m.record_type
+              AND d.record_id = m.record_id
+              AND d.changed_at = m.changed_at
+        """, markers, page_size=5000)
+    conn.commit()
+
 def validate_shadow_data(conn):
     """Ensures shadow data is sane before swapping."""
     logger.info("Validating shadow data...")
@@ -122,22 +253,114 @@ def atomic_swap(conn):
         cursor.execute("ALTER TABLE networks RENAME TO networks_old;")
         cursor.execute("ALTER TABLE entity_networks RENAME TO entity_networks_old;")
         cursor.execute("ALTER TABLE ownership_links RENAME TO ownership_links_old;")
+        # May not exist yet on the first refresh after the membership table was introduced
+        cursor.execute("ALTER TABLE IF EXISTS network_property_membership RENAME TO network_property_membership_old;")
 
         cursor.execute("ALTER TABLE networks_shadow RENAME TO networks;")
         cursor.execute("ALTER TABLE entity_networks_shadow RENAME TO entity_networks;")
         cursor.execute("ALTER TABLE ownership_links_shadow RENAME TO ownership_links;")
+        cursor.execute("ALTER TABLE network_property_membership_shadow RENAME TO network_property_membership;")
 
         cursor.execute("DROP TABLE networks_old CASCADE;")
         cursor.execute("DROP TABLE entity_networks_old CASCADE;")
         cursor.execute("DROP TABLE ownership_links_old CASCADE;")
+        cursor.execute("DROP TABLE IF EXISTS network_property_membership_old CASCADE;")
+        # Cached stream_load payloads describe the old tables
+        bump_network_data_version(cursor, "atomic_swap")
+    conn.commit()
+
+def merge_shadow_into_live(conn, affected_network_ids):
+    """Replaces the affected live networks with the rebuilt ones from the shadow tables.
+
+    Shadow ids restart at 1, so they are remapped onto fresh ids from the live
+    networks sequence. Everything happens in one transaction.
+    """
+    affected = sorted(affected_network_ids)
+    logger.info(f"Patching {len(affected):,} live network(s) in place...")
+    with conn.cursor() as cursor:
+        cursor.execute("DELETE FROM network_property_membership WHERE network_id = ANY(%s::int[])", (affected,))
+        cursor.execute("DELETE FROM ownership_links WHERE network_id = ANY(%s::int[])", (affected,))
+        cursor.execute("DELETE FROM entity_networks WHERE network_id = ANY(%s::int[])", (affected,))
+        cursor.execute("DELETE FROM networks WHERE id = ANY(%s::int[])", (affected,))
+
+        cursor.execute("""
+            CREATE TEMP TABLE network_id_map ON COMMIT DROP AS
+            SELECT id AS shadow_id, nextval(pg_get_serial_sequence('networks', 'id'))::int AS live_id
+            FROM networks_shadow
+        """)
+        cursor.execute("""
+            INSERT INTO networks (id, primary_name, total_properties, total_assessed_value, business_count,
+                                  principal_count, created_at, network_size, updated_at)
+            SELECT m.live_id, s.primary_name, s.total_properties, s.total_assessed_value, s.business_count,
+                   s.principal_count, s.created_at, s.network_size, CURRENT_TIMESTAMP
+            FROM networks_shadow s
+            JOIN network_id_map m ON m.shadow_id = s.id
+        """)
+        inserted = cursor.rowcount
+        cursor.execute("""
+            INSERT INTO entity_networks (network_id, entity_type, entity_id, entity_name, normalized_name)
+            SELECT m.live_id, s.entity_type, s.entity_id, s.entity_name, s.normalized_name
+            FROM entity_networks_shadow s
+            JOIN network_id_map m ON m.shadow_id = s.network_id
+        """)
+        cursor.execute("""
+            INSERT INTO ownership_links (network_id, from_entity, to_entity, link_type)
+            SELECT m.live_id, s.from_entity, s.to_entity, s.link_type
+            FROM ownership_links_shadow s
+            JOIN network_id_map m ON m.shadow_id = s.network_id
+        """)
+        cursor.execute("""
+            INSERT INTO network_property_membership (network_id, property_id, match_reason)
+            SELECT m.live_id, s.property_id, s.match_reason
+            FROM network_property_membership_shadow s
+            JOIN network_id_map m ON m.shadow_id = s.network_id
+        """)
+        bump_network_data_version(cursor, "incremental_merge")
     conn.commit()
+    logger.info(f"✅ Replaced {len(affected):,} network(s) with {inserted:,} rebuilt network(s).")
 
-def run_refresh(dry_run=False, skip_linking=False, skip_emails=False):
-    """Executes the full refresh cycle."""
+def refresh_insights_cache(conn):
+    """Flushes the insights cache and rebuilds cached_insights from live tables."""
+    logger.info("🔄 Triggering Insights Refresh...")
+    try:
+        # Flush old cache to be safe (optional, but requested)
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM kv_cache WHERE key = 'insights'")
+        conn.commit()
+
+        # Rebuild
+        from generate_insights import rebuild_cached_insights
+        rebuild_cached_insights(db_conn=conn)
+        logger.info("✅ Insights & Cache Rebuilt Successfully.")
+    except Exception as e:
+        logger.error(f"❌ Insights Rebuild Failed: {e}")
+
+def refresh_search_index(conn):
+    """Rebuilds search_documents so autocomplete/search see the new names and networks."""
+    try:
+        refresh_search_documents(conn)
+    except Exception as e:
+        conn.rollback()
+        logger.error(f"❌ Search index rebuild failed: {e}")
+
+def refresh_eviction_facts(conn):
+    """Re-links the eviction fact cube to the new networks for the monitor and burst detector."""
+    try:
+        if ensure_eviction_facts(conn):
+            rebuild_eviction_network_facts(conn)
+    except Exception as e:
+        conn.rollback()
+        logger.error(f"❌ Eviction network facts rebuild failed: {e}")
+
+def run_refresh(dry_run=False, skip_linking=False, skip_emails=False, report=None):
+    """Executes the full refresh cycle. Phase timings go to `report` (a PhaseReport) when given."""
     logger.info(f"🚀 Starting Network Refresh (DryRun={dry_run}, SkipLinking={skip_linking}, SkipEmails={skip_emails})")
     conn = None
+    report = report or PhaseReport("Network refresh")
     try:
         conn = get_db_connection()
+        setup_dirty_tracking(conn)
+        dirty_markers, _ = load_dirty_records(conn)
 
         if not skip_linking:
             # 0. Clear stale links (Important for correctness after logic changes)
@@ -152,7 +375,8 @@ def run_refresh(dry_run=False, skip_linking=False, skip_emails=False):
             conn.commit()
 
             # 1. Link properties
-            link_properties_to_entities(conn)
+            with report.phase("link properties"):
+                link_properties_to_entities(conn)
 
         else:
             logger.info("⏩ PHASES 0 & 1 SKIPPED: Assuming property links are already set.")
@@ -163,7 +387,8 @@ def run_refresh(dry_run=False, skip_linking=False, skip_emails=False):
         else:
             logger.info("📧 Email Matching ENABLED.")
 
-        graph_data = build_graph(conn, skip_emails=skip_emails)
+        with report.phase("build graph"):
+            graph_data = build_graph(conn, skip_emails=skip_emails)
 
         logger.info("Gathering seed nodes...")
         seeds = set()
@@ -173,35 +398,34 @@ def run_refresh(dry_run=False, skip_linking=False, skip_emails=False):
             cur.execute("SELECT DISTINCT principal_id FROM properties WHERE principal_id IS NOT NULL")
             for r in cur: seeds.add(('principal', r['principal_id']))
 
-        networks = discover_networks_depth_limited(graph_data, list(seeds))
+        with report.phase("discover networks"):
+            networks = discover_networks_depth_limited(graph_data, list(seeds))
 
         # 3. Setup shadow and store
-        setup_shadow_tables(conn)
-        store_networks_shadow(conn, networks, graph_data=graph_data)
+        with report.phase("store shadow tables"):
+            setup_shadow_tables(conn)
+            store_networks_shadow(conn, networks, graph_data=graph_data)
 
         # 4. Validate and Swap
         if validate_shadow_data(conn):
             if dry_run:
                 logger.info("Dry run complete. Tables NOT swapped.")
             else:
-                atomic_swap(conn)
+                with report.phase("swap tables"):
+                    atomic_swap(conn)
                 logger.info("✅ Refresh cycle complete. Networks updated.")
 
+                # Everything marked dirty before this build is now reflected in the live tables
+                clear_dirty_records(conn, dirty_markers)
+
                 # 5. Flush Cache & Rebuild Insights
                 # We do this AFTER the swap so the new data is live in 'networks', 'entity_networks', etc.
-                logger.info("🔄 Triggering Insights Refresh...")
-                try:
-                    # Flush old cache to be safe (optional, but requested)
-                    with conn.cursor() as cur:
-                        cur.execute("DELETE FROM kv_cache WHERE key = 'insights'")
-                    conn.commit()
-
-                    # Rebuild
-                    from generate_insights import rebuild_cached_insights
-                    rebuild_cached_insights(db_conn=conn)
-                    logger.info("✅ Insights & Cache Rebuilt Successfully.")
-                except Exception as e:
-                    logger.error(f"❌ Insights Rebuild Failed: {e}")
+                with report.phase("refresh insights"):
+                    refresh_insights_cache(conn)
+                with report.phase("refresh search index"):
+                    refresh_search_index(conn)
+                with report.phase("refresh eviction facts"):
+                    refresh_eviction_facts(conn)
             return True
         return False
 
@@ -209,6 +433,190 @@ def run_refresh(dry_run=False, skip_linking=False, skip_emails=False):
         logger.error(f"Refresh failed: {e}")
         if conn: conn.rollback()
         return False
+    finally:
+        report.log_summary()
+        if conn: conn.close()
+
+def _entity_key(node_type, node_id):
+    return (node_type, str(node_id))
+
+def _seed_node(entity_type, entity_id):
+    """Graph node tuple for an entity id as stored in properties/entity_networks."""
+    if entity_type == 'principal':
+        try:
+            return ('principal', int(entity_id))
+        except (TypeError, ValueError):
+            return None
+    return ('business', entity_id)
+
+def run_incremental_refresh(dry_run=False, skip_emails=False):
+    """Re-clusters only the networks touched by records changed since the last build.
+
+    Dirty properties are relinked and discovery is seeded only from the
+    affected networks plus newly linked entities. Any live network the new
+    components run into is pulled in until the affected set is closed. The
+    entity graph itself is still built in full (shared-attribute edges can join
+    any two components), so only linking, discovery and the write phase are
+    incremental.
+    Falls back to run_refresh() when the dirty set is large or the live tables
+    predate network_property_membership. A periodic full refresh remains the
+    consistency check for changes the triggers cannot see (e.g. new principals).
+    """
+    result = _incremental_refresh(dry_run=dry_run, skip_emails=skip_emails)
+    if result is None:
+        return run_refresh(dry_run=dry_run, skip_emails=skip_emails)
+    return result
+
+def _incremental_refresh(dry_run=False, skip_emails=False):
+    """Returns True/False like run_refresh, or None when a full rebuild is needed."""
+    logger.info(f"🚀 Starting Incremental Network Refresh (DryRun={dry_run}, SkipEmails={skip_emails})")
+    conn = None
+    try:
+        conn = get_db_connection()
+        setup_dirty_tracking(conn)
+        markers, dirty = load_dirty_records(conn)
+        dirty_total = sum(len(ids) for ids in dirty.values())
+        logger.info(
+            f"  - Dirty records: {len(dirty['property']):,} properties, "
+            f"{len(dirty['business']):,} businesses, {len(dirty['principal']):,} principals."
+        )
+        if dirty_total == 0:
+            logger.info("✅ Nothing changed since the last build.")
+            return True
+
+        with conn.cursor() as cur:
+            cur.execute("SELECT to_regclass('public.network_property_membership') IS NOT NULL")
+            has_membership = cur.fetchone()[0]
+        if dirty_total > INCREMENTAL_MAX_DIRTY or not has_membership:
+            logger.info(
+                f"⏩ Falling back to full refresh (dirty={dirty_total:,}, limit={INCREMENTAL_MAX_DIRTY:,}, "
+                f"membership_table={has_membership})."
+            )
+            return None
+
+        property_ids = {int(pid) for pid in dirty['property'] if pid.isdigit()}
+        business_ids = set(dirty['business'])
+        principal_ids = set(dirty['principal'])
+
+        with conn.cursor() as cur:
+            # Renamed or new businesses can change which parcels they match by name
+            if business_ids:
+                cur.execute("""
+                    SELECT p.id
+                    FROM properties p
+                    JOIN businesses b ON UPPER(p.owner) = UPPER(b.name) OR UPPER(p.co_owner) = UPPER(b.name)
+                    WHERE b.id = ANY(%s)
+                """, (list(business_ids),))
+                property_ids.update(r[0] for r in cur)
+
+            # Capture the links being replaced so their old networks are re-clustered too
+            cur.execute("""
+                SELECT business_id, principal_id FROM properties WHERE id = ANY(%s::int[])
+            """, (list(property_ids),))
+            for bid, pid in cur:
+                if bid: business_ids.add(str(bid))
+                if pid: principal_ids.add(str(pid))
+        conn.commit()
+
+        # PHASE 0/1 restricted to the dirty parcels
+        if property_ids:
+            with conn.cursor() as cur:
+                logger.info(f"🧹 PHASE 0: Clearing links on {len(property_ids):,} dirty properties...")
+                cur.execute("""
+                    UPDATE properties
+                    SET business_id = NULL, principal_id = NULL
+                    WHERE id = ANY(%s::int[])
+                      AND (business_id IS NOT NULL OR principal_id IS NOT NULL)
+                """, (list(property_ids),))
+            conn.commit()
+            link_properties_to_entities(conn, property_ids=property_ids)
+
+        seeds = set()
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT business_id, principal_id FROM properties WHERE id = ANY(%s::int[])
+            """, (list(property_ids),))
+            for bid, pid in cur:
+                if bid:
+                    business_ids.add(str(bid))
+                    seeds.add(('business', bid))
+                if pid:
+                    principal_ids.add(str(pid))
+                    seed = _seed_node('principal', pid)
+                    if seed: seeds.add(seed)
+
+            # Dirty entities only seed discovery if they still own property
+            cur.execute("SELECT DISTINCT business_id FROM properties WHERE business_id = ANY(%s)", (list(business_ids),))
+            seeds.update(('business', r[0]) for r in cur)
+            cur.execute("SELECT DISTINCT principal_id FROM properties WHERE principal_id = ANY(%s)", (list(principal_ids),))
+            for (pid,) in cur:
+                seed = _seed_node('principal', pid)
+                if seed: seeds.add(seed)
+
+            cur.execute("""
+                SELECT DISTINCT network_id FROM network_property_membership WHERE property_id = ANY(%s::int[])
+                UNION
+                SELECT DISTINCT network_id FROM entity_networks
+                WHERE (entity_type = 'business' AND entity_id = ANY(%s))
+                   OR (entity_type = 'principal' AND entity_id = ANY(%s))
+            """, (list(property_ids), list(business_ids), list(principal_ids)))
+            affected = {r[0] for r in cur}
+
+            logger.info("  - Loading live entity → network map...")
+            entity_network = {}
+            network_members = defaultdict(list)
+            cur.execute("SELECT network_id, entity_type, entity_id FROM entity_networks")
+            for network_id, entity_type, entity_id in cur:
+                entity_network[_entity_key(entity_type, entity_id)] = network_id
+                network_members[network_id].append((entity_type, entity_id))
+        conn.commit()
+
+        graph_data = build_graph(conn, skip_emails=skip_emails)
+
+        # Grow the affected set until discovery stays inside it
+        networks = []
+        for attempt in range(1, INCREMENTAL_MAX_PASSES + 1):
+            pass_seeds = set(seeds)
+            for network_id in affected:
+                for entity_type, entity_id in network_members.get(network_id, ()):
+                    seed = _seed_node(entity_type, entity_id)
+                    if seed: pass_seeds.add(seed)
+
+            networks = discover_networks_depth_limited(graph_data, list(pass_seeds))
+            reached = {
+                entity_network[_entity_key(node_type, node_id)]
+                for group in networks
+                for node_type, node_id in group
+                if _entity_key(node_type, node_id) in entity_network
+            }
+            newly_reached = reached - affected
+            logger.info(f"  - Pass {attempt}: {len(affected):,} affected network(s), {len(newly_reached):,} newly reached.")
+            if not newly_reached:
+                break
+            affected |= newly_reached
+        else:
+            logger.info("⏩ Affected set did not converge; falling back to full refresh.")
+            return None
+
+        setup_shadow_tables(conn)
+        store_networks_shadow(conn, networks, graph_data=graph_data)
+
+        if dry_run:
+            logger.info(f"Dry run complete. {len(affected):,} network(s) would be replaced by {len(networks):,}.")
+            return True
+
+        merge_shadow_into_live(conn, affected)
+        clear_dirty_records(conn, markers)
+        logger.info("✅ Incremental refresh complete. Networks updated.")
+        refresh_insights_cache(conn)
+        refresh_search_index(conn)
+        refresh_eviction_facts(conn)
+        return True
+
+    except Exception as e:
+        logger.error(f"Incremental refresh failed: {e}")
+        if conn: conn.rollback()
+        return False
     finally:
         if conn: conn.close()
 
@@ -218,6 +626,10 @@ if __name__ == "__main__":
     parser.add_argument('--dry-run', action='store_true', help="Run without swapping tables")
     parser.add_argument('--skip-linking', action='store_true', help="Skip property linking phases (0 and 1)")
     parser.add_argument('--skip-emails', action='store_true', help="Skip email matching (Phase 2)")
+    parser.add_argument('--incremental', action='store_true', help="Only re-cluster networks touched since the last build")
     args = parser.parse_args()
 
-    run_refresh(dry_run=args.dry_run, skip_linking=args.skip_linking, skip_emails=args.skip_emails)
+    if args.incremental:
+        run_incremental_refresh(dry_run=args.dry_run, skip_emails=args.skip_emails)
+    else:
+        run_refresh(dry_run=args.dry_run, skip_linking=args.skip_linking, skip_emails=args.skip_emails)
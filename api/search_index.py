@@ -0,0 +1,309 @@
+import os
+import re
+import time
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("they-own-what")
+
+# Queries slower than this are logged so regressions show up before users notice
+SEARCH_LATENCY_TARGET_MS = float(os.environ.get("SEARCH_LATENCY_TARGET_MS", "150"))
+SEARCH_READY_TTL_SECONDS = 60
+
+# Jurisdictions every base document belongs to: NY-sourced records and everything else
+BASE_JURISDICTIONS = ("CT", "NY")
+
+# City property tables indexed alongside the statewide tables: table -> (jurisdiction, display label)
+CITY_SEARCH_TABLES = {
+    "nyc_properties": ("NYC", "NYC"),
+    "dc_properties": ("DC", "D.C."),
+    "baltimore_properties": ("BALTIMORE", "Baltimore"),
+    "chicago_properties": ("CHICAGO", "Chicago"),
+    "boston_properties": ("BOSTON", "Boston"),
+    "detroit_properties": ("DETROIT", "Detroit"),
+    "philadelphia_properties": ("PHILADELPHIA", "Philadelphia"),
+    "nj_properties": ("NJ", "NJ"),
+}
+
+# `state` query values that pull in a city table's documents
+STATE_CITY_JURISDICTIONS = {
+    "NY": "NYC", "NYC": "NYC",
+    "DC": "DC",
+    "BALTIMORE": "BALTIMORE", "MD": "BALTIMORE",
+    "CHICAGO": "CHICAGO", "IL": "CHICAGO",
+    "BOSTON": "BOSTON", "MA": "BOSTON",
+    "DETROIT": "DETROIT", "MI": "DETROIT",
+    "PHILADELPHIA": "PHILADELPHIA", "PA": "PHILADELPHIA",
+    "NJ": "NJ",
+}
+
+DDL_SEARCH_DOCUMENTS = """
+    CREATE TABLE {table} (
+        id BIGSERIAL PRIMARY KEY,
+        entity_type TEXT NOT NULL,
+        entity_id TEXT NOT NULL,
+        group_key TEXT NOT NULL,
+        label TEXT NOT NULL,
+        search_text TEXT NOT NULL,
+        search_tsv TSVECTOR GENERATED ALWAYS AS (to_tsvector('simple', search_text)) STORED,
+        hint TEXT,
+        city TEXT,
+        state TEXT,
+        owner TEXT,
+        business_id TEXT,
+        jurisdiction TEXT,
+        weight INTEGER NOT NULL DEFAULT 0
+    )
+"""
+
+SEARCH_DOCUMENT_INDEXES = (
+    ("trgm", "USING gin (search_text gin_trgm_ops)"),
+    ("tsv", "USING gin (search_tsv)"),
+    ("type", "(entity_type, jurisdiction)"),
+)
+
+INSERT_COLUMNS = "entity_type, entity_id, group_key, label, search_text, hint, city, state, owner, business_id, jurisdiction, weight"
+
+SOURCE_BUSINESSES = """
+    INSERT INTO {table} ({columns})
+    SELECT 'business', b.id::text, b.id::text, b.name, UPPER(b.name_norm),
+           b.business_address, b.business_city, b.business_state, NULL, NULL,
+           CASE WHEN b.business_state = 'NY' THEN 'NY' ELSE 'CT' END, 1
+    FROM businesses b
+    WHERE b.name IS NOT NULL AND b.name_norm IS NOT NULL AND b.name_norm != ''
+"""
+
+SOURCE_OWNERS = """
+    INSERT INTO {table} ({columns})
+    SELECT 'owner', name_norm, name_norm, MIN(name), UPPER(name_norm),
+           MIN(location), NULL, NULL, NULL, NULL, jurisdiction, COUNT(*)
+    FROM (
+        SELECT owner AS name, owner_norm AS name_norm, location,
+               CASE WHEN source = 'NYS_OPEN_DATA' THEN 'NY' ELSE 'CT' END AS jurisdiction
+        FROM properties
+        WHERE owner IS NOT NULL AND owner_norm IS NOT NULL AND owner_norm != ''
+        UNION ALL
+        SELECT co_owner, co_owner_norm, location,
+               CASE WHEN source = 'NYS_OPEN_DATA' THEN 'NY' ELSE 'CT' END
+        FROM properties
+        WHERE co_owner IS NOT NULL AND co_owner_norm IS NOT NULL AND co_owner_norm != ''
+    ) o
+    GROUP BY name_norm, jurisdiction
+"""
+
+SOURCE_PRINCIPALS = """
+    INSERT INTO {table} ({columns})
+    SELECT 'principal', p.name_c_norm, p.name_c_norm, MIN(p.name_c), UPPER(p.name_c_norm),
+           MIN(b.name), NULL, NULL, NULL, NULL,
+           CASE WHEN b.business_state = 'NY' THEN 'NY' ELSE 'CT' END,
+           COUNT(DISTINCT p.business_id)
+    FROM principals p
+    LEFT JOIN businesses b ON b.id = p.business_id
+    WHERE p.name_c IS NOT NULL AND p.name_c_norm IS NOT NULL AND p.name_c_norm != ''
+    GROUP BY p.name_c_norm, CASE WHEN b.business_state = 'NY' THEN 'NY' ELSE 'CT' END
+"""
+
+SOURCE_ADDRESSES = """
+    INSERT INTO {table} ({columns})
+    SELECT 'address', location, location || '|' || COALESCE(property_city, ''), location, UPPER(location),
+           NULL, property_city, NULL, MIN(owner), MIN(business_id::text), jurisdiction, COUNT(*)
+    FROM (
+        SELECT location, property_city, owner, business_id,
+               CASE WHEN source = 'NYS_OPEN_DATA' THEN 'NY' ELSE 'CT' END AS jurisdiction
+        FROM properties
+        WHERE location IS NOT NULL AND TRIM(location) != ''
+    ) a
+    GROUP BY location, property_city, jurisdiction
+"""
+
+SOURCE_NETWORKS = """
+    INSERT INTO {table} ({columns})
+    SELECT 'network', en.network_id::text, en.network_id::text, en.entity_name, UPPER(en.normalized_name),
+           NULL, NULL, NULL, NULL, NULL, NULL, COALESCE(n.total_properties, 0)
+    FROM entity_networks en
+    LEFT JOIN networks n ON n.id = en.network_id
+    WHERE en.entity_name IS NOT NULL AND TRIM(en.entity_name) != ''
+      AND en.normalized_name IS NOT NULL AND en.normalized_name != ''
+"""
+
+SOURCE_CITY_OWNERS = """
+    INSERT INTO {table} ({columns})
+    SELECT 'owner', owner_name_norm, %(jurisdiction)s || '|' || owner_name_norm, MIN(owner_name), UPPER(owner_name_norm),
+           MIN(address), %(label)s, NULL, NULL, NULL, %(jurisdiction)s, COUNT(*)
+    FROM {source}
+    WHERE owner_name IS NOT NULL AND owner_name_norm IS NOT NULL AND owner_name_norm != ''
+    GROUP BY owner_name_norm
+"""
+
+SOURCE_CITY_ADDRESSES = """
+    INSERT INTO {table} ({columns})
+    SELECT 'address', address, %(jurisdiction)s || '|' || address, address, UPPER(address),
+           NULL, %(label)s, NULL, MIN(owner_name), NULL, %(jurisdiction)s, COUNT(*)
+    FROM {source}
+    WHERE address IS NOT NULL AND TRIM(address) != ''
+    GROUP BY address
+"""
+
+# One ranked query for every requested entity type. Each type gets its own
+# quota; within a type, documents that start with the query beat ones whose
+# words all start with a query term (tsvector prefix match), which beat plain
+# substring matches. Heavier documents (more properties) win ties.
+# {term_filter} is one ANDed LIKE per query term: the trigram GIN index can
+# serve plain LIKE predicates but not LIKE ALL(array).
+SEARCH_SQL = """
+    SELECT m.*
+    FROM unnest(%(types)s::text[], %(quotas)s::int[]) AS q(entity_type, quota)
+    CROSS JOIN LATERAL (
+        SELECT *
+        FROM (
+            SELECT DISTINCT ON (d.group_key)
+                   d.entity_type, d.entity_id, d.label, d.hint, d.city, d.state,
+                   d.owner, d.business_id, d.jurisdiction, d.weight,
+                   CASE
+                       WHEN d.search_text LIKE %(prefix)s THEN 1
+                       WHEN %(tsquery)s::text IS NOT NULL AND d.search_tsv @@ to_tsquery('simple', %(tsquery)s) THEN 2
+                       ELSE 3
+                   END AS match_rank
+            FROM search_documents d
+            WHERE d.entity_type = q.entity_type
+              AND (d.jurisdiction IS NULL OR d.jurisdiction = ANY(%(jurisdictions)s))
+              AND {term_filter}
+            ORDER BY d.group_key, match_rank, d.weight DESC
+        ) matched
+        ORDER BY match_rank, weight DESC, label
+        LIMIT q.quota
+    ) m
+    ORDER BY m.match_rank, m.weight DESC, m.label
+"""
+
+_ready_cache = {"value": False, "checked_at": None}
+
+
+def _like_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _term_filter(count: int) -> str:
+    return " AND ".join(f"d.search_text LIKE %(term_{i})s" for i in range(count))
+
+
+def _prefix_tsquery(terms: List[str]) -> Optional[str]:
+    words = [re.sub(r"[^0-9a-z]", "", t.lower()) for t in terms]
+    words = [w for w in words if w]
+    return " & ".join(f"{w}:*" for w in words) if words else None
+
+
+def jurisdictions_for_state(state: Optional[str], include_city_tables: bool = True) -> List[str]:
+    """Maps an endpoint `state` filter to the document jurisdictions it may return."""
+    key = (state or "").strip().upper()
+    if key in ("NY", "NYC"):
+        jurisdictions = ["NY"]
+    elif key == "CT":
+        jurisdictions = ["CT"]
+    else:
+        jurisdictions = list(BASE_JURISDICTIONS)
+    city = STATE_CITY_JURISDICTIONS.get(key)
+    if include_city_tables and city:
+        jurisdictions.append(city)
+    return jurisdictions
+
+
+def search_index_ready(cursor) -> bool:
+    """True once search_documents has been built; cached briefly per process."""
+    now = time.monotonic()
+    checked_at = _ready_cache["checked_at"]
+    if checked_at is not None and now - checked_at < SEARCH_READY_TTL_SECONDS:
+        return _ready_cache["value"]
+    cursor.execute("SELECT to_regclass('public.search_documents') IS NOT NULL AS present")
+    row = cursor.fetchone()
+    present = row["present"] if isinstance(row, dict) else row[0]
+    if present:
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM search_documents) AS populated")
+        row = cursor.fetchone()
+        present = row["populated"] if isinstance(row, dict) else row[0]
+    _ready_cache.update(value=bool(present), checked_at=now)
+    return _ready_cache["value"]
+
+
+def query_search_documents(cursor, query: str, quotas: Dict[str, int], jurisdictions: List[str]) -> List[Dict[str, Any]]:
+    """Returns up to quotas[type] best documents per entity type matching every query term."""
+    terms = [t.upper() for t in query.split() if t]
+    if not terms or not quotas:
+        return []
+    params = {
+        "types": list(quotas.keys()),
+        "quotas": list(quotas.values()),
+        "prefix": _like_escape(query.strip().upper()) + "%",
+        "tsquery": _prefix_tsquery(terms),
+        "jurisdictions": jurisdictions,
+    }
+    params.update({f"term_{i}": f"%{_like_escape(t)}%" for i, t in enumerate(terms)})
+    start = time.perf_counter()
+    cursor.execute(SEARCH_SQL.format(term_filter=_term_filter(len(terms))), params)
+    rows = cursor.fetchall()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if elapsed_ms > SEARCH_LATENCY_TARGET_MS:
+        logger.warning(f"🐢 search_documents query took {elapsed_ms:.0f}ms for {query!r} (target {SEARCH_LATENCY_TARGET_MS:.0f}ms)")
+    return [dict(r) if not isinstance(r, dict) else r for r in rows]
+
+
+def _existing_city_tables(cursor) -> List[str]:
+    cursor.execute("""
+        SELECT table_name FROM information_schema.tables
+        WHERE table_schema = 'public' AND table_name = ANY(%s)
+    """, (list(CITY_SEARCH_TABLES),))
+    present = {r[0] for r in cursor.fetchall()}
+    return [t for t in CITY_SEARCH_TABLES if t in present]
+
+
+def refresh_search_documents(conn) -> int:
+    """Rebuilds search_documents from the source tables and swaps it in atomically."""
+    logger.info("🔎 Rebuilding search_documents...")
+    start = time.time()
+    build = "search_documents_build"
+    with conn.cursor() as cursor:
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        cursor.execute(f"DROP TABLE IF EXISTS {build}")
+        cursor.execute(DDL_SEARCH_DOCUMENTS.format(table=build))
+
+        for label, sql in (
+            ("businesses", SOURCE_BUSINESSES),
+            ("owners", SOURCE_OWNERS),
+            ("principals", SOURCE_PRINCIPALS),
+            ("addresses", SOURCE_ADDRESSES),
+            ("networks", SOURCE_NETWORKS),
+        ):
+            cursor.execute(sql.format(table=build, columns=INSERT_COLUMNS))
+            logger.info(f"  - {label}: {cursor.rowcount:,} documents")
+
+        for source in _existing_city_tables(cursor):
+            jurisdiction, city_label = CITY_SEARCH_TABLES[source]
+            params = {"jurisdiction": jurisdiction, "label": city_label}
+            cursor.execute(SOURCE_CITY_OWNERS.format(table=build, columns=INSERT_COLUMNS, source=source), params)
+            owners = cursor.rowcount
+            cursor.execute(SOURCE_CITY_ADDRESSES.format(table=build, columns=INSERT_COLUMNS, source=source), params)
+            logger.info(f"  - {source}: {owners:,} owners, {cursor.rowcount:,} addresses")
+
+        for suffix, definition in SEARCH_DOCUMENT_INDEXES:
+            cursor.execute(f"CREATE INDEX idx_{build}_{suffix} ON {build} {definition}")
+        cursor.execute(f"ANALYZE {build}")
+        cursor.execute(f"SELECT COUNT(*) FROM {build}")
+        total = cursor.fetchone()[0]
+        # Readers holding a copy of the documents (the autocomplete engine) key off this version
+        cursor.execute("""
+            INSERT INTO kv_cache (key, value, created_at)
+            VALUES ('search_documents_version', jsonb_build_object('version', md5(clock_timestamp()::text), 'documents', %s), now())
+            ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value, created_at = EXCLUDED.created_at
+        """, (total,))
+
+        # Swap in one transaction so readers see either the old or the new index
+        cursor.execute("DROP TABLE IF EXISTS search_documents")
+        cursor.execute(f"ALTER TABLE {build} RENAME TO search_documents")
+        cursor.execute(f"ALTER SEQUENCE {build}_id_seq RENAME TO search_documents_id_seq")
+        cursor.execute(f"ALTER INDEX {build}_pkey RENAME TO search_documents_pkey")
+        for suffix, _ in SEARCH_DOCUMENT_INDEXES:
+            cursor.execute(f"ALTER INDEX idx_{build}_{suffix} RENAME TO idx_search_documents_{suffix}")
+    conn.commit()
+    _ready_cache.update(value=total > 0, checked_at=time.monotonic())
+    logger.info(f"✅ search_documents rebuilt: {total:,} documents in {time.time() - start:.1f}s")
+    return total
@@ -0,0 +1,62 @@
+import os
+import json
+import decimal
+import logging
+from datetime import date, datetime
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+logger = logging.getLogger("they-own-what")
+
+# "orjson" (default when installed) or "json" to force the stdlib encoder
+JSON_SERIALIZER = os.environ.get("JSON_SERIALIZER", "orjson").lower()
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if JSON_SERIALIZER == "orjson" and orjson is None:
+    logger.warning("orjson package not installed — falling back to stdlib json serialization")
+SERIALIZER = "orjson" if (JSON_SERIALIZER == "orjson" and orjson is not None) else "json"
+
+# Non-str keys show up in grouped dicts (int network ids); numpy values in pandas-backed reports
+_ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY) if orjson is not None else 0
+
+
+def json_default(o: Any):
+    """Fallback for types neither encoder handles natively; mirrors main.json_converter."""
+    if isinstance(o, (date, datetime)):
+        return o.isoformat()
+    if isinstance(o, decimal.Decimal):
+        return float(o)
+    return str(o)
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """UTF-8 JSON for database rows (Decimals, dates, nested lists) and shaped payloads."""
+    if SERIALIZER == "orjson":
+        return orjson.dumps(obj, default=json_default, option=_ORJSON_OPTIONS)
+    return json.dumps(obj, default=json_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def dumps(obj: Any) -> str:
+    return dumps_bytes(obj).decode("utf-8")
+
+
+def ndjson_frame(obj: Any) -> str:
+    """One newline-terminated NDJSON frame."""
+    return dumps(obj) + "\n"
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered through dumps_bytes.
+
+    Used as `response_class` on heavy routes, and returned directly by
+    handlers whose rows are already shaped, which skips FastAPI's
+    jsonable_encoder pass.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps_bytes(content)
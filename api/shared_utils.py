@@ -1,105 +1,124 @@
 # shared_utils.py
+import os
 import re
+from functools import lru_cache
 from typing import Set
 
+# Normalizers are called millions of times by the linker, graph builder and
+# ingest scripts, so every pattern is compiled once and results are memoized.
+NORMALIZE_CACHE_SIZE = int(os.environ.get("NORMALIZE_CACHE_SIZE", "262144"))
+
+_NAME_PUNCT_RE = re.compile(r"[,.'`\"]")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Standardize common abbreviations for better cross-matching
+BUSINESS_ABBREVIATIONS = {
+    'CO': 'COMPANY',
+    'CORP': 'CORPORATION',
+    'INC': 'INCORPORATED',
+    'ASSOC': 'ASSOCIATION',
+    'ASSOCIATES': 'ASSOCIATION',
+    'ASSOCIATED': 'ASSOCIATION',
+    'ASSC': 'ASSOCIATION',
+    'ASSN': 'ASSOCIATION',
+    'MGMT': 'MANAGEMENT',
+    'MGT': 'MANAGEMENT',
+    'PROP': 'PROPERTIES',
+    'PROPS': 'PROPERTIES',
+    'PROPERTY': 'PROPERTIES',
+    'SVCS': 'SERVICES',
+    'DEVL': 'DEVELOPMENT',
+    'DEV': 'DEVELOPMENT',
+    'SYS': 'SYSTEM',
+    'SYST': 'SYSTEM',
+    'SYSTS': 'SYSTEM',
+    'HLDG': 'HOLDING',
+    'HLDGS': 'HOLDINGS',
+    'BLDG': 'BUILDING',
+    'CTR': 'CENTER',
+    'CNTR': 'CENTER',
+}
+
+def _word_table_pattern(table):
+    # One alternation over whole words; no replacement is itself a key, so a
+    # single pass gives the same result as applying the table entry by entry.
+    words = sorted(table, key=len, reverse=True)
+    return re.compile(r"\b(?:" + "|".join(map(re.escape, words)) + r")\b")
+
+_BUSINESS_ABBREV_RE = _word_table_pattern(BUSINESS_ABBREVIATIONS)
+_BUSINESS_DISALLOWED_RE = re.compile(r"[^A-Z0-9\s-]")
+
 def normalize_business_name(name: str) -> str:
     """Canonical function to normalize business names for matching."""
     if not name: return ''
-    normalized = name.upper().strip()
-    normalized = re.sub(r"[,.'`\"]", '', normalized)
+    return _normalize_business_name(name)
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def _normalize_business_name(name: str) -> str:
+    normalized = _NAME_PUNCT_RE.sub('', name.upper().strip())
 
     # Standardize conjunctions
-    normalized = normalized.replace('&', ' AND ')
-    normalized = normalized.replace('+', ' AND ')
+    normalized = normalized.replace('&', ' AND ').replace('+', ' AND ')
 
-    # Standardize common abbreviations for better cross-matching
     # Using \b for word boundaries to avoid partial matches
-    abbrevs = {
-        'CO': 'COMPANY',
-        'CORP': 'CORPORATION',
-        'INC': 'INCORPORATED',
-        'ASSOC': 'ASSOCIATION',
-        'ASSOCIATES': 'ASSOCIATION',
-        'ASSOCIATED': 'ASSOCIATION',
-        'ASSC': 'ASSOCIATION',
-        'ASSN': 'ASSOCIATION',
-        'MGMT': 'MANAGEMENT',
-        'MGT': 'MANAGEMENT',
-        'PROP': 'PROPERTIES',
-        'PROPS': 'PROPERTIES',
-        'PROPERTY': 'PROPERTIES',
-        'SVCS': 'SERVICES',
-        'DEVL': 'DEVELOPMENT',
-        'DEV': 'DEVELOPMENT',
-        'SYS': 'SYSTEM',
-        'SYST': 'SYSTEM',
-        'SYSTS': 'SYSTEM',
-        'HLDG': 'HOLDING',
-        'HLDGS': 'HOLDINGS',
-        'BLDG': 'BUILDING',
-        'CTR': 'CENTER',
-        'CNTR': 'CENTER',
-    }
-    for abbr, full in abbrevs.items():
-        normalized = re.sub(rf"\b{abbr}\b", full, normalized)
+    normalized = _BUSINESS_ABBREV_RE.sub(lambda m: BUSINESS_ABBREVIATIONS[m.group(0)], normalized)
 
     # Clean up non-alphanumeric (except space and hyphen)
-    normalized = re.sub(r"[^A-Z0-9\s-]", '', normalized)
-    normalized = re.sub(r"\s+", ' ', normalized).strip()
-    return normalized
+    normalized = _BUSINESS_DISALLOWED_RE.sub('', normalized)
+    return _WHITESPACE_RE.sub(' ', normalized).strip()
+
+# Contextual typo corrections for the Gurevitch network
+GUREVITCH_MARKERS = ('GUREVITCH', 'GURAVITCH', 'GUREVICH', 'GUREVITH', 'GUTVITCH', 'GUREVITOH', 'GURVITCH')
+GUREVITCH_TYPOS = {
+    'MENACHERM': 'MENACHEM',
+    'MENAHEM': 'MENACHEM',
+    'MENACHER': 'MENACHEM',
+    'MANACHEM': 'MENACHEM',
+    'GURAVITCH': 'GUREVITCH',
+    'GUREVICH': 'GUREVITCH',
+    'GUREVITOH': 'GUREVITCH',
+    'GUREVITH': 'GUREVITCH',
+    'GUTVITCH': 'GUREVITCH',
+    'GURVITCH': 'GUREVITCH',
+}
+EDELKOPF_MARKERS = ('EDELKOPF', 'EDELKOPH')
+EDELKOPF_TYPOS = {'EDELKOPH': 'EDELKOPF'}
+
+_GUREVITCH_TYPO_RE = _word_table_pattern(GUREVITCH_TYPOS)
+_EDELKOPF_TYPO_RE = _word_table_pattern(EDELKOPF_TYPOS)
+_TRAILING_JOINT_RE = re.compile(r'[&/]\s*$')
 
 def normalize_person_name(name: str) -> str:
     """Canonical function to normalize person names for matching."""
     if not name: return ''
+    return _normalize_person_name(name)
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def _normalize_person_name(name: str) -> str:
     normalized = name.upper().strip()
 
     # Swap commas: "LAST, FIRST MIDDLE" -> "FIRST MIDDLE LAST"
     if ',' in normalized:
-        parts_comma = normalized.split(',', 1)
-        if len(parts_comma) == 2:
-            last = parts_comma[0].strip()
-            first_mid = parts_comma[1].strip()
-            normalized = f"{first_mid} {last}"
+        last, first_mid = normalized.split(',', 1)
+        normalized = f"{first_mid.strip()} {last.strip()}"
 
     # 0. Pre-strip noise and handle joint names
     # If name is "KAZEROUNIAN KAZEM &", remove the trailing &
-    normalized = re.sub(r'[&/]\s*$', '', normalized).strip()
-    # If name contains " & ", " AND ", or " / ", we take the first part for normalization
-    # but the matching logic in variations will handle permutations.
-    # Actually, for the principal list, we want to split them.
-    # For now, let's just clean common joint markers to a space or split.
-    normalized = normalized.replace(' & ', ' ')
-    normalized = normalized.replace(' / ', ' ')
-    normalized = normalized.replace(' AND ', ' ')
+    normalized = _TRAILING_JOINT_RE.sub('', normalized).strip()
+    # Joint markers collapse to a space; get_name_variations() splits joint names.
+    normalized = normalized.replace(' & ', ' ').replace(' / ', ' ').replace(' AND ', ' ')
 
     # 1. Contextual typo corrections for the Gurevitch network
-    is_gurevitch = any(x in normalized for x in ['GUREVITCH', 'GURAVITCH', 'GUREVICH', 'GUREVITH', 'GUTVITCH', 'GUREVITOH', 'GURVITCH'])
-    is_edelkopf = any(x in normalized for x in ['EDELKOPF', 'EDELKOPH'])
-
+    is_gurevitch = any(x in normalized for x in GUREVITCH_MARKERS)
+    is_edelkopf = any(x in normalized for x in EDELKOPF_MARKERS)
     if is_gurevitch:
-        g_typos = {
-            'MENACHERM': 'MENACHEM',
-            'MENAHEM': 'MENACHEM',
-            'MENACHER': 'MENACHEM',
-            'MANACHEM': 'MENACHEM',
-            'GURAVITCH': 'GUREVITCH',
-            'GUREVICH': 'GUREVITCH',
-            'GUREVITOH': 'GUREVITCH',
-            'GUREVITH': 'GUREVITCH',
-            'GUTVITCH': 'GUREVITCH',
-            'GURVITCH': 'GUREVITCH',
-        }
-        for typo, correction in g_typos.items():
-            normalized = re.sub(rf"\b{typo}\b", correction, normalized)
-
+        normalized = _GUREVITCH_TYPO_RE.sub(lambda m: GUREVITCH_TYPOS[m.group(0)], normalized)
     if is_edelkopf:
-        e_typos = {'EDELKOPH': 'EDELKOPF'}
-        for typo, correction in e_typos.items():
-            normalized = re.sub(rf"\b{typo}\b", correction, normalized)
+        normalized = _EDELKOPF_TYPO_RE.sub(lambda m: EDELKOPF_TYPOS[m.group(0)], normalized)
 
     # Standard punctuation and whitespace cleanup
-    normalized = re.sub(r"[,.'`\"]", '', normalized)
-    normalized = re.sub(r"\s+", ' ', normalized).strip()
+    normalized = _NAME_PUNCT_RE.sub('', normalized)
+    normalized = _WHITESPACE_RE.sub(' ', normalized).strip()
 
     # Remove standard suffixes
     for pattern in PERSON_SUFFIX_PATTERNS:
@@ -173,6 +192,7 @@ def normalize_owner_name(name: str) -> str:
         return ''
     return normalize_business_name(name) if looks_like_business_name(name) else normalize_person_name(name)
 
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
 def canonicalize_person_name(name: str) -> str:
     """
     Creates a word-sorted version of a name to treat "LAST FIRST"
@@ -183,6 +203,9 @@ def canonicalize_person_name(name: str) -> str:
     parts = sorted(norm.split())
     return " ".join(parts)
 
+_LEADING_THE_RE = re.compile(r'^THE\s+')
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
 def canonicalize_business_name(name: str) -> str:
     """
     Strips suffixes and word-sorts for robust business matching.
@@ -196,7 +219,7 @@ def canonicalize_business_name(name: str) -> str:
     base = variations[0]
 
     # 3. Strip 'THE' specifically if it's a prefix
-    base = re.sub(r'^THE\s+', '', base)
+    base = _LEADING_THE_RE.sub('', base)
 
     # 4. Word sort
     parts = sorted(base.split())
@@ -26,17 +26,17 @@ def test_graph_build():
         log_memory("DB Connection")
         
         # Run build_graph
-        graph, node_to_int, int_to_node = build_graph(conn)
+        graph, nodes = build_graph(conn)
         
         log_memory("Graph Built")
         
         logger.info(f"Graph Nodes: {len(graph)}")
-        logger.info(f"Unique Entities: {len(int_to_node)}")
+        logger.info(f"Unique Entities: {len(nodes)}")
+        logger.info(f"Graph Edges: {graph.num_edges} (CSR arrays: {graph.nbytes() / (1024 * 1024):.1f} MB)")
         
         # Check size of first few nodes
-        first_keys = list(graph.keys())[:5]
-        for k in first_keys:
-            logger.info(f"Node {k} edges: {len(graph[k])} (Type: {type(graph[k])})")
+        for k in range(min(5, graph.num_nodes)):
+            logger.info(f"Node {k} edges: {graph.degree(k)} ({nodes.node(k)[0]})")
             
     except Exception as e:
         logger.error(f"Test failed: {e}")
@@ -374,6 +374,14 @@ function App() {
           if (chunk.data.code_enforcement_summary) newData.codeEnforcementSummary = chunk.data.code_enforcement_summary;
           if (chunk.data.connection_signals) newData.connection_signals = chunk.data.connection_signals;
           if (chunk.data.transaction_summary) newData.transactionSummary = chunk.data.transaction_summary;
+        } else if (chunk.type === 'summary_evictions') {
+          if (chunk.data) newData.evictionSummary = chunk.data;
+        } else if (chunk.type === 'summary_code_enforcement') {
+          if (chunk.data) newData.codeEnforcementSummary = chunk.data;
+        } else if (chunk.type === 'summary_connections') {
+          if (chunk.data) newData.connection_signals = chunk.data;
+        } else if (chunk.type === 'summary_transactions') {
+          if (chunk.data) newData.transactionSummary = chunk.data;
         } else if (chunk.type === 'entities') {
           if (chunk.data.entities) {
             setStreamingStatus(prev => ({
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the ArcGIS / CT Geodata CSV transforms in updater/update_data.py.
+
+Times the column-wise process_arcgis_data / process_ct_geodata_records against
+the row-by-row iterrows() versions they replaced (kept below as reference,
+with the stale-location and "nan" unit bugs fixed so outputs are comparable)
+and reports rows/sec and how many address groups agree.
+
+Input, in order of preference:
+  --ct-csv      a saved statewide CT Geodata parcel CSV (filtered by --town)
+  --arcgis-csv  a saved town ArcGIS Hub export (+ --mapping JSON of column -> field)
+  otherwise     a synthetic CT Geodata town of --rows parcels
+
+Usage:
+    python scripts/benchmark_csv_transforms.py --ct-csv /tmp/ct_geodata.csv --town "NEW HAVEN"
+    python scripts/benchmark_csv_transforms.py --rows 100000
+"""
+import os
+import re
+import sys
+import json
+import time
+import random
+import argparse
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from updater import update_data
+from updater.update_data import (
+    CT_GEODATA_MAPPING,
+    normalize_address_for_matching,
+    process_arcgis_data,
+    process_ct_geodata_records,
+)
+
+DEFAULT_ARCGIS_MAPPING = {
+    "Owner": "owner",
+    "SalePrice": "sale_amount",
+    "SaleDate": "sale_date",
+    "AssessedValue": "assessed_value",
+    "YearBuilt": "year_built",
+    "Unit": "unit",
+}
+
+STREETS = ["MAIN STREET", "ELM ST", "CHAPEL STREET", "WHITNEY AVENUE", "FARMINGTON AVE", "PARK TERRACE", "ASYLUM HILL ROAD"]
+
+
+def synthetic_ct_town(rows, seed=7):
+    rng = random.Random(seed)
+    numbers = [rng.randint(1, 999) for _ in range(rows)]
+    streets = [rng.choice(STREETS) for _ in range(rows)]
+    df = pd.DataFrame({
+        "Town Name": "BENCHMARK",
+        "Location": [f"{n} {s}" if rng.random() > 0.03 else str(n) for n, s in zip(numbers, streets)],
+        "Location_CAMA": [f"{n} {s}" for n, s in zip(numbers, streets)],
+        "Unit_Type": [rng.choice([None, None, None, "1", "2B", "CNDASC"]) for _ in range(rows)],
+        "Owner": [rng.choice(["ACME LLC", "SMITH JOHN", f"{rng.randint(1, 99)} ELM ST LLC", None]) for _ in range(rows)],
+        "Co_Owner": [None] * rows,
+        "Mailing_Address": [f"PO BOX {rng.randint(1, 9999)}" for _ in range(rows)],
+        "Mailing_City": [rng.choice(["NEW HAVEN", "HARTFORD"]) for _ in range(rows)],
+        "Assessed_Total": [rng.choice([0, rng.randint(50_000, 900_000)]) for _ in range(rows)],
+        "Appraised_Land": [rng.choice([np.nan, rng.randint(10_000, 300_000)]) for _ in range(rows)],
+        "Appraised_Building": [rng.randint(0, 600_000) for _ in range(rows)],
+        "Appraised_Outbuilding": [np.nan] * rows,
+        "AYB": [rng.choice([np.nan, rng.randint(1850, 2024)]) for _ in range(rows)],
+        "Sale_Price": [rng.choice([0, rng.randint(1, 2_000_000)]) for _ in range(rows)],
+        "Sale_Date": [rng.choice([None, f"{rng.randint(1980, 2024)}/{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d} 00:00:00+00"]) for _ in range(rows)],
+        "CAMA_Link": [rng.choice([None, f"https://example.test/Parcel.aspx?pid={rng.randint(1, 99999)}"]) for _ in range(rows)],
+        "Link_From_CAMA": [f"https://example.test/Parcel.aspx?pid={rng.randint(1, 99999)}" for _ in range(rows)],
+    })
+    df["appraised_value"] = df[["Appraised_Land", "Appraised_Building", "Appraised_Outbuilding"]].sum(axis=1)
+    return df
+
+
+# --- Row-by-row reference implementations (pre-vectorization) ---
+
+def legacy_process_arcgis_data(df, column_mapping):
+    processed_data = {}
+    for _, row in df.iterrows():
+        try:
+            address_parts = []
+            if pd.notna(row.get('StreetNumberFrom')):
+                address_parts.append(str(int(row['StreetNumberFrom'])))
+            if pd.notna(row.get('StreetName')):
+                address_parts.append(str(row['StreetName']))
+            if not address_parts:
+                continue
+            full_address = ' '.join(address_parts)
+            normalized_address = normalize_address_for_matching(full_address)
+            if not normalized_address:
+                continue
+            property_data = {}
+            if full_address.strip():
+                property_data['location'] = full_address.strip()
+            for source_col, target_col in column_mapping.items():
+                if source_col in row.index and pd.notna(row[source_col]):
+                    value = row[source_col]
+                    if target_col in ['sale_amount', 'assessed_value', 'appraised_value', 'living_area', 'acres', 'number_of_units']:
+                        try:
+                            if isinstance(value, str):
+                                value = re.sub(r'[$,]', '', value)
+                            numeric_value = float(value)
+                            if numeric_value > 0:
+                                property_data[target_col] = numeric_value
+                        except (ValueError, TypeError):
+                            pass
+                    elif target_col == 'sale_date':
+                        if isinstance(value, str) and value.strip():
+                            for fmt in ['%Y-%m-%d', '%m/%d/%Y', '%Y/%m/%d']:
+                                try:
+                                    property_data[target_col] = datetime.strptime(value.strip(), fmt).date()
+                                    break
+                                except ValueError:
+                                    continue
+                    elif target_col == 'year_built':
+                        try:
+                            year = int(float(value))
+                            if 1600 <= year <= datetime.now().year:
+                                property_data[target_col] = year
+                        except (ValueError, TypeError):
+                            pass
+                    else:
+                        property_data[target_col] = str(value).strip()
+            if 'appraised_value' in property_data and property_data['appraised_value'] > 0:
+                if 'assessed_value' not in property_data or not property_data['assessed_value']:
+                    property_data['assessed_value'] = round(property_data['appraised_value'] * 0.70, 2)
+            elif 'assessed_value' in property_data and property_data['assessed_value'] > 0:
+                if 'appraised_value' not in property_data or not property_data['appraised_value']:
+                    property_data['appraised_value'] = round(property_data['assessed_value'] / 0.70, 2)
+            if len(property_data) >= 2:
+                if 'unit' not in property_data or not property_data['unit']:
+                    m = re.search(r'\s([A-Z]|\d{1,4})$', full_address)
+                    if m:
+                        property_data['unit'] = m.group(1)
+                processed_data.setdefault(normalized_address, []).append(property_data)
+        except Exception:
+            continue
+    return processed_data
+
+
+def legacy_process_ct_geodata_records(df):
+    processed_data = {}
+    for _, row in df.iterrows():
+        try:
+            unit_type = str(row.get('Unit_Type', '')).upper()
+            if 'CNDASC' in unit_type or 'CONDO ASC' in unit_type:
+                continue
+            loc1 = str(row.get('Location', '')).strip()
+            loc2 = str(row.get('Location_CAMA', '')).strip()
+            loc = None
+            if loc1.isdigit() and len(loc1) < 4:
+                if pd.notna(row.get('Mailing_Address')) and str(row.get('Mailing_City')).upper() == 'NEW HAVEN':
+                    loc = str(row['Mailing_Address']).strip()
+                elif pd.notna(row.get('Owner')):
+                    owner = str(row['Owner']).upper()
+                    if ' LLC' in owner:
+                        possible_addr = owner.split(' LLC')[0]
+                        if possible_addr[0].isdigit():
+                            loc = possible_addr
+                else:
+                    loc = loc2 if len(loc2) > len(loc1) else loc1
+            elif len(loc2) > len(loc1) and ' ' in loc2:
+                loc = loc2
+            elif len(loc1) > 0:
+                loc = loc1
+            else:
+                loc = loc2
+            if not loc:
+                continue
+            norm_addr = normalize_address_for_matching(loc)
+            p_data = {}
+            for src, target in CT_GEODATA_MAPPING.items():
+                val = row.get(src)
+                if pd.notna(val):
+                    if target == 'sale_date':
+                        try:
+                            p_data[target] = pd.to_datetime(val).date()
+                        except Exception:
+                            pass
+                    else:
+                        p_data[target] = val
+            p_data['appraised_value'] = row['appraised_value']
+            if p_data.get('appraised_value', 0) > 0:
+                if 'assessed_value' not in p_data or not p_data['assessed_value']:
+                    p_data['assessed_value'] = round(p_data['appraised_value'] * 0.70, 2)
+            elif p_data.get('assessed_value', 0) > 0:
+                if 'appraised_value' not in p_data or not p_data['appraised_value']:
+                    p_data['appraised_value'] = round(p_data['assessed_value'] / 0.70, 2)
+            if 'cama_site_link' not in p_data and pd.notna(row.get('Link_From_CAMA')):
+                p_data['cama_site_link'] = row['Link_From_CAMA']
+            official_unit = str(row.get('Unit_Type', '')).strip()
+            if official_unit and pd.notna(row.get('Unit_Type')):
+                p_data['unit'] = official_unit
+            processed_data.setdefault(norm_addr, []).append(p_data)
+        except Exception:
+            continue
+    return processed_data
+
+
+def _comparable(processed):
+    return {
+        addr: sorted(json.dumps(rec, default=str, sort_keys=True) for rec in records)
+        for addr, records in processed.items()
+    }
+
+
+def run(label, fn, rows, repeat):
+    elapsed = 0.0
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed += time.perf_counter() - start
+    per_pass = elapsed / repeat
+    print(f"{label:<28} {rows / per_pass:>12,.0f} rows/sec   {per_pass * 1000:>10,.1f} ms/pass")
+    return result, per_pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ArcGIS / CT Geodata CSV transforms")
+    parser.add_argument("--ct-csv", help="Saved CT Geodata parcel CSV")
+    parser.add_argument("--town", help="Town Name to filter the CT Geodata CSV by")
+    parser.add_argument("--arcgis-csv", help="Saved ArcGIS Hub town export")
+    parser.add_argument("--mapping", help="JSON file of ArcGIS column -> property field")
+    parser.add_argument("--rows", type=int, default=20000, help="Synthetic town size when no CSV is given")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes per measurement")
+    args = parser.parse_args()
+
+    # Keep the vectorized code's progress logging out of the timings
+    update_data.log = lambda *a, **k: None
+
+    if args.arcgis_csv:
+        df = pd.read_csv(args.arcgis_csv, low_memory=False)
+        mapping = DEFAULT_ARCGIS_MAPPING
+        if args.mapping:
+            with open(args.mapping, "r", encoding="utf-8") as f:
+                mapping = json.load(f)
+        new = lambda: process_arcgis_data(df, mapping, "benchmark")
+        old = lambda: legacy_process_arcgis_data(df, mapping)
+    else:
+        if args.ct_csv:
+            df = pd.read_csv(args.ct_csv, low_memory=False, encoding="utf-8-sig")
+            if args.town:
+                df = df[df["Town Name"].str.upper() == args.town.upper()].copy()
+            df["appraised_value"] = df[["Appraised_Land", "Appraised_Building", "Appraised_Outbuilding"]].sum(axis=1)
+        else:
+            df = synthetic_ct_town(args.rows)
+        new = lambda: process_ct_geodata_records(df)
+        old = lambda: legacy_process_ct_geodata_records(df)
+
+    print(f"Input: {len(df):,} rows, {args.repeat} pass(es)")
+    old_result, old_time = run("iterrows (reference)", old, len(df), args.repeat)
+    new_result, new_time = run("column-wise", new, len(df), args.repeat)
+    print(f"Speedup: {old_time / new_time:,.1f}x")
+
+    old_cmp, new_cmp = _comparable(old_result), _comparable(new_result)
+    same = sum(1 for addr in old_cmp if new_cmp.get(addr) == old_cmp[addr])
+    print(f"Address groups: {len(old_cmp):,} reference, {len(new_cmp):,} column-wise, {same:,} identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmarks PHASE 4 persistence strategies for the network shadow tables.
+
+Compares the previous per-network `INSERT ... RETURNING id` + `execute_values`
+path against client-side ids streamed with COPY (network_builder.CopyBuffer).
+Both run against TEMP copies of the shadow tables, so the live data is untouched.
+
+Usage:
+    DATABASE_URL=... python scripts/benchmark_network_persistence.py --networks 100000
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import logging
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from api.network_builder import CopyBuffer
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("benchmark_network_persistence")
+
+DATABASE_URL = os.environ.get("DATABASE_URL")
+
+
+def create_temp_tables(cur):
+    cur.execute("""
+        CREATE TEMP TABLE bench_networks (
+            id SERIAL PRIMARY KEY, primary_name TEXT, total_properties INTEGER DEFAULT 0,
+            total_assessed_value NUMERIC DEFAULT 0, business_count INTEGER DEFAULT 0,
+            principal_count INTEGER DEFAULT 0
+        )
+    """)
+    cur.execute("""
+        CREATE TEMP TABLE bench_entity_networks (
+            network_id INTEGER, entity_type TEXT NOT NULL, entity_id TEXT NOT NULL,
+            entity_name TEXT NOT NULL, normalized_name TEXT
+        )
+    """)
+    cur.execute("""
+        CREATE TEMP TABLE bench_ownership_links (
+            network_id INTEGER, from_entity TEXT, to_entity TEXT, link_type TEXT
+        )
+    """)
+
+
+def synthetic_networks(count, seed=17):
+    """Yields (primary_name, entities, edges) shaped like real discovery output."""
+    rng = random.Random(seed)
+    for n in range(count):
+        # Most networks are tiny; a few are large portfolios
+        size = 2 if rng.random() < 0.8 else rng.randint(3, 60)
+        entities = []
+        for i in range(size):
+            if i % 2 == 0:
+                entities.append(('business', f"B{n}_{i}", f"ACME {n} {i} LLC", f"ACME {n} {i}"))
+            else:
+                entities.append(('principal', str(n * 100 + i), f"SMITH JOHN {n} {i}", f"SMITH JOHN {n} {i}"))
+        edges = [(entities[i][2], entities[i + 1][2], 'principal_link') for i in range(size - 1)]
+        yield f"NETWORK {n}", entities, edges
+
+
+def run_legacy(conn, networks):
+    entity_links, edges_to_store = [], []
+    rows = 0
+    for name, entities, edges in networks:
+        with conn.cursor() as cur:
+            # The old loop also reloaded the ignore list for every network
+            cur.execute("SELECT normalized_name FROM principal_ignore_list")
+            cur.fetchall()
+            cur.execute(
+                "INSERT INTO bench_networks (primary_name, business_count, principal_count, total_properties, total_assessed_value) "
+                "VALUES (%s, %s, %s, %s, %s) RETURNING id",
+                (name, len(entities), len(entities), 0, 0),
+            )
+            net_id = cur.fetchone()[0]
+        rows += 1
+        entity_links.extend((net_id, t, i, n, norm) for t, i, n, norm in entities)
+        edges_to_store.extend((net_id, u, v, lt) for u, v, lt in edges)
+        if len(entity_links) >= 10000:
+            with conn.cursor() as cur:
+                execute_values(cur, "INSERT INTO bench_entity_networks VALUES %s", entity_links)
+            conn.commit(); rows += len(entity_links); entity_links = []
+        if len(edges_to_store) >= 10000:
+            with conn.cursor() as cur:
+                execute_values(cur, "INSERT INTO bench_ownership_links VALUES %s", edges_to_store)
+            conn.commit(); rows += len(edges_to_store); edges_to_store = []
+    with conn.cursor() as cur:
+        if entity_links:
+            execute_values(cur, "INSERT INTO bench_entity_networks VALUES %s", entity_links)
+        if edges_to_store:
+            execute_values(cur, "INSERT INTO bench_ownership_links VALUES %s", edges_to_store)
+    conn.commit()
+    return rows + len(entity_links) + len(edges_to_store)
+
+
+def run_copy(conn, networks):
+    with conn.cursor() as cur:
+        cur.execute("SELECT normalized_name FROM principal_ignore_list")
+        cur.fetchall()
+    network_rows = CopyBuffer(conn, "bench_networks", ("id", "primary_name", "business_count", "principal_count", "total_properties", "total_assessed_value"))
+    entity_links = CopyBuffer(conn, "bench_entity_networks", ("network_id", "entity_type", "entity_id", "entity_name", "normalized_name"))
+    edges_to_store = CopyBuffer(conn, "bench_ownership_links", ("network_id", "from_entity", "to_entity", "link_type"))
+    for net_id, (name, entities, edges) in enumerate(networks, 1):
+        network_rows.add((net_id, name, len(entities), len(entities), 0, 0))
+        for t, i, n, norm in entities:
+            entity_links.add((net_id, t, i, n, norm))
+        for u, v, lt in edges:
+            edges_to_store.add((net_id, u, v, lt))
+    for buf in (network_rows, entity_links, edges_to_store):
+        buf.flush()
+    conn.commit()
+    return network_rows.rows + entity_links.rows + edges_to_store.rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark network shadow-table persistence")
+    parser.add_argument("--networks", type=int, default=50000, help="Number of synthetic networks")
+    args = parser.parse_args()
+
+    networks = list(synthetic_networks(args.networks))
+    results = {}
+    for label, fn in (("legacy INSERT RETURNING", run_legacy), ("COPY client ids", run_copy)):
+        conn = psycopg2.connect(DATABASE_URL)
+        try:
+            with conn.cursor() as cur:
+                create_temp_tables(cur)
+            conn.commit()
+            start = time.perf_counter()
+            rows = fn(conn, networks)
+            elapsed = time.perf_counter() - start
+            results[label] = elapsed
+            logger.info(f"{label:<26} {elapsed:>8.2f}s  {rows:,} rows  {rows / max(elapsed, 1e-6):,.0f} rows/sec")
+        finally:
+            conn.close()
+
+    legacy, copy = results["legacy INSERT RETURNING"], results["COPY client ids"]
+    logger.info(f"Speedup: {legacy / max(copy, 1e-6):.1f}x for {args.networks:,} networks")
+
+
+if __name__ == "__main__":
+    main()
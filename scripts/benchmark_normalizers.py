@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for the shared_utils name normalizers.
+
+Reports names/sec for each normalizer on the golden test corpus, both cold
+(LRU cache cleared before the pass) and warm (repeat pass served from cache).
+
+Usage:
+    python scripts/benchmark_normalizers.py --repeat 5
+"""
+import os
+import sys
+import gzip
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from api import shared_utils
+from api.shared_utils import (
+    normalize_business_name,
+    normalize_person_name,
+    canonicalize_person_name,
+    canonicalize_business_name,
+)
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "..", "tests", "data", "name_normalization_golden.jsonl.gz")
+
+CACHES = (
+    shared_utils._normalize_business_name,
+    shared_utils._normalize_person_name,
+    canonicalize_person_name,
+    canonicalize_business_name,
+)
+
+
+def clear_caches():
+    for fn in CACHES:
+        fn.cache_clear()
+
+
+def time_pass(fn, names):
+    start = time.perf_counter()
+    for name in names:
+        fn(name)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark name normalizers")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes over the corpus per measurement")
+    args = parser.parse_args()
+
+    with gzip.open(CORPUS_PATH, 'rt', encoding='utf-8') as f:
+        names = [json.loads(line)['name'] for line in f]
+    print(f"Corpus: {len(names):,} names, {args.repeat} pass(es)")
+
+    for label, fn in (
+        ("normalize_business_name", normalize_business_name),
+        ("normalize_person_name", normalize_person_name),
+        ("canonicalize_person_name", canonicalize_person_name),
+        ("canonicalize_business_name", canonicalize_business_name),
+    ):
+        cold = 0.0
+        for _ in range(args.repeat):
+            clear_caches()
+            cold += time_pass(fn, names)
+        warm = sum(time_pass(fn, names) for _ in range(args.repeat))
+        total = len(names) * args.repeat
+        print(f"{label:<28} cold {total / cold:>12,.0f} names/sec   warm {total / warm:>12,.0f} names/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark on a synthetic statewide dataset.
+
+Loads scripts/synthetic_dataset.py output into an EMPTY database, derives
+unique principals, runs the full network refresh (link, graph, discovery,
+shadow store, swap, insights, search index), rebuilds insights on its own,
+then times the hot API endpoints through the FastAPI app. Results (phase
+timings, RSS, endpoint latency percentiles, row counts, git commit) are
+written as JSON so runs from different commits can be compared with
+--compare.
+
+The target database is rebuilt from scratch. The script refuses to touch a
+database that already has tables in schema public unless --force-reset is given,
+which drops and recreates the public schema.
+
+Usage:
+    DATABASE_URL=postgresql://localhost/bench python scripts/benchmark_suite.py --parcels 200000 --output bench.json
+    python scripts/benchmark_suite.py --initdb --parcels 50000 --output bench.json --compare previous.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import socket
+import argparse
+import logging
+import platform
+import tempfile
+import statistics
+import subprocess
+from datetime import date, datetime, timezone
+
+import psycopg2
+
+REPO_ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.dirname(__file__))
+from synthetic_dataset import SyntheticStatewide, DEFAULT_AS_OF, EMAIL_DOMAINS
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("benchmark_suite")
+
+# Tables/columns production gets from migrations and updaters that are not
+# importable as functions; shapes match the code that reads them.
+BENCH_DDL = """
+ALTER TABLE properties ADD COLUMN IF NOT EXISTS business_id TEXT;
+ALTER TABLE properties ADD COLUMN IF NOT EXISTS principal_id TEXT;
+ALTER TABLE properties ADD COLUMN IF NOT EXISTS source TEXT;
+ALTER TABLE properties ADD COLUMN IF NOT EXISTS normalized_address TEXT;
+ALTER TABLE properties ADD COLUMN IF NOT EXISTS bbl TEXT;
+ALTER TABLE businesses ADD COLUMN IF NOT EXISTS name_norm TEXT;
+
+CREATE TABLE IF NOT EXISTS networks (
+    id SERIAL PRIMARY KEY, primary_name TEXT, total_properties INTEGER DEFAULT 0,
+    total_assessed_value NUMERIC DEFAULT 0, business_count INTEGER DEFAULT 0,
+    principal_count INTEGER DEFAULT 0, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    network_size TEXT, updated_at TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS entity_networks (
+    network_id INTEGER,
+    entity_type TEXT NOT NULL CHECK (entity_type IN ('business', 'principal')),
+    entity_id TEXT NOT NULL, entity_name TEXT NOT NULL, normalized_name TEXT,
+    PRIMARY KEY (network_id, entity_type, entity_id)
+);
+CREATE TABLE IF NOT EXISTS ownership_links (
+    network_id INTEGER, from_entity TEXT NOT NULL, to_entity TEXT NOT NULL, link_type TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS email_match_rules (domain TEXT PRIMARY KEY, match_type TEXT);
+CREATE TABLE IF NOT EXISTS principal_ignore_list (normalized_name TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS property_transactions (
+    id SERIAL PRIMARY KEY, property_id INTEGER, transaction_date DATE, transaction_amount NUMERIC,
+    buyer_name TEXT, seller_name TEXT, buyer_raw TEXT, seller_raw TEXT, transaction_type TEXT,
+    source TEXT, detected_at TIMESTAMPTZ DEFAULT now(), location TEXT, property_city TEXT
+);
+CREATE TABLE IF NOT EXISTS data_source_status (
+    source_name TEXT PRIMARY KEY, source_type TEXT, external_last_updated TIMESTAMPTZ,
+    last_refreshed_at TIMESTAMPTZ, refresh_status TEXT, details JSONB
+);
+"""
+
+
+# --- Database ----------------------------------------------------------
+
+class TempCluster:
+    """Throwaway Postgres cluster from initdb/pg_ctl on PATH, listening on a private socket."""
+
+    def __init__(self):
+        if not (shutil.which("initdb") and shutil.which("pg_ctl")):
+            raise RuntimeError("--initdb needs initdb and pg_ctl on PATH")
+        self.dir = tempfile.mkdtemp(prefix="bench-pg-")
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            self.port = s.getsockname()[1]
+
+    def start(self):
+        data = os.path.join(self.dir, "data")
+        subprocess.run(["initdb", "-D", data, "-U", "bench", "--auth=trust"], check=True, stdout=subprocess.DEVNULL)
+        subprocess.run([
+            "pg_ctl", "-D", data, "-w", "-l", os.path.join(self.dir, "postgres.log"),
+            "-o", f"-p {self.port} -k {self.dir} -c listen_addresses=''",
+            "start",
+        ], check=True, stdout=subprocess.DEVNULL)
+        return f"postgresql://bench@/postgres?host={self.dir}&port={self.port}"
+
+    def stop(self):
+        subprocess.run(["pg_ctl", "-D", os.path.join(self.dir, "data"), "-m", "fast", "stop"],
+                       check=False, stdout=subprocess.DEVNULL)
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+
+def prepare_database(conn, force_reset):
+    with conn.cursor() as cur:
+        cur.execute("SELECT COUNT(*) FROM pg_tables WHERE schemaname = 'public'")
+        tables = cur.fetchone()[0]
+        if tables and not force_reset:
+            raise SystemExit(f"❌ Database has {tables} table(s) in schema public. Point at an empty database or pass --force-reset.")
+        if tables:
+            logger.warning(f"⚠️ --force-reset: dropping schema public ({tables} tables)")
+            cur.execute("DROP SCHEMA public CASCADE")
+            cur.execute("CREATE SCHEMA public")
+    conn.commit()
+
+
+def create_bench_schema(conn):
+    """Schema from the importers, the API bootstrap DDL and the SQL setup scripts."""
+    from importer.import_data import create_schema
+    from importer.update_data import add_property_columns, add_business_columns, add_principal_columns
+    from api.main import DDL_NORMALIZE_FUNCTION, DDL_ADD_OWNER_NORM, DDL_KV_CACHE
+
+    with conn.cursor() as cur:
+        cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        create_schema(cur)
+        add_property_columns(cur)
+        add_business_columns(cur)
+        add_principal_columns(cur)
+        for ddl in (DDL_NORMALIZE_FUNCTION, DDL_ADD_OWNER_NORM, DDL_KV_CACHE, BENCH_DDL):
+            cur.execute(ddl)
+        for script in ("setup_evictions_table.sql", "code_enforcement.sql"):
+            with open(os.path.join(os.path.dirname(__file__), script)) as f:
+                cur.execute(f.read())
+        cur.executemany("INSERT INTO email_match_rules (domain, match_type) VALUES (%s, 'public')",
+                        [(d,) for d in EMAIL_DOMAINS])
+    conn.commit()
+
+
+def load_dataset(conn, dataset):
+    from api.network_builder import CopyBuffer
+
+    counts = {}
+    for table, columns, rows in dataset.tables():
+        buffer = CopyBuffer(conn, table, columns)
+        for row in rows:
+            buffer.add(row)
+        buffer.flush()
+        counts[table] = buffer.rows
+        logger.info(f"  {table:<18} {buffer.rows:>12,} rows")
+    with conn.cursor() as cur:
+        # Ids were generated client side
+        for table in ("principals", "properties"):
+            cur.execute(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT MAX(id) FROM {table}))")
+    conn.commit()
+    return counts
+
+
+def create_indexes(conn):
+    from api.main import DDL_INDEXES
+
+    with conn.cursor() as cur:
+        cur.execute(DDL_INDEXES)
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_principals_business_id ON principals(business_id)")
+        cur.execute("ANALYZE")
+    conn.commit()
+
+
+# --- Stages ------------------------------------------------------------
+
+def timed(results, name, fn, *args, **kwargs):
+    start = time.perf_counter()
+    value = fn(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    results[name] = round(elapsed, 3)
+    logger.info(f"⏱️  {name}: {elapsed:.1f}s")
+    return value
+
+
+def pick_network_targets(conn):
+    """stream_load bodies for the largest network's business and a median-sized one."""
+    targets = []
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT en.entity_id, en.entity_name, n.total_properties
+            FROM networks n
+            JOIN entity_networks en ON en.network_id = n.id AND en.entity_type = 'business'
+            ORDER BY n.total_properties DESC, en.entity_id
+        """)
+        rows = cur.fetchall()
+        if rows:
+            targets.append(("largest", rows[0]))
+            targets.append(("median", rows[len(rows) // 2]))
+    return [
+        (label, {"entity_id": entity_id, "entity_type": "business", "entity_name": name})
+        for label, (entity_id, name, _) in targets
+    ]
+
+
+def endpoint_cases(dataset, network_targets):
+    family = dataset.planted["mega_networks"][1]["family"] if len(dataset.planted["mega_networks"]) > 1 else "GUREVITCH"
+    collision = next(iter(dataset.planted["collisions"]))
+    cases = [
+        ("autocomplete business", "GET", "/api/autocomplete", {"q": "holdings", "type": "business"}, None),
+        ("autocomplete owner", "GET", "/api/autocomplete", {"q": family.lower()[:5], "type": "owner"}, None),
+        ("autocomplete collision", "GET", "/api/autocomplete", {"q": collision.lower(), "type": "owner"}, None),
+        ("search owner", "GET", "/api/search", {"type": "owner", "term": family}, None),
+        ("search business", "GET", "/api/search", {"type": "business", "term": "REALTY"}, None),
+        ("search address", "GET", "/api/search", {"type": "address", "term": "MAIN ST"}, None),
+        ("insights", "GET", "/api/insights", None, None),
+        ("dashboard summary", "GET", "/api/dashboard/summary", None, None),
+    ]
+    for label, body in network_targets:
+        cases.append((f"stream_load {label}", "POST", "/api/network/stream_load", None, body))
+    return cases
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def time_endpoints(cases, repeat):
+    from fastapi.testclient import TestClient
+    from api.main import app
+
+    results = {}
+    with TestClient(app) as client:
+        for name, method, path, params, body in cases:
+            samples, statuses, size = [], set(), 0
+            for i in range(repeat + 1):
+                start = time.perf_counter()
+                response = client.request(method, path, params=params, json=body)
+                content = response.content
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                statuses.add(response.status_code)
+                size = len(content)
+                if i == 0:
+                    first_ms = elapsed_ms
+                else:
+                    samples.append(elapsed_ms)
+            results[name] = {
+                "path": path,
+                "status": sorted(statuses),
+                "bytes": size,
+                "first_ms": round(first_ms, 1),
+                "p50_ms": round(percentile(samples, 50), 1),
+                "p95_ms": round(percentile(samples, 95), 1),
+                "mean_ms": round(statistics.mean(samples), 1),
+            }
+            logger.info(f"  {name:<26} p50 {results[name]['p50_ms']:>9,.1f} ms  p95 {results[name]['p95_ms']:>9,.1f} ms  status {sorted(statuses)}")
+    return results
+
+
+def table_counts(conn):
+    counts = {}
+    with conn.cursor() as cur:
+        for table in ("businesses", "principals", "unique_principals", "principal_business_links", "properties",
+                      "evictions", "code_enforcement", "networks", "entity_networks", "cached_insights"):
+            cur.execute(f"SELECT to_regclass('public.{table}') IS NOT NULL")
+            if cur.fetchone()[0]:
+                cur.execute(f"SELECT COUNT(*) FROM {table}")
+                counts[table] = cur.fetchone()[0]
+    return counts
+
+
+def git_revision():
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, text=True).strip()
+        dirty = bool(subprocess.check_output(["git", "status", "--porcelain", "--untracked-files=no"], cwd=REPO_ROOT, text=True).strip())
+        return {"commit": commit, "dirty": dirty}
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+
+
+# --- Comparison --------------------------------------------------------
+
+def flatten_timings(result):
+    flat = {f"stage {k}": v for k, v in result.get("stages", {}).items()}
+    flat.update({f"refresh {row['phase']}": row["seconds"] for row in result.get("refresh_phases", [])})
+    flat.update({f"endpoint {k} p50_ms": v["p50_ms"] for k, v in result.get("endpoints", {}).items()})
+    return flat
+
+
+def print_comparison(old, new):
+    before, after = flatten_timings(old), flatten_timings(new)
+    if old.get("config") != new.get("config"):
+        logger.warning(f"⚠️ Configs differ: {old.get('config')} vs {new.get('config')}")
+    print(f"\n{'metric':<44} {'before':>12} {'after':>12} {'change':>9}")
+    for key in list(before) + [k for k in after if k not in before]:
+        b, a = before.get(key), after.get(key)
+        change = f"{(a - b) / b * 100:+.0f}%" if a is not None and b else ""
+        print(f"{key:<44} {b if b is not None else '-':>12} {a if a is not None else '-':>12} {change:>9}")
+
+
+# --- Main --------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end benchmark on a synthetic statewide dataset")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--database-url", default=os.environ.get("DATABASE_URL"), help="Throwaway database (default: DATABASE_URL)")
+    target.add_argument("--initdb", action="store_true", help="Run against a temporary cluster created with initdb")
+    parser.add_argument("--force-reset", action="store_true", help="Drop and recreate schema public if the database is not empty")
+    parser.add_argument("--parcels", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--as-of", type=date.fromisoformat, default=DEFAULT_AS_OF)
+    parser.add_argument("--repeat", type=int, default=5, help="Timed requests per endpoint (after one warm-up)")
+    parser.add_argument("--output", required=True, help="JSON file for the results")
+    parser.add_argument("--compare", help="Previous results JSON to print deltas against")
+    args = parser.parse_args()
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+
+    cluster = None
+    if args.initdb:
+        cluster = TempCluster()
+        database_url = cluster.start()
+    elif args.database_url:
+        database_url = args.database_url
+    else:
+        parser.error("--database-url, DATABASE_URL or --initdb is required")
+    # The refresh and insights modules read DATABASE_URL at import time
+    os.environ["DATABASE_URL"] = database_url
+
+    try:
+        conn = psycopg2.connect(database_url)
+        prepare_database(conn, args.force_reset)
+        stages = {}
+
+        logger.info(f"🏗️ Generating {args.parcels:,} parcels (seed {args.seed})...")
+        dataset = timed(stages, "generate entities", SyntheticStatewide, args.parcels, seed=args.seed, as_of=args.as_of)
+        timed(stages, "create schema", create_bench_schema, conn)
+        loaded = timed(stages, "load", load_dataset, conn, dataset)
+        timed(stages, "index and analyze", create_indexes, conn)
+
+        from api.activity_stats import ensure_property_activity_stats
+        timed(stages, "activity stats", ensure_property_activity_stats, conn)
+        from api.eviction_facts import ensure_eviction_facts
+        timed(stages, "eviction facts", ensure_eviction_facts, conn)
+
+        from api.deduplicate_principals import create_schema as create_principal_schema, deduplicate_principals
+        timed(stages, "deduplicate principals", lambda: (create_principal_schema(conn), deduplicate_principals(conn)))
+
+        from api.graph_engine import PhaseReport
+        from api.safe_network_refresh import run_refresh
+        report = PhaseReport("Benchmark refresh")
+        swapped = timed(stages, "network refresh", run_refresh, report=report)
+        if not swapped:
+            logger.warning("⚠️ Refresh did not swap; endpoint numbers reflect empty network tables")
+
+        from api.generate_insights import rebuild_cached_insights
+        timed(stages, "insights rebuild", rebuild_cached_insights, db_conn=conn)
+
+        logger.info("🌐 Timing endpoints...")
+        endpoints = time_endpoints(endpoint_cases(dataset, pick_network_targets(conn)), args.repeat)
+
+        result = {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git": git_revision(),
+            "host": {"python": platform.python_version(), "machine": platform.machine(), "cpus": os.cpu_count()},
+            "config": {"parcels": args.parcels, "seed": args.seed, "as_of": args.as_of.isoformat(), "repeat": args.repeat},
+            "planted": dataset.planted,
+            "loaded_rows": loaded,
+            "row_counts": table_counts(conn),
+            "refresh_swapped": swapped,
+            "stages": stages,
+            "refresh_phases": report.rows,
+            "endpoints": endpoints,
+        }
+        conn.close()
+    finally:
+        if cluster:
+            cluster.stop()
+
+    with open(args.output, "w") as f:
+        json.dump(result, f, indent=2, default=str)
+    logger.info(f"💾 Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(json.load(f), result)
+
+
+if __name__ == "__main__":
+    main()
@@ -20,6 +20,8 @@ except ImportError:
     def normalize_business_name(n): return n.upper().strip() if n else ""
     def normalize_person_name(n): return n.upper().strip() if n else ""
     def extract_base_address(a): return a.upper().strip() if a else ""
+from api.activity_stats import ensure_property_activity_stats, refresh_property_activity_stats
+from api.eviction_facts import update_eviction_facts
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -215,6 +217,8 @@ def ingest_evictions():
     
     conn = get_db_connection()
     ensure_schema(conn)
+    # Triggers must be in place before the upsert so changed properties are marked
+    activity_stats = ensure_property_activity_stats(conn)
     cur = conn.cursor()
     
     # 1. Build Address+Town -> property_id mapping
@@ -339,7 +343,9 @@ def ingest_evictions():
         conn.commit()
     else:
         deleted_stale = 0
-    
+
+    activity_refreshed = refresh_property_activity_stats(conn) if activity_stats else 0
+    fact_rows = update_eviction_facts(conn, "CT")
     linked_count = sum(1 for row in ingest_data if row[4] is not None)
     filing_dates = [d for d in df_clean['filing_date'].tolist() if pd.notna(d)]
     update_status(conn, "success", {
@@ -348,6 +354,8 @@ def ingest_evictions():
         "matched_records": linked_count,
         "records_without_local_property": len(ingest_data) - linked_count,
         "removed_records_not_in_current_source": deleted_stale,
+        "activity_stats_refreshed": activity_refreshed,
+        "eviction_fact_rows": fact_rows,
         "min_filing_date": str(min(filing_dates)) if filing_dates else None,
         "max_filing_date": str(max(filing_dates)) if filing_dates else None,
     }, external_last_updated)
@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+"""
+Seeded synthetic statewide dataset for benchmarks and local development.
+
+Produces businesses, principals, properties, evictions and code_enforcement
+rows shaped like the CT sources (business registry, assessor parcels, housing
+court filings, code cases) at any scale from ~10k to a few million parcels,
+without real names. The same (parcels, seed, as_of) always yields the same
+rows, so timings from different commits run against identical data.
+
+Planted structures that the network build has to handle:
+  - mega-networks: families of principals spread over dozens to hundreds of
+    LLCs with a shared email domain and office address. One of them uses the
+    two principal names validate_shadow_data() checks for, sized inside
+    GUREVITCH_MIN/MAX_PROPERTIES, so a full refresh can swap.
+  - registrar addresses: ~3% of businesses share a registered-agent mailing
+    address that must not merge them.
+  - common-name collisions: a handful of person names appear as principals of
+    15-40 unrelated businesses with diffuse emails and addresses.
+
+unique_principals and principal_business_links are not generated; the
+benchmark derives them with api/deduplicate_principals.py as production does.
+
+Usage:
+    python scripts/synthetic_dataset.py --parcels 100000 --out-dir /tmp/synthetic
+"""
+import os
+import sys
+import csv
+import random
+import argparse
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from api.shared_utils import normalize_business_name, normalize_person_name
+
+MIN_PARCELS = 10_000
+DEFAULT_AS_OF = date(2026, 1, 1)
+
+# Town, zip, approximate centre
+TOWNS = [
+    ("HARTFORD", "06106", 41.764, -72.685), ("NEW HAVEN", "06511", 41.308, -72.928),
+    ("BRIDGEPORT", "06604", 41.187, -73.195), ("STAMFORD", "06902", 41.053, -73.539),
+    ("WATERBURY", "06702", 41.558, -73.051), ("NORWALK", "06851", 41.118, -73.408),
+    ("DANBURY", "06810", 41.394, -73.454), ("NEW BRITAIN", "06051", 41.661, -72.780),
+    ("WEST HARTFORD", "06107", 41.762, -72.742), ("MERIDEN", "06450", 41.538, -72.807),
+    ("BRISTOL", "06010", 41.672, -72.949), ("MILFORD", "06460", 41.222, -73.057),
+    ("MIDDLETOWN", "06457", 41.562, -72.651), ("NORWICH", "06360", 41.524, -72.076),
+    ("NEW LONDON", "06320", 41.356, -72.100), ("EAST HARTFORD", "06108", 41.782, -72.612),
+    ("HAMDEN", "06514", 41.396, -72.897), ("MANCHESTER", "06040", 41.776, -72.522),
+    ("WEST HAVEN", "06516", 41.271, -72.947), ("STRATFORD", "06615", 41.184, -73.133),
+]
+# Parcel share per town, roughly by housing stock
+TOWN_WEIGHTS = [9, 9, 9, 8, 7, 6, 5, 5, 4, 4, 4, 4, 3, 3, 2, 3, 4, 4, 3, 4]
+
+FIRST_NAMES = [
+    "JAMES", "MARY", "ROBERT", "PATRICIA", "JOHN", "JENNIFER", "MICHAEL", "LINDA", "DAVID", "ELIZABETH",
+    "WILLIAM", "BARBARA", "RICHARD", "SUSAN", "JOSEPH", "JESSICA", "THOMAS", "SARAH", "CHRISTOPHER", "KAREN",
+    "DANIEL", "LISA", "MATTHEW", "NANCY", "ANTHONY", "BETTY", "MARK", "SANDRA", "DONALD", "ASHLEY",
+    "STEVEN", "EMILY", "ANDREW", "DONNA", "PAUL", "MICHELLE", "JOSHUA", "CAROL", "KENNETH", "AMANDA",
+    "KEVIN", "MELISSA", "BRIAN", "DEBORAH", "GEORGE", "STEPHANIE", "TIMOTHY", "REBECCA", "LUIS", "ANA",
+    "JOSE", "CARMEN", "RAFAEL", "ROSA", "PIOTR", "ANNA", "GIUSEPPE", "MARIA", "DMITRI", "OLGA",
+]
+# Surnames are assembled from syllables so the name space is large enough that
+# accidental collisions stay at real-world rates instead of merging everyone.
+SURNAME_HEADS = [
+    "KOW", "MAR", "BEL", "STR", "HAL", "DON", "FER", "GAL", "PET", "ROS", "WIN", "CAR", "LAN", "MOR",
+    "TOR", "VAL", "BRE", "KAL", "NOR", "SAL", "DRA", "GOL", "HAR", "LOM", "MEN", "OST", "PAL", "RAD",
+    "SEV", "TAL", "BRO", "CAS", "DEL", "FAL", "GRA", "JAN", "KRE", "LEV", "MAC", "NAS",
+]
+SURNAME_MIDS = ["", "A", "E", "I", "O", "AN", "EL", "IN", "OR", "UL"]
+SURNAME_TAILS = [
+    "SKI", "DONALD", "ETTI", "SON", "MAN", "LEY", "INO", "OVA", "ELLI", "BERG", "STEIN", "WOOD",
+    "ICK", "OWSKI", "ENKO", "AZZO", "ERTY", "OFF", "ESCU", "ARD", "ANO", "ITZ", "ER", "TON", "FORD",
+]
+
+STREET_WORDS = [
+    "MAIN", "ELM", "OAK", "MAPLE", "PARK", "CHURCH", "HIGH", "WASHINGTON", "CHAPEL", "ORCHARD",
+    "PROSPECT", "FRANKLIN", "WHITNEY", "FARMINGTON", "ASYLUM", "ZION", "BROAD", "GRAND", "STATE", "UNION",
+    "WALNUT", "CEDAR", "PINE", "SPRING", "SUMMER", "WINTER", "RIVER", "LAKE", "HILLSIDE", "GREENWOOD",
+    "COLONY", "HOWE", "DIXWELL", "FAIRFIELD", "EDGEWOOD", "WOODLAND", "BURNSIDE", "CAPITOL", "LAUREL", "ASHLEY",
+    "BARNUM", "NOBLE", "HUNTINGTON", "WILLOW", "BEACON", "SHELTON", "WARREN", "LINCOLN", "JEFFERSON", "MADISON",
+]
+STREET_SUFFIXES = ["ST", "ST", "ST", "AVE", "AVE", "RD", "DR", "LN", "CT", "PL", "TER", "BLVD"]
+
+BUSINESS_WORDS = [
+    "ATLANTIC", "BLUE", "CAPITOL", "CHARTER", "CONSTITUTION", "EAGLE", "ELM CITY", "EMPIRE", "FIRST", "GATEWAY",
+    "GOLDEN", "GRANITE", "HARBOR", "HERITAGE", "HILLTOP", "LIBERTY", "MERIDIAN", "NUTMEG", "OAKWOOD", "PINNACLE",
+    "PIONEER", "RIVERSIDE", "SEAVIEW", "SHORELINE", "SILVER", "SOUND", "SUMMIT", "THAMES", "UNION", "VALLEY",
+]
+BUSINESS_KINDS = ["LLC", "PROPERTIES LLC", "HOLDINGS LLC", "REALTY LLC", "ASSOCIATES LLC", "MANAGEMENT LLC", "INC", "GROUP LLC"]
+
+# Registered-agent addresses that many unrelated businesses share
+REGISTRAR_ADDRESSES = [
+    ("2389 MAIN STREET", "GLASTONBURY", "06033"),
+    ("2 CORPORATE DRIVE", "SHELTON", "06484"),
+    ("100 PEARL STREET", "HARTFORD", "06103"),
+]
+# Person names planted as principals of many unrelated businesses
+COLLISION_NAMES = [
+    ("MICHAEL", "SULLIVAN"), ("ROBERT", "CLARK"), ("JOHN", "SMITH"), ("MARIA", "RODRIGUEZ"), ("DAVID", "COHEN"),
+]
+# The network validate_shadow_data() requires before it will swap
+SENTINEL_PRINCIPALS = [("MENACHEM", "GUREVITCH"), ("YEHUDA", "GUREVITCH")]
+SENTINEL_PARCELS = 1200
+
+EMAIL_DOMAINS = ["gmail.com", "yahoo.com", "outlook.com", "aol.com", "comcast.net"]
+PROPERTY_TYPES = [
+    ("Single Family", 40), ("Two Family", 18), ("Three Family", 12), ("Condominium", 14),
+    ("Apartments", 6), ("Commercial", 6), ("Vacant Land", 4),
+]
+EVICTION_FIRMS = [f"{w} LAW GROUP LLC" for w in ("HALLORAN", "BRESLIN", "CARVER", "DEMPSEY", "ELWOOD", "FINCH", "GARRITY", "HOLLIS")]
+ENFORCEMENT_TYPES = ["Housing Code Violation", "Blight", "Illegal Apartment", "No Heat", "Rodent Infestation", "Trash and Debris", "Fire Safety"]
+
+BUSINESS_COLUMNS = (
+    "id", "name", "name_norm", "status", "date_of_formation", "business_type", "business_address",
+    "business_city", "business_state", "business_zip", "mail_address", "mail_city", "mail_state", "mail_zip",
+    "business_email_address",
+)
+PRINCIPAL_COLUMNS = (
+    "id", "business_id", "name_c", "name_c_norm", "firstname", "lastname", "address", "city", "state", "zip", "title",
+)
+PROPERTY_COLUMNS = (
+    "id", "serial_number", "list_year", "property_city", "owner", "co_owner", "owner_norm", "co_owner_norm",
+    "location", "normalized_address", "street_name", "address_number", "unit", "property_zip", "property_type",
+    "number_of_units", "living_area", "year_built", "acres", "assessed_value", "appraised_value",
+    "sale_amount", "sale_date", "account_number", "latitude", "longitude",
+    "mailing_address", "mailing_city", "mailing_state", "mailing_zip", "cama_site_link",
+)
+EVICTION_COLUMNS = (
+    "case_number", "case_type", "property_id", "plaintiff_name", "plaintiff_norm",
+    "plaintiff_attorney_name", "plaintiff_attorney_firm", "plaintiff_attorney_norm",
+    "municipality", "filing_date", "status", "disposition_date", "address", "normalized_address",
+)
+CODE_ENFORCEMENT_COLUMNS = (
+    "property_id", "municipality", "case_number", "parcel_id", "address", "record_type",
+    "record_status", "date_opened", "date_closed", "property_owner", "global_id",
+)
+
+
+class SyntheticStatewide:
+    """
+    Builds the entity layer (businesses, principals, ownership plan) up front
+    and streams parcels, so memory stays proportional to the number of
+    businesses rather than parcels.
+
+    tables() yields (table, columns, rows) in load order. Each rows iterator
+    must be consumed before advancing: evictions and code cases are collected
+    while parcels stream.
+    """
+
+    def __init__(self, parcels=100_000, seed=42, as_of=DEFAULT_AS_OF):
+        if parcels < MIN_PARCELS:
+            raise ValueError(f"parcels must be at least {MIN_PARCELS:,} to fit the planted networks")
+        self.parcels = parcels
+        self.seed = seed
+        self.as_of = as_of
+        self.rng = random.Random(seed)
+        self.businesses = []
+        self.principals = []
+        # Owner groups: {"names": [...], "kind": "business"|"person", "parcels": n, "mail": (...), "evict": p}
+        self.owner_groups = []
+        self.planted = {"mega_networks": [], "registrar_businesses": 0, "collisions": {}}
+        self._business_names = set()
+        self._evictions = []
+        self._enforcement = []
+        self._build_entities()
+
+    # --- Names ---------------------------------------------------------
+
+    def _surname(self):
+        rng = self.rng
+        return rng.choice(SURNAME_HEADS) + rng.choice(SURNAME_MIDS) + rng.choice(SURNAME_TAILS)
+
+    def _person(self, last=None):
+        return self.rng.choice(FIRST_NAMES), last or self._surname()
+
+    def _street(self):
+        return f"{self.rng.choice(STREET_WORDS)} {self.rng.choice(STREET_SUFFIXES)}"
+
+    def _address(self):
+        return f"{self.rng.randint(1, 1999)} {self._street()}"
+
+    def _town(self):
+        return self.rng.choices(TOWNS, weights=TOWN_WEIGHTS)[0]
+
+    def _business_name(self, prefix=None):
+        rng = self.rng
+        while True:
+            if prefix:
+                name = f"{prefix} {rng.choice(BUSINESS_KINDS)}"
+            elif rng.random() < 0.35:
+                # Single-asset LLCs named after their building
+                name = f"{self._address()} LLC"
+            else:
+                name = f"{rng.choice(BUSINESS_WORDS)} {rng.choice(BUSINESS_WORDS)} {rng.choice(BUSINESS_KINDS)}"
+            if name not in self._business_names:
+                self._business_names.add(name)
+                return name
+            prefix = f"{prefix or name.rsplit(' ', 1)[0]} {rng.randint(2, 999)}"
+
+    # --- Entities ------------------------------------------------------
+
+    def _add_business(self, name, email=None, mail=None, office=None):
+        rng = self.rng
+        bid = f"{1000000 + len(self.businesses):07d}"
+        town, zip_code = (office[1], office[2]) if office else self._town()[:2]
+        street = office[0] if office else self._address()
+        if mail is None and rng.random() < 0.03:
+            mail = rng.choice(REGISTRAR_ADDRESSES)
+            self.planted["registrar_businesses"] += 1
+        mail = mail or (street, town, zip_code)
+        formed = self.as_of - timedelta(days=rng.randint(30, 40 * 365))
+        self.businesses.append((
+            bid, name, normalize_business_name(name), rng.choice(["Active"] * 8 + ["Dissolved", "Forfeited"]),
+            formed, "Domestic Limited Liability Company" if "LLC" in name else "Domestic Stock Corporation",
+            street, town, "CT", zip_code, mail[0], mail[1], "CT", mail[2], email,
+        ))
+        return bid
+
+    def _add_principal(self, business_id, person, title="Member"):
+        first, last = person
+        town, zip_code = self._town()[:2]
+        name_c = f"{first} {last}"
+        self.principals.append((
+            len(self.principals) + 1, business_id, name_c, normalize_person_name(name_c), first, last,
+            self._address(), town, "CT", zip_code, title,
+        ))
+
+    def _build_entities(self):
+        rng = self.rng
+        parcels = self.parcels
+        planned = 0
+
+        # 1. Mega-networks: the validation sentinel plus a few scale-dependent families
+        families = [("GUREVITCH", SENTINEL_PRINCIPALS, SENTINEL_PARCELS, 60)]
+        for _ in range(2 + parcels // 250_000):
+            last = self._surname()
+            members = [self._person(last) for _ in range(rng.randint(2, 3))]
+            families.append((last, members, max(300, parcels // 250), rng.randint(40, 150)))
+        for last, members, quota, llc_count in families:
+            domain = f"{last.lower()}mgmt.com"
+            office = (self._address(), *self._town()[:2])
+            llcs = []
+            for i in range(llc_count):
+                email = f"info@{domain}" if rng.random() < 0.7 else None
+                bid = self._add_business(self._business_name(), email=email, mail=office if rng.random() < 0.5 else None)
+                # Every LLC carries at least one family member; most carry two
+                for person in rng.sample(members, k=min(len(members), rng.choice([1, 2, 2]))):
+                    self._add_principal(bid, person, title="Manager")
+                llcs.append(self.businesses[-1][1])
+            self.owner_groups.append({
+                "names": llcs, "kind": "business", "parcels": quota,
+                "mail": office, "evict": 0.08, "units": (2, 12),
+            })
+            self.planted["mega_networks"].append({
+                "family": last, "principals": [f"{f} {l}" for f, l in members],
+                "businesses": llc_count, "parcels": quota,
+            })
+            planned += quota
+
+        # 2. Ordinary operators: a few LLCs and principals each, heavy-tailed portfolio sizes
+        operator_businesses = []
+        while planned < parcels * 0.45:
+            last = self._surname()
+            members = [self._person(last if rng.random() < 0.5 else None) for _ in range(rng.randint(1, 2))]
+            email = f"{members[0][0].lower()}.{members[0][1].lower()}@{rng.choice(EMAIL_DOMAINS)}" if rng.random() < 0.6 else None
+            names = []
+            for _ in range(rng.randint(1, 4)):
+                bid = self._add_business(self._business_name(), email=email)
+                operator_businesses.append(bid)
+                for person in members:
+                    self._add_principal(bid, person)
+                names.append(self.businesses[-1][1])
+            quota = min(60, max(1, int(rng.paretovariate(1.4))))
+            if rng.random() < 0.2:
+                # Some parcels held in a principal's own name, assessor style "LAST FIRST"
+                first, last_name = members[0]
+                self.owner_groups.append({"names": [f"{last_name} {first}"], "kind": "person", "parcels": 1,
+                                          "mail": None, "evict": 0.04, "units": (1, 3)})
+                planned += 1
+            self.owner_groups.append({"names": names, "kind": "business", "parcels": quota,
+                                      "mail": None, "evict": 0.04, "units": (1, 6)})
+            planned += quota
+
+        # 3. Businesses that own nothing (most of the registry)
+        idle_businesses = []
+        for _ in range(parcels // 12):
+            bid = self._add_business(self._business_name(),
+                                     email=f"office@{self._surname().lower()}.com" if rng.random() < 0.4 else None)
+            idle_businesses.append(bid)
+            for _ in range(rng.randint(1, 2)):
+                self._add_principal(bid, self._person())
+
+        # 4. Common-name collisions across unrelated businesses
+        for first, last in COLLISION_NAMES:
+            owning = rng.sample(operator_businesses, k=min(len(operator_businesses), rng.randint(3, 8)))
+            idle = rng.sample(idle_businesses, k=min(len(idle_businesses), rng.randint(15, 32)))
+            for bid in owning + idle:
+                self._add_principal(bid, (first, last), title="Agent")
+            self.planted["collisions"][f"{first} {last}"] = len(owning) + len(idle)
+
+    # --- Streams -------------------------------------------------------
+
+    def tables(self):
+        yield "businesses", BUSINESS_COLUMNS, iter(self.businesses)
+        yield "principals", PRINCIPAL_COLUMNS, iter(self.principals)
+        yield "properties", PROPERTY_COLUMNS, self._properties()
+        yield "evictions", EVICTION_COLUMNS, iter(self._evictions)
+        yield "code_enforcement", CODE_ENFORCEMENT_COLUMNS, iter(self._enforcement)
+
+    def _properties(self):
+        rng = random.Random(self.seed * 7919 + 1)
+        # One slot per parcel: owner group index, or -1 for an individual owner
+        slots = [i for i, group in enumerate(self.owner_groups) for _ in range(group["parcels"])]
+        slots = slots[:self.parcels] + [-1] * max(0, self.parcels - len(slots))
+        rng.shuffle(slots)
+        self._evictions = []
+        self._enforcement = []
+        type_names = [t for t, _ in PROPERTY_TYPES]
+        type_weights = [w for _, w in PROPERTY_TYPES]
+
+        for pid, slot in enumerate(slots, start=1):
+            town, zip_code, lat, lon = rng.choices(TOWNS, weights=TOWN_WEIGHTS)[0]
+            number = rng.randint(1, 1999)
+            street = f"{rng.choice(STREET_WORDS)} {rng.choice(STREET_SUFFIXES)}"
+            ptype = rng.choices(type_names, weights=type_weights)[0]
+            unit = str(rng.randint(1, 40)) if ptype == "Condominium" else None
+            location = f"{number} {street}" + (f" UNIT {unit}" if unit else "")
+
+            if slot >= 0:
+                group = self.owner_groups[slot]
+                owner = rng.choice(group["names"])
+                co_owner = None
+                mail = group["mail"]
+                evict_rate = group["evict"]
+                low, high = group["units"]
+            else:
+                first, last = rng.choice(FIRST_NAMES), self._surname_from(rng)
+                owner = f"{last} {first}"
+                co_owner = f"{last} {rng.choice(FIRST_NAMES)}" if rng.random() < 0.3 else None
+                mail = None
+                evict_rate = 0.01
+                low, high = 1, 3
+            mail = mail or (f"{number} {street}", town, zip_code)
+            units = rng.randint(low, high) if ptype not in ("Single Family", "Condominium", "Vacant Land") else 1
+            assessed = round(rng.lognormvariate(12.0, 0.6), -2)
+            sale_date = self.as_of - timedelta(days=rng.randint(0, 30 * 365)) if rng.random() < 0.85 else None
+
+            yield (
+                pid, f"{pid:08d}", self.as_of.year - 1, town, owner, co_owner,
+                _owner_norm(owner), _owner_norm(co_owner) if co_owner else None,
+                location, location, street, str(number), unit, zip_code, ptype,
+                units, rng.randint(600, 4000) if ptype != "Vacant Land" else None,
+                rng.randint(1870, 2023) if ptype != "Vacant Land" else None, round(rng.uniform(0.05, 2.0), 2),
+                assessed, round(assessed / 0.7, 2),
+                round(assessed * rng.uniform(0.8, 2.2), -3) if sale_date else None, sale_date,
+                f"{town[:3]}-{pid}", round(lat + rng.uniform(-0.04, 0.04), 6), round(lon + rng.uniform(-0.05, 0.05), 6),
+                mail[0], mail[1], "CT", mail[2], f"https://example.test/Parcel.aspx?pid={pid}",
+            )
+
+            if rng.random() < evict_rate:
+                self._add_evictions(rng, pid, owner, location, town)
+            if rng.random() < evict_rate / 2:
+                self._add_enforcement(rng, pid, owner, location, town)
+
+    @staticmethod
+    def _surname_from(rng):
+        return rng.choice(SURNAME_HEADS) + rng.choice(SURNAME_MIDS) + rng.choice(SURNAME_TAILS)
+
+    def _add_evictions(self, rng, pid, owner, location, town):
+        firm = EVICTION_FIRMS[min(int(rng.paretovariate(1.2)) - 1, len(EVICTION_FIRMS) - 1)]
+        attorney = f"{rng.choice(FIRST_NAMES)} {firm.split()[0]}"
+        for _ in range(rng.choice([1, 1, 1, 2, 3])):
+            filed = self.as_of - timedelta(days=int(rng.triangular(0, 5 * 365, 0)))
+            disposed = filed + timedelta(days=rng.randint(20, 200)) if rng.random() < 0.8 else None
+            if disposed and disposed > self.as_of:
+                disposed = None
+            self._evictions.append((
+                f"{town[:3]}-CV{filed.year % 100:02d}-{6000000 + len(self._evictions):07d}-S",
+                "Summary Process", pid, owner, _owner_norm(owner),
+                attorney, firm, normalize_business_name(firm), town, filed,
+                "Disposed" if disposed else "Pending", disposed, location, location,
+            ))
+
+    def _add_enforcement(self, rng, pid, owner, location, town):
+        opened = self.as_of - timedelta(days=rng.randint(0, 4 * 365))
+        closed = opened + timedelta(days=rng.randint(5, 300)) if rng.random() < 0.6 else None
+        if closed and closed > self.as_of:
+            closed = None
+        n = len(self._enforcement)
+        self._enforcement.append((
+            pid, town, f"CE-{opened.year}-{n:07d}", f"{pid:08d}", location, rng.choice(ENFORCEMENT_TYPES),
+            "Closed" if closed else "Open", opened, closed, owner, f"synthetic-{self.seed}-{n}",
+        ))
+
+
+def _owner_norm(owner):
+    if not owner:
+        return None
+    return normalize_business_name(owner) if any(k in owner for k in (" LLC", " INC", " CORP")) else normalize_person_name(owner)
+
+
+def write_csv(dataset, out_dir):
+    """Writes one CSV per table; returns {table: rows}."""
+    os.makedirs(out_dir, exist_ok=True)
+    counts = {}
+    for table, columns, rows in dataset.tables():
+        path = os.path.join(out_dir, f"{table}.csv")
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            n = 0
+            for row in rows:
+                writer.writerow(row)
+                n += 1
+        counts[table] = n
+        print(f"{table:<18} {n:>12,} rows -> {path}")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic statewide dataset")
+    parser.add_argument("--parcels", type=int, default=100_000, help=f"Number of parcels (minimum {MIN_PARCELS:,})")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--as-of", type=date.fromisoformat, default=DEFAULT_AS_OF, help="Date the data is current to (YYYY-MM-DD)")
+    parser.add_argument("--out-dir", required=True, help="Directory for the per-table CSV files")
+    args = parser.parse_args()
+
+    dataset = SyntheticStatewide(args.parcels, seed=args.seed, as_of=args.as_of)
+    write_csv(dataset, args.out_dir)
+    for network in dataset.planted["mega_networks"]:
+        print(f"mega-network {network['family']}: {network['businesses']} businesses, {network['parcels']:,} parcels")
+    print(f"registrar-address businesses: {dataset.planted['registrar_businesses']:,}")
+    for name, count in dataset.planted["collisions"].items():
+        print(f"common-name collision {name}: {count} businesses")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+import re
+import unittest
+
+from api.activity_stats import DDL_PROPERTY_ACTIVITY_STATS, _stats_query
+
+
+def ddl_columns():
+    body = DDL_PROPERTY_ACTIVITY_STATS.split("(", 1)[1]
+    return [m.group(1) for m in re.finditer(r"^\s+(\w+) (?:INTEGER|DATE)", body, re.M)]
+
+
+class TestStatsQuery(unittest.TestCase):
+    def test_insert_covers_every_column(self):
+        insert = re.search(r"INSERT INTO property_activity_stats \((.*?)\)", _stats_query(), re.S).group(1)
+        self.assertEqual([c.strip() for c in insert.split(",")], ddl_columns())
+
+    def test_scope_restricts_both_sources(self):
+        full = _stats_query()
+        scoped = _stats_query("tmp_activity_refresh")
+        self.assertNotIn("scope", full)
+        self.assertIn("JOIN tmp_activity_refresh scope ON scope.property_id = ce.property_id", scoped)
+        self.assertIn("JOIN tmp_activity_refresh scope ON scope.property_id = e.property_id", scoped)
+
+
+if __name__ == "__main__":
+    unittest.main()
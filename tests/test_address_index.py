@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+tests/test_address_index.py
+===========================
+Regression corpus for the indexed matcher behind find_match_for_property.
+
+tests/data/address_match_corpus.jsonl starts with the scraped street listing
+and then holds one DB location per line with the match the old linear
+substring scan produced ("legacy") and the match expected now. Cases where
+the two differ carry a "note" explaining why the new answer is better; every
+other case must agree with the old scan.
+"""
+
+import os
+import json
+import unittest
+
+from updater.address_index import AddressIndex, parse_address
+from updater.update_data import find_match_for_property
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "data", "address_match_corpus.jsonl")
+
+
+def _load_corpus():
+    with open(CORPUS_PATH, "r", encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f if line.strip()]
+    return lines[0]["scraped"], lines[1:]
+
+
+class TestAddressIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        scraped, cls.cases = _load_corpus()
+        cls.scraped = {addr: {"location": addr} for addr in scraped}
+        cls.index = AddressIndex(cls.scraped)
+
+    def test_corpus_matches_expected(self):
+        for case in self.cases:
+            with self.subTest(db=case["db"]):
+                match = find_match_for_property(case["db"], self.scraped, self.index)
+                self.assertEqual(match[0] if match else None, case["expected"])
+                if match:
+                    self.assertIs(match[1], self.scraped[match[0]])
+
+    def test_unchanged_where_legacy_was_right(self):
+        for case in self.cases:
+            if "note" not in case:
+                with self.subTest(db=case["db"]):
+                    self.assertEqual(case["expected"], case["legacy"])
+
+    def test_tie_break_ignores_scrape_order(self):
+        forward = {"40 ELM ST EXT": 1, "40 ELM ST RD": 2}
+        backward = dict(reversed(list(forward.items())))
+        self.assertEqual(AddressIndex(forward).match("40 ELM ST")[0], AddressIndex(backward).match("40 ELM ST")[0])
+
+    def test_parse_address(self):
+        self.assertEqual(parse_address("12-14 ELM ST APT 03"), (("12", "14"), ("ELM", "ST"), "3"))
+        self.assertEqual(parse_address("12 UNIT RD"), (("12",), ("UNIT", "RD"), None))
+
+
+if __name__ == "__main__":
+    unittest.main()
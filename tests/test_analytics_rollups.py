@@ -0,0 +1,68 @@
+import unittest
+from datetime import datetime
+
+from api.analytics_rollups import RollupAccumulator, hll_add, hll_estimate, hll_merge, hll_new, hll_union
+
+
+def _row(session, path="/api/search", is_bot=False, is_mobile=False, event_type="search", query="main st"):
+    return (session, "hartford", event_type, path, query, None,
+            "Mozilla/5.0 Chrome/120", is_mobile, is_bot, "1.2.3.4", "Hartford", "CT", "US")
+
+
+class TestAnalyticsRollups(unittest.TestCase):
+    def test_hll_estimate_is_close(self):
+        registers = hll_new()
+        for i in range(5000):
+            hll_add(registers, f"session-{i}")
+        self.assertAlmostEqual(hll_estimate(registers), 5000, delta=5000 * 0.1)
+        self.assertEqual(hll_estimate(None), 0)
+
+    def test_accumulator_counts_minute_and_day(self):
+        acc = RollupAccumulator()
+        ts = datetime(2026, 1, 5, 14, 30, 12)
+        acc.add(_row("a"), ts)
+        acc.add(_row("b", is_bot=True), ts)
+        acc.add(_row("c", path="/api/analytics/realtime"), ts)
+
+        minute = acc.cells[("minute", datetime(2026, 1, 5, 14, 30), "all", "", "", "")]
+        day = acc.cells[("day", datetime(2026, 1, 5), "all", "", "", "")]
+        for cell in (minute, day):
+            self.assertEqual(cell["requests"], 2)
+            self.assertEqual(cell["bot_requests"], 1)
+            self.assertEqual(cell["search_requests"], 2)
+            self.assertEqual(hll_estimate(cell["sessions"]), 2)
+            self.assertEqual(hll_estimate(cell["human_sessions"]), 1)
+
+        self.assertIn(("minute", datetime(2026, 1, 5, 14, 30), "search", "main st", "hartford", ""), acc.cells)
+        self.assertNotIn(("minute", datetime(2026, 1, 5, 14, 30), "page", "/api/analytics/realtime", "", ""), acc.cells)
+
+        # Pages count hits but keep no session sketch
+        page = acc.cells[("day", datetime(2026, 1, 5), "page", "/api/search", "", "")]
+        self.assertEqual(page["requests"], 2)
+        self.assertIsNone(page["sessions"])
+
+    def test_hll_merge_is_register_wise_max(self):
+        a, b = hll_new(), hll_new()
+        for i in range(300):
+            hll_add(a, f"a-{i}")
+            hll_add(b, f"b-{i}")
+        merged = hll_merge(bytes(a), bytes(b))
+        self.assertEqual(merged, bytes(max(x, y) for x, y in zip(a, b)))
+        self.assertAlmostEqual(hll_estimate(merged), 600, delta=60)
+        self.assertEqual(hll_merge(None, bytes(b)), bytes(b))
+        self.assertIsNone(hll_merge(None, None))
+
+    def test_hll_union_folds_fetched_sketches(self):
+        days = [hll_new() for _ in range(3)]
+        for d, sketch in enumerate(days):
+            for i in range(200):
+                hll_add(sketch, f"s-{d * 100 + i}")  # overlapping session sets
+        # bytea[] values arrive from psycopg2 as memoryviews
+        merged = hll_union([memoryview(bytes(d)) for d in days])
+        self.assertAlmostEqual(hll_estimate(merged), 400, delta=40)
+        self.assertIsNone(hll_union(None))
+        self.assertEqual(hll_estimate(hll_union([])), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
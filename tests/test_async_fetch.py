@@ -0,0 +1,87 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+import httpx
+
+from updater.async_fetch import AsyncPageFetcher
+from updater.host_governor import HostGovernorRegistry
+from updater.scrape_cache import SCRAPE_UNCHANGED, ScrapeCache
+
+
+def parse_owner(content, url):
+    return {"owner": content.decode().split("|")[0], "url": url}
+
+
+class TestAsyncPageFetcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.cache = ScrapeCache(path=os.path.join(self.tmp, "cache.sqlite3"), enabled=True)
+        self.calls = []
+
+        def handler(request):
+            self.calls.append(str(request.url))
+            pid = request.url.params["pid"]
+            if pid == "3" and self.calls.count(str(request.url)) == 1:
+                return httpx.Response(503, headers={"Retry-After": "0"})
+            if pid == "4":
+                return httpx.Response(404)
+            if pid == "5":  # redirect loop
+                return httpx.Response(302, headers={"Location": str(request.url)})
+            return httpx.Response(200, content=f"OWNER {pid}|".encode())
+
+        self.transport = httpx.MockTransport(handler)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def _run(self, governors=None):
+        fetcher = AsyncPageFetcher(self.cache, governors, concurrency=4, parse_workers=0, transport=self.transport)
+        jobs = [(pid, f"https://gis.vgsi.com/townct/Parcel.aspx?pid={pid}") for pid in range(1, 5)]
+        return fetcher, {job_id: record for job_id, _, record in fetcher.results(jobs, parse_owner, "vision")}
+
+    def test_fetch_parse_retry_and_cache(self):
+        governors = HostGovernorRegistry(enabled=True)
+        fetcher, results = self._run(governors)
+        self.assertEqual(results[1]["owner"], "OWNER 1")
+        self.assertEqual(results[3]["owner"], "OWNER 3")  # retried after the 503
+        self.assertIsNone(results[4])
+        self.assertEqual(fetcher.stats["parsed"], 3)
+        self.assertEqual(governors.governor("gis.vgsi.com").snapshot()["in_flight"], 0)
+
+        # Until the writer reports them committed, pages are parsed again
+        fetcher, results = self._run()
+        self.assertEqual(fetcher.stats["parsed"], 3)
+        self.cache.mark_applied(results.values())
+
+        # Second run: identical bodies come back as unchanged without parsing
+        fetcher, results = self._run()
+        self.assertIs(results[1], SCRAPE_UNCHANGED)
+        self.assertEqual(fetcher.stats["parsed"], 0)
+
+    def test_one_bad_page_does_not_abort_the_town(self):
+        governors = HostGovernorRegistry(enabled=True)
+        fetcher = AsyncPageFetcher(self.cache, governors, concurrency=4, parse_workers=0, transport=self.transport)
+        jobs = [(pid, f"https://gis.vgsi.com/townct/Parcel.aspx?pid={pid}") for pid in (1, 5, 6)]
+        jobs.append(("bad", "https://gis.vgsi.com:notaport/Parcel.aspx"))  # InvalidURL, not a RequestError
+        results = {job_id: record for job_id, _, record in fetcher.results(jobs, parse_owner, "vision")}
+        self.assertEqual(results[6]["owner"], "OWNER 6")
+        self.assertIsNone(results[5])
+        self.assertIsNone(results["bad"])
+        self.assertEqual(fetcher.stats["failed"], 2)
+        self.assertEqual(governors.governor("gis.vgsi.com").snapshot()["in_flight"], 0)
+
+    def test_early_close_stops_the_loop_thread(self):
+        fetcher = AsyncPageFetcher(self.cache, None, concurrency=2, parse_workers=0, transport=self.transport)
+        jobs = [(pid, f"https://gis.vgsi.com/townct/Parcel.aspx?pid={pid}") for pid in range(10, 60)]
+        results = fetcher.results(jobs, parse_owner, "vision")
+        next(results)
+        results.close()
+        self.assertFalse(any(t.name == "async-page-fetcher" for t in threading.enumerate()))
+        self.assertLess(len(self.calls), len(jobs))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from api import autocomplete_cache
+from api.autocomplete_cache import AutocompleteEngine, AutocompleteIndex
+
+
+def _doc(entity_type, entity_id, label, jurisdiction="CT", weight=1, group_key=None):
+    return (entity_type, entity_id, group_key or entity_id, label, label.upper(), None,
+            "HARTFORD", None, None, None, jurisdiction, weight)
+
+
+DOCS = [
+    _doc("owner", "MAIN STREET LLC", "MAIN STREET LLC", weight=40),
+    _doc("owner", "MAINLINE HOLDINGS", "MAINLINE HOLDINGS", weight=3),
+    _doc("business", "1", "JOHN MAIN REALTY", weight=1),
+    _doc("address", "12 MAIN ST", "12 MAIN ST", jurisdiction="NY", weight=2),
+    _doc("owner", "DOMAIN PARTNERS", "DOMAIN PARTNERS", weight=99),
+]
+
+
+class TestAutocompleteIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = AutocompleteIndex.from_documents("v1", DOCS)
+
+    def test_word_prefix_ranking_and_quotas(self):
+        docs = self.index.search("main", {"owner": 5, "business": 5}, ["CT"])
+        self.assertEqual([d["label"] for d in docs], ["MAIN STREET LLC", "MAINLINE HOLDINGS", "JOHN MAIN REALTY", "DOMAIN PARTNERS"])
+        self.assertEqual([d["match_rank"] for d in docs], [1, 1, 2, 3])
+
+        docs = self.index.search("main", {"owner": 1}, ["CT"])
+        self.assertEqual([d["label"] for d in docs], ["MAIN STREET LLC"])
+
+    def test_jurisdiction_and_all_terms(self):
+        self.assertEqual(self.index.search("main st", {"address": 5}, ["CT"]), [])
+        docs = self.index.search("main st", {"address": 5, "owner": 5}, ["NY"])
+        self.assertEqual([d["label"] for d in docs], ["12 MAIN ST"])
+
+    def test_infix_matches_come_from_trigram_postings(self):
+        docs = self.index.search("omai", {"owner": 5}, ["CT"])
+        self.assertEqual([(d["label"], d["match_rank"]) for d in docs], [("DOMAIN PARTNERS", 3)])
+        self.assertEqual(self.index.search("ainl hold", {"owner": 5}, ["CT"])[0]["label"], "MAINLINE HOLDINGS")
+        self.assertEqual(self.index.search("xyz", {"owner": 5}, ["CT"]), [])
+        self.assertTrue(self.index.answers_infix("ma street"))
+        self.assertFalse(self.index.answers_infix("ma st"))
+
+    def test_candidate_cap_keeps_heaviest_documents(self):
+        docs = [_doc("owner", f"AARDVARK {i}", f"AARDVARK {i}", weight=1) for i in range(5)]
+        docs.append(_doc("owner", "AZURE HOLDINGS", "AZURE HOLDINGS", weight=500))
+        index = AutocompleteIndex.from_documents("v1", docs)
+        with mock.patch.object(autocomplete_cache, "AUTOCOMPLETE_MAX_CANDIDATES", 2):
+            found = index.search("a", {"owner": 1}, ["CT"])
+        self.assertEqual([d["label"] for d in found], ["AZURE HOLDINGS"])
+        self.assertEqual(found[0]["weight"], 500)
+        self.assertIsNone(found[0]["hint"])
+
+    def test_snapshot_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "snapshot.pkl")
+            self.index.save(path)
+            loaded = AutocompleteIndex.load(path)
+        self.assertEqual(loaded.version, "v1")
+        self.assertEqual(loaded.search("hold", {"owner": 5}, ["CT"])[0]["label"], "MAINLINE HOLDINGS")
+
+
+class TestAutocompleteEngine(unittest.TestCase):
+    def setUp(self):
+        self.engine = AutocompleteEngine(snapshot_path=os.devnull)
+        self.engine._index = AutocompleteIndex.from_documents("v1", DOCS)
+
+    def test_unknown_database_version_is_stale(self):
+        self.assertFalse(self.engine.is_fresh())
+        self.assertIsNone(self.engine.search("main", {"owner": 1}, ["CT"]))
+        self.engine._db_version = "v2"
+        self.assertFalse(self.engine.is_fresh())
+        self.engine._db_version = "v1"
+        self.assertTrue(self.engine.is_fresh())
+
+    def test_trigram_queries_never_top_up(self):
+        self.engine._db_version = "v1"
+        calls = []
+        docs = self.engine.search("main", {"owner": 5, "business": 5, "address": 5}, ["CT"], calls.append)
+        self.assertEqual(len(docs), 4)
+        self.assertEqual(calls, [])
+
+    def test_short_terms_top_up_short_types(self):
+        self.engine._db_version = "v1"
+        calls = []
+
+        def top_up(short_quotas):
+            calls.append(short_quotas)
+            return [{"entity_type": "owner", "label": "DOMAIN PARTNERS", "weight": 99, "match_rank": 3}]
+
+        docs = self.engine.search("ma", {"owner": 5, "business": 1}, ["CT"], top_up)
+        self.assertEqual(calls, [{"owner": 5}])
+        self.assertEqual([d["label"] for d in docs], ["JOHN MAIN REALTY", "DOMAIN PARTNERS"])
+        self.assertIsNone(self.engine.search("ma", {"owner": 5}, ["CT"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from updater.update_data import process_arcgis_data, process_ct_geodata_records
+
+
+def _ct_frame(**overrides):
+    row = {
+        "Location": "12 MAIN STREET", "Location_CAMA": "12 MAIN ST", "Unit_Type": np.nan,
+        "Owner": "ACME LLC", "Mailing_Address": "PO BOX 1", "Mailing_City": "HARTFORD",
+        "Assessed_Total": 0, "Sale_Price": 250000, "Sale_Date": "2019/05/01 00:00:00+00",
+        "AYB": 1920.0, "CAMA_Link": np.nan, "Link_From_CAMA": "https://example.test/p?pid=1",
+        "appraised_value": 100000.0,
+    }
+    row.update(overrides)
+    return pd.DataFrame([row])
+
+
+class TestCtGeodataRecords(unittest.TestCase):
+    def test_record_shape(self):
+        processed = process_ct_geodata_records(_ct_frame())
+        self.assertEqual(list(processed), ["12 MAIN ST"])
+        record = processed["12 MAIN ST"][0]
+        self.assertEqual(record["sale_date"], date(2019, 5, 1))
+        self.assertEqual(record["assessed_value"], 70000.0)
+        self.assertEqual(record["cama_site_link"], "https://example.test/p?pid=1")
+        self.assertEqual(record["location"], "12 MAIN STREET")
+        # A missing Unit_Type no longer comes through as the string "nan"
+        self.assertNotIn("unit", record)
+        self.assertIsInstance(record["sale_amount"], int)
+
+    def test_condo_association_rows_are_skipped(self):
+        self.assertEqual(process_ct_geodata_records(_ct_frame(Unit_Type="CNDASC")), {})
+
+    def test_numeric_location_recovers_from_owner(self):
+        processed = process_ct_geodata_records(_ct_frame(Location="93", Location_CAMA="93", Owner="45 ELM ST LLC"))
+        self.assertEqual(list(processed), ["45 ELM ST"])
+        self.assertEqual(process_ct_geodata_records(_ct_frame(Location="93", Location_CAMA="93", Owner="SMITH JOHN")), {})
+
+
+class TestArcgisData(unittest.TestCase):
+    def test_money_dates_years_and_unit_inference(self):
+        df = pd.DataFrame({
+            "StreetNumberFrom": [12.0, np.nan],
+            "StreetName": ["OAK AVENUE B", "ELM ST"],
+            "Owner": ["ACME LLC", "SMITH"],
+            "SalePrice": ["$1,200", "0"],
+            "SaleDate": ["1/5/2020", "2020-01-05 00:00:00"],
+            "AssessedValue": [np.nan, 1000],
+            "YearBuilt": ["1920", 1500],
+        })
+        mapping = {"Owner": "owner", "SalePrice": "sale_amount", "SaleDate": "sale_date",
+                   "AssessedValue": "assessed_value", "YearBuilt": "year_built"}
+        processed = process_arcgis_data(df, mapping, "Test")
+        self.assertEqual(processed["12 OAK AVE B"], [{
+            "location": "12 OAK AVENUE B", "owner": "ACME LLC", "sale_amount": 1200.0,
+            "sale_date": date(2020, 1, 5), "year_built": 1920, "unit": "B",
+        }])
+        self.assertEqual(processed["ELM ST"], [{
+            "location": "ELM ST", "owner": "SMITH", "assessed_value": 1000.0, "appraised_value": 1428.57,
+        }])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import threading
+import time
+import unittest
+
+from psycopg2 import pool
+
+from api.db import CheckoutGate, MeteredConnectionPool
+from api.outbound import OutboundExecutor
+
+
+class TestCheckoutGate(unittest.TestCase):
+    def test_uncontended_checkouts_do_not_count_as_waits(self):
+        gate = CheckoutGate(2, timeout=1)
+        gate.acquire()
+        gate.acquire()
+        stats = gate.snapshot()
+        self.assertEqual((stats["checkouts"], stats["waited"], stats["in_use"]), (2, 0, 2))
+        gate.release()
+        gate.release()
+        self.assertEqual(gate.snapshot()["in_use"], 0)
+        self.assertEqual(gate.snapshot()["peak_in_use"], 2)
+
+    def test_full_gate_queues_until_a_release(self):
+        gate = CheckoutGate(1, timeout=5)
+        gate.acquire()
+        waits = []
+        waiter = threading.Thread(target=lambda: waits.append(gate.acquire()))
+        waiter.start()
+        time.sleep(0.05)
+        self.assertEqual(waits, [])
+        gate.release()
+        waiter.join(2)
+        self.assertEqual(len(waits), 1)
+        self.assertGreaterEqual(waits[0], 40)
+        stats = gate.snapshot()
+        self.assertEqual((stats["waited"], stats["in_use"]), (1, 1))
+        self.assertGreaterEqual(stats["max_wait_ms"], 40)
+
+    def test_timeout_raises_pool_error(self):
+        gate = CheckoutGate(1, timeout=0.01)
+        gate.acquire()
+        with self.assertRaises(pool.PoolError):
+            gate.acquire()
+        stats = gate.snapshot()
+        self.assertEqual((stats["timeouts"], stats["checkouts"], stats["in_use"]), (1, 1, 1))
+
+    def test_rejected_putconn_keeps_the_slot(self):
+        db_pool = MeteredConnectionPool(0, 1, dsn="")
+        with self.assertRaises(pool.PoolError):
+            db_pool.putconn(object())
+        self.assertEqual(db_pool.stats()["in_use"], 0)
+        db_pool.gate.acquire()
+        self.assertEqual(db_pool.stats()["in_use"], 1)
+
+
+class TestOutboundExecutor(unittest.TestCase):
+    def setUp(self):
+        self.executor = OutboundExecutor(max_workers=2)
+        self.addCleanup(self.executor.shutdown)
+
+    def test_concurrency_is_bounded(self):
+        lock = threading.Lock()
+        active = [0, 0]
+
+        def work(i):
+            with lock:
+                active[0] += 1
+                active[1] = max(active[1], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+            return i * 2
+
+        self.assertEqual(self.executor.map(work, range(6)), [0, 2, 4, 6, 8, 10])
+        self.assertEqual(active[1], 2)
+        stats = self.executor.snapshot()
+        self.assertEqual((stats["submitted"], stats["pending"], stats["running"]), (6, 0, 0))
+
+    def test_nested_calls_run_inline(self):
+        # Both workers block on nested calls; queuing them would deadlock
+        def outer(i):
+            return self.executor.call(lambda: threading.current_thread().name)
+
+        names = self.executor.map(outer, range(2))
+        self.assertTrue(all(name.startswith("outbound") for name in names))
+        self.assertEqual(self.executor.snapshot()["submitted"], 2)
+
+    def test_as_completed_bounds_one_callers_in_flight_calls(self):
+        lock = threading.Lock()
+        active = [0, 0]
+
+        def work(i):
+            with lock:
+                active[0] += 1
+                active[1] = max(active[1], active[0])
+            time.sleep(0.01)
+            with lock:
+                active[0] -= 1
+            return i * 2
+
+        executor = OutboundExecutor(max_workers=4)
+        self.addCleanup(executor.shutdown)
+        done = {item: future.result() for item, future in executor.as_completed(work, range(10), window=2)}
+        self.assertEqual(done, {i: i * 2 for i in range(10)})
+        self.assertEqual(active[1], 2)
+
+    def test_failures_propagate_and_are_counted(self):
+        with self.assertRaises(ValueError):
+            self.executor.call(int, "not a number")
+        self.assertEqual(self.executor.snapshot()["failed"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,23 @@
+import unittest
+
+from api.eviction_facts import _attorney_expressions
+
+
+class TestAttorneyExpressions(unittest.TestCase):
+    def test_norm_column_is_the_monitor_key(self):
+        norm, label = _attorney_expressions({"plaintiff_attorney_firm", "plaintiff_attorney_name", "plaintiff_attorney_norm"})
+        self.assertEqual(norm, "COALESCE(TRIM(plaintiff_attorney_norm), '')")
+        self.assertTrue(label.startswith("COALESCE(NULLIF(TRIM(plaintiff_attorney_firm), '')"))
+
+    def test_older_schemas_fall_back_to_firm_then_name(self):
+        norm, label = _attorney_expressions({"plaintiff_attorney_firm", "plaintiff_attorney_name"}, alias="e")
+        expected = "COALESCE(NULLIF(TRIM(e.plaintiff_attorney_firm), ''), NULLIF(TRIM(e.plaintiff_attorney_name), ''), '')"
+        self.assertEqual(norm, expected)
+        self.assertEqual(label, expected)
+
+    def test_no_attorney_columns_yield_blank_keys(self):
+        self.assertEqual(_attorney_expressions(set()), ("''", "COALESCE('')"))
+
+
+if __name__ == "__main__":
+    unittest.main()
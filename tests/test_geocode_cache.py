@@ -0,0 +1,138 @@
+import csv
+import io
+import threading
+import time
+import unittest
+from unittest import mock
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from api import geocoding_utils
+from api.geocode_cache import geocode_cache_key
+from api.geocoding_utils import census_batch_geocode, geocode_with_fallbacks, geocoding_address_parts
+
+# What the stand-in Census knows: street -> (matched address, "lon,lat")
+KNOWN = {
+    "400 MAIN ST": ("400 MAIN ST, HARTFORD, CT, 06103", "-72.6734,41.7658"),
+    "10 HOWE ST": ("10 HOWE ST, NEW HAVEN, CT, 06511", "-72.9361,41.3081"),
+}
+
+
+class _CensusStandIn(BaseHTTPRequestHandler):
+    """Minimal addressbatch endpoint: multipart addressFile in, result CSV out."""
+
+    uploads = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        message = BytesParser(policy=HTTP).parsebytes(
+            b"Content-Type: " + self.headers["Content-Type"].encode() + b"\r\n\r\n" + body
+        )
+        fields = {part.get_param("name", header="content-disposition"): part.get_payload(decode=True)
+                  for part in message.iter_parts()}
+        if fields.get("benchmark") != b"Public_AR_Current":
+            self.send_response(400)
+            self.end_headers()
+            return
+        rows = list(csv.reader(io.StringIO(fields["addressFile"].decode("utf-8"))))
+        type(self).uploads.append(rows)
+        out = io.StringIO()
+        writer = csv.writer(out, quoting=csv.QUOTE_ALL)
+        for row_id, street, city, state, zip_code in rows:
+            given = f"{street}, {city}, {state}, {zip_code}"
+            if street in KNOWN:
+                matched, coords = KNOWN[street]
+                writer.writerow([row_id, given, "Match", "Exact", matched, coords, "1234", "L"])
+            elif street.startswith("1 TIE"):
+                writer.writerow([row_id, given, "Tie"])
+            else:
+                writer.writerow([row_id, given, "No_Match"])
+        data = out.getvalue().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/csv")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestCensusBatchGeocode(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _CensusStandIn)
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}/geocoder/locations/addressbatch"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        _CensusStandIn.uploads = []
+
+    def test_matches_and_non_matches(self):
+        results = census_batch_geocode([
+            ("0", "400 MAIN ST", "HARTFORD", "CT", "06103"),
+            ("1", "99 NOWHERE RD", "HARTFORD", "CT", "06103"),
+            ("2", "1 TIE LN", "HARTFORD", "CT", ""),
+        ], url=self.url)
+        self.assertEqual(results["0"], (41.7658, -72.6734, "400 MAIN ST, HARTFORD, CT, 06103"))
+        self.assertIsNone(results["1"])
+        self.assertIsNone(results["2"])
+
+    def test_uploads_in_chunks(self):
+        addresses = [(str(i), "10 HOWE ST", "NEW HAVEN", "CT", "06511") for i in range(5)]
+        results = census_batch_geocode(addresses, url=self.url, batch_size=2)
+        self.assertEqual([len(rows) for rows in _CensusStandIn.uploads], [2, 2, 1])
+        self.assertEqual(set(results), {"0", "1", "2", "3", "4"})
+
+    def test_failed_upload_leaves_ids_unanswered(self):
+        results = census_batch_geocode(
+            [("0", "400 MAIN ST", "HARTFORD", "CT", "06103")], url=self.url, benchmark="Bogus"
+        )
+        self.assertEqual(results, {})
+
+
+class TestGeocodeCacheKey(unittest.TestCase):
+    def test_condo_units_share_a_key(self):
+        keys = {
+            geocode_cache_key(*geocoding_address_parts(location, "New Haven", "6511.0"))
+            for location in ("12 MAIN ST UNIT 3", "12 Main St #4", "12 MAIN ST APT 2B", "12 MAIN ST")
+        }
+        self.assertEqual(keys, {"12 MAIN ST|NEW HAVEN|CT|06511"})
+
+    def test_ranges_and_placeholders(self):
+        self.assertEqual(
+            geocode_cache_key(*geocoding_address_parts("1-15 EDGEWATER DR", "Hamden", None)),
+            "1 EDGEWATER DR|HAMDEN|CT|",
+        )
+        self.assertIsNone(geocoding_address_parts("0 MELBA ST", "Milford", "06460"))
+
+
+class TestNominatimThrottle(unittest.TestCase):
+    def test_public_requests_are_spaced_across_threads(self):
+        with mock.patch.object(geocoding_utils, "NOMINATIM_PUBLIC_INTERVAL", 0.05), \
+                mock.patch.object(geocoding_utils, "_nominatim_next_at", 0.0):
+            start = time.monotonic()
+            threads = [threading.Thread(target=geocoding_utils._wait_for_public_nominatim) for _ in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        # First slot is immediate, the other three queue behind it
+        self.assertGreaterEqual(time.monotonic() - start, 0.14)
+
+    def test_census_only_skips_nominatim(self):
+        with mock.patch.object(geocoding_utils, "geocode_census", return_value=(None, None, None)), \
+                mock.patch.object(geocoding_utils, "geocode_nominatim") as nominatim:
+            result = geocode_with_fallbacks("1 NOWHERE RD, HARTFORD, CT 06103", try_nominatim=False)
+        self.assertEqual(result, (None, None, None, None, False))
+        nominatim.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+tests/test_graph_engine.py
+==========================
+Checks the array-backed CSR graph and depth-limited discovery against the
+original dict/deque BFS + DSU implementation on synthetic graphs.
+"""
+
+import os
+import sys
+import random
+import unittest
+from collections import deque, defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "api"))
+
+from graph_engine import EdgeBuffer, TypedEdgeBuffer, CSRGraph, NODE_TYPE_CODES, merge_labels, depth_limited_components
+
+
+def reference_components(adjacency, seed_ints, max_depth):
+    """The pre-CSR discovery loop, kept verbatim as the behavioural oracle."""
+    parent = list(range(len(seed_ints)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    node_owner = {}
+    for idx, seed_id in enumerate(seed_ints):
+        if seed_id in node_owner:
+            continue
+        node_owner[seed_id] = idx
+        queue = deque([(seed_id, 0)])
+        while queue:
+            node, depth = queue.popleft()
+            if depth >= max_depth:
+                continue
+            for neighbor in adjacency.get(node, ()):
+                if neighbor not in node_owner:
+                    node_owner[neighbor] = idx
+                    queue.append((neighbor, depth + 1))
+                else:
+                    ri, rj = find(idx), find(node_owner[neighbor])
+                    if ri != rj:
+                        parent[ri] = rj
+
+    components = defaultdict(set)
+    for node_id, owner_idx in node_owner.items():
+        components[find(owner_idx)].add(node_id)
+    return {frozenset(c) for c in components.values()}
+
+
+def engine_components(graph, seed_ints, max_depth):
+    owned, owners, labels = depth_limited_components(graph, seed_ints, max_depth, progress_every=0)
+    components = defaultdict(set)
+    for node_id, owner_idx in zip(owned.tolist(), owners.tolist()):
+        components[int(labels[owner_idx])].add(node_id)
+    return {frozenset(c) for c in components.values()}
+
+
+class TestGraphEngine(unittest.TestCase):
+
+    def _random_graph(self, rng, num_nodes, num_edges):
+        edges = EdgeBuffer()
+        adjacency = defaultdict(set)
+        for _ in range(num_edges):
+            u, v = rng.randrange(num_nodes), rng.randrange(num_nodes)
+            edges.add(u, v)
+            if u != v:
+                adjacency[u].add(v)
+                adjacency[v].add(u)
+        return CSRGraph.from_edges(edges, num_nodes), adjacency
+
+    def test_csr_matches_adjacency(self):
+        rng = random.Random(7)
+        graph, adjacency = self._random_graph(rng, 200, 600)
+        for node in range(200):
+            self.assertEqual(sorted(graph.get(node, [])), sorted(adjacency.get(node, ())))
+        self.assertEqual(len(graph), len(adjacency))
+        self.assertEqual(graph.num_edges, sum(len(v) for v in adjacency.values()) // 2)
+        self.assertEqual(list(graph.get(10_000, [])), [])
+
+    def test_typed_edges_intern_per_type(self):
+        edges = TypedEdgeBuffer()
+        typed_adjacency = defaultdict(set)
+        pairs = [
+            (('business', 'B2'), ('principal', 7)),
+            (('business', 'B1'), ('principal', 7)),
+            (('business', 'B2'), ('business', 'B1')),
+            (('business', 'B1'), ('address', '1 MAIN ST')),
+            (('principal', 3), ('principal', 7)),
+            (('business', 'B2'), ('principal', 7)),
+        ]
+        for u, v in pairs:
+            edges.add(u[0], u[1], v[0], v[1])
+            typed_adjacency[u].add(v)
+            typed_adjacency[v].add(u)
+        src, dst, nodes = edges.intern()
+        graph = CSRGraph.from_arrays(src, dst, len(nodes), nodes.type_codes())
+
+        self.assertEqual(len(nodes), 5)
+        self.assertEqual(nodes.nodes(range(len(nodes))), [
+            ('business', 'B1'), ('business', 'B2'), ('principal', 3), ('principal', 7), ('address', '1 MAIN ST'),
+        ])
+        for node, neighbors in typed_adjacency.items():
+            node_id = nodes.id_of(node)
+            self.assertEqual(nodes.node(node_id), node)
+            self.assertEqual(graph.node_types[node_id], NODE_TYPE_CODES[node[0]])
+            self.assertEqual(set(nodes.nodes(graph.get(node_id))), neighbors)
+        self.assertNotIn(('principal', 4), nodes)
+        self.assertNotIn(('principal', 'B1'), nodes)
+        self.assertIsNone(nodes.id_of(('unknown', 1)))
+
+    def test_merge_labels_groups_chains(self):
+        labels = merge_labels(6, [5, 4, 3], [4, 3, 2])
+        self.assertEqual(labels.tolist(), [0, 1, 2, 2, 2, 2])
+
+    def test_discovery_matches_reference(self):
+        rng = random.Random(42)
+        for num_nodes, num_edges in [(50, 40), (500, 450), (2000, 2600)]:
+            graph, adjacency = self._random_graph(rng, num_nodes, num_edges)
+            seeds = rng.sample(range(num_nodes), num_nodes // 3)
+            for max_depth in (1, 2, 4):
+                self.assertEqual(
+                    engine_components(graph, seeds, max_depth),
+                    reference_components(adjacency, seeds, max_depth),
+                    f"mismatch for n={num_nodes}, e={num_edges}, depth={max_depth}",
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
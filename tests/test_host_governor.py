@@ -0,0 +1,102 @@
+import time
+import threading
+import unittest
+
+import requests
+from requests.adapters import BaseAdapter
+
+from updater.host_governor import GovernedSession, HostGovernor, HostGovernorRegistry, platform_for_host
+
+
+class _ScriptedAdapter(BaseAdapter):
+    """Answers with the given status codes in order."""
+
+    def __init__(self, statuses, headers=None):
+        super().__init__()
+        self.statuses = list(statuses)
+        self.headers = headers or {}
+        self.calls = 0
+
+    def send(self, request, **kwargs):
+        self.calls += 1
+        response = requests.Response()
+        response.status_code = self.statuses.pop(0)
+        response.headers.update(self.headers)
+        response.url = request.url
+        response.request = request
+        response._content = b""
+        return response
+
+    def close(self):
+        pass
+
+
+class _Registry(HostGovernorRegistry):
+    def __init__(self, adapter):
+        super().__init__(enabled=True)
+        self._fake = adapter
+
+    def adapter(self, host):
+        return self._fake
+
+
+class TestHostGovernor(unittest.TestCase):
+    def test_throttle_halves_once_per_second(self):
+        gov = HostGovernor("gis.vgsi.com", rate=8, concurrency=8)
+        for _ in range(3):
+            gov.acquire()
+        gov.release("throttled")
+        gov.release("throttled")
+        gov.release("throttled")
+        self.assertEqual(gov.limit, 4)
+        self.assertEqual(gov.rate, 4)
+        self.assertEqual(gov.stats["backoffs"], 1)
+
+    def test_successes_ramp_up(self):
+        gov = HostGovernor("example.test", rate=100, concurrency=2, max_rate=200, max_concurrency=3)
+        for _ in range(10):
+            gov.acquire()
+            gov.release("ok")
+        self.assertEqual(gov.limit, 3)
+        self.assertAlmostEqual(gov.rate, 101.0)
+
+    def test_concurrency_limit_blocks(self):
+        gov = HostGovernor("example.test", rate=1000, concurrency=1)
+        gov.acquire()
+        acquired = threading.Event()
+        worker = threading.Thread(target=lambda: (gov.acquire(), acquired.set()))
+        worker.start()
+        self.assertFalse(acquired.wait(0.1))
+        gov.release("ok")
+        self.assertTrue(acquired.wait(1.0))
+        worker.join()
+
+    def test_errors_leave_limits_alone(self):
+        gov = HostGovernor("example.test", rate=8, concurrency=4)
+        gov.acquire()
+        gov.release("error")
+        self.assertEqual((gov.limit, gov.rate, gov.stats["error"], gov.in_flight), (4, 8, 1, 0))
+
+    def test_platforms(self):
+        self.assertEqual(platform_for_host("gis.vgsi.com"), "vision")
+        self.assertEqual(platform_for_host("www.propertyrecordcards.com"), "propertyrecordcards")
+        self.assertEqual(platform_for_host("example.test"), "example.test")
+
+
+class TestGovernedSession(unittest.TestCase):
+    def test_retries_throttled_responses_and_backs_off(self):
+        adapter = _ScriptedAdapter([503, 429, 200], headers={"Retry-After": "0"})
+        registry = _Registry(adapter)
+        session = GovernedSession(registry)
+        start = time.monotonic()
+        response = session.get("https://gis.vgsi.com/hartfordct/Parcel.aspx?pid=1")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(adapter.calls, 3)
+        self.assertLess(time.monotonic() - start, 2.0)
+        snapshot = registry.governor("gis.vgsi.com").snapshot()
+        self.assertEqual((snapshot["throttled"], snapshot["ok"], snapshot["in_flight"]), (2, 1, 0))
+        self.assertTrue(any(line.startswith("vision:") for line in registry.report()))
+
+
+if __name__ == "__main__":
+    unittest.main()
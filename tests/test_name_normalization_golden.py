@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+tests/test_name_normalization_golden.py
+=======================================
+Golden-file check for the compiled/memoized name normalizers in shared_utils.
+
+tests/data/name_normalization_golden.jsonl.gz holds a synthetic corpus of
+owner, principal and business names (punctuation noise, joint names, typo
+tables, suffixes, non-ASCII) together with the outputs of the original
+per-call re.sub implementation. Every function must stay byte-identical.
+"""
+
+import os
+import sys
+import gzip
+import json
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from api.shared_utils import (
+    normalize_business_name,
+    normalize_person_name,
+    normalize_owner_name,
+    canonicalize_person_name,
+    canonicalize_business_name,
+)
+
+GOLDEN_PATH = os.path.join(os.path.dirname(__file__), "data", "name_normalization_golden.jsonl.gz")
+
+FUNCTIONS = {
+    'business': normalize_business_name,
+    'person': normalize_person_name,
+    'canon_person': canonicalize_person_name,
+    'canon_business': canonicalize_business_name,
+    'owner': normalize_owner_name,
+}
+
+
+class TestNameNormalizationGolden(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with gzip.open(GOLDEN_PATH, 'rt', encoding='utf-8') as f:
+            cls.cases = [json.loads(line) for line in f]
+
+    def test_corpus_is_large(self):
+        self.assertGreaterEqual(len(self.cases), 10000)
+
+    def test_outputs_match_golden(self):
+        for key, fn in FUNCTIONS.items():
+            mismatches = [
+                (case['name'], case[key], fn(case['name']))
+                for case in self.cases
+                if fn(case['name']) != case[key]
+            ]
+            self.assertEqual(mismatches[:5], [], f"{key}: {len(mismatches)} mismatch(es)")
+
+    def test_cached_results_are_stable(self):
+        # Second pass is served from the LRU cache and must not drift
+        for case in self.cases[:2000]:
+            self.assertEqual(normalize_business_name(case['name']), case['business'])
+            self.assertEqual(normalize_person_name(case['name']), case['person'])
+
+    def test_empty_inputs(self):
+        for fn in FUNCTIONS.values():
+            self.assertEqual(fn(None), '')
+            self.assertEqual(fn(''), '')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+
+from api.network_payload_cache import NetworkPayloadCache, network_key
+
+
+class _FakeConnection:
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class _FakeCursor:
+    """Stores the single payload row the cache writes and returns it on read."""
+
+    def __init__(self):
+        self.connection = _FakeConnection()
+        self.stored = {}
+        self.version = "v1"
+        self._result = None
+
+    def execute(self, sql, params=None):
+        self._result = None
+        if sql.lstrip().startswith("INSERT INTO network_payload_cache"):
+            key, version, payload = params[0], params[1], params[2]
+            if version == self.version:
+                self.stored.setdefault(key, payload)
+        elif sql.lstrip().startswith("SELECT COALESCE"):
+            self._result = (self.version,)
+        elif "SELECT payload FROM network_payload_cache" in sql:
+            payload = self.stored.get(params[0])
+            self._result = (payload,) if payload is not None else None
+
+    def fetchone(self):
+        return self._result
+
+
+class TestNetworkPayloadCache(unittest.TestCase):
+    def test_network_key_is_order_insensitive(self):
+        self.assertEqual(network_key([12, "3", 12]), "3,12")
+
+    def test_frames_replay_byte_for_byte(self):
+        cache = NetworkPayloadCache()
+        cursor = _FakeCursor()
+        frames = ['{"type": "network_info", "data": {"name": "Café"}}\n', '{"type": "done"}\n']
+
+        self.assertIsNone(cache.get(cursor, [7]))
+        cache.put(cursor, [7], frames, cache.data_version(cursor))
+        self.assertEqual(cache.get(cursor, [7]), frames)
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_render_spanning_a_version_bump_is_not_stored(self):
+        cache = NetworkPayloadCache()
+        cursor = _FakeCursor()
+        render_version = cache.data_version(cursor)
+        cursor.version = "v2"
+        cache.put(cursor, [7], ['{"type": "done"}\n'], render_version)
+        self.assertEqual(cursor.stored, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
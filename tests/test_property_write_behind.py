@@ -0,0 +1,75 @@
+import unittest
+from datetime import date
+
+from updater.update_data import (
+    PROPERTY_TRANSACTION_COLUMNS,
+    _copy_rows,
+    compute_property_update,
+    property_state_columns,
+)
+
+
+class _CopyCursor:
+    def __init__(self):
+        self.statement = None
+        self.data = None
+
+    def copy_expert(self, statement, buffer):
+        self.statement = statement
+        self.data = buffer.read()
+
+
+class TestComputePropertyUpdate(unittest.TestCase):
+    def test_protected_fields_are_not_overwritten(self):
+        updates, tx = compute_property_update(
+            1, {"owner": "NEW OWNER LLC", "year_built": "1920"},
+            {"owner": "ACME LLC", "year_built": None},
+        )
+        self.assertEqual(updates, {"year_built": "1920"})
+        # The owner stays protected but the change of hands is still logged
+        row = dict(zip(PROPERTY_TRANSACTION_COLUMNS, tx))
+        self.assertEqual((row["seller_raw"], row["buyer_raw"]), ("ACME LLC", "NEW OWNER LLC"))
+
+    def test_placeholder_owner_is_replaced_and_link_always_refreshed(self):
+        updates, _ = compute_property_update(
+            1, {"owner": "ACME LLC", "cama_site_link": "https://example/parcel?pid=1"},
+            {"owner": "CURRENT OWNER", "cama_site_link": "https://example/old"},
+        )
+        self.assertEqual(updates, {"owner": "ACME LLC", "cama_site_link": "https://example/parcel?pid=1"})
+
+    def test_new_sale_date_records_transaction(self):
+        updates, tx = compute_property_update(
+            5, {"sale_date": "2024-02-01", "sale_amount": "$325,000"},
+            {"owner": "ACME LLC", "owner_norm": "ACME", "sale_date": None, "sale_amount": None,
+             "location": "1 MAIN ST", "property_city": "Hartford"},
+        )
+        self.assertEqual(set(updates), {"sale_date", "sale_amount"})
+        row = dict(zip(PROPERTY_TRANSACTION_COLUMNS, tx))
+        self.assertEqual(row["property_id"], 5)
+        self.assertEqual(row["transaction_amount"], 325000.0)
+        self.assertEqual(row["transaction_type"], "sale")
+        self.assertEqual(row["seller_raw"], "ACME LLC")
+
+    def test_restricted_columns_include_transaction_fields(self):
+        cols = property_state_columns({"owner": "X", "building_photo": "p.jpg"}, restricted_mode=True)
+        self.assertIn("account_number", cols)
+        self.assertIn("owner_norm", cols)
+        self.assertNotIn("building_photo", cols)
+
+
+class TestCopyRows(unittest.TestCase):
+    def test_escapes_and_coerces(self):
+        cursor = _CopyCursor()
+        _copy_rows(
+            cursor, "property_update_stage", ("id", "year_built", "owner", "sale_date"),
+            [(1, 1920.0, "A\tB\\C", date(2024, 2, 1)), (2, None, "line\nbreak", None)],
+            {"year_built": "integer"},
+        )
+        self.assertEqual(
+            cursor.data,
+            "1\t1920\tA\\tB\\\\C\t2024-02-01\n2\t\\N\tline\\nbreak\t\\N\n",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import contextvars
+import threading
+import unittest
+
+import psycopg2.extensions
+from psycopg2.extras import RealDictCursor
+
+from starlette.routing import Route
+
+from api.query_profiler import UNMATCHED_ROUTE, QueryProfiler, _profiling_cursor_class, is_read_only, route_template, sql_fingerprint
+
+
+class TestSqlFingerprint(unittest.TestCase):
+    def test_literals_params_and_lists_collapse(self):
+        self.assertEqual(
+            sql_fingerprint("SELECT *  FROM properties -- hot\n WHERE id IN (%s, %s, %s) AND city = 'NEW HAVEN' LIMIT 50"),
+            "SELECT * FROM properties WHERE id IN (...) AND city = ? LIMIT ?",
+        )
+        self.assertEqual(
+            sql_fingerprint("SELECT name FROM businesses WHERE id = %(id)s"),
+            sql_fingerprint("SELECT name FROM businesses WHERE id = '0123456'"),
+        )
+
+    def test_execute_values_batches_share_a_fingerprint(self):
+        two = "INSERT INTO t (a, b) VALUES (1, 'x'), (2, 'y')"
+        three = "INSERT INTO t (a, b) VALUES (1, 'x'), (2, 'y'), (3, 'z');"
+        self.assertEqual(sql_fingerprint(two), sql_fingerprint(three))
+        self.assertEqual(sql_fingerprint(two), "INSERT INTO t (a, b) VALUES (...)")
+
+    def test_identifiers_with_digits_are_kept(self):
+        self.assertEqual(sql_fingerprint("SELECT col2 FROM t1"), "SELECT col2 FROM t1")
+
+    def test_read_only_detection(self):
+        self.assertTrue(is_read_only("  SELECT * FROM properties WHERE owner ILIKE '%DELETE%'"))
+        self.assertTrue(is_read_only("WITH x AS (SELECT 1) SELECT * FROM x"))
+        self.assertFalse(is_read_only("WITH x AS (DELETE FROM t RETURNING id) SELECT * FROM x"))
+        self.assertFalse(is_read_only("SELECT * FROM t FOR UPDATE SKIP LOCKED"))
+        self.assertFalse(is_read_only("UPDATE t SET a = 1"))
+
+
+class TestQueryProfiler(unittest.TestCase):
+    def test_requests_and_statements_aggregate(self):
+        profiler = QueryProfiler(enabled=True, slow_ms=100, explain=True, explain_interval=300)
+        plans = []
+
+        def explain():
+            plans.append(1)
+            return [{"Plan": {"Node Type": "Seq Scan"}}]
+
+        def request(ids):
+            profile = profiler.start_request("/api/things/{id}")
+            for i in ids:
+                profiler.record(f"SELECT * FROM things WHERE id = {i}", 5.0, 1)
+            profiler.record("SELECT * FROM things WHERE name ILIKE %s", 250.0, 40, explain)
+            profiler.finish_request(profile)
+            return profile
+
+        # Each request runs in its own context, as under the ASGI server
+        profile = contextvars.copy_context().run(request, [1, 2, 3])
+        contextvars.copy_context().run(request, [4])
+        self.assertEqual(profile.statements, 4)
+        self.assertAlmostEqual(profile.db_ms, 265.0)
+        self.assertIn('db;dur=265.0;desc="4 queries"', profile.server_timing())
+
+        snapshot = profiler.snapshot()
+        self.assertEqual(snapshot["routes"][0]["route"], "/api/things/{id}")
+        self.assertEqual(snapshot["routes"][0]["requests"], 2)
+        slow, fast = snapshot["statements"]
+        self.assertEqual(slow["fingerprint"], "SELECT * FROM things WHERE name ILIKE ?")
+        self.assertEqual((slow["calls"], slow["slow"], slow["rows"]), (2, 2, 80))
+        self.assertEqual(fast["calls"], 4)
+        self.assertEqual(fast["routes"], {"/api/things/{id}": 4})
+        # Explained once per interval, not once per slow call
+        self.assertEqual(len(plans), 1)
+        self.assertEqual(slow["explain"]["plan"][0]["Plan"]["Node Type"], "Seq Scan")
+
+    def test_worker_threads_see_the_request(self):
+        profiler = QueryProfiler(enabled=True)
+
+        def request():
+            profile = profiler.start_request("/api/x")
+            # What starlette's run_in_threadpool does for sync endpoints
+            context = contextvars.copy_context()
+            worker = threading.Thread(target=context.run, args=(profiler.record, "SELECT 1", 2.0, 1))
+            worker.start()
+            worker.join()
+            return profile
+
+        self.assertEqual(contextvars.copy_context().run(request).statements, 1)
+        profiler.record("SELECT 2", 1.0, 1)
+        routes = {s["fingerprint"]: s["routes"] for s in profiler.snapshot()["statements"]}
+        self.assertEqual(routes["SELECT ?"], {"/api/x": 1, "(background)": 1})
+
+    def test_disabled_profiler_starts_nothing(self):
+        profiler = QueryProfiler(enabled=False)
+        self.assertIsNone(profiler.start_request("/api/x"))
+        profiler.finish_request(None)
+        self.assertEqual(profiler.snapshot()["routes"], [])
+
+    def test_cursor_classes_keep_the_requested_factory(self):
+        cls = _profiling_cursor_class(RealDictCursor)
+        self.assertTrue(issubclass(cls, RealDictCursor))
+        self.assertIs(cls, _profiling_cursor_class(RealDictCursor))
+        self.assertTrue(issubclass(_profiling_cursor_class(psycopg2.extensions.cursor), psycopg2.extensions.cursor))
+
+
+
+class TestRouteTemplate(unittest.TestCase):
+    def test_unmatched_paths_share_one_bucket(self):
+        routes = [Route("/api/things/{id}", lambda request: None)]
+
+        def scope(path):
+            return {"type": "http", "path": path, "method": "GET", "root_path": ""}
+
+        self.assertEqual(route_template(routes, scope("/api/things/42")), "/api/things/{id}")
+        self.assertEqual(route_template(routes, scope("/wp-login.php")), UNMATCHED_ROUTE)
+        self.assertEqual(route_template(routes, scope("/api/random/9f2c")), UNMATCHED_ROUTE)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import date
+
+from updater.scrape_cache import ScrapeCache, body_hash
+
+PAGE = (
+    b'<html><form><input type="hidden" name="__VIEWSTATE" value="%s" />'
+    b'<span id="MainContent_lblGenOwner">ACME LLC</span></form></html>'
+)
+
+
+class _FakeResponse:
+    def __init__(self, url, status_code, content, headers=None):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.encoding = "utf-8"
+        self.apparent_encoding = "utf-8"
+
+
+class _FakeSession:
+    """Serves queued responses and records the request headers it saw."""
+
+    def __init__(self):
+        self.responses = []
+        self.sent_headers = []
+
+    def get(self, url, params=None, headers=None, **kwargs):
+        self.sent_headers.append(headers or {})
+        return self.responses.pop(0)
+
+
+def _parse(page):
+    text = page.text
+    if "ACME LLC" not in text:
+        return None
+    return {"owner": "ACME LLC", "sale_date": date(2020, 1, 2), "cama_site_link": page.key}
+
+
+class TestScrapeCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.cache = ScrapeCache(path=os.path.join(self.tmp, "cache.sqlite3"), enabled=True, store_bodies=True)
+        self.session = _FakeSession()
+        self.url = "https://gis.vgsi.com/x/Parcel.aspx?pid=1"
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def _fetch_and_store(self, content, headers=None, applied=True):
+        self.session.responses.append(_FakeResponse(self.url, 200, content, headers))
+        page = self.cache.get(self.session, self.url, source="vision")
+        if not page.unchanged:
+            record = _parse(page)
+            self.cache.put_record(page, record)
+            if applied:
+                self.cache.mark_applied([record])
+        return page
+
+    def test_viewstate_does_not_change_hash(self):
+        self.assertEqual(body_hash(PAGE % b"aaa"), body_hash(PAGE % b"bbb"))
+
+    def test_same_body_is_unchanged_and_returns_record(self):
+        self.assertFalse(self._fetch_and_store(PAGE % b"one").unchanged)
+        page = self._fetch_and_store(PAGE % b"two")
+        self.assertTrue(page.unchanged)
+        self.assertEqual(page.record["sale_date"], date(2020, 1, 2))
+
+    def test_record_not_committed_to_the_database_is_not_skipped(self):
+        self._fetch_and_store(PAGE % b"one", headers={"ETag": '"v1"'}, applied=False)
+        page = self._fetch_and_store(PAGE % b"two")
+        self.assertNotIn("If-None-Match", self.session.sent_headers[-1])
+        self.assertFalse(page.unchanged)
+        self.assertTrue(self._fetch_and_store(PAGE % b"three").unchanged)
+
+    def test_conditional_request_and_304(self):
+        self._fetch_and_store(PAGE % b"one", headers={"ETag": '"v1"'})
+        self.session.responses.append(_FakeResponse(self.url, 304, b""))
+        page = self.cache.get(self.session, self.url, source="vision")
+        self.assertEqual(self.session.sent_headers[-1].get("If-None-Match"), '"v1"')
+        self.assertTrue(page.unchanged)
+        self.assertEqual(page.record["owner"], "ACME LLC")
+
+    def test_replay_reparses_offline_and_flags_changed_records(self):
+        self._fetch_and_store(PAGE % b"one")
+        replayed = list(self.cache.replay({"vision": lambda p: dict(_parse(p), owner="ACME HOLDINGS LLC")}))
+        self.assertEqual([r[2]["owner"] for r in replayed], ["ACME HOLDINGS LLC"])
+        self.assertEqual(self.session.responses, [])
+        # A changed record sends the page through the database on the next live run
+        page = self._fetch_and_store(PAGE % b"one")
+        self.assertFalse(page.unchanged)
+
+
+if __name__ == "__main__":
+    unittest.main()
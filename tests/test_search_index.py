@@ -0,0 +1,27 @@
+import unittest
+
+from api.search_index import SEARCH_SQL, _like_escape, _prefix_tsquery, _term_filter, jurisdictions_for_state
+
+
+class TestSearchIndex(unittest.TestCase):
+    def test_jurisdictions_for_state(self):
+        self.assertEqual(jurisdictions_for_state(None), ["CT", "NY"])
+        self.assertEqual(jurisdictions_for_state("ct"), ["CT"])
+        self.assertEqual(jurisdictions_for_state("NYC"), ["NY", "NYC"])
+        self.assertEqual(jurisdictions_for_state("NY", include_city_tables=False), ["NY"])
+        self.assertEqual(jurisdictions_for_state("MD"), ["CT", "NY", "BALTIMORE"])
+
+    def test_query_helpers(self):
+        self.assertEqual(_like_escape("50%_OFF"), "50\\%\\_OFF")
+        self.assertEqual(_prefix_tsquery(["MAIN", "ST."]), "main:* & st:*")
+        self.assertIsNone(_prefix_tsquery(["&&"]))
+
+    def test_each_term_is_its_own_indexable_like(self):
+        self.assertEqual(_term_filter(2), "d.search_text LIKE %(term_0)s AND d.search_text LIKE %(term_1)s")
+        sql = SEARCH_SQL.format(term_filter=_term_filter(3))
+        self.assertNotIn("LIKE ALL", sql)
+        self.assertIn("AND d.search_text LIKE %(term_2)s", sql)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import json
+import decimal
+import unittest
+from datetime import date, datetime, timezone
+
+from psycopg2.extras import RealDictRow
+
+from api.serialization import FastJSONResponse, dumps, json_default, ndjson_frame
+
+
+def _row():
+    row = RealDictRow()
+    row["id"] = 7
+    row["assessed_value"] = decimal.Decimal("183420.50")
+    row["sale_date"] = date(2021, 3, 4)
+    row["updated_at"] = datetime(2024, 5, 6, 7, 8, 9, 123456, tzinfo=timezone.utc)
+    row["subsidies"] = [{"program_name": "LIHTC", "expiry_date": date(2030, 1, 1)}]
+    row["owner"] = "ÉCOLE LLC"
+    return row
+
+
+class TestSerialization(unittest.TestCase):
+    def test_matches_stdlib_encoding_of_db_rows(self):
+        row = _row()
+        self.assertEqual(json.loads(dumps(row)), json.loads(json.dumps(row, default=json_default)))
+
+    def test_ndjson_frame_is_one_line(self):
+        frame = ndjson_frame({"type": "properties", "data": [_row()], "note": "a\nb"})
+        self.assertTrue(frame.endswith("\n"))
+        self.assertEqual(frame.count("\n"), 1)
+        self.assertEqual(json.loads(frame)["note"], "a\nb")
+
+    def test_non_string_keys(self):
+        self.assertEqual(json.loads(dumps({12: "network"})), {"12": "network"})
+
+    def test_response_renders_utf8(self):
+        response = FastJSONResponse([_row()])
+        self.assertEqual(response.media_type, "application/json")
+        self.assertEqual(json.loads(response.body)[0]["owner"], "ÉCOLE LLC")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import sys
+import unittest
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+from synthetic_dataset import (
+    PROPERTY_COLUMNS, REGISTRAR_ADDRESSES, SENTINEL_PARCELS, SENTINEL_PRINCIPALS, SyntheticStatewide,
+)
+
+
+def materialize(dataset):
+    return {table: (columns, list(rows)) for table, columns, rows in dataset.tables()}
+
+
+class TestSyntheticStatewide(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tables = materialize(SyntheticStatewide(20_000, seed=7))
+
+    def test_same_seed_same_rows(self):
+        again = materialize(SyntheticStatewide(20_000, seed=7))
+        self.assertEqual(again, self.tables)
+        other = materialize(SyntheticStatewide(20_000, seed=8))
+        self.assertNotEqual(other["properties"][1][:100], self.tables["properties"][1][:100])
+
+    def test_rows_match_columns_and_references(self):
+        for table, (columns, rows) in self.tables.items():
+            self.assertTrue(rows, table)
+            self.assertTrue(all(len(row) == len(columns) for row in rows), table)
+        properties = self.tables["properties"][1]
+        self.assertEqual(len(properties), 20_000)
+        parcel_ids = {row[0] for row in properties}
+        self.assertEqual(len(parcel_ids), len(properties))
+        business_ids = {row[0] for row in self.tables["businesses"][1]}
+        self.assertEqual(len(business_ids), len(self.tables["businesses"][1]))
+        self.assertTrue(all(row[1] in business_ids for row in self.tables["principals"][1]))
+        self.assertTrue(all(row[2] in parcel_ids for row in self.tables["evictions"][1]))
+        self.assertTrue(all(row[0] in parcel_ids for row in self.tables["code_enforcement"][1]))
+
+    def test_sentinel_network_is_planted(self):
+        names = {f"{first} {last}" for first, last in SENTINEL_PRINCIPALS}
+        principals = self.tables["principals"][1]
+        sentinel_businesses = {row[1] for row in principals if row[2] in names}
+        self.assertEqual({row[2] for row in principals if row[1] in sentinel_businesses} & names, names)
+        sentinel_names = {row[1] for row in self.tables["businesses"][1] if row[0] in sentinel_businesses}
+        owner = PROPERTY_COLUMNS.index("owner")
+        owned = sum(1 for row in self.tables["properties"][1] if row[owner] in sentinel_names)
+        self.assertEqual(owned, SENTINEL_PARCELS)
+
+    def test_collisions_and_registrar_addresses(self):
+        dataset = SyntheticStatewide(20_000, seed=7)
+        by_name = Counter(row[2] for row in dataset.principals)
+        for name, count in dataset.planted["collisions"].items():
+            self.assertGreaterEqual(count, 15)
+            self.assertGreaterEqual(by_name[name], count)
+        registrar = {address for address, _, _ in REGISTRAR_ADDRESSES}
+        shared = sum(1 for row in dataset.businesses if row[10] in registrar)
+        self.assertEqual(shared, dataset.planted["registrar_businesses"])
+        self.assertGreater(shared, len(dataset.businesses) * 0.01)
+
+    def test_rejects_tiny_datasets(self):
+        with self.assertRaises(ValueError):
+            SyntheticStatewide(1_000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import re
+from collections import defaultdict
+
+# Unit designators as they appear in Vision street listings and our locations:
+# "12 MAIN ST #3", "12 MAIN ST UNIT 3", "12 MAIN ST APT 3B", "12 MAIN ST # 3"
+_UNIT_RE = re.compile(r'\s*(?:#|\b(?:UNIT|APT|APARTMENT|STE|SUITE)\b)\s*(\d[A-Z0-9-]*|[A-Z]\d*(?:-\d+)?)\s*$')
+_HOUSE_RE = re.compile(r'^(\d+[A-Z]?)(?:\s*-\s*(\d+[A-Z]?))?\s+(.*)$')
+_PUNCT_RE = re.compile(r'[.,]')
+
+# Whole-token forms normalize_address leaves alone ("PARK TERRACE" vs "PARK TER")
+_STREET_TOKENS = {
+    'STREET': 'ST', 'AVENUE': 'AVE', 'AV': 'AVE', 'ROAD': 'RD', 'DRIVE': 'DR', 'LANE': 'LN',
+    'COURT': 'CT', 'PLACE': 'PL', 'BOULEVARD': 'BLVD', 'CIRCLE': 'CIR', 'TERRACE': 'TER',
+    'PARKWAY': 'PKWY', 'HIGHWAY': 'HWY', 'TURNPIKE': 'TPKE', 'TPK': 'TPKE', 'EXTENSION': 'EXT',
+    'SQUARE': 'SQ', 'HEIGHTS': 'HTS', 'TRAIL': 'TRL', 'CROSSING': 'XING',
+    'NORTH': 'N', 'SOUTH': 'S', 'EAST': 'E', 'WEST': 'W',
+}
+
+
+def parse_address(normalized):
+    """
+    Splits a normalize_address() string into (house numbers, street tokens, unit).
+
+    A range such as "12-14 MAIN ST" yields both "12" and "14" so either end
+    finds it. Unit is None when the address has no designator.
+    """
+    text = _PUNCT_RE.sub('', normalized or '').strip()
+    unit = None
+    m = _UNIT_RE.search(text)
+    if m and m.start() > 0:
+        unit = m.group(1).lstrip('0') or m.group(1)
+        text = text[:m.start()].strip()
+    houses = ()
+    m = _HOUSE_RE.match(text)
+    if m:
+        houses = tuple(h for h in (m.group(1), m.group(2)) if h)
+        text = m.group(3)
+    return houses, tuple(_STREET_TOKENS.get(t, t) for t in text.split()), unit
+
+
+def _is_prefix(a, b):
+    """True if one token sequence starts with the other ("FARMINGTON AVE" / "FARMINGTON AVE EXT")."""
+    n = min(len(a), len(b))
+    return n > 0 and a[:n] == b[:n]
+
+
+def _contains(longer, shorter):
+    """True if `shorter` is a contiguous run of tokens inside `longer`."""
+    n = len(shorter)
+    if n == 0 or n > len(longer):
+        return False
+    return any(longer[i:i + n] == shorter for i in range(len(longer) - n + 1))
+
+
+class AddressIndex:
+    """
+    House-number / street-token index over scraped addresses for one
+    municipality run, replacing the per-lookup scan in find_match_for_property.
+
+    Built once from the {normalized address: record} dict returned by the
+    street scrape. match() tries, in order:
+      1. the exact normalized key
+      2. candidates sharing a house number whose street tokens are equal or
+         one starts with the other ("FARMINGTON AVE" / "FARMINGTON AVE EXT";
+         "MAIN ST" never matches "N MAIN ST")
+      3. for addresses without a house number, a street whose tokens contain
+         (or are contained in) the DB street, but only when exactly one
+         scraped address qualifies
+
+    A different unit number never matches. Among candidates, an identical
+    street beats a partial one, then an equal unit beats a building-level
+    record (or a unit record for a building-level location). Remaining
+    ties go to the lexicographically smallest key so results do not depend on
+    scrape order.
+    """
+
+    def __init__(self, scraped_properties):
+        self.records = scraped_properties
+        self._by_house = defaultdict(list)
+        self._by_street_token = defaultdict(set)
+        self._parsed = {}
+        for key in scraped_properties:
+            houses, street, unit = parse_address(key)
+            self._parsed[key] = (houses, street, unit)
+            for house in houses:
+                self._by_house[house].append(key)
+            for token in street:
+                self._by_street_token[token].add(key)
+
+    def __len__(self):
+        return len(self.records)
+
+    def match(self, normalized_address):
+        """Returns (key, record) of the best scraped address, or None."""
+        if not normalized_address:
+            return None
+        if normalized_address in self.records:
+            return normalized_address, self.records[normalized_address]
+
+        houses, street, unit = parse_address(normalized_address)
+        if not street:
+            return None
+
+        if houses:
+            candidates = {key for house in houses for key in self._by_house.get(house, ())}
+        else:
+            # Street-only locations (vacant lots, "RIVER RD"): intersect the token postings
+            postings = [self._by_street_token.get(token, set()) for token in street]
+            candidates = set.intersection(*postings) if postings else set()
+
+        best = None
+        qualifying = 0
+        for key in candidates:
+            c_street, c_unit = self._parsed[key][1:]
+            if c_street == street:
+                street_rank = 0
+            elif houses and _is_prefix(street, c_street):
+                street_rank = 1
+            elif not houses and (_contains(street, c_street) or _contains(c_street, street)):
+                street_rank = 1
+            else:
+                continue
+            if unit == c_unit:
+                unit_rank = 0
+            elif c_unit is None or unit is None:
+                unit_rank = 1
+            else:
+                continue  # Another unit's record never describes this one
+            qualifying += 1
+            rank = (street_rank, unit_rank, key)
+            if best is None or rank < best:
+                best = rank
+
+        if best is None:
+            return None
+        if not houses and qualifying != 1:
+            # Several parcels on the street: a lot record cannot be assigned to one of them
+            return None
+        return best[2], self.records[best[2]]
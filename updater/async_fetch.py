@@ -0,0 +1,200 @@
+import os
+import queue
+import asyncio
+import logging
+import functools
+import threading
+import concurrent.futures
+from urllib.parse import urlsplit
+
+from updater.host_governor import RETRIES, THROTTLE_STATUSES, retry_after_seconds
+from updater.scrape_cache import SCRAPE_UNCHANGED
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+# In-flight page fetches for one town
+ASYNC_FETCH_CONCURRENCY = int(os.environ.get("ASYNC_FETCH_CONCURRENCY", "32"))
+# Processes parsing HTML; 0 parses on the event loop's thread pool instead
+ASYNC_PARSE_WORKERS = int(os.environ.get("ASYNC_PARSE_WORKERS", str(max(1, (os.cpu_count() or 2) - 1))))
+# Threads for the blocking SQLite ScrapeCache calls; writes serialize anyway
+ASYNC_CACHE_WORKERS = 4
+
+_DONE = object()
+
+
+class AsyncPageFetcher:
+    """
+    Fetches detail pages with one httpx.AsyncClient under a concurrency bound
+    and parses them in a process pool, handing (job, record) pairs back to the
+    calling thread as they finish so the DB writer can consume them while
+    fetching continues.
+
+    Goes through the same ScrapeCache (conditional requests, unchanged-page
+    skip, stored records) and host governor as the threaded scrapers. The
+    event loop runs on its own thread; iterate results() from the thread that
+    owns the database connection. Closing the results() generator early
+    cancels the remaining fetches and shuts the pools down.
+    """
+
+    def __init__(self, cache, governors=None, concurrency=ASYNC_FETCH_CONCURRENCY, parse_workers=ASYNC_PARSE_WORKERS, transport=None):
+        if httpx is None:
+            raise RuntimeError("httpx is not installed")
+        self.cache = cache
+        self.transport = transport
+        self.governors = governors
+        self.concurrency = concurrency
+        self.parse_workers = parse_workers
+        self.stats = {"fetched": 0, "unchanged": 0, "parsed": 0, "failed": 0}
+
+    def results(self, jobs, parse, source, headers=None, skip_unchanged=True, verify=True, timeout=20):
+        """
+        jobs: iterable of (job_id, url). parse(content, url) must be picklable
+        (a module-level function or functools.partial of one).
+
+        Yields (job_id, url, record) where record is the parsed dict,
+        SCRAPE_UNCHANGED, or None when the page could not be fetched.
+        """
+        out = queue.Queue(maxsize=self.concurrency * 4)
+        jobs = list(jobs)
+        running = {}
+
+        def run():
+            try:
+                asyncio.run(self._main(jobs, parse, source, headers or {}, skip_unchanged, verify, timeout, out, running))
+            except BaseException as e:  # surface loop failures to the consumer
+                out.put(e)
+            finally:
+                out.put(_DONE)
+
+        thread = threading.Thread(target=run, name="async-page-fetcher", daemon=True)
+        thread.start()
+        finished = False
+        try:
+            while True:
+                item = out.get()
+                if item is _DONE:
+                    finished = True
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            if not finished:
+                # The consumer stopped early: cancel the loop, then drain so
+                # producers blocked on a full queue can exit
+                self._cancel(running)
+                while out.get() is not _DONE:
+                    pass
+            thread.join()
+
+    @staticmethod
+    def _cancel(running):
+        loop, task = running.get("loop"), running.get("task")
+        if loop is None:
+            return
+        try:
+            loop.call_soon_threadsafe(task.cancel)
+        except RuntimeError:  # loop already closed
+            pass
+
+    async def _main(self, jobs, parse, source, headers, skip_unchanged, verify, timeout, out, running):
+        loop = asyncio.get_running_loop()
+        running.update(loop=loop, task=asyncio.current_task())
+        semaphore = asyncio.Semaphore(self.concurrency)
+        # Governor slots and SQLite cache calls block, so they run on small thread pools
+        gate_pool = concurrent.futures.ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="fetch-gate")
+        cache_pool = concurrent.futures.ThreadPoolExecutor(max_workers=ASYNC_CACHE_WORKERS, thread_name_prefix="scrape-cache")
+        parse_pool = (
+            concurrent.futures.ProcessPoolExecutor(max_workers=self.parse_workers)
+            if self.parse_workers > 0 else None
+        )
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        try:
+            async with httpx.AsyncClient(headers=headers, verify=verify, timeout=timeout,
+                                         follow_redirects=True, limits=limits, transport=self.transport) as client:
+
+                async def one(job_id, url):
+                    async with semaphore:
+                        record = await self._fetch_and_parse(client, loop, gate_pool, cache_pool, parse_pool, url, parse, source, skip_unchanged)
+                    # Blocks the loop only while the consumer is behind, which is the backpressure we want
+                    await loop.run_in_executor(None, out.put, (job_id, url, record))
+
+                await asyncio.gather(*(one(job_id, url) for job_id, url in jobs))
+        finally:
+            gate_pool.shutdown(wait=False, cancel_futures=True)
+            cache_pool.shutdown(wait=True)
+            if parse_pool is not None:
+                parse_pool.shutdown(wait=True, cancel_futures=True)
+
+    async def _fetch_and_parse(self, client, loop, gate_pool, cache_pool, parse_pool, url, parse, source, skip_unchanged):
+        """One page; any failure is logged and counted so the rest of the town carries on."""
+        try:
+            return await self._fetch_page(client, loop, gate_pool, cache_pool, parse_pool, url, parse, source, skip_unchanged)
+        except Exception as e:
+            logger.exception(f"Fetch failed for {url}: {e}")
+            self.stats["failed"] += 1
+            return None
+
+    async def _fetch_page(self, client, loop, gate_pool, cache_pool, parse_pool, url, parse, source, skip_unchanged):
+        key, entry, conditional = await loop.run_in_executor(cache_pool, self.cache.prepare, url)
+        governor = None
+        if self.governors is not None and self.governors.enabled:
+            governor = self.governors.governor(urlsplit(url).hostname or "")
+
+        response = None
+        for attempt in range(RETRIES + 1):
+            if governor is not None:
+                await loop.run_in_executor(gate_pool, governor.acquire)
+            # The slot is released on every path, including errors and cancellation
+            outcome, retry_after = "error", None
+            try:
+                response = await client.get(url, headers=conditional)
+                if response.status_code in THROTTLE_STATUSES:
+                    outcome, retry_after = "throttled", retry_after_seconds(response)
+                else:
+                    outcome = "ok" if response.status_code < 400 else "error"
+            except httpx.RequestError as e:
+                # Timeouts, transport errors, redirect loops, undecodable bodies
+                if isinstance(e, (httpx.TimeoutException, httpx.TransportError)):
+                    outcome = "throttled"
+                logger.warning(f"Fetch failed for {url}: {e}")
+                self.stats["failed"] += 1
+                return None
+            finally:
+                if governor is not None:
+                    governor.release(outcome, retry_after)
+            if outcome == "throttled" and attempt < RETRIES:
+                await asyncio.sleep(retry_after if retry_after is not None else 2 ** attempt)
+                continue
+            break
+
+        self.stats["fetched"] += 1
+        page = await loop.run_in_executor(cache_pool, functools.partial(
+            self.cache.resolve, key, entry, source, response.status_code, str(response.url), response.content,
+            response.headers, encoding=response.encoding,
+        ))
+        try:
+            page.raise_for_status()
+        except Exception as e:
+            logger.warning(f"Fetch failed for {url}: {e}")
+            self.stats["failed"] += 1
+            return None
+
+        if page.unchanged:
+            self.stats["unchanged"] += 1
+            return SCRAPE_UNCHANGED if (skip_unchanged and self.cache.skip_unchanged) else page.record
+
+        try:
+            record = await loop.run_in_executor(parse_pool, parse, page.content, url)
+        except Exception as e:
+            logger.exception(f"Parse failed for {url}: {e}")
+            self.stats["failed"] += 1
+            return None
+        self.stats["parsed"] += 1
+        await loop.run_in_executor(cache_pool, self.cache.put_record, page, record)
+        return record
@@ -0,0 +1,262 @@
+import os
+import time
+import random
+import threading
+from collections import deque
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+HOST_GOVERNOR_ENABLED = os.environ.get("HOST_GOVERNOR", "1").lower() in ("1", "true", "yes")
+# Starting / ceiling / floor request rate per host (requests per second)
+GOVERNOR_RATE = float(os.environ.get("GOVERNOR_RATE", "5"))
+GOVERNOR_MAX_RATE = float(os.environ.get("GOVERNOR_MAX_RATE", "25"))
+GOVERNOR_MIN_RATE = float(os.environ.get("GOVERNOR_MIN_RATE", "0.5"))
+# Starting / ceiling in-flight requests per host, shared by every town and thread
+GOVERNOR_CONCURRENCY = int(os.environ.get("GOVERNOR_CONCURRENCY", "4"))
+GOVERNOR_MAX_CONCURRENCY = int(os.environ.get("GOVERNOR_MAX_CONCURRENCY", "24"))
+GOVERNOR_POOL_SIZE = int(os.environ.get("GOVERNOR_POOL_SIZE", "50"))
+GOVERNOR_REPORT_SECONDS = int(os.environ.get("GOVERNOR_REPORT_SECONDS", "60"))
+
+# Responses that mean "slow down" rather than "this page is broken"
+THROTTLE_STATUSES = {429, 502, 503, 504}
+RETRIES = 3
+
+# Scraper platform per host, for the throughput report
+PLATFORM_HOSTS = (
+    ("vgsi.com", "vision"),
+    ("propertyrecordcards.com", "propertyrecordcards"),
+    ("mapxpress.net", "mapxpress"),
+    ("mapgeo.io", "mapgeo"),
+    ("tighebond.com", "tighe_bond"),
+    ("actdatascout.com", "actdatascout"),
+)
+
+
+def platform_for_host(host):
+    for suffix, platform in PLATFORM_HOSTS:
+        if host == suffix or host.endswith("." + suffix):
+            return platform
+    return host
+
+
+def retry_after_seconds(response):
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+class HostGovernor:
+    """
+    Token bucket plus AIMD concurrency limit for one host.
+
+    acquire() blocks until an in-flight slot and a token are free. Each
+    success adds 1/limit to the concurrency limit (one slot per full window)
+    and a little rate; a throttle signal (429/5xx/timeout) halves both, at
+    most once per second, and honours Retry-After by pausing the host.
+    """
+
+    def __init__(self, host, rate=GOVERNOR_RATE, concurrency=GOVERNOR_CONCURRENCY,
+                 max_rate=GOVERNOR_MAX_RATE, min_rate=GOVERNOR_MIN_RATE,
+                 max_concurrency=GOVERNOR_MAX_CONCURRENCY):
+        self.host = host
+        self.platform = platform_for_host(host)
+        self.rate = rate
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.limit = float(concurrency)
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self._tokens = 1.0
+        self._refilled = time.monotonic()
+        self._paused_until = 0.0
+        self._last_backoff = 0.0
+        self._cond = threading.Condition()
+        self._completed = deque()  # monotonic completion times for the live rate
+        self.stats = {"requests": 0, "ok": 0, "throttled": 0, "error": 0, "backoffs": 0, "wait_seconds": 0.0}
+
+    def _refill(self, now):
+        self._tokens = min(max(self.rate, 1.0), self._tokens + (now - self._refilled) * self.rate)
+        self._refilled = now
+
+    def acquire(self):
+        start = time.monotonic()
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                elif self.in_flight >= int(self.limit):
+                    wait = None
+                elif self._tokens < 1.0:
+                    wait = (1.0 - self._tokens) / self.rate
+                else:
+                    self._tokens -= 1.0
+                    self.in_flight += 1
+                    self.stats["requests"] += 1
+                    self.stats["wait_seconds"] += now - start
+                    return
+                self._cond.wait(wait)
+
+    def release(self, outcome, retry_after=None):
+        """outcome is 'ok', 'throttled' or 'error' (non-throttle failures do not change the limits)."""
+        with self._cond:
+            now = time.monotonic()
+            self.in_flight -= 1
+            self.stats[outcome] += 1
+            if outcome == "ok":
+                self._completed.append(now)
+                self.limit = min(self.max_concurrency, self.limit + 1.0 / max(self.limit, 1.0))
+                self.rate = min(self.max_rate, self.rate + 0.1)
+            elif outcome == "throttled":
+                if now - self._last_backoff >= 1.0:
+                    self._last_backoff = now
+                    self.stats["backoffs"] += 1
+                    self.limit = max(1.0, self.limit / 2)
+                    self.rate = max(self.min_rate, self.rate / 2)
+                if retry_after:
+                    self._paused_until = max(self._paused_until, now + retry_after)
+            self._cond.notify_all()
+
+    def throughput(self, window=60.0):
+        """Successful requests per second over the last `window` seconds."""
+        with self._cond:
+            cutoff = time.monotonic() - window
+            while self._completed and self._completed[0] < cutoff:
+                self._completed.popleft()
+            return len(self._completed) / window
+
+    def snapshot(self):
+        with self._cond:
+            return {
+                "host": self.host,
+                "platform": self.platform,
+                "rate": round(self.rate, 2),
+                "limit": int(self.limit),
+                "in_flight": self.in_flight,
+                **{k: (round(v, 1) if isinstance(v, float) else v) for k, v in self.stats.items()},
+            }
+
+
+class HostGovernorRegistry:
+    """Process-wide HostGovernors and shared connection pools, one per host."""
+
+    def __init__(self, enabled=HOST_GOVERNOR_ENABLED):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._governors = {}
+        self._adapters = {}
+        self._reporter = None
+
+    def governor(self, host):
+        with self._lock:
+            gov = self._governors.get(host)
+            if gov is None:
+                gov = self._governors[host] = HostGovernor(host)
+            return gov
+
+    def adapter(self, host):
+        """One urllib3 pool per host shared by every session, so towns on the same host reuse connections."""
+        with self._lock:
+            adapter = self._adapters.get(host)
+            if adapter is None:
+                # Status retries happen in GovernedSession so the governor sees them
+                adapter = HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=GOVERNOR_POOL_SIZE,
+                    max_retries=Retry(total=RETRIES, status=0, backoff_factor=1),
+                )
+                self._adapters[host] = adapter
+            return adapter
+
+    def report(self, window=60.0):
+        """Per-platform live throughput lines for the progress log."""
+        with self._lock:
+            governors = list(self._governors.values())
+        by_platform = {}
+        for gov in governors:
+            entry = by_platform.setdefault(gov.platform, {"rps": 0.0, "hosts": []})
+            entry["rps"] += gov.throughput(window)
+            entry["hosts"].append(gov.snapshot())
+        lines = []
+        for platform, entry in sorted(by_platform.items()):
+            hosts = entry["hosts"]
+            lines.append(
+                f"{platform}: {entry['rps']:.1f} req/s over {window:.0f}s, "
+                f"{sum(h['ok'] for h in hosts):,} ok / {sum(h['throttled'] for h in hosts):,} throttled / "
+                f"{sum(h['error'] for h in hosts):,} errors, "
+                + ", ".join(f"{h['host']} limit {h['limit']} @ {h['rate']}/s" for h in hosts)
+            )
+        return lines
+
+    def start_reporter(self, emit, interval=GOVERNOR_REPORT_SECONDS):
+        """Calls emit(line) for each platform every `interval` seconds from a daemon thread."""
+        if not self.enabled or interval <= 0 or self._reporter is not None:
+            return
+
+        def run():
+            while True:
+                time.sleep(interval)
+                for line in self.report(window=float(interval)):
+                    emit(f"📶 {line}")
+
+        self._reporter = threading.Thread(target=run, name="host-governor-report", daemon=True)
+        self._reporter.start()
+
+
+class GovernedSession(requests.Session):
+    """
+    requests.Session whose requests pass through the host's governor and use
+    the host's shared connection pool. Cookies and headers stay per session
+    (ASP.NET sites keep state in them); only pacing and sockets are shared.
+
+    429/502/503/504 are retried up to RETRIES times after the governor backs
+    off, matching the status retries the plain sessions had.
+    """
+
+    governed = True
+
+    def __init__(self, registry):
+        super().__init__()
+        self.registry = registry
+
+    def get_adapter(self, url):
+        host = urlsplit(url).hostname
+        if host:
+            return self.registry.adapter(host)
+        return super().get_adapter(url)
+
+    def request(self, method, url, *args, **kwargs):
+        host = urlsplit(url).hostname or ""
+        governor = self.registry.governor(host)
+        for attempt in range(RETRIES + 1):
+            governor.acquire()
+            try:
+                response = super().request(method, url, *args, **kwargs)
+            except (requests.Timeout, requests.ConnectionError):
+                governor.release("throttled")
+                raise
+            except Exception:
+                governor.release("error")
+                raise
+            if response.status_code in THROTTLE_STATUSES:
+                retry_after = retry_after_seconds(response)
+                governor.release("throttled", retry_after)
+                if attempt < RETRIES:
+                    response.close()
+                    time.sleep(retry_after if retry_after is not None else (2 ** attempt) * (0.5 + random.random()))
+                    continue
+                return response
+            governor.release("ok" if response.status_code < 400 else "error")
+            return response
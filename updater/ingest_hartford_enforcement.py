@@ -10,6 +10,7 @@ from email.utils import parsedate_to_datetime
 
 # Add parent directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from api.activity_stats import ensure_property_activity_stats, refresh_property_activity_stats
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -84,6 +85,8 @@ def ingest_csv(csv_path, external_last_updated=None):
     
     conn = get_db_connection()
     ensure_schema(conn)
+    # Triggers must be in place before the upsert so changed properties are marked
+    activity_stats = ensure_property_activity_stats(conn)
     cur = conn.cursor()
     
     # 1. Build ParcelID -> property_id mapping for Hartford
@@ -192,6 +195,7 @@ def ingest_csv(csv_path, external_last_updated=None):
         deleted_stale = 0
     conn.commit()
     logger.info(f"Successfully ingested/updated {len(ingest_data)} enforcement records.")
+    activity_refreshed = refresh_property_activity_stats(conn) if activity_stats else 0
 
     linked_count = sum(1 for row in ingest_data if row[0] is not None)
     update_status(conn, "success", {
@@ -200,6 +204,7 @@ def ingest_csv(csv_path, external_last_updated=None):
         "matched_records": linked_count,
         "records_without_local_property": len(ingest_data) - linked_count,
         "removed_records_not_in_current_source": deleted_stale,
+        "activity_stats_refreshed": activity_refreshed,
     }, external_last_updated)
     
     cur.close()
@@ -0,0 +1,353 @@
+import os
+import re
+import json
+import zlib
+import time
+import sqlite3
+import hashlib
+import threading
+from datetime import date, datetime
+from urllib.parse import urlencode
+
+import requests
+
+SCRAPE_CACHE_ENABLED = os.environ.get("SCRAPE_CACHE", "1").lower() in ("1", "true", "yes")
+SCRAPE_CACHE_PATH = os.environ.get(
+    "SCRAPE_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scrape_cache.sqlite3"),
+)
+# Raw bodies are what replay re-parses; set to 0 to keep only hashes and records
+SCRAPE_CACHE_BODIES = os.environ.get("SCRAPE_CACHE_BODIES", "1").lower() in ("1", "true", "yes")
+
+# ASP.NET pages (Vision, PropertyRecordCards) re-issue these on every load;
+# they are stripped before hashing so an unchanged parcel hashes the same.
+_VOLATILE_FIELDS = re.compile(
+    rb'(<input[^>]+name="(?:__VIEWSTATE|__VIEWSTATEGENERATOR|__EVENTVALIDATION|__REQUESTDIGEST)"[^>]*>)',
+    re.IGNORECASE,
+)
+
+DDL_SCRAPE_PAGES = """
+    CREATE TABLE IF NOT EXISTS scrape_pages (
+        url TEXT PRIMARY KEY,
+        source TEXT,
+        final_url TEXT,
+        status INTEGER,
+        body_hash TEXT,
+        etag TEXT,
+        last_modified TEXT,
+        body BLOB,
+        record TEXT,
+        record_dirty INTEGER NOT NULL DEFAULT 0,
+        db_applied INTEGER NOT NULL DEFAULT 0,
+        fetched_at REAL,
+        checked_at REAL
+    )
+"""
+
+
+def cache_key(url, params=None):
+    if not params:
+        return url
+    return f"{url}{'&' if '?' in url else '?'}{urlencode(sorted(params.items()), doseq=True)}"
+
+
+def body_hash(content):
+    return hashlib.sha256(_VOLATILE_FIELDS.sub(b"", content or b"")).hexdigest()
+
+
+def _encode_record(record):
+    def default(o):
+        if isinstance(o, datetime):
+            return {"__datetime__": o.isoformat()}
+        if isinstance(o, date):
+            return {"__date__": o.isoformat()}
+        return str(o)
+    return json.dumps(record, default=default, sort_keys=True)
+
+
+def _decode_record(text):
+    def hook(d):
+        if len(d) == 1:
+            if "__date__" in d:
+                return date.fromisoformat(d["__date__"])
+            if "__datetime__" in d:
+                return datetime.fromisoformat(d["__datetime__"])
+        return d
+    return json.loads(text, object_hook=hook) if text else None
+
+
+class CachedPage:
+    """The subset of requests.Response the scrapers use.
+
+    `unchanged` is True when the server answered 304 or returned the same
+    body as last time and the record parsed from it reached the database;
+    `record` is then that record.
+    """
+
+    def __init__(self, url, status_code, content, key=None, unchanged=False, record=None, encoding=None):
+        self.url = url
+        self.status_code = status_code
+        self.content = content or b""
+        self.key = key or url
+        self.unchanged = unchanged
+        self.record = record
+        self.encoding = encoding or "utf-8"
+
+    @classmethod
+    def from_response(cls, response, key, **kwargs):
+        return cls(response.url, response.status_code, response.content, key=key,
+                   encoding=response.encoding or response.apparent_encoding, **kwargs)
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}")
+
+
+class ScrapeCache:
+    """Per-URL store of body hash, validators, raw body and parsed record.
+
+    get() sends If-None-Match/If-Modified-Since when a record is on file and
+    flags the page `unchanged` on a 304 or an identical body hash, so callers
+    can skip both parsing and the database. put_record() stores what the
+    caller parsed; the page only counts as unchanged once the writer reports
+    the record committed through mark_applied(), so a write that fails or is
+    lost before a flush is retried on the next run. replay() re-parses stored
+    bodies without network access.
+
+    Backed by SQLite (one connection per thread, WAL) so parallel scraper
+    threads and municipality workers can share it.
+    """
+
+    def __init__(self, path=SCRAPE_CACHE_PATH, enabled=SCRAPE_CACHE_ENABLED, store_bodies=SCRAPE_CACHE_BODIES):
+        self.path = path
+        self.enabled = enabled
+        self.store_bodies = store_bodies
+        # Cleared by --force so unchanged pages still get their database pass
+        self.skip_unchanged = True
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        # id(record) -> (page key, record) for records parsed but not yet written
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self.stats = {"fetched": 0, "not_modified": 0, "same_hash": 0, "changed": 0}
+
+    def _db(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(DDL_SCRAPE_PAGES)
+            columns = {row[1] for row in db.execute("PRAGMA table_info(scrape_pages)")}
+            if "db_applied" not in columns:
+                # Caches from before the flag: every page gets one more database pass
+                db.execute("ALTER TABLE scrape_pages ADD COLUMN db_applied INTEGER NOT NULL DEFAULT 0")
+            db.execute("CREATE INDEX IF NOT EXISTS scrape_pages_source_idx ON scrape_pages (source)")
+            db.commit()
+            self._local.db = db
+        return db
+
+    def _bump(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _lookup(self, key):
+        row = self._db().execute(
+            "SELECT final_url, body_hash, etag, last_modified, body, record, record_dirty, db_applied FROM scrape_pages WHERE url = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        final_url, digest, etag, last_modified, body, record, dirty, applied = row
+        return {
+            "final_url": final_url,
+            "body_hash": digest,
+            "etag": etag,
+            "last_modified": last_modified,
+            "body": zlib.decompress(body) if body else None,
+            "record": record,
+            "record_dirty": bool(dirty),
+            "db_applied": bool(applied),
+        }
+
+    def get(self, session, url, source=None, params=None, **kwargs):
+        """session.get() through the cache; returns a CachedPage."""
+        key, entry, conditional = self.prepare(url, params)
+        if not self.enabled:
+            return CachedPage.from_response(session.get(url, params=params, **kwargs), key)
+        headers = dict(kwargs.pop("headers", None) or {})
+        headers.update(conditional)
+        response = session.get(url, params=params, headers=headers, **kwargs)
+        return self.resolve(
+            key, entry, source, response.status_code, response.url, response.content, response.headers,
+            encoding=response.encoding or response.apparent_encoding,
+        )
+
+    def prepare(self, url, params=None):
+        """Returns (key, cached entry, conditional request headers) for a fetch of `url`."""
+        key = cache_key(url, params)
+        if not self.enabled:
+            return key, None, {}
+        entry = self._lookup(key)
+        headers = {}
+        if _reusable(entry):
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return key, entry, headers
+
+    def resolve(self, key, entry, source, status_code, final_url, content, response_headers, encoding=None):
+        """Turns a response fetched with prepare()'s headers into a CachedPage, updating the cache.
+
+        Shared by get() and the async fetcher, which makes its own requests.
+        """
+        if not self.enabled:
+            return CachedPage(final_url, status_code, content, key=key, encoding=encoding)
+        reusable = _reusable(entry)
+        self._bump("fetched")
+        now = time.time()
+
+        if status_code == 304 and reusable:
+            self._bump("not_modified")
+            self._touch(key, now)
+            return CachedPage(entry["final_url"] or final_url, 200, entry["body"], key=key,
+                              unchanged=True, record=_decode_record(entry["record"]))
+
+        if status_code != 200:
+            return CachedPage(final_url, status_code, content, key=key, encoding=encoding)
+
+        digest = body_hash(content)
+        etag = response_headers.get("ETag")
+        last_modified = response_headers.get("Last-Modified")
+        if reusable and digest == entry["body_hash"]:
+            self._bump("same_hash")
+            self._touch(key, now, etag, last_modified)
+            return CachedPage(final_url, status_code, content, key=key, encoding=encoding,
+                              unchanged=True, record=_decode_record(entry["record"]))
+
+        self._bump("changed")
+        body = zlib.compress(content) if self.store_bodies else None
+        db = self._db()
+        db.execute("""
+            INSERT INTO scrape_pages (url, source, final_url, status, body_hash, etag, last_modified, body, record, record_dirty, fetched_at, checked_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, NULL, 0, ?, ?)
+            ON CONFLICT (url) DO UPDATE SET
+                source = COALESCE(excluded.source, scrape_pages.source),
+                final_url = excluded.final_url, status = excluded.status,
+                body_hash = excluded.body_hash, etag = excluded.etag,
+                last_modified = excluded.last_modified, body = excluded.body,
+                record = NULL, record_dirty = 0, db_applied = 0,
+                fetched_at = excluded.fetched_at, checked_at = excluded.checked_at
+        """, (key, source, final_url, status_code, digest, etag, last_modified, body, now, now))
+        db.commit()
+        return CachedPage(final_url, status_code, content, key=key, encoding=encoding)
+
+    def put_record(self, page, record):
+        """Stores the record parsed from `page`; pass the same object to
+        mark_applied() once it is committed to the database."""
+        if not self.enabled or record is None:
+            return
+        db = self._db()
+        db.execute(
+            "UPDATE scrape_pages SET record = ?, record_dirty = 0, db_applied = 0 WHERE url = ?",
+            (_encode_record(record), page.key),
+        )
+        db.commit()
+        with self._pending_lock:
+            self._pending[id(record)] = (page.key, record)
+
+    def mark_applied(self, records):
+        """Flags the pages of committed records so identical refetches are skipped.
+
+        Records that did not come from put_record() are ignored.
+        """
+        if not self.enabled:
+            return
+        keys = []
+        with self._pending_lock:
+            for record in records:
+                pending = self._pending.get(id(record))
+                if pending is not None and pending[1] is record:
+                    del self._pending[id(record)]
+                    keys.append((pending[0],))
+        if keys:
+            db = self._db()
+            db.executemany("UPDATE scrape_pages SET db_applied = 1 WHERE url = ? AND record IS NOT NULL", keys)
+            db.commit()
+
+    def _touch(self, key, now, etag=None, last_modified=None):
+        db = self._db()
+        db.execute(
+            "UPDATE scrape_pages SET checked_at = ?, etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) WHERE url = ?",
+            (now, etag, last_modified, key),
+        )
+        db.commit()
+
+    def replay(self, parsers, source=None, limit=None):
+        """Re-parses stored bodies with `parsers[source](page)` without touching the network.
+
+        Records that come out different are saved and marked dirty, so the
+        next live run sends those pages through the database again even if
+        the site has not changed. Yields (url, source, record) per page.
+        """
+        if not self.enabled:
+            return
+        db = self._db()
+        query = "SELECT url, source, final_url, body FROM scrape_pages WHERE body IS NOT NULL AND status = 200"
+        args = []
+        if source:
+            query += " AND source = ?"
+            args.append(source)
+        query += " ORDER BY url"
+        if limit:
+            query += " LIMIT ?"
+            args.append(int(limit))
+        rows = db.execute(query, args).fetchall()
+        for key, row_source, final_url, body in rows:
+            parse = parsers.get(row_source)
+            if parse is None:
+                continue
+            page = CachedPage(final_url or key, 200, zlib.decompress(body), key=key)
+            record = parse(page)
+            if record is not None:
+                encoded = _encode_record(record)
+                db.execute(
+                    "UPDATE scrape_pages SET record = ?, record_dirty = CASE WHEN record IS ? THEN record_dirty ELSE 1 END WHERE url = ?",
+                    (encoded, encoded, key),
+                )
+            yield key, row_source, record
+        db.commit()
+
+    def summary(self):
+        if not self.enabled:
+            return {}
+        counts = dict(self._db().execute(
+            "SELECT COALESCE(source, 'unknown'), COUNT(*) FROM scrape_pages GROUP BY 1"
+        ).fetchall())
+        with self._stats_lock:
+            return {"pages": counts, **self.stats}
+
+
+def _reusable(entry):
+    return entry is not None and entry["record"] is not None and not entry["record_dirty"] and entry["db_applied"]
+
+
+class _Unchanged:
+    """Falsy marker a scraper returns when its page is unchanged since the last run."""
+
+    def __bool__(self):
+        return False
+
+    def __repr__(self):
+        return "SCRAPE_UNCHANGED"
+
+
+SCRAPE_UNCHANGED = _Unchanged()
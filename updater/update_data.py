@@ -2,6 +2,7 @@ import threading
 import os
 import json
 import pandas as pd
+import numpy as np
 import time
 import psycopg2
 from psycopg2 import sql
@@ -15,7 +16,9 @@ from requests.compat import urljoin
 import sys
 import random
 import traceback
+import functools
 from io import StringIO
+from collections import defaultdict
 import argparse
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
@@ -28,6 +31,11 @@ except ImportError:
     print("Warning: Could not import safe_network_refresh. Network rebuilding will be skipped.")
     run_refresh = None
 from shared_utils import normalize_business_name
+from network_payload_cache import bump_network_data_version
+from updater.scrape_cache import ScrapeCache, SCRAPE_UNCHANGED
+from updater.address_index import AddressIndex
+from updater.host_governor import HostGovernorRegistry, GovernedSession
+from updater import async_fetch
 
 # Suppress only the single InsecureRequestWarning from urllib3 needed for this script
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -56,6 +64,13 @@ except ImportError as e:
 GEODATA_CACHE = {}
 GEODATA_LOCK = threading.Lock()
 
+# --- Scrape cache for per-parcel detail pages (see updater/scrape_cache.py) ---
+SCRAPE_CACHE = ScrapeCache()
+# Per-host pacing and connection pools shared by every scraper thread and town
+HOST_GOVERNOR = HostGovernorRegistry()
+# Vision fast path on httpx/asyncio with process-pool parsing (--async-fetch)
+ASYNC_FAST_PATH = os.environ.get("ASYNC_FETCH", "0").lower() in ("1", "true", "yes")
+
 # --- Logging ---
 def log(message, municipality=None):
     """Prints a message with a timestamp and optional municipality prefix."""
@@ -360,6 +375,20 @@ def download_arcgis_csv(url, municipality_name):
         log(f"Error downloading ArcGIS CSV for {municipality_name}: {e}")
         return None
 
+# Common address normalizations for better matching
+ADDRESS_NORMALIZATIONS = {
+    ' STREET': ' ST',
+    ' AVENUE': ' AVE',
+    ' ROAD': ' RD',
+    ' DRIVE': ' DR',
+    ' LANE': ' LN',
+    ' COURT': ' CT',
+    ' PLACE': ' PL',
+    ' BOULEVARD': ' BLVD',
+    ' CIRCLE': ' CIR'
+}
+
+
 def normalize_address_for_matching(address):
     """Normalizes an address for consistent matching."""
     if not address:
@@ -368,20 +397,7 @@ def normalize_address_for_matching(address):
     # Convert to uppercase and normalize whitespace
     normalized = ' '.join(str(address).upper().strip().split())
 
-    # Common address normalizations for better matching
-    normalizations = {
-        ' STREET': ' ST',
-        ' AVENUE': ' AVE',
-        ' ROAD': ' RD',
-        ' DRIVE': ' DR',
-        ' LANE': ' LN',
-        ' COURT': ' CT',
-        ' PLACE': ' PL',
-        ' BOULEVARD': ' BLVD',
-        ' CIRCLE': ' CIR'
-    }
-
-    for old, new in normalizations.items():
+    for old, new in ADDRESS_NORMALIZATIONS.items():
         normalized = normalized.replace(old, new)
 
     return normalized
@@ -396,102 +412,131 @@ def is_placeholder_address(addr):
         return True
     return False
 
-def process_arcgis_data(df, column_mapping, municipality_name):
-    """Processes ArcGIS DataFrame and returns a dictionary mapping addresses to A LIST OF property data dicts."""
-    log(f"Processing {len(df)} ArcGIS records for {municipality_name}...")
+ARCGIS_NUMERIC_FIELDS = ['sale_amount', 'assessed_value', 'appraised_value', 'living_area', 'acres', 'number_of_units']
+ARCGIS_DATE_FORMATS = ['%Y-%m-%d', '%m/%d/%Y', '%Y/%m/%d']
 
-    processed_data = {}
 
-    for _, row in df.iterrows():
-        try:
-            # Build the address from available components
-            address_parts = []
-            if pd.notna(row.get('StreetNumberFrom')):
-                address_parts.append(str(int(row['StreetNumberFrom'])))
-            if pd.notna(row.get('StreetName')):
-                address_parts.append(str(row['StreetName']))
-
-            if not address_parts:
-                continue
+def normalize_address_series(addresses):
+    """Column-wise normalize_address_for_matching for non-empty address strings."""
+    normalized = addresses.astype(str).str.upper().str.split().str.join(' ')
+    for old, new in ADDRESS_NORMALIZATIONS.items():
+        normalized = normalized.str.replace(old, new, regex=False)
+    return normalized
 
-            full_address = ' '.join(address_parts)
-            normalized_address = normalize_address_for_matching(full_address)
 
-            if not normalized_address:
-                continue
+def _parse_money_series(values):
+    """'$1,234' / 1234.0 -> 1234.0; anything unparseable is NaN."""
+    return pd.to_numeric(values.astype(str).str.replace(r'[$,]', '', regex=True), errors='coerce').where(values.notna())
 
-            # Map the data using the column mapping
-            property_data = {}
 
-            # Set the location directly from the constructed full address
-            if full_address.strip():
-                property_data['location'] = full_address.strip()
+def _parse_date_series(values, formats, infer_rest=False):
+    """
+    Parses a column with each explicit format in turn; values still unparsed
+    are inferred per element when infer_rest is set. Returns datetime.date
+    objects (None when unparseable).
+    """
+    text = values.astype(object).where(values.map(lambda v: isinstance(v, str))).str.strip()
+    parsed = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+    for fmt in formats:
+        missing = parsed.isna() & text.notna()
+        if not missing.any():
+            break
+        parsed[missing] = pd.to_datetime(text[missing], format=fmt, errors='coerce')
+    if infer_rest:
+        missing = parsed.isna() & values.notna()
+        if missing.any():
+            parsed[missing] = pd.to_datetime(values[missing].astype(str), format='mixed', errors='coerce', utc=True).dt.tz_localize(None)
+    return parsed.dt.date.where(parsed.notna(), None)
+
+
+def _frame_to_records(out):
+    """Rows of `out` as dicts without their missing (None/NaN) fields."""
+    out = out.astype(object).where(out.notna(), None)
+    return [{k: v for k, v in rec.items() if v is not None} for rec in out.to_dict('records')]
+
+
+def _group_by_address(norm_addresses, records):
+    processed_data = {}
+    for norm_addr, record in zip(norm_addresses, records):
+        processed_data.setdefault(norm_addr, []).append(record)
+    return processed_data
 
-            for source_col, target_col in column_mapping.items():
-                if source_col in row.index and pd.notna(row[source_col]):
-                    value = row[source_col]
 
-                    # Handle different data types
-                    if target_col in ['sale_amount', 'assessed_value', 'appraised_value', 'living_area', 'acres', 'number_of_units']:
-                        try:
-                            # Remove any currency symbols and convert to float
-                            if isinstance(value, str):
-                                value = re.sub(r'[$,]', '', value)
-                            numeric_value = float(value)
-                            if numeric_value > 0:  # Only store positive values
-                                property_data[target_col] = numeric_value
-                        except (ValueError, TypeError):
-                            pass
-                    elif target_col == 'sale_date':
-                        try:
-                            if isinstance(value, str) and value.strip():
-                                # Try different date formats
-                                for fmt in ['%Y-%m-%d', '%m/%d/%Y', '%Y/%m/%d']:
-                                    try:
-                                        property_data[target_col] = datetime.strptime(value.strip(), fmt).date()
-                                        break
-                                    except ValueError:
-                                        continue
-                        except Exception:
-                            pass
-                    elif target_col == 'year_built':
-                        try:
-                            year = int(float(value))
-                            if 1600 <= year <= datetime.now().year:  # Reasonable year range
-                                property_data[target_col] = year
-                        except (ValueError, TypeError):
-                            pass
-                    else:
-                        # String fields
-                        if isinstance(value, str) and value.strip():
-                            property_data[target_col] = value.strip()
-                        elif pd.notna(value):
-                            property_data[target_col] = str(value).strip()
-
-            # --- Auto-Calculate missing values ---
-            if 'appraised_value' in property_data and property_data['appraised_value'] > 0:
-                if 'assessed_value' not in property_data or not property_data['assessed_value']:
-                    property_data['assessed_value'] = round(property_data['appraised_value'] * 0.70, 2)
-            elif 'assessed_value' in property_data and property_data['assessed_value'] > 0:
-                if 'appraised_value' not in property_data or not property_data['appraised_value']:
-                    property_data['appraised_value'] = round(property_data['assessed_value'] / 0.70, 2)
-
-            # Only store if we have meaningful data
-            if len(property_data) >= 2:  # At least owner and one other field
-                # Fallback: Inference for missing unit
-                if 'unit' not in property_data or not property_data['unit']:
-                    import re
-                    m = re.search(r'\s([A-Z]|\d{1,4})$', full_address)
-                    if m:
-                        property_data['unit'] = m.group(1)
-
-                if normalized_address not in processed_data:
-                    processed_data[normalized_address] = []
-                processed_data[normalized_address].append(property_data)
+def _apply_70_percent_rule(out):
+    """Fills a missing assessed value from appraised (x0.70) or the reverse."""
+    appraised = pd.to_numeric(out['appraised_value'], errors='coerce') if 'appraised_value' in out else pd.Series(float('nan'), index=out.index)
+    assessed = pd.to_numeric(out['assessed_value'], errors='coerce') if 'assessed_value' in out else pd.Series(float('nan'), index=out.index)
+    has_appraised = appraised > 0
+    fill_assessed = has_appraised & (assessed.isna() | (assessed == 0))
+    fill_appraised = ~has_appraised & (assessed > 0) & (appraised.isna() | (appraised == 0))
+    if fill_assessed.any():
+        out['assessed_value'] = out.get('assessed_value', pd.Series(None, index=out.index, dtype=object)).astype(object)
+        out.loc[fill_assessed, 'assessed_value'] = (appraised[fill_assessed] * 0.70).round(2)
+    if fill_appraised.any():
+        out['appraised_value'] = out.get('appraised_value', pd.Series(None, index=out.index, dtype=object)).astype(object)
+        out.loc[fill_appraised, 'appraised_value'] = (assessed[fill_appraised] / 0.70).round(2)
 
-        except Exception as e:
-            log(f"Error processing row: {e}")
+
+def process_arcgis_data(df, column_mapping, municipality_name):
+    """
+    Processes ArcGIS DataFrame and returns a dictionary mapping addresses to A LIST OF property data dicts.
+
+    Transforms run column-wise (to_numeric, explicit-format to_datetime,
+    str.extract); only the final grouping walks the rows.
+    """
+    log(f"Processing {len(df)} ArcGIS records for {municipality_name}...")
+
+    # Build the address from available components
+    house = df['StreetNumberFrom'] if 'StreetNumberFrom' in df else pd.Series(None, index=df.index, dtype=object)
+    street = df['StreetName'] if 'StreetName' in df else pd.Series(None, index=df.index, dtype=object)
+    house_num = pd.to_numeric(house, errors='coerce')
+    # A house number that is present but not numeric made the row unusable
+    usable = ~(house.notna() & house_num.isna())
+    house_text = house_num.dropna().astype('int64').astype(str).reindex(df.index)
+    full_address = (
+        house_text.fillna('') + ' ' + street.where(street.notna(), '').astype(str)
+    ).str.strip()
+    full_address = full_address.where(usable & (house.notna() | street.notna()))
+    normalized = normalize_address_series(full_address.fillna(''))
+    usable &= full_address.notna() & (normalized != '')
+
+    out = pd.DataFrame(index=df.index)
+    out['location'] = full_address.where(full_address.str.strip() != '')
+
+    this_year = datetime.now().year
+    for source_col, target_col in column_mapping.items():
+        if source_col not in df:
             continue
+        values = df[source_col]
+        if target_col in ARCGIS_NUMERIC_FIELDS:
+            # Only store positive values
+            parsed = _parse_money_series(values)
+            parsed = parsed.where(parsed > 0)
+        elif target_col == 'sale_date':
+            parsed = _parse_date_series(values, ARCGIS_DATE_FORMATS)
+        elif target_col == 'year_built':
+            years = np.trunc(pd.to_numeric(values, errors='coerce'))
+            parsed = years.where((years >= 1600) & (years <= this_year)).astype('Int64')  # Reasonable year range
+        else:
+            # String fields
+            parsed = values.where(values.isna(), values.astype(str).str.strip())
+        # A later source column for the same target overrides an earlier one
+        out[target_col] = parsed.astype(object).where(parsed.notna(), out[target_col] if target_col in out else None)
+
+    # --- Auto-Calculate missing values ---
+    _apply_70_percent_rule(out)
+
+    # Only store if we have meaningful data (at least owner and one other field)
+    usable &= out.notna().sum(axis=1) >= 2
+
+    # Fallback: Inference for missing unit
+    inferred_unit = full_address.str.extract(r'\s([A-Z]|\d{1,4})$', expand=False)
+    if 'unit' not in out:
+        out['unit'] = None
+    needs_unit = (out['unit'].isna() | (out['unit'] == '')) & inferred_unit.notna()
+    out.loc[needs_unit, 'unit'] = inferred_unit[needs_unit]
+
+    processed_data = _group_by_address(normalized[usable], _frame_to_records(out[usable]))
 
     log(f"Successfully processed address records for {municipality_name}")
     return processed_data
@@ -535,14 +580,14 @@ def process_municipality_with_arcgis(conn, municipality_name, data_source_config
 
     log(f"Matching {len(db_properties)} DB properties (grouped by {len(db_props_by_address)} addresses) against ArcGIS records...")
 
-    updated_count = 0
+    writer = PropertyWriteBehind(conn, municipality_name)
     processed_count = 0
 
     for norm_addr, prop_ids in db_props_by_address.items():
         # SKIP PLACEHOLDERS: Do not attempt matching if the address is a known placeholder
         if is_placeholder_address(norm_addr):
             for prop_id in prop_ids:
-                mark_property_processed_today(conn, prop_id)
+                writer.mark_processed(prop_id)
             processed_count += len(prop_ids) # Increment processed_count for skipped properties
             continue
 
@@ -563,23 +608,21 @@ def process_municipality_with_arcgis(conn, municipality_name, data_source_config
             # For now, blind distribution is better than overwriting all with the SAME record.
 
             for prop_id, vision_data in zip(prop_ids, matched_data_list):
-                 if update_property_in_db(conn, prop_id, vision_data):
-                    updated_count += 1
+                writer.add(prop_id, vision_data)
 
         # Mark all as processed even if not matched
         for prop_id in prop_ids:
-            mark_property_processed_today(conn, prop_id)
+            writer.mark_processed(prop_id)
 
         processed_count += len(prop_ids)
         if processed_count % 100 == 0:
-            log(f"  -> Progress: {processed_count}/{len(db_properties)}, updated {updated_count} so far...")
-
-        mark_property_processed_today(conn, prop_id)
+            log(f"  -> Progress: {processed_count}/{len(db_properties)}, updated {writer.updated} so far...")
 
+    updated_count = writer.close()
     log(f"Finished {municipality_name}. Updated {updated_count} of {len(db_properties)} properties.")
 
     # --- AUTOMATIC FRESHNESS UPDATE ---
-    update_freshness_status(conn, municipality_name, 'arcgis', 'Success', details=f"Scraped {updated_count} properties.")
+    update_freshness_status(conn, municipality_name, 'arcgis', 'Success', details=f"Scraped {updated_count} properties.", data_changed=bool(updated_count))
 
     return updated_count
 
@@ -611,6 +654,110 @@ def download_ct_geodata_csv(url):
             log(f"Error loading CT Geodata CSV: {e}")
             return None
 
+CT_GEODATA_MAPPING = {
+    'Owner': 'owner',
+    'Co_Owner': 'co_owner',
+    'Assessed_Total': 'assessed_value',
+    'Land_Acres': 'acres',
+    'Zone': 'zone',
+    'State_Use_Description': 'property_type',
+    'AYB': 'year_built',
+    'Living_Area': 'living_area',
+    'Sale_Price': 'sale_amount',
+    'Sale_Date': 'sale_date',
+    'Mailing_Address': 'mailing_address',
+    'Mailing_City': 'mailing_city',
+    'Mailing_State': 'mailing_state',
+    'Mailing_Zip': 'mailing_zip',
+    'CAMA_Link': 'cama_site_link',
+    'Location': 'location',
+    'Unit_Type': 'unit',
+    'Occupancy': 'number_of_units'
+}
+# The statewide parcel CSV exports dates as "2019/05/01 00:00:00+00"
+CT_GEODATA_DATE_FORMATS = ['%Y/%m/%d %H:%M:%S+00', '%Y/%m/%d', '%m/%d/%Y', '%Y-%m-%d']
+
+
+def process_ct_geodata_records(df):
+    """
+    Turns one town's rows of the CT Geodata parcel CSV into
+    {normalized address: [property data dicts]}, column-wise.
+    """
+    def column(name):
+        return df[name] if name in df else pd.Series(None, index=df.index, dtype=object)
+
+    def text(name):
+        return column(name).fillna('').astype(str).str.strip()
+
+    # Skip CNDASC placeholder units (Condo Association administrative records)
+    unit_type = text('Unit_Type')
+    keep = ~unit_type.str.upper().str.contains('CNDASC|CONDO ASC', regex=True)
+
+    loc1 = text('Location')
+    loc2 = text('Location_CAMA')
+
+    # Heuristic: Pick the one that looks more like a full address (New Haven fix)
+    # If both are just "93" or numeric, try to recover from Mailing Address or Owner Name
+    numeric_artifact = loc1.str.isdigit() & (loc1.str.len() < 4)
+    mailing = column('Mailing_Address')
+    new_haven_mailing = mailing.notna() & (text('Mailing_City').str.upper() == 'NEW HAVEN')
+    owner = column('Owner')
+    # Try to extract address from Owner if it looks like "123 MAIN ST LLC"
+    owner_upper = owner.fillna('').astype(str).str.upper()
+    owner_addr = owner_upper.str.split(' LLC', n=1, regex=False).str[0]
+    owner_is_addr = owner_upper.str.contains(' LLC', regex=False) & owner_addr.str.match(r'\d')
+    loc = pd.Series(
+        np.select(
+            [
+                (numeric_artifact & new_haven_mailing).to_numpy(),
+                (numeric_artifact & owner.notna()).to_numpy(),
+                numeric_artifact.to_numpy(),
+                ((loc2.str.len() > loc1.str.len()) & loc2.str.contains(' ', regex=False)).to_numpy(),
+                (loc1.str.len() > 0).to_numpy(),
+            ],
+            [
+                mailing.fillna('').astype(str).str.strip().to_numpy(dtype=object),
+                # No address in the owner name: nothing usable
+                owner_addr.where(owner_is_addr, '').to_numpy(dtype=object),
+                loc2.where(loc2.str.len() > loc1.str.len(), loc1).to_numpy(dtype=object),
+                loc2.to_numpy(dtype=object),
+                loc1.to_numpy(dtype=object),
+            ],
+            default=loc2.to_numpy(dtype=object),
+        ),
+        index=df.index,
+        dtype=object,
+    )
+    keep &= loc != ''
+
+    out = pd.DataFrame(index=df.index)
+    for src, target in CT_GEODATA_MAPPING.items():
+        if src not in df:
+            continue
+        if target == 'sale_date':
+            out[target] = _parse_date_series(df[src], CT_GEODATA_DATE_FORMATS, infer_rest=True)
+        else:
+            out[target] = df[src]
+
+    out['appraised_value'] = df['appraised_value']
+
+    # --- Auto-Calculate missing values (70% Rule) ---
+    _apply_70_percent_rule(out)
+
+    if 'Link_From_CAMA' in df:
+        out['cama_site_link'] = out['cama_site_link'].where(out['cama_site_link'].notna(), df['Link_From_CAMA']) if 'cama_site_link' in out else df['Link_From_CAMA']
+
+    # Only assign unit if present in official record
+    # Do NOT infer or assign a unit if official record does not have one
+    out['unit'] = unit_type.where(unit_type != '')
+
+    keep = keep.to_numpy()
+    return _group_by_address(
+        normalize_address_series(loc[keep]),
+        _frame_to_records(out[keep]),
+    )
+
+
 def process_municipality_with_ct_geodata(conn, municipality_name, config, current_owner_only=False, force_process=False):
     """Process municipality using CT Geodata CSV."""
     log(f"--- Processing {municipality_name} via CT Geodata CSV ---")
@@ -637,105 +784,13 @@ def process_municipality_with_ct_geodata(conn, municipality_name, config, curren
     # 4. Map columns
     # OBJECTID,Town Name,Location,CAMA_Link,Parcel_ID,Parcel Type,Unit_Type,Link,Collection_year,Editor,Editor Comment,Edit_Date,Link_From_CAMA,Location_CAMA,Property_City,Property_Zip,Owner,Co_Owner,Mailing_Address,Mailing_City,Mailing_State,Mailing_Zip,Assessed_Total,Assessed_Land,Assessed_Building,Pre_Yr_Assessed_Total,Appraised_Land,Appraised_Building,Appraised_Outbuilding,Valuation_Year,Land_Acres,Zone,State_Use,State_Use_Description,EYB,AYB,Model,Condition,Living_Area,Effective_Area,Total_Rooms,Number_of_Bedroom,Number_of_Baths,Number_of_Half_Baths,Sale_Price,Sale_Date,Prior_Sale_Date,Prior_Book_Page,Prior_Sale_Price,Occupancy,FIPS Code,CouncilsOfGovernments,Shape__Area,Shape__Length
 
-    mapping = {
-        'Owner': 'owner',
-        'Co_Owner': 'co_owner',
-        'Assessed_Total': 'assessed_value',
-        'Land_Acres': 'acres',
-        'Zone': 'zone',
-        'State_Use_Description': 'property_type',
-        'AYB': 'year_built',
-        'Living_Area': 'living_area',
-        'Sale_Price': 'sale_amount',
-        'Sale_Date': 'sale_date',
-        'Mailing_Address': 'mailing_address',
-        'Mailing_City': 'mailing_city',
-        'Mailing_State': 'mailing_state',
-        'Mailing_Zip': 'mailing_zip',
-        'CAMA_Link': 'cama_site_link',
-        'Location': 'location',
-        'Unit_Type': 'unit',
-        'Occupancy': 'number_of_units'
-    }
-
     # Pre-calculate appraised_value
     df['appraised_value'] = df[['Appraised_Land', 'Appraised_Building', 'Appraised_Outbuilding']].sum(axis=1)
 
-    # Custom process data logic
-    processed_data = {}
-    for _, row in df.iterrows():
-        try:
-            # Skip CNDASC placeholder units (Condo Association administrative records)
-            unit_type = str(row.get('Unit_Type', '')).upper()
-            if 'CNDASC' in unit_type or 'CONDO ASC' in unit_type:
-                continue
-
-            loc1 = str(row.get('Location', '')).strip()
-            loc2 = str(row.get('Location_CAMA', '')).strip()
-
-            # Heuristic: Pick the one that looks more like a full address (New Haven fix)
-            # If both are just "93" or numeric, try to recover from Mailing Address or Owner Name
-            if loc1.isdigit() and len(loc1) < 4:
-                # "93" artifact case
-                if pd.notna(row.get('Mailing_Address')) and str(row.get('Mailing_City')).upper() == 'NEW HAVEN':
-                     loc = str(row['Mailing_Address']).strip()
-                elif pd.notna(row.get('Owner')):
-                     # Try to extract address from Owner if it looks like "123 MAIN ST LLC"
-                     owner = str(row['Owner']).upper()
-                     if ' LLC' in owner:
-                         possible_addr = owner.split(' LLC')[0]
-                         if possible_addr[0].isdigit():
-                             loc = possible_addr
-                else:
-                     loc = loc2 if len(loc2) > len(loc1) else loc1
-            elif len(loc2) > len(loc1) and ' ' in loc2:
-                loc = loc2
-            elif len(loc1) > 0:
-                loc = loc1
-            else:
-                loc = loc2
-
-            if not loc:
-                continue
-
-            norm_addr = normalize_address_for_matching(loc)
-
-            p_data = {}
-            for src, target in mapping.items():
-                val = row.get(src)
-                if pd.notna(val):
-                    if target == 'sale_date':
-                         try: p_data[target] = pd.to_datetime(val).date()
-                         except: pass
-                    else:
-                         p_data[target] = val
-
-            p_data['appraised_value'] = row['appraised_value']
-
-            # --- Auto-Calculate missing values (70% Rule) ---
-            if p_data.get('appraised_value', 0) > 0:
-                if 'assessed_value' not in p_data or not p_data['assessed_value']:
-                    p_data['assessed_value'] = round(p_data['appraised_value'] * 0.70, 2)
-            elif p_data.get('assessed_value', 0) > 0:
-                if 'appraised_value' not in p_data or not p_data['appraised_value']:
-                    p_data['appraised_value'] = round(p_data['assessed_value'] / 0.70, 2)
-
-            if 'cama_site_link' not in p_data and pd.notna(row.get('Link_From_CAMA')):
-                p_data['cama_site_link'] = row['Link_From_CAMA']
-
-            # Only assign unit if present in official record
-            official_unit = str(row.get('Unit_Type', '')).strip()
-            if official_unit:
-                p_data['unit'] = official_unit
-            # Do NOT infer or assign a unit if official record does not have one
-
-            if norm_addr not in processed_data:
-                processed_data[norm_addr] = []
-            processed_data[norm_addr].append(p_data)
-        except: continue
+    processed_data = process_ct_geodata_records(df)
 
     # 5. Update DB
-    updated_count = 0
+    writer = PropertyWriteBehind(conn, municipality_name)
     processed_count = 0
 
     # Tracker for multi-unit matches at same address
@@ -744,7 +799,7 @@ def process_municipality_with_ct_geodata(conn, municipality_name, config, curren
     for prop_id, prop_location, _ in db_properties:
         processed_count += 1
         if not prop_location:
-            mark_property_processed_today(conn, prop_id)
+            writer.mark_processed(prop_id)
             continue
 
         norm_addr = normalize_address_for_matching(prop_location)
@@ -752,7 +807,7 @@ def process_municipality_with_ct_geodata(conn, municipality_name, config, curren
         # SKIP PLACEHOLDERS: Do not attempt matching if the address is a known placeholder
         # to prevent "smearing" one record across thousands of generic records.
         if is_placeholder_address(norm_addr):
-            mark_property_processed_today(conn, prop_id)
+            writer.mark_processed(prop_id)
             continue
 
         matches = processed_data.get(norm_addr)
@@ -761,15 +816,15 @@ def process_municipality_with_ct_geodata(conn, municipality_name, config, curren
             idx = addr_match_index.get(norm_addr, 0)
             if idx < len(matches):
                 v_data = matches[idx]
-                if update_property_in_db(conn, prop_id, v_data):
-                    updated_count += 1
+                writer.add(prop_id, v_data)
                 addr_match_index[norm_addr] = idx + 1
 
-        mark_property_processed_today(conn, prop_id)
+        writer.mark_processed(prop_id)
 
         if processed_count % 100 == 0:
-            log(f"    -> Progress for {municipality_name}: {processed_count}/{len(db_properties)}, updated {updated_count}...")
+            log(f"    -> Progress for {municipality_name}: {processed_count}/{len(db_properties)}, updated {writer.updated}...")
 
+    updated_count = writer.close()
     log(f"Finished {municipality_name}. Updated {updated_count}.")
 
     # --- NEW: Hartford Enrichment Trigger ---
@@ -796,7 +851,7 @@ def process_municipality_with_ct_geodata(conn, municipality_name, config, curren
             log(f"    - ... and {len(potential_collapses) - 5} more")
 
     # --- AUTOMATIC FRESHNESS UPDATE ---
-    update_freshness_status(conn, municipality_name, 'ct_geodata_csv', 'Success', details=f"Scraped {updated_count} properties.")
+    update_freshness_status(conn, municipality_name, 'ct_geodata_csv', 'Success', details=f"Scraped {updated_count} properties.", data_changed=bool(updated_count))
 
     return updated_count
 
@@ -906,6 +961,25 @@ def parse_mapxpress_html(html_content):
     return data
 
 
+def parse_mapxpress_page(resp):
+    """Parses a fetched MapXpress detail page, resolving the photo against the final URL."""
+    scraped_data = parse_mapxpress_html(resp.text)
+
+    # Resolve relative photo URL if found
+    if 'building_photo' in scraped_data:
+        photo_path = scraped_data['building_photo']
+        if not photo_path.startswith('http'):
+            if photo_path.startswith('/'):
+                from urllib.parse import urlparse
+                parsed = urlparse(resp.url)
+                scraped_data['building_photo'] = f"{parsed.scheme}://{parsed.netloc}{photo_path}"
+            else:
+                scraped_data['building_photo'] = resp.url.rsplit('/', 1)[0] + '/' + photo_path
+
+    scraped_data['cama_site_link'] = resp.key
+    return scraped_data
+
+
 def scrape_mapxpress_property(session, base_url_template, row):
     """Worker function to scrape a single property."""
     import time
@@ -924,25 +998,18 @@ def scrape_mapxpress_property(session, base_url_template, row):
     target_url = base_url_template.format(unique_id)
 
     try:
-        # Reduced sleep time for parallel execution (random jitter 0.1s - 0.5s)
-        time.sleep(random.uniform(0.1, 0.5))
-
-        resp = session.get(target_url, timeout=15)
+        # Reduced sleep time for parallel execution (random jitter 0.1s - 0.5s); the governor paces instead
+        if not HOST_GOVERNOR.enabled:
+            time.sleep(random.uniform(0.1, 0.5))
+
+        resp = SCRAPE_CACHE.get(session, target_url, source='mapxpress', timeout=15)
+        if resp.unchanged:
+            if SCRAPE_CACHE.skip_unchanged:
+                return prop_id, SCRAPE_UNCHANGED, None
+            return prop_id, resp.record, None
         if resp.status_code == 200:
-            scraped_data = parse_mapxpress_html(resp.text)
-
-            # Resolve relative photo URL if found
-            if 'building_photo' in scraped_data:
-                photo_path = scraped_data['building_photo']
-                if not photo_path.startswith('http'):
-                    if photo_path.startswith('/'):
-                        from urllib.parse import urlparse
-                        parsed = urlparse(resp.url)
-                        scraped_data['building_photo'] = f"{parsed.scheme}://{parsed.netloc}{photo_path}"
-                    else:
-                        scraped_data['building_photo'] = resp.url.rsplit('/', 1)[0] + '/' + photo_path
-
-            scraped_data['cama_site_link'] = target_url
+            scraped_data = parse_mapxpress_page(resp)
+            SCRAPE_CACHE.put_record(resp, scraped_data)
             return prop_id, scraped_data, None
         else:
             return prop_id, None, f"Status {resp.status_code}"
@@ -1119,7 +1186,7 @@ def process_municipality_with_mapxpress(conn, municipality_name, data_source_con
 
     base_url_template = f"https://{domain}/PAGES/detail.asp?{id_param}={{}}"
 
-    updated_count = 0
+    writer = PropertyWriteBehind(conn, municipality_name)
     processed_count = 0
 
     session = get_session()
@@ -1140,20 +1207,20 @@ def process_municipality_with_mapxpress(conn, municipality_name, data_source_con
             prop_id, scraped_data, error_msg = future.result()
 
             if scraped_data:
-                if update_property_in_db(conn, prop_id, scraped_data, municipality_name=municipality_name):
-                    updated_count += 1
+                writer.add(prop_id, scraped_data)
             elif error_msg:
                 # Log error but don't spam if common
                 if "Status 404" not in error_msg:
                      pass # log(f"Scrape error for {prop_id}: {error_msg}")
 
             # Always mark processed
-            mark_property_processed_today(conn, prop_id)
+            writer.mark_processed(prop_id)
 
             processed_count += 1
             if processed_count % 50 == 0:
-                log(f"  -> Scraped {processed_count}/{len(properties)}, updated {updated_count}...", municipality=municipality_name)
+                log(f"  -> Scraped {processed_count}/{len(properties)}, updated {writer.updated}...", municipality=municipality_name)
 
+    updated_count = writer.close()
     log(f"Finished {municipality_name}. Scraped {processed_count}, Updated {updated_count}.", municipality=municipality_name)
     return updated_count
 
@@ -1236,6 +1303,15 @@ def parse_propertyrecordcards_html(html_content):
 
     return data
 
+def parse_propertyrecordcards_page(resp):
+    """Parses a fetched PropertyRecordCards page; None when nothing was found."""
+    scraped_data = parse_propertyrecordcards_html(resp.text)
+    if not scraped_data:
+        return None
+    scraped_data['cama_site_link'] = resp.key
+    return scraped_data
+
+
 def scrape_propertyrecordcards_property(session, base_url_template, row, towncode=None):
     """Worker function to scrape a single PropertyRecordCards property."""
     import time
@@ -1258,34 +1334,40 @@ def scrape_propertyrecordcards_property(session, base_url_template, row, towncod
     target_url = base_url_template.format(unique_id)
 
     try:
-        # Respectful jitter
-        time.sleep(random.uniform(0.1, 0.5))
+        # Respectful jitter (the host governor paces requests when enabled)
+        if not HOST_GOVERNOR.enabled:
+            time.sleep(random.uniform(0.1, 0.5))
+
+        resp = SCRAPE_CACHE.get(session, target_url, source='propertyrecordcards', timeout=20)
+        if resp.unchanged:
+            if SCRAPE_CACHE.skip_unchanged:
+                return prop_id, SCRAPE_UNCHANGED, None
+            scraped_data = resp.record
+        else:
+            # Check for soft errors or redirect to search page (invalid ID)
+            if "SearchMaster.aspx" in resp.url and "propertyresults.aspx" not in resp.url:
+                 return prop_id, None, "Redirected to Search (Invalid ID?)"
 
-        resp = session.get(target_url, timeout=20)
+            if resp.status_code != 200:
+                return prop_id, None, f"Status {resp.status_code}"
 
-        # Check for soft errors or redirect to search page (invalid ID)
-        if "SearchMaster.aspx" in resp.url and "propertyresults.aspx" not in resp.url:
-             return prop_id, None, "Redirected to Search (Invalid ID?)"
+            # Cached before the row-specific unit fallback below, so replay can rebuild it from the page alone
+            scraped_data = parse_propertyrecordcards_page(resp)
+            SCRAPE_CACHE.put_record(resp, scraped_data)
 
-        if resp.status_code == 200:
-            scraped_data = parse_propertyrecordcards_html(resp.text)
-            if scraped_data: # Ensure we actually got some data
-                # Fallback: If unit is missing, try to infer from location
-                if 'unit' not in scraped_data or not scraped_data['unit']:
-                    # Extract unit from location if predictable (Space + Single Letter or Digits)
-                    # Regex: Space followed by (Single Uppercase Letter OR 1-4 Digits) at end of string
-                    # Excludes street suffixes like AV, RD, ST (2 letters).
-                    import re # Ensure re is available (module level usually imports it but safer here)
-                    m = re.search(r'\s([A-Z]|\d{1,4})$', location)
-                    if m:
-                         scraped_data['unit'] = m.group(1)
-
-                scraped_data['cama_site_link'] = target_url
-                return prop_id, scraped_data, None
-            else:
-                return prop_id, None, "No data parsed"
-        else:
-            return prop_id, None, f"Status {resp.status_code}"
+        if not scraped_data: # Ensure we actually got some data
+            return prop_id, None, "No data parsed"
+
+        # Fallback: If unit is missing, try to infer from location
+        if 'unit' not in scraped_data or not scraped_data['unit']:
+            # Extract unit from location if predictable (Space + Single Letter or Digits)
+            # Regex: Space followed by (Single Uppercase Letter OR 1-4 Digits) at end of string
+            # Excludes street suffixes like AV, RD, ST (2 letters).
+            m = re.search(r'\s([A-Z]|\d{1,4})$', location)
+            if m:
+                 scraped_data['unit'] = m.group(1)
+
+        return prop_id, scraped_data, None
 
     except Exception as e:
         return prop_id, None, str(e)
@@ -1433,7 +1515,7 @@ def process_municipality_with_propertyrecordcards(conn, municipality_name, data_
 
     base_url_template = f"https://www.propertyrecordcards.com{path_prefix}/propertyresults.aspx?towncode={towncode}&uniqueid={{}}"
 
-    updated_count = 0
+    writer = PropertyWriteBehind(conn, municipality_name)
     processed_count = 0
 
     session = get_session()
@@ -1452,8 +1534,7 @@ def process_municipality_with_propertyrecordcards(conn, municipality_name, data_
             prop_id, scraped_data, error_msg = future.result()
 
             if scraped_data:
-                if update_property_in_db(conn, prop_id, scraped_data, municipality_name=municipality_name):
-                    updated_count += 1
+                writer.add(prop_id, scraped_data)
             elif error_msg:
                 # log(f"Scrape error for {prop_id}: {error_msg}")
                 pass
@@ -1463,12 +1544,13 @@ def process_municipality_with_propertyrecordcards(conn, municipality_name, data_
             # But the scraper currently gets whatever is in src.
             # We'll handle normalization in update_property_in_db or here.
 
-            mark_property_processed_today(conn, prop_id)
+            writer.mark_processed(prop_id)
             processed_count += 1
 
             if processed_count % 50 == 0:
-                log(f"  -> Scraped {processed_count}/{len(properties)}, updated {updated_count}...", municipality=municipality_name)
+                log(f"  -> Scraped {processed_count}/{len(properties)}, updated {writer.updated}...", municipality=municipality_name)
 
+    updated_count = writer.close()
     log(f"Finished {municipality_name}. Scraped {processed_count}, Updated {updated_count}.", municipality=municipality_name)
     return updated_count
 
@@ -1554,8 +1636,13 @@ def normalize_address(address):
 
     return normalized
 
-def scrape_individual_property_page(prop_page_url, session, referer, municipality=None):
-    """Scrapes data from a single property detail page."""
+def scrape_individual_property_page(prop_page_url, session, referer, municipality=None, skip_unchanged=True):
+    """Scrapes data from a single property detail page.
+
+    Returns SCRAPE_UNCHANGED (falsy) when the page is unchanged since the last
+    run and skip_unchanged is set; otherwise the record, reusing the cached
+    one instead of re-parsing when the page is unchanged.
+    """
     # print(f"DEBUG: START Scraping {prop_page_url}", flush=True) # Commented out to avoid spam, uncomment if needed
     try:
         # User requested silence, but I need to see errors.
@@ -1564,15 +1651,24 @@ def scrape_individual_property_page(prop_page_url, session, referer, municipalit
             'Referer': referer,
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
-        response = session.get(prop_page_url, verify=False, timeout=20, headers=headers)
+        response = SCRAPE_CACHE.get(session, prop_page_url, source='vision', verify=False, timeout=20, headers=headers)
         response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-        # print(f"DEBUG: Scraped URL {prop_page_url} - Payload Size: {len(response.content)} - Title: {soup.title.text.strip() if soup.title else 'No Title'}", flush=True)
-
     except Exception as e:
         print(f"DEBUG: EXCEPTION fetching {prop_page_url}: {e}", flush=True)
         return None
 
+    if response.unchanged:
+        return SCRAPE_UNCHANGED if (skip_unchanged and SCRAPE_CACHE.skip_unchanged) else response.record
+
+    data = parse_vision_property_html(response.content, prop_page_url, municipality=municipality)
+    SCRAPE_CACHE.put_record(response, data)
+    return data
+
+
+def parse_vision_property_html(content, prop_page_url, municipality=None):
+    """Parses a Vision Parcel.aspx page into the record update_property_in_db expects."""
+    soup = BeautifulSoup(content, 'html.parser')
+    # print(f"DEBUG: Scraped URL {prop_page_url} - Payload Size: {len(content)} - Title: {soup.title.text.strip() if soup.title else 'No Title'}", flush=True)
     data = {}
 
     # Vision Appraisal specific selectors (primary strategy)
@@ -1710,7 +1806,9 @@ def scrape_street_properties(street_link, municipality_url, referer, session=Non
 
     # Random jitter to avoid strict pattern detection
     # Use smaller jitter if we are sharing a session to keep things fast but safe
-    time.sleep(random.uniform(0.1, 0.5) if session else random.uniform(0.5, 1.5))
+    # (the host governor paces requests when enabled)
+    if not HOST_GOVERNOR.enabled:
+        time.sleep(random.uniform(0.1, 0.5) if session else random.uniform(0.5, 1.5))
 
     try:
         if session:
@@ -1746,7 +1844,8 @@ def scrape_street_properties(street_link, municipality_url, referer, session=Non
 
             prop_page_url = urljoin(municipality_url, href)
             # Use provided session for individual property scraping too
-            prop_details = scrape_individual_property_page(prop_page_url, session, street_link, municipality=municipality_name)
+            # Address matching needs every record, so unchanged pages come back from the cache
+            prop_details = scrape_individual_property_page(prop_page_url, session, street_link, municipality=municipality_name, skip_unchanged=False)
 
             if prop_details:
                 # Add the specific parcel URL to the data dict so it can be saved in the DB
@@ -1858,7 +1957,14 @@ def scrape_all_properties_by_address(municipality_url, municipality_name):
     return all_props_data
 
 def get_session(pool_size=50):
-    """Returns a requests session with optimized connection pooling."""
+    """
+    Returns a requests session with optimized connection pooling.
+
+    With the host governor enabled (HOST_GOVERNOR=1, the default) requests are
+    paced per host and share that host's connection pool across towns.
+    """
+    if HOST_GOVERNOR.enabled:
+        return GovernedSession(HOST_GOVERNOR)
     session = requests.Session()
     adapter = HTTPAdapter(
         pool_connections=pool_size,
@@ -1868,62 +1974,65 @@ def get_session(pool_size=50):
     session.mount("http://", adapter)
     session.mount("https://", adapter)
     return session
-def update_property_in_db(conn, property_db_id, vision_data, restricted_mode=False, municipality_name=None):
+# Owner/field values that never count as real data and are always overwritten
+PLACEHOLDER_NAMES = {
+    'CURRENT OWNER', 'UNKNOWN OWNER', 'OCCUPANT', 'OWNER',
+    'UNKNOWN', 'CT', 'CONNECTICUT', 'THE', 'INC', 'LLC', 'CORP',
+    'USA', 'UNITED STATES', 'NO NAME', 'N/A', 'NA', 'NONE',
+    'NO INFORMATION PROVIDED', 'NOT PROVIDED', 'VACANT', 'NULL',
+    'NOT AVAILABLE', '[UNKNOWN]', 'CURRENT COMPANY OWNER', 'CURRENT COMPANY-OWNER',
+    'SV', 'SURVIVORSHIP', 'JT', 'TIC', 'TC', 'ET AL', 'LII', 'ETAL'
+}
+
+# Fields that ARE NEVER allowed to be overwritten by the scraper if they already have data
+# unless the new data is substantially "better" (not handled automatically here)
+PROTECTED_FIELDS = {
+    'latitude', 'longitude', 'normalized_address',
+    'unit', 'unit_cut', 'owner', 'co_owner', 'location', 'account_number'
+}
+
+RESTRICTED_STATE_FIELDS = ['owner', 'sale_amount', 'sale_date', 'assessed_value', 'appraised_value', 'year_built', 'living_area', 'property_type', 'acres', 'zone', 'location', 'number_of_units']
+# We need owner, sale_date, sale_amount, location, property_city to detect ownership changes
+TRANSACTION_DETECTION_FIELDS = ['owner', 'owner_norm', 'sale_date', 'sale_amount', 'location', 'property_city']
+# Superset read by the write-behind prefetch; each record still only sees its own columns
+PROPERTY_STATE_COLUMNS = sorted(set(RESTRICTED_STATE_FIELDS + TRANSACTION_DETECTION_FIELDS + ['account_number']))
+
+PROPERTY_TRANSACTION_COLUMNS = (
+    'property_id', 'transaction_date', 'transaction_amount',
+    'buyer_name', 'buyer_raw', 'seller_name', 'seller_raw',
+    'transaction_type', 'source', 'location', 'property_city',
+)
+
+PROPERTY_WRITE_BATCH = int(os.environ.get("PROPERTY_WRITE_BATCH", "500"))
+
+
+def property_state_columns(vision_data, restricted_mode=False):
+    """Columns of the current row a scraped record is compared against."""
+    if restricted_mode:
+        cols_to_fetch = [k for k in vision_data.keys() if k in RESTRICTED_STATE_FIELDS]
+        if 'account_number' not in cols_to_fetch:
+            cols_to_fetch.append('account_number')
+        # Merge in transaction detection fields
+        for f in TRANSACTION_DETECTION_FIELDS:
+            if f not in cols_to_fetch:
+                cols_to_fetch.append(f)
+        return cols_to_fetch
+    # Even in non-restricted mode, fetch fields needed for transaction detection
+    return list(set(
+        [k for k in vision_data.keys() if k in ['owner', 'sale_amount', 'sale_date', 'location', 'property_city']]
+        + TRANSACTION_DETECTION_FIELDS
+    ))
+
+
+def compute_property_update(property_db_id, vision_data, current_state, municipality_name=None):
     """
-    Updates a property record in the database with new information.
-    restricted_mode (bool): If True, only update fields that are currently empty or 'Current Owner'.
-                            Exceptions: 'cama_site_link', 'building_photo', 'unit', 'unit_cut' are always updated.
+    Diffs a scraped record against the current row.
 
-    Also detects ownership transitions and logs them to property_transactions
-    for historical tracking of acquisitions and dispositions.
+    Returns (updates, transaction): the fields to write, in record order, and
+    a property_transactions row (PROPERTY_TRANSACTION_COLUMNS order) when the
+    record is an ownership transition, else None.
     """
-    if not vision_data or not any(v is not None for v in vision_data.values()):
-        return False
-
-    # --- ALWAYS fetch current state for transaction detection ---
-    # We need owner, sale_date, sale_amount, location, property_city to detect ownership changes
-    current_state = {}
-    transaction_detection_fields = ['owner', 'owner_norm', 'sale_date', 'sale_amount', 'location', 'property_city']
-
-    try:
-        with conn.cursor() as cursor:
-            if restricted_mode:
-                cols_to_fetch = [k for k in vision_data.keys() if k in ['owner', 'sale_amount', 'sale_date', 'assessed_value', 'appraised_value', 'year_built', 'living_area', 'property_type', 'acres', 'zone', 'location', 'number_of_units']]
-                if 'account_number' not in cols_to_fetch:
-                    cols_to_fetch.append('account_number')
-                # Merge in transaction detection fields
-                for f in transaction_detection_fields:
-                    if f not in cols_to_fetch:
-                        cols_to_fetch.append(f)
-            else:
-                # Even in non-restricted mode, fetch fields needed for transaction detection
-                cols_to_fetch = list(set(
-                    [k for k in vision_data.keys() if k in ['owner', 'sale_amount', 'sale_date', 'location', 'property_city']]
-                    + transaction_detection_fields
-                ))
-
-            select_sql = sql.SQL("SELECT {} FROM properties WHERE id = %s").format(
-                sql.SQL(", ").join(map(sql.Identifier, cols_to_fetch))
-            )
-            cursor.execute(select_sql, (property_db_id,))
-            row = cursor.fetchone()
-            if row:
-                current_state = dict(zip(cols_to_fetch, row))
-            else:
-                return False  # ID not found
-    except psycopg2.Error as e:
-        log(f"DB fetch error for property ID {property_db_id}: {e}", municipality=municipality_name)
-        return False
-
-    update_fields = []
-    values = []
-
-    # Fields that ARE NEVER allowed to be overwritten by the scraper if they already have data
-    # unless the new data is substantially "better" (not handled automatically here)
-    PROTECTED_FIELDS = {
-        'latitude', 'longitude', 'normalized_address',
-        'unit', 'unit_cut', 'owner', 'co_owner', 'location', 'account_number'
-    }
+    updates = {}
 
     for key, new_value in vision_data.items():
         if new_value is None or str(new_value).strip() == '':
@@ -1933,19 +2042,10 @@ def update_property_in_db(conn, property_db_id, vision_data, restricted_mode=Fal
         current_val = current_state.get(key)
 
         # 1. Placeholder logic: Always update if current is placeholder
-        placeholder_names = {
-            'CURRENT OWNER', 'UNKNOWN OWNER', 'OCCUPANT', 'OWNER',
-            'UNKNOWN', 'CT', 'CONNECTICUT', 'THE', 'INC', 'LLC', 'CORP',
-            'USA', 'UNITED STATES', 'NO NAME', 'N/A', 'NA', 'NONE',
-            'NO INFORMATION PROVIDED', 'NOT PROVIDED', 'VACANT', 'NULL',
-            'NOT AVAILABLE', '[UNKNOWN]', 'CURRENT COMPANY OWNER', 'CURRENT COMPANY-OWNER',
-            'SV', 'SURVIVORSHIP', 'JT', 'TIC', 'TC', 'ET AL', 'LII', 'ETAL'
-        }
-
         is_placeholder = (
             current_val is None or
             str(current_val).strip() == '' or
-            str(current_val).strip().upper() in placeholder_names or
+            str(current_val).strip().upper() in PLACEHOLDER_NAMES or
             (key == 'location' and str(current_val).strip().replace(' ', '').isdigit() and len(str(current_val).strip()) < 6)
         )
 
@@ -1964,17 +2064,13 @@ def update_property_in_db(conn, property_db_id, vision_data, restricted_mode=Fal
 
         if should_update:
             log(f"Updating field {key} (old: {current_val}) -> (new: {new_value})", municipality=municipality_name)
-            update_fields.append(sql.SQL("{} = %s").format(sql.Identifier(key)))
-            values.append(new_value)
-        else:
-            # print(f"DEBUG DB: Skipping field {key} because should_update is False", flush=True)
-            pass
+            updates[key] = new_value
 
-    if not update_fields:
-        print(f"DEBUG DB: No fields to update for property {property_db_id}", flush=True)
-        return False
+    if not updates:
+        return updates, None
 
     # --- TRANSACTION DETECTION: Log ownership transitions before committing ---
+    transaction = None
     try:
         new_owner = vision_data.get('owner')
         new_sale_date = vision_data.get('sale_date')
@@ -1989,8 +2085,8 @@ def update_property_in_db(conn, property_db_id, vision_data, restricted_mode=Fal
         # 3. Sale date is present on the incoming data
         owner_is_changing = (
             new_owner and current_owner and
-            str(new_owner).strip().upper() not in placeholder_names and
-            str(current_owner).strip().upper() not in placeholder_names and
+            str(new_owner).strip().upper() not in PLACEHOLDER_NAMES and
+            str(current_owner).strip().upper() not in PLACEHOLDER_NAMES and
             str(new_owner).strip().upper() != str(current_owner).strip().upper()
         )
 
@@ -2016,27 +2112,19 @@ def update_property_in_db(conn, property_db_id, vision_data, restricted_mode=Fal
             elif clean_amount <= 1000:
                 tx_type = 'nominal'
 
-            ensure_property_transactions_schema(conn)
-            with conn.cursor() as cursor:
-                cursor.execute("""
-                    INSERT INTO property_transactions
-                    (property_id, transaction_date, transaction_amount,
-                     buyer_name, buyer_raw, seller_name, seller_raw,
-                     transaction_type, source, location, property_city)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """, (
-                    property_db_id,
-                    new_sale_date,
-                    clean_amount,
-                    normalize_business_name(new_owner) if new_owner else None,
-                    str(new_owner).strip() if new_owner else None,          # buyer_raw
-                    current_owner_norm,                                      # seller_name (already normalized)
-                    str(current_owner).strip() if current_owner else None,   # seller_raw
-                    tx_type,
-                    'scrape_delta',
-                    current_state.get('location'),
-                    current_state.get('property_city')
-                ))
+            transaction = (
+                property_db_id,
+                new_sale_date,
+                clean_amount,
+                normalize_business_name(new_owner) if new_owner else None,
+                str(new_owner).strip() if new_owner else None,          # buyer_raw
+                current_owner_norm,                                      # seller_name (already normalized)
+                str(current_owner).strip() if current_owner else None,   # seller_raw
+                tx_type,
+                'scrape_delta',
+                current_state.get('location'),
+                current_state.get('property_city')
+            )
 
             log(f"TRANSACTION DETECTED: Property {property_db_id} "
                 f"({current_state.get('location')}, {current_state.get('property_city')}) "
@@ -2046,12 +2134,70 @@ def update_property_in_db(conn, property_db_id, vision_data, restricted_mode=Fal
     except Exception as e:
         # Never let transaction logging break the actual update
         log(f"Warning: Transaction logging failed for property {property_db_id}: {e}", municipality=municipality_name)
+        transaction = None
+
+    return updates, transaction
+
+
+def update_property_in_db(conn, property_db_id, vision_data, restricted_mode=False, municipality_name=None):
+    """
+    Updates a property record in the database with new information.
+    restricted_mode (bool): If True, only update fields that are currently empty or 'Current Owner'.
+                            Exceptions: 'cama_site_link', 'building_photo', 'unit', 'unit_cut' are always updated.
+
+    Also detects ownership transitions and logs them to property_transactions
+    for historical tracking of acquisitions and dispositions.
+
+    Single-parcel path; bulk callers use PropertyWriteBehind, which applies the
+    same rules through compute_property_update.
+    """
+    if not vision_data or not any(v is not None for v in vision_data.values()):
+        return False
+
+    # --- ALWAYS fetch current state for transaction detection ---
+    current_state = {}
+    try:
+        with conn.cursor() as cursor:
+            cols_to_fetch = property_state_columns(vision_data, restricted_mode)
+            select_sql = sql.SQL("SELECT {} FROM properties WHERE id = %s").format(
+                sql.SQL(", ").join(map(sql.Identifier, cols_to_fetch))
+            )
+            cursor.execute(select_sql, (property_db_id,))
+            row = cursor.fetchone()
+            if row:
+                current_state = dict(zip(cols_to_fetch, row))
+            else:
+                return False  # ID not found
+    except psycopg2.Error as e:
+        log(f"DB fetch error for property ID {property_db_id}: {e}", municipality=municipality_name)
+        return False
+
+    updates, transaction = compute_property_update(property_db_id, vision_data, current_state, municipality_name)
+
+    if not updates:
+        print(f"DEBUG DB: No fields to update for property {property_db_id}", flush=True)
+        # Nothing to write still means the row reflects this record
+        SCRAPE_CACHE.mark_applied([vision_data])
+        return False
+
+    if transaction:
+        try:
+            ensure_property_transactions_schema(conn)
+            with conn.cursor() as cursor:
+                cursor.execute(sql.SQL("INSERT INTO property_transactions ({}) VALUES ({})").format(
+                    sql.SQL(", ").join(map(sql.Identifier, PROPERTY_TRANSACTION_COLUMNS)),
+                    sql.SQL(", ").join(sql.Placeholder() * len(PROPERTY_TRANSACTION_COLUMNS)),
+                ), transaction)
+        except Exception as e:
+            # Never let transaction logging break the actual update
+            log(f"Warning: Transaction logging failed for property {property_db_id}: {e}", municipality=municipality_name)
 
     # Use psycopg2.sql to safely format identifiers and structure
     query_sql = sql.SQL("UPDATE properties SET {} WHERE id = %s").format(
-        sql.SQL(", ").join(update_fields)
+        sql.SQL(", ").join(sql.SQL("{} = %s").format(sql.Identifier(key)) for key in updates)
     )
 
+    values = list(updates.values())
     values.append(property_db_id)
 
     try:
@@ -2059,30 +2205,260 @@ def update_property_in_db(conn, property_db_id, vision_data, restricted_mode=Fal
             cursor.execute(query_sql, values)
             conn.commit()
             # log(f"Committed updates for property {property_db_id}", municipality=municipality_name)
+            SCRAPE_CACHE.mark_applied([vision_data])
             return True
     except psycopg2.Error as e:
         log(f"DB update error for property ID {property_db_id}: {e}")
         conn.rollback()
         return False
 
-def find_match_for_property(prop_address, scraped_properties_dict):
-    """Helper function to find a scraped property matching a DB address."""
+
+_PROPERTY_COLUMN_TYPES = {}
+_INTEGER_TYPES = {'integer', 'bigint', 'smallint'}
+
+
+def _copy_field(value, pg_type=None):
+    """One value in COPY text format."""
+    if value is None:
+        return '\\N'
+    if pg_type in _INTEGER_TYPES and not isinstance(value, bool):
+        # A parameterized UPDATE would assignment-cast 3.0 to 3; COPY only accepts "3"
+        try:
+            value = int(round(float(value)))
+        except (TypeError, ValueError):
+            pass
+    text = value.isoformat() if isinstance(value, (date, datetime)) else str(value)
+    return text.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+def _copy_rows(cursor, table, columns, rows, column_types=None):
+    column_types = column_types or {}
+    buffer = StringIO()
+    for row in rows:
+        buffer.write('\t'.join(_copy_field(v, column_types.get(c)) for c, v in zip(columns, row)))
+        buffer.write('\n')
+    buffer.seek(0)
+    cursor.copy_expert(
+        sql.SQL("COPY {} ({}) FROM STDIN").format(
+            sql.Identifier(table), sql.SQL(", ").join(map(sql.Identifier, columns))
+        ),
+        buffer,
+    )
+
+
+def property_column_types(conn):
+    if not _PROPERTY_COLUMN_TYPES:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT column_name, data_type FROM information_schema.columns
+                WHERE table_schema = current_schema() AND table_name = 'properties'
+            """)
+            _PROPERTY_COLUMN_TYPES.update(dict(cursor.fetchall()))
+    return _PROPERTY_COLUMN_TYPES
+
+
+class PropertyWriteBehind:
+    """
+    Buffers scraped records and processed-today marks for one municipality
+    and writes them in batches instead of one SELECT + UPDATE per parcel.
+
+    Each flush prefetches the current rows for the whole batch, diffs every
+    record with compute_property_update (same protected-field and
+    restricted-mode rules as update_property_in_db), COPYs the changes into
+    a temp staging table per column set and applies them with one
+    UPDATE ... FROM, COPYs detected transactions into property_transactions,
+    and upserts the processing log. If a batch fails it is retried parcel by
+    parcel through update_property_in_db. Records are reported to
+    SCRAPE_CACHE.mark_applied only once their batch has committed.
+
+    Use from one thread (the as_completed loop); call close() at the end.
+    """
+
+    def __init__(self, conn, municipality_name=None, batch_size=PROPERTY_WRITE_BATCH):
+        self.conn = conn
+        self.municipality_name = municipality_name
+        self.batch_size = batch_size
+        self._records = []
+        self._processed_ids = []
+        self.started = time.time()
+        self.stats = {"parcels": 0, "updated": 0, "transactions": 0, "flushes": 0, "flush_seconds": 0.0, "fallbacks": 0}
+
+    @property
+    def updated(self):
+        return self.stats["updated"]
+
+    def add(self, property_db_id, vision_data, restricted_mode=False):
+        if not vision_data or not any(v is not None for v in vision_data.values()):
+            return
+        self._records.append((property_db_id, vision_data, restricted_mode))
+        self.stats["parcels"] += 1
+        if len(self._records) >= self.batch_size:
+            self.flush()
+
+    def mark_processed(self, property_id):
+        self._processed_ids.append(property_id)
+        if len(self._processed_ids) >= self.batch_size * 4:
+            self.flush()
+
+    def flush(self):
+        records, self._records = self._records, []
+        processed_ids, self._processed_ids = self._processed_ids, []
+        if not records and not processed_ids:
+            return
+        start = time.time()
+        if records:
+            try:
+                self.stats["updated"] += self._write_batch(records)
+                SCRAPE_CACHE.mark_applied(vision_data for _, vision_data, _ in records)
+            except psycopg2.Error as e:
+                self.conn.rollback()
+                self.stats["fallbacks"] += 1
+                log(f"Batch write of {len(records)} parcels failed ({e}); retrying one by one", municipality=self.municipality_name)
+                for property_db_id, vision_data, restricted_mode in records:
+                    if update_property_in_db(self.conn, property_db_id, vision_data, restricted_mode=restricted_mode, municipality_name=self.municipality_name):
+                        self.stats["updated"] += 1
+        if processed_ids:
+            self._write_processed(processed_ids)
+        self.stats["flushes"] += 1
+        self.stats["flush_seconds"] += time.time() - start
+
+    def close(self):
+        """Flushes what is left and logs throughput; returns the number of parcels updated."""
+        self.flush()
+        elapsed = max(time.time() - self.started, 1e-6)
+        log(
+            f"  -> Write-behind for {self.municipality_name}: {self.stats['parcels']} parcels "
+            f"({self.stats['updated']} updated, {self.stats['transactions']} transactions) in {elapsed:.1f}s "
+            f"= {self.stats['parcels'] / elapsed:.1f} parcels/sec "
+            f"(DB {self.stats['flush_seconds']:.1f}s over {self.stats['flushes']} flushes)",
+            municipality=self.municipality_name,
+        )
+        return self.stats["updated"]
+
+    def _write_batch(self, records):
+        ids = sorted({property_db_id for property_db_id, _, _ in records})
+        with self.conn.cursor() as cursor:
+            cursor.execute(
+                sql.SQL("SELECT id, {} FROM properties WHERE id = ANY(%s)").format(
+                    sql.SQL(", ").join(map(sql.Identifier, PROPERTY_STATE_COLUMNS))
+                ),
+                (ids,),
+            )
+            current_rows = {row[0]: dict(zip(PROPERTY_STATE_COLUMNS, row[1:])) for row in cursor.fetchall()}
+
+        updates_by_id = {}
+        transactions = []
+        for property_db_id, vision_data, restricted_mode in records:
+            row = current_rows.get(property_db_id)
+            if row is None:
+                continue  # ID not found
+            current_state = {c: row.get(c) for c in property_state_columns(vision_data, restricted_mode)}
+            updates, transaction = compute_property_update(property_db_id, vision_data, current_state, self.municipality_name)
+            if not updates:
+                continue
+            # A later record for the same parcel in this batch sees the earlier one's writes
+            row.update(updates)
+            updates_by_id.setdefault(property_db_id, {}).update(updates)
+            if transaction:
+                transactions.append(transaction)
+
+        if not updates_by_id:
+            return 0
+
+        column_types = property_column_types(self.conn)
+        by_columns = defaultdict(list)
+        for property_db_id, updates in updates_by_id.items():
+            by_columns[tuple(sorted(updates))].append((property_db_id, updates))
+
+        if transactions:
+            ensure_property_transactions_schema(self.conn)
+        with self.conn.cursor() as cursor:
+            if transactions:
+                _copy_rows(cursor, 'property_transactions', PROPERTY_TRANSACTION_COLUMNS, transactions)
+            for columns, rows in by_columns.items():
+                column_list = sql.SQL(", ").join(map(sql.Identifier, columns))
+                cursor.execute(sql.SQL(
+                    "CREATE TEMP TABLE property_update_stage ON COMMIT DROP AS SELECT id, {} FROM properties LIMIT 0"
+                ).format(column_list))
+                _copy_rows(
+                    cursor, 'property_update_stage', ('id',) + columns,
+                    [(property_db_id,) + tuple(updates[c] for c in columns) for property_db_id, updates in rows],
+                    column_types,
+                )
+                cursor.execute(sql.SQL("UPDATE properties p SET {} FROM property_update_stage s WHERE p.id = s.id").format(
+                    sql.SQL(", ").join(sql.SQL("{0} = s.{0}").format(sql.Identifier(c)) for c in columns)
+                ))
+                cursor.execute("DROP TABLE property_update_stage")
+        self.conn.commit()
+        self.stats["transactions"] += len(transactions)
+        return len(updates_by_id)
+
+    def _write_processed(self, property_ids):
+        query = """
+            INSERT INTO property_processing_log (property_id, last_processed_date)
+            SELECT DISTINCT unnest(%s::int[]), %s
+            ON CONFLICT (property_id)
+            DO UPDATE SET last_processed_date = EXCLUDED.last_processed_date
+        """
+        try:
+            with self.conn.cursor() as cursor:
+                cursor.execute(query, (property_ids, date.today()))
+            self.conn.commit()
+        except psycopg2.Error:
+            self.conn.rollback()
+            # If table doesn't exist, create it (fallback)
+            create_processing_log_table(self.conn)
+            with self.conn.cursor() as cursor:
+                cursor.execute(query, (property_ids, date.today()))
+            self.conn.commit()
+
+def find_match_for_property(prop_address, scraped_properties_dict, address_index=None):
+    """
+    Helper function to find a scraped property matching a DB address.
+
+    Pass an AddressIndex built once over scraped_properties_dict when matching
+    a whole town; without one an index is built for this single lookup.
+    Returns (matched scraped address, record) or None.
+    """
     if not prop_address:
         return None
+    if address_index is None:
+        address_index = AddressIndex(scraped_properties_dict)
+    return address_index.match(normalize_address(prop_address))
 
-    normalized_db_address = normalize_address(prop_address)
+def fetch_vision_fast_path(props_with_urls, referer_url, municipality_name):
+    """
+    Yields (prop_id, prop_url, record) for each known Vision parcel URL as its
+    page is scraped; record is falsy when the page failed or is unchanged
+    (SCRAPE_UNCHANGED).
 
-    # Strategy 1: Direct match on normalized address
-    if normalized_db_address in scraped_properties_dict:
-        return scraped_properties_dict[normalized_db_address]
-    else:
-        # Strategy 2: Fuzzy matching for edge cases
-        for scraped_addr, vision_data in scraped_properties_dict.items():
-            # Check if DB address is in scraped address or vice-versa
-            if normalized_db_address in scraped_addr or scraped_addr in normalized_db_address:
-                return vision_data
+    Uses the httpx/asyncio fetcher with process-pool parsing when
+    ASYNC_FETCH=1 (or --async-fetch) and httpx is installed, else the
+    thread pool.
+    """
+    headers = {'Referer': referer_url, 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+    if ASYNC_FAST_PATH and async_fetch.httpx is not None:
+        fetcher = async_fetch.AsyncPageFetcher(SCRAPE_CACHE, HOST_GOVERNOR)
+        parse = functools.partial(parse_vision_property_html, municipality=municipality_name)
+        start = time.time()
+        yield from fetcher.results(props_with_urls, parse, 'vision', headers=headers, verify=False, timeout=20)
+        elapsed = max(time.time() - start, 1e-6)
+        log(f"  -> Async fetch for {municipality_name}: {fetcher.stats} in {elapsed:.1f}s ({len(props_with_urls) / elapsed:.1f} pages/sec)")
+        return
+    if ASYNC_FAST_PATH:
+        log("httpx not installed - FAST PATH falling back to threaded requests")
+
+    with get_session() as session:
+        session.headers.update({'User-Agent': headers['User-Agent']})
+        with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            future_to_id = {
+                executor.submit(scrape_individual_property_page, prop_url, session, referer_url, municipality_name): (prop_id, prop_url)
+                for prop_id, prop_url in props_with_urls
+            }
+            for future in concurrent.futures.as_completed(future_to_id):
+                prop_id, prop_url = future_to_id[future]
+                yield prop_id, prop_url, future.result()
 
-    return None
 
 def process_municipality_with_realtime_updates(conn, municipality_name, municipality_url, last_updated_date=None, current_owner_only=False, force_process=False):
     """
@@ -2169,36 +2545,27 @@ def process_municipality_with_realtime_updates(conn, municipality_name, municipa
     # --- GROUP 1: Process properties we already have URLs for (FAST PATH) ---
     if props_with_urls:
         log(f"  -> Starting FAST PATH: Directly scraping {len(props_with_urls)} property URLs...")
-        group1_updated_count = 0
+        writer = PropertyWriteBehind(conn, municipality_name)
         group1_processed_count = 0  # <--- NEW COUNTER
+        group1_unchanged_count = 0
         referer_url = f"{municipality_url}Streets.aspx" # Use a generic valid referer
 
-        with get_session() as session:
-            session.headers.update({'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'})
-            with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-                future_to_id = {
-                    executor.submit(scrape_individual_property_page, prop_url, session, referer_url, municipality_name): prop_id
-                    for prop_id, prop_url in props_with_urls
-                }
-
-                for future in concurrent.futures.as_completed(future_to_id):
-                    prop_id = future_to_id[future]
-                    vision_data = future.result()
-                    if vision_data:
-                        # Ensure we persist the URL we just scraped (Fast Path implies we have it, but consistent re-save is good)
-                        vision_data['cama_site_link'] = prop_url
-                        if update_property_in_db(conn, prop_id, vision_data, restricted_mode=restricted_mode, municipality_name=municipality_name):
-                            group1_updated_count += 1
-
-                    group1_processed_count += 1 # <--- INCREMENT COUNTER
-                    # --- NEW LOGGING LINE ---
-                    if group1_processed_count % 100 == 0:
-                        log(f"    -> FAST PATH progress for {municipality_name}: Processed {group1_processed_count}/{len(props_with_urls)}, Updated {group1_updated_count} so far...")
-                        update_freshness_status(conn, municipality_name, 'vision_appraisal', 'running', details=f"Fast Path: {group1_processed_count}/{len(props_with_urls)} processed")
-
-
-
-        log(f"  -> FAST PATH complete. Updated {group1_updated_count} properties.")
+        for prop_id, prop_url, vision_data in fetch_vision_fast_path(props_with_urls, referer_url, municipality_name):
+            if vision_data is SCRAPE_UNCHANGED:
+                group1_unchanged_count += 1
+            elif vision_data:
+                # Ensure we persist the URL we just scraped (Fast Path implies we have it, but consistent re-save is good)
+                vision_data['cama_site_link'] = prop_url
+                writer.add(prop_id, vision_data, restricted_mode=restricted_mode)
+
+            group1_processed_count += 1 # <--- INCREMENT COUNTER
+            # --- NEW LOGGING LINE ---
+            if group1_processed_count % 100 == 0:
+                log(f"    -> FAST PATH progress for {municipality_name}: Processed {group1_processed_count}/{len(props_with_urls)}, Updated {writer.updated} so far...")
+                update_freshness_status(conn, municipality_name, 'vision_appraisal', 'running', details=f"Fast Path: {group1_processed_count}/{len(props_with_urls)} processed")
+
+        group1_updated_count = writer.close()
+        log(f"  -> FAST PATH complete. Updated {group1_updated_count} properties ({group1_unchanged_count} pages unchanged since last scrape).")
         total_updated_count += group1_updated_count
 
     # --- GROUP 2: Process properties we need to find via full scrape (SLOW PATH / POPULATION PATH) ---
@@ -2215,20 +2582,19 @@ def process_municipality_with_realtime_updates(conn, municipality_name, municipa
             group2_updated_count = 0
             processed_in_group = 0
             matched_addresses = set()  # Track which scraped properties we've matched
+            address_index = AddressIndex(scraped_properties)
 
             # First pass: Try address-based matching for properties with locations
             for prop_db_id, prop_address in props_without_urls:
-                vision_data = find_match_for_property(prop_address, scraped_properties)
+                match = find_match_for_property(prop_address, scraped_properties, address_index)
 
-                if vision_data:
+                if match:
+                    matched_addr, vision_data = match
                     # This update will save owner, sales, AND the new 'cama_site_link'
                     if update_property_in_db(conn, prop_db_id, vision_data, restricted_mode=restricted_mode, municipality_name=municipality_name):
                         group2_updated_count += 1
                         # Track the address we matched so we know which scraped properties are "used"
-                        for addr, data in scraped_properties.items():
-                            if data == vision_data:
-                                matched_addresses.add(addr)
-                                break
+                        matched_addresses.add(matched_addr)
 
                 processed_in_group += 1
                 if processed_in_group % 100 == 0:
@@ -2261,19 +2627,25 @@ def process_municipality_with_realtime_updates(conn, municipality_name, municipa
     # --- FINALIZE: Mark all items from the original queue as processed ---
     # We do this even if 'force' is on, to ensure the 'last_processed_date' is always today's date.
     log(f"  -> Finalizing: Marking all {len(all_processed_ids)} properties as processed for today.")
+    processed_log = PropertyWriteBehind(conn, municipality_name)
     for prop_id in all_processed_ids:
-        mark_property_processed_today(conn, prop_id)
+        processed_log.mark_processed(prop_id)
+    processed_log.flush()
 
     log(f"Finished {municipality_name}. Total Updated: {total_updated_count} of {len(all_processed_ids)} properties.")
 
     # --- AUTOMATIC FRESHNESS UPDATE ---
-    update_freshness_status(conn, municipality_name, 'vision_appraisal', 'Success', details=f"Scraped {total_updated_count} properties via regular/direct URL scraping.")
+    update_freshness_status(conn, municipality_name, 'vision_appraisal', 'Success', details=f"Scraped {total_updated_count} properties via regular/direct URL scraping.", data_changed=bool(total_updated_count))
 
     return total_updated_count
 
 
-def update_freshness_status(conn, source_name, source_type, status, details=None, external_date=None, preserve_external_date=True):
-    """Updates the data_source_status table with progress."""
+def update_freshness_status(conn, source_name, source_type, status, details=None, external_date=None, preserve_external_date=True, data_changed=False):
+    """Updates the data_source_status table with progress.
+
+    Pass data_changed=True on the final success status of a run that wrote
+    property rows; only that invalidates the cached network payloads.
+    """
     try:
         with conn.cursor() as cursor:
             if details:
@@ -2311,6 +2683,17 @@ def update_freshness_status(conn, source_name, source_type, status, details=None
             # ensures the frontend "Completeness Matrix" reflects this update immediately
             cursor.execute("DELETE FROM kv_cache WHERE key = 'completeness_matrix'")
 
+            if data_changed and status.lower() == 'success':
+                # Property rows changed, so cached network payloads are stale. A
+                # failed bump must not take the status write down with it.
+                cursor.execute("SAVEPOINT network_version_bump")
+                try:
+                    bump_network_data_version(cursor, source_name)
+                    cursor.execute("RELEASE SAVEPOINT network_version_bump")
+                except psycopg2.Error as e:
+                    cursor.execute("ROLLBACK TO SAVEPOINT network_version_bump")
+                    log(f"Could not bump network data version for {source_name}: {e}")
+
             conn.commit()
     except Exception as e:
         log(f"Error updating freshness status for {source_name}: {e}")
@@ -2339,7 +2722,7 @@ def process_municipality_with_windsor_api(conn, municipality_name, config, curre
 
     log(f"Found {len(properties_to_scan)} properties to scan.")
 
-    session = requests.Session()
+    session = get_session()
     session.headers.update({
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
     })
@@ -2367,8 +2750,9 @@ def process_municipality_with_windsor_api(conn, municipality_name, config, curre
         st_name_cleaned = re.sub(r"\s+(?:ST|AVE|RD|LN|DR|CT|CIR|PL|BLVD|HWY|TPKE)$", "", st_name, flags=re.IGNORECASE).strip()
 
         try:
-             # Rate limiting - simple sleep
-             time.sleep(0.5)
+             # Rate limiting - simple sleep unless the host governor paces requests
+             if not HOST_GOVERNOR.enabled:
+                 time.sleep(0.5)
 
              resp = session.get(base_api_url, params={"st_num": st_num, "st_name": st_name_cleaned}, timeout=20)
              if resp.status_code != 200:
@@ -2467,42 +2851,50 @@ def scrape_mapgeo_property(session, base_url, unique_id, layout_id):
              'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
         }
 
-        resp = session.get(detail_url, params=params, headers=headers, timeout=10)
+        resp = SCRAPE_CACHE.get(session, detail_url, source='mapgeo', params=params, headers=headers, timeout=10)
+        if resp.unchanged:
+            return SCRAPE_UNCHANGED if SCRAPE_CACHE.skip_unchanged else resp.record
         if resp.status_code == 404:
             return None
         resp.raise_for_status()
 
-        data = resp.json()
-        properties = data.get('data', {})
+        record = parse_mapgeo_details(resp.json())
+        SCRAPE_CACHE.put_record(resp, record)
+        return record
 
-        owner_name = properties.get('ownerName')
-        if not owner_name and properties.get('owners'):
-            owner_name = properties['owners'][0]
+    except Exception as e:
+        log(f"Error scraping MapGeo property {unique_id}: {e}")
+        return None
 
-        mailing_address = properties.get('mailingAddress')
-        if not mailing_address:
-             mailing_address = f"{properties.get('mailingAddress1', '')} {properties.get('mailingAddress2', '')}".strip()
 
-        sale_date = properties.get('lastSaleDate') or properties.get('saleDate')
-        sale_price = properties.get('lastSalePrice') or properties.get('salePrice')
+def parse_mapgeo_details(data):
+    """Maps a MapGeo itemDetails payload onto the fields the MapGeo processor stores."""
+    properties = data.get('data', {})
 
-        assessed_value = properties.get('assessedValue') or properties.get('totalAssessedValue')
-        appraised_value = properties.get('appraisedValue') or properties.get('totalAppraisedValue')
-        year_built = properties.get('yearBuilt')
+    owner_name = properties.get('ownerName')
+    if not owner_name and properties.get('owners'):
+        owner_name = properties['owners'][0]
 
-        return {
-            'owner': owner_name,
-            'mailing_address': mailing_address,
-            'sale_date': sale_date,
-            'sale_price': sale_price,
-            'assessed_value': assessed_value,
-            'appraised_value': appraised_value,
-            'year_built': year_built
-        }
+    mailing_address = properties.get('mailingAddress')
+    if not mailing_address:
+         mailing_address = f"{properties.get('mailingAddress1', '')} {properties.get('mailingAddress2', '')}".strip()
 
-    except Exception as e:
-        log(f"Error scraping MapGeo property {unique_id}: {e}")
-        return None
+    sale_date = properties.get('lastSaleDate') or properties.get('saleDate')
+    sale_price = properties.get('lastSalePrice') or properties.get('salePrice')
+
+    assessed_value = properties.get('assessedValue') or properties.get('totalAssessedValue')
+    appraised_value = properties.get('appraisedValue') or properties.get('totalAppraisedValue')
+    year_built = properties.get('yearBuilt')
+
+    return {
+        'owner': owner_name,
+        'mailing_address': mailing_address,
+        'sale_date': sale_date,
+        'sale_price': sale_price,
+        'assessed_value': assessed_value,
+        'appraised_value': appraised_value,
+        'year_built': year_built
+    }
 
 def process_municipality_with_mapgeo(conn, municipality_name, data_source_config, current_owner_only=False, force_process=False):
     """
@@ -2519,7 +2911,7 @@ def process_municipality_with_mapgeo(conn, municipality_name, data_source_config
     log(f"Starting MapGeo processing for {municipality_name} at {base_url}")
 
     # 1. Discovery Phase
-    session = requests.Session()
+    session = get_session()
     session.headers.update({
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
         'Referer': base_url + '/',
@@ -2606,7 +2998,7 @@ def process_municipality_with_mapgeo(conn, municipality_name, data_source_config
 
     log(f"Found {len(properties_to_scrape)} properties to scrape detail for.")
 
-    updated_count = 0
+    writer = PropertyWriteBehind(conn, municipality_name)
     with concurrent.futures.ThreadPoolExecutor(max_workers=DEFAULT_MUNI_WORKERS) as executor:
         future_to_prop = {
             executor.submit(scrape_mapgeo_property, session, base_url, prop[2], layout_id): prop
@@ -2628,12 +3020,11 @@ def process_municipality_with_mapgeo(conn, municipality_name, data_source_config
                         'appraised_value': str(data['appraised_value']).replace('$','').replace(',','') if data['appraised_value'] else None,
                         'year_built': data['year_built'],
                     }
-                    if update_property_in_db(conn, db_id, scraped_data, municipality_name=municipality_name):
-                        updated_count += 1
+                    writer.add(db_id, scraped_data)
             except Exception as e:
                 log(f"Error updating property {address}: {e}")
 
-    return updated_count
+    return writer.close()
 
 def process_municipality_with_tighe_bond(conn, municipality_name, data_source_config, current_owner_only=False, force_process=False):
     """
@@ -2647,7 +3038,7 @@ def process_municipality_with_tighe_bond(conn, municipality_name, data_source_co
     log(f"Starting Tighe & Bond processing for {municipality_name}")
 
     # 1. Discovery (ArcGIS)
-    session = requests.Session()
+    session = get_session()
     params = {
         'searchText': '%',
         'contains': 'true',
@@ -2729,7 +3120,7 @@ def process_municipality_with_tighe_bond(conn, municipality_name, data_source_co
 
     log(f"Found {len(properties_to_scrape)} properties to scrape detail for.")
 
-    updated_count = 0
+    writer = PropertyWriteBehind(conn, municipality_name)
     # PropertyRecordCards Base URL
     prc_base_url = "https://www.propertyrecordcards.com/PropertyResults.aspx?towncode={}&uniqueid={{}}"
     town_code = data_source_config.get('town_code', '42')
@@ -2761,16 +3152,15 @@ def process_municipality_with_tighe_bond(conn, municipality_name, data_source_co
                     if scraped_data.get('appraised_value'):
                         scraped_data['appraised_value'] = str(scraped_data['appraised_value']).replace('$','').replace(',','')
 
-                    if update_property_in_db(conn, db_id, scraped_data, municipality_name=municipality_name):
-                        updated_count += 1
+                    writer.add(db_id, scraped_data)
                 elif error_msg:
                     pass
 
-                mark_property_processed_today(conn, db_id)
+                writer.mark_processed(db_id)
             except Exception as e:
                 log(f"Error updating property {address}: {e}")
 
-    return updated_count
+    return writer.close()
 
 def process_municipality_task(city_name, city_data, current_owner_only, force_process):
     """
@@ -2835,7 +3225,7 @@ def process_municipality_task(city_name, city_data, current_owner_only, force_pr
                     log(f"--- Processing HARTFORD via Custom Script ---")
                     # run_enrichment returns an integer count of updated properties
                     updated_count = run_enrichment()
-                    update_freshness_status(conn, city_name, 'hartford_script', 'Success', details=f"Scraped {updated_count} properties.")
+                    update_freshness_status(conn, city_name, 'hartford_script', 'Success', details=f"Scraped {updated_count} properties.", data_changed=bool(updated_count))
                 except Exception as e:
                     log(f"Error running Hartford script: {e}")
                     updated_count = 0
@@ -2902,6 +3292,7 @@ def process_municipality_task(city_name, city_data, current_owner_only, force_pr
             details=f"Updated {updated_count} properties",
             external_date=source_date,
             preserve_external_date=source_date is not None,
+            data_changed=bool(updated_count),
         )
 
         return updated_count
@@ -2923,6 +3314,31 @@ def process_municipality_task(city_name, city_data, current_owner_only, force_pr
 
 
 # --- Main Execution (Rewritten for Parallelism) ---
+SCRAPE_REPLAY_PARSERS = {
+    'vision': lambda page: parse_vision_property_html(page.content, page.key),
+    'mapxpress': parse_mapxpress_page,
+    'propertyrecordcards': parse_propertyrecordcards_page,
+    'mapgeo': lambda page: parse_mapgeo_details(page.json()),
+}
+
+
+def replay_scrape_cache(source=None, limit=None):
+    """Re-parses cached detail pages offline (no network, no database).
+
+    Records that differ from what was stored are flagged so the next live run
+    writes them to the database even though the page itself is unchanged.
+    """
+    parsed = failed = 0
+    for url, page_source, record in SCRAPE_CACHE.replay(SCRAPE_REPLAY_PARSERS, source=source, limit=limit):
+        if record:
+            parsed += 1
+        else:
+            failed += 1
+            log(f"[Replay] No record parsed from {url} ({page_source})")
+    log(f"[Replay] Re-parsed {parsed + failed} cached pages: {parsed} records, {failed} failures.")
+    return parsed, failed
+
+
 def main():
     """Main function to run the update process."""
     parser = argparse.ArgumentParser(description='Update property data from Vision Appraisal websites and other municipal data sources')
@@ -2936,8 +3352,30 @@ def main():
                        help=f'Number of municipalities to process in parallel (Default: {DEFAULT_MUNI_WORKERS})')
     parser.add_argument('--force', '-f', action='store_true',
                        help='Force reprocessing of all properties, ignoring the last processed date')
+    parser.add_argument('--async-fetch', action='store_true',
+                       help='Scrape the Vision fast path with asyncio/httpx and parse pages in a process pool')
+    parser.add_argument('--no-host-governor', action='store_true',
+                       help='Use plain sessions with fixed jitter sleeps instead of adaptive per-host pacing')
+    parser.add_argument('--no-scrape-cache', action='store_true',
+                       help='Fetch and parse every detail page, bypassing the scrape cache')
+    parser.add_argument('--replay-scrape-cache', nargs='?', const='all', metavar='SOURCE',
+                       help='Re-parse cached pages offline (optionally one source: vision, mapxpress, propertyrecordcards, mapgeo) and exit')
     args = parser.parse_args()
 
+    if args.no_scrape_cache:
+        SCRAPE_CACHE.enabled = False
+    if args.no_host_governor:
+        HOST_GOVERNOR.enabled = False
+    if args.async_fetch:
+        global ASYNC_FAST_PATH
+        ASYNC_FAST_PATH = True
+    if args.replay_scrape_cache:
+        replay_scrape_cache(None if args.replay_scrape_cache == 'all' else args.replay_scrape_cache)
+        return
+    if args.force:
+        # Forced runs still reuse cached records, but every page goes through the database
+        SCRAPE_CACHE.skip_unchanged = False
+
     log(f"Starting data update process...")
     log(f"Settings: Parallel Municipalities={args.parallel_munis}, Force Reprocess={args.force}, Source Only={SOURCE_ONLY}")
 
@@ -3085,6 +3523,8 @@ def main():
         log("Setup complete. Closed main DB connection. Starting worker pool.")
 
         # --- 3. EXECUTION PHASE: Process the queue in parallel ---
+        # Live per-platform request throughput while towns run
+        HOST_GOVERNOR.start_reporter(log)
         with concurrent.futures.ThreadPoolExecutor(max_workers=args.parallel_munis) as executor:
             # Submit all jobs to the pool
             future_to_city = {
@@ -3127,6 +3567,10 @@ def main():
         property_type = "'Current Owner'" if args.current_owner_only else "all"
         log(f"\n--- PROCESS COMPLETE ---")
         log(f"Updated {total_updated} total {property_type} properties across {len(municipality_list)} municipalities.")
+        if SCRAPE_CACHE.enabled:
+            log(f"Scrape cache: {SCRAPE_CACHE.summary()}")
+        for line in HOST_GOVERNOR.report(window=3600.0):
+            log(f"📶 {line}")
 
     except Exception as e:
         log(f"Critical error in main thread: {e}")
@@ -3285,7 +3729,7 @@ def process_municipality_with_actdatascout(conn, municipality_name, config, curr
     base_url = config['url']
     county_id = config.get('county_id') # e.g. 9103 for Norwalk
 
-    session = requests.Session()
+    session = get_session()
     session.headers.update({
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
         "Accept": "*/*",